@@ -11,6 +11,22 @@ export interface ScanResult {
     file_name: string;
     sensitive_fields: any[];
   };
+  detection_id?: string;
+}
+
+export interface DetectionSummary {
+  totalDetections: number;
+  totalFindings: number;
+  byCategory: Record<string, number>;
+  byType: Record<string, number>;
+  byConfidence: Record<string, number>;
+  byDay: Record<string, { detections: number; findings: number }>;
+}
+
+export interface FileFindingCount {
+  fileName: string;
+  findings: number;
+  detections: number;
 }
 
 export class BackendService {
@@ -30,12 +46,12 @@ export class BackendService {
     return headers;
   }
 
-  static async scanFile(file: File): Promise<ScanResult> {
+  static async scanFile(file: File, persist: boolean = false): Promise<ScanResult> {
     const formData = new FormData();
     formData.append('file', file);
 
     try {
-      const response = await fetch(`${API_URL}/scan`, {
+      const response = await fetch(`${API_URL}/scan${persist ? '?persist=true' : ''}`, {
         method: 'POST',
         headers: this.getHeaders(),
         body: formData,
@@ -76,7 +92,47 @@ export class BackendService {
     }
 
     const data = await response.json();
-    return data[0]['detections'];
+    return data['detections'];
+  }
+
+  static async fetchDetectionSummary(): Promise<DetectionSummary> {
+    const response = await fetch(`${API_URL}/analytics/summary`, {
+      headers: this.getHeaders()
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch detection summary: ' + (await response.text()));
+    }
+
+    return await response.json();
+  }
+
+  static async fetchTopFiles(limit: number = 10): Promise<FileFindingCount[]> {
+    const response = await fetch(`${API_URL}/analytics/top-files?limit=${limit}`, {
+      headers: this.getHeaders()
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch top files: ' + (await response.text()));
+    }
+
+    const data = await response.json();
+    return data['files'];
+  }
+
+  static async findDetectionsByValue(value: string): Promise<any[]> {
+    const response = await fetch(`${API_URL}/detections/by-value`, {
+      method: 'POST',
+      headers: this.getHeaders(true),
+      body: JSON.stringify({ value }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to look up value: ' + (await response.text()));
+    }
+
+    const data = await response.json();
+    return data['detections'];
   }
 
   static async deleteResult(id: string): Promise<void> {
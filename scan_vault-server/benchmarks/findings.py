@@ -0,0 +1,95 @@
+"""
+Compares findings held as plain dicts with the slotted Finding type.
+
+Dicts are what JSONParser used to return: one dict per finding, each with its
+own label strings, validated into response models before being encoded.
+Findings are slotted, share interned labels and are encoded by orjson
+without an intermediate dict.
+
+Usage (from the server directory):
+    python -m benchmarks.findings --findings 1000000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import orjson
+
+from src.server.models.finding import Finding
+from src.server.models.scan_result import ScanResponse
+
+
+def model_output(count: int) -> list:
+    # Parsed model output, so every label is a separate string as with json.loads
+    return json.loads(json.dumps([
+        {
+            "type": "email",
+            "value": f"user{i}@example.com",
+            "confidence": "high",
+            "context": "Contact information section",
+            "category": "PII",
+        }
+        for i in range(count)
+    ]))
+
+
+def as_dicts(raw: list) -> list:
+    return [dict(item) for item in raw]
+
+
+def as_findings(raw: list) -> list:
+    return [Finding.from_dict(item) for item in raw]
+
+
+def legacy_response(findings: list) -> bytes:
+    # What the scan route did through response_model=ScanResponse
+    content = {"message": "success", "results": {"file_name": "bench.txt", "sensitive_fields": findings}}
+    return orjson.dumps(ScanResponse.model_validate(content).model_dump(mode="json", exclude_unset=True))
+
+
+def direct_response(findings: list) -> bytes:
+    return orjson.dumps({"message": "success", "results": {"file_name": "bench.txt", "sensitive_fields": findings}})
+
+
+def measure(build, render, raw: list):
+    """Retained memory of the built findings, then build, render and full GC times."""
+    gc.collect()
+    tracemalloc.start()
+    findings = build(raw)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del findings
+    gc.collect()
+
+    start = time.perf_counter()
+    findings = build(raw)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    render(findings)
+    rendered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gc.collect()
+    collected = time.perf_counter() - start
+    return retained, built, rendered, collected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, default=1000000)
+    args = parser.parse_args()
+
+    raw = model_output(args.findings)
+    for label, build, render in (("dicts", as_dicts, legacy_response), ("Finding", as_findings, direct_response)):
+        retained, built, rendered, collected = measure(build, render, raw)
+        print(
+            f"{label:8} {retained / 2 ** 20:8.1f} MiB retained  build {built * 1000:7.1f} ms  "
+            f"response {rendered * 1000:7.1f} ms  full GC {collected * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Compares scanning over the REST API with the gRPC API.
+
+Serves the real scan pipeline over both transports from one child
+process, with the model call stubbed out and near-duplicate reuse off, so
+the numbers show what each transport costs: multipart parsing and a
+request per file for ``POST /scan``, against raw chunk messages for
+``Scan`` (one call per file) and ``ScanBatch`` (every file over one
+stream). Each client runs ``--concurrency`` calls at a time over one
+connection or channel.
+
+Usage (from the server directory):
+    python -m benchmarks.grpc_vs_rest --files 500 --size-kb 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SCAN_VAULT_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import grpc
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from src.server.models.finding import Finding
+from src.server.routes.scan import router as scan_router, scan_service
+from src.server.rpc import scan_vault_pb2 as pb
+from src.server.rpc import scan_vault_pb2_grpc
+from src.server.rpc.server import GrpcServer
+
+CHUNK_SIZE = 64 * 1024
+API_KEY = os.environ["SCAN_VAULT_API_KEY"]
+
+
+async def stub_model(text: str) -> list:
+    """Stand-in for the model call, so only the transport is measured."""
+    return [Finding("email", "a@example.com", "high", category="PII")] if "a@example.com" in text else []
+
+
+def build_file(index: int, size: int) -> bytes:
+    line = f"record {index}: contact a@example.com about invoice {index}\n".encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+def serve(http_port: int, grpc_port: int) -> None:
+    """Run both servers on one event loop, as a worker does."""
+    scan_service.llm_handler.analyze_text_async = stub_model
+    app = FastAPI()
+    app.include_router(scan_router)
+    http = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=http_port, log_level="warning"))
+    rpc = GrpcServer(port=grpc_port, host="127.0.0.1")
+
+    async def run():
+        await rpc.start(scan_service)
+        await http.serve()
+        await rpc.stop(0)
+
+    asyncio.run(run())
+
+
+def start_server(http_port: int, grpc_port: int) -> subprocess.Popen:
+    """Serve from a separate process, so clients and servers do not share a CPU or event loop."""
+    env = dict(os.environ)
+    # The files are near-duplicates of each other; reusing findings would favour whichever transport runs last
+    env["SCAN_VAULT_DEDUP_MIN_WORDS"] = str(10 ** 9)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.grpc_vs_rest", "--serve",
+         "--http-port", str(http_port), "--grpc-port", str(grpc_port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{http_port}/")
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Benchmark server did not become ready")
+
+
+def chunks(content: bytes, filename: str, file_id: str = ""):
+    for start in range(0, len(content), CHUNK_SIZE):
+        yield pb.FileChunk(
+            file_id=file_id,
+            filename=filename if start == 0 else "",
+            data=content[start:start + CHUNK_SIZE],
+            last=start + CHUNK_SIZE >= len(content),
+        )
+
+
+async def run_rest(port: int, files: list, concurrency: int) -> int:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        async def scan(index, content):
+            async with semaphore:
+                response = await client.post(
+                    "/scan", files={"file": (f"file-{index}.txt", content)}, headers={"access_token": API_KEY}
+                )
+                return response.status_code == 200
+
+        return sum(await asyncio.gather(*(scan(i, content) for i, content in enumerate(files))))
+
+
+async def run_grpc_unary(port: int, files: list, concurrency: int) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = scan_vault_pb2_grpc.ScanVaultStub(channel)
+
+        async def scan(index, content):
+            async with semaphore:
+                result = await stub.Scan(chunks(content, f"file-{index}.txt"), metadata=(("access_token", API_KEY),))
+                return result.file_name != ""
+
+        return sum(await asyncio.gather(*(scan(i, content) for i, content in enumerate(files))))
+
+
+async def run_grpc_batch(port: int, files: list, concurrency: int) -> int:
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = scan_vault_pb2_grpc.ScanVaultStub(channel)
+        # Files are sent one after another; the server scans up to its open-file limit at once
+        requests = (
+            chunk for i, content in enumerate(files) for chunk in chunks(content, f"file-{i}.txt", str(i))
+        )
+        completed = 0
+        async for result in stub.ScanBatch(requests, metadata=(("access_token", API_KEY),)):
+            completed += not result.HasField("error")
+        return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--http-port", type=int, default=8766)
+    parser.add_argument("--grpc-port", type=int, default=50066)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.http_port, args.grpc_port)
+        return
+
+    server = start_server(args.http_port, args.grpc_port)
+    files = [build_file(i, args.size_kb * 1024) for i in range(args.files)]
+    megabytes = args.files * args.size_kb / 1024
+
+    print(f"{'transport':>12} {'files':>7} {'seconds':>9} {'files/s':>9} {'MB/s':>8}")
+    try:
+        for name, run, port in (
+            ("rest", run_rest, args.http_port),
+            ("grpc", run_grpc_unary, args.grpc_port),
+            ("grpc-batch", run_grpc_batch, args.grpc_port),
+        ):
+            started = time.perf_counter()
+            completed = asyncio.run(run(port, files, args.concurrency))
+            elapsed = time.perf_counter() - started
+            print(f"{name:>12} {completed:>7} {elapsed:>9.2f} {completed / elapsed:>9.1f} {megabytes / elapsed:>8.1f}")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
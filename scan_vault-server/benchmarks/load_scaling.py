@@ -0,0 +1,97 @@
+"""
+Load test showing how throughput scales with the number of gunicorn workers.
+
+Starts the production server (``gunicorn.conf.py``) once per worker count,
+drives it with concurrent keep-alive clients and prints requests/second for
+each run.
+
+Usage (from the server directory):
+    python -m benchmarks.load_scaling --workers 1 2 4 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Launch gunicorn with the production config and the given worker count."""
+    env = dict(os.environ)
+    env["WEB_CONCURRENCY"] = str(workers)
+    env["SCAN_VAULT_BIND"] = f"127.0.0.1:{port}"
+    env["SCAN_VAULT_ACCESS_LOG"] = "/dev/null"
+    env.setdefault("SCAN_VAULT_API_KEY", "benchmark")
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "src.server.app:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    """Poll the server until it answers or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> int:
+    """Send requests from `concurrency` clients for `duration` seconds."""
+    completed = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def worker():
+            nonlocal completed
+            while time.monotonic() < deadline:
+                response = await client.get(url)
+                if response.status_code == 200:
+                    completed += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    baseline = None
+
+    print(f"{'workers':>8} {'requests':>10} {'req/s':>10} {'speedup':>8}")
+    for workers in args.workers:
+        server = start_server(workers, args.port)
+        try:
+            wait_until_ready(url)
+            completed = asyncio.run(drive(url, args.concurrency, args.duration))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+        throughput = completed / args.duration
+        baseline = baseline or throughput
+        print(f"{workers:>8} {completed:>10} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
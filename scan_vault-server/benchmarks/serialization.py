@@ -0,0 +1,87 @@
+"""
+Compares the old and new serialization paths for detection payloads.
+
+The old routes returned ``({"detections": ...}, 200)`` tuples that FastAPI ran
+through ``jsonable_encoder`` and the stdlib JSON encoder. The new route renders
+stored documents straight through ``ScanVaultJSONResponse`` (orjson); the
+typed-model path is shown for comparison.
+
+Usage (from the server directory):
+    python -m benchmarks.serialization --detections 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.server.models.detection import DetectionsResponse
+from src.server.utils.responses import ScanVaultJSONResponse
+
+
+def build_detections(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": f"detection-{i}",
+            "fileName": f"file-{i}.pdf",
+            "sensitiveInfo": [
+                {
+                    "type": "email",
+                    "value": f"user{i}-{j}@example.com",
+                    "confidence": "high",
+                    "context": "Contact information section",
+                    "category": "PII",
+                }
+                for j in range(3)
+            ],
+            "createdAt": now,
+            "timestamp": now,
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_path(detections: list) -> bytes:
+    content = jsonable_encoder(({"detections": detections}, 200))
+    return JSONResponse(content).body
+
+
+def validated_path(detections: list) -> bytes:
+    model = DetectionsResponse.model_validate({"detections": detections})
+    return ScanVaultJSONResponse(model.model_dump(mode="json", exclude_unset=True)).body
+
+
+def direct_path(detections: list) -> bytes:
+    return ScanVaultJSONResponse({"detections": detections}).body
+
+
+def measure(fn, detections: list, repeat: int) -> float:
+    fn(detections)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(detections)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--detections", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    detections = build_detections(args.detections)
+    assert json.loads(legacy_path(detections))[0] == json.loads(direct_path(detections))
+
+    legacy = measure(legacy_path, detections, args.repeat)
+    validated = measure(validated_path, detections, args.repeat)
+    direct = measure(direct_path, detections, args.repeat)
+    print(f"jsonable_encoder + JSONResponse:  {legacy * 1000:8.1f} ms")
+    print(f"validated model + orjson:         {validated * 1000:8.1f} ms ({legacy / validated:.1f}x)")
+    print(f"ScanVaultJSONResponse (route):    {direct * 1000:8.1f} ms ({legacy / direct:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Production server configuration.
+
+Run with ``gunicorn src.server.app:app`` from the server directory; gunicorn
+picks this file up automatically. Every setting can be overridden through the
+environment so the same image can be tuned per deployment.
+
+Workers are forked from a master that has already imported the app
+(``preload_app``), and threads do not survive fork. Anything that runs a
+background thread or task (tenant sync, readiness probes, the tracing
+exporter, Firestore listeners, process pools) must be started from a
+startup hook or an ``os.register_at_fork`` handler, never at import time.
+"""
+import os
+
+# Binding
+bind = os.getenv("SCAN_VAULT_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+backlog = int(os.getenv("SCAN_VAULT_BACKLOG", "2048"))
+
+# Workers: each is a uvicorn event loop with its own extraction processes,
+# model and caches, so scale up deliberately with WEB_CONCURRENCY
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "src.server.workers.ScanVaultWorker"
+worker_connections = int(os.getenv("SCAN_VAULT_WORKER_CONNECTIONS", "1000"))
+
+# Import the app once in the master so workers share it copy-on-write
+preload_app = True
+
+# Timeouts. Scans wait on model calls, so the worker timeout is generous.
+keepalive = int(os.getenv("SCAN_VAULT_KEEPALIVE", "75"))
+timeout = int(os.getenv("SCAN_VAULT_WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("SCAN_VAULT_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers periodically to cap memory growth from large uploads
+max_requests = int(os.getenv("SCAN_VAULT_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("SCAN_VAULT_MAX_REQUESTS_JITTER", "200"))
+
+# Logging
+accesslog = os.getenv("SCAN_VAULT_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("SCAN_VAULT_LOG_LEVEL", "info")
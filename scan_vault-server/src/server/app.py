@@ -1,37 +1,121 @@
-from fastapi import FastAPI, logger
+from fastapi import FastAPI
+from src.server.utils.responses import ScanVaultJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import logging, sys
+import logging
 from src.utils.utils import read_markdown_file
+from src.server.middleware.upload_limit import UploadLimitMiddleware
+from src.server.middleware.profiling import ProfilingMiddleware
+from src.server.middleware.compression import CompressionMiddleware
+from src.server.profiling.tracing import configure_tracing, shutdown_tracing
+from src.server.extractors.scheduler import shutdown_process_pool
+from src.server.services.readiness import readiness_monitor
+from src.server.services.detection_version import detection_version
+from src.services.firebase_service import FirebaseService
+from src.utils.auth import tenant_store
+from src.utils.logging_config import setup_logging
 from src.server.routes.home import router as home_router
-from src.server.routes.scan import router as scan_router
+from src.server.routes.scan import router as scan_router, scan_service
+from src.server.routes.uploads import router as uploads_router
 from src.server.routes.save_detection import router as save_detection_router
 from src.server.routes.get_detections import router as get_detections_router
 from src.server.routes.delete_detection import router as delete_detection_router
 from src.server.routes.health import router as health_router
+from src.server.routes.analytics import router as analytics_router
+from src.server.routes.find_by_value import router as find_by_value_router
+from src.server.routes.redact import router as redact_router
+from src.server.routes.metrics import router as metrics_router
+from src.server.routes.admin import router as admin_router
+from src.server.rpc.server import grpc_server
 readme_content = read_markdown_file("README.md")
 
-logging.basicConfig(stream=sys.stdout, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Scan Vault",
     description=(lambda: readme_content if isinstance(readme_content, str) else "")(),
     version="1.0.0",
+    default_response_class=ScanVaultJSONResponse,
 )
 
 @app.on_event("startup")
 async def sync_database():
     logger.debug("starting up...")
 
+@app.on_event("startup")
+async def start_tenant_sync():
+    await tenant_store.start_sync(FirebaseService)
+
+@app.on_event("startup")
+async def watch_detection_version():
+    # Per worker: the listener runs on a Firestore thread created after fork
+    detection_version.watch(FirebaseService)
+
+@app.on_event("startup")
+async def start_readiness_monitor():
+    readiness_monitor.start(lambda: FirebaseService().ping())
+
+@app.on_event("startup")
+async def start_tracing():
+    # Per worker, so the exporter thread is created after fork
+    configure_tracing()
+
+@app.on_event("startup")
+async def warm_model():
+    # Runs in each worker after fork, so every process loads its own model
+    await scan_service.llm_handler.warm()
+
+@app.on_event("startup")
+async def start_grpc_server():
+    # Per worker: each binds the shared port with SO_REUSEPORT
+    await grpc_server.start(scan_service)
+
+@app.on_event("shutdown")
+async def stop_readiness_monitor():
+    # First, so load balancers stop routing here while the rest shuts down
+    await readiness_monitor.stop()
+
+@app.on_event("shutdown")
+async def stop_grpc_server():
+    await grpc_server.stop()
+
+@app.on_event("shutdown")
+async def stop_detection_version_watch():
+    detection_version.stop()
+
+@app.on_event("shutdown")
+async def stop_extractors():
+    shutdown_process_pool()
+
+@app.on_event("shutdown")
+async def stop_tenant_sync():
+    await tenant_store.stop_sync(FirebaseService)
+
+@app.on_event("shutdown")
+async def stop_tracing():
+    shutdown_tracing()
+
 app.include_router(health_router, tags=["Health"])
 app.include_router(home_router, tags=["Home"])
 app.include_router(scan_router, tags=["Scan"]) 
+app.include_router(uploads_router, tags=["Scan"])
 app.include_router(save_detection_router, tags=["Save Detection"])
 app.include_router(get_detections_router, tags=["Get Detections"])
 app.include_router(delete_detection_router, tags=["Delete Detection"])
+app.include_router(analytics_router, tags=["Analytics"])
+app.include_router(find_by_value_router, tags=["Get Detections"])
+app.include_router(redact_router, tags=["Redact"])
+app.include_router(metrics_router, tags=["Health"])
+app.include_router(admin_router, tags=["Admin"])
 
 origins = ["*"]
 
+app.add_middleware(UploadLimitMiddleware)
+
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
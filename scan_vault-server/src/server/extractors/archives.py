@@ -0,0 +1,58 @@
+from typing import Iterator
+import logging
+
+from src.server.extractors.base import ContainerExtractor, spool_member
+
+logger = logging.getLogger(__name__)
+
+# Members read from one archive; the rest are skipped
+MAX_ARCHIVE_MEMBERS = 1000
+
+
+class ZipExtractor(ContainerExtractor):
+    """Extracts every supported member, recursing into nested archives."""
+
+    file_type = "archive"
+    signatures = (b"PK\x03\x04", b"PK\x05\x06")
+
+    def iter_pages(self, path: str, depth: int = 0, remaining: list = None) -> Iterator[str]:
+        import zipfile
+
+        remaining = self.unpack_budget(remaining)
+        with zipfile.ZipFile(path) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            if len(members) > MAX_ARCHIVE_MEMBERS:
+                logger.warning("Archive has %s members; only the first %s are scanned", len(members), MAX_ARCHIVE_MEMBERS)
+            for info in members[:MAX_ARCHIVE_MEMBERS]:
+                if info.flag_bits & 0x1:
+                    logger.warning("Skipping encrypted archive member %s", info.filename)
+                    continue
+                with archive.open(info) as source, spool_member(source, remaining[0]) as (member_path, size):
+                    remaining[0] -= size
+                    yield from self.iter_member_pages(info.filename, member_path, depth, remaining)
+
+
+class TarExtractor(ContainerExtractor):
+    """Reads plain and compressed tarballs member by member."""
+
+    file_type = "archive"
+    signatures = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+
+    def matches(self, header: bytes) -> bool:
+        # Uncompressed tar has its magic at offset 257 rather than at the start
+        return super().matches(header) or header[257:262] == b"ustar"
+
+    def iter_pages(self, path: str, depth: int = 0, remaining: list = None) -> Iterator[str]:
+        import tarfile
+
+        remaining = self.unpack_budget(remaining)
+        with tarfile.open(path, "r:*") as archive:
+            for index, member in enumerate(archive):
+                if index >= MAX_ARCHIVE_MEMBERS:
+                    logger.warning("Archive has more than %s members; the rest are skipped", MAX_ARCHIVE_MEMBERS)
+                    break
+                if not member.isfile():
+                    continue
+                with archive.extractfile(member) as source, spool_member(source, remaining[0]) as (member_path, size):
+                    remaining[0] -= size
+                    yield from self.iter_member_pages(member.name, member_path, depth, remaining)
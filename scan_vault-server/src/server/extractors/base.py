@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Tuple
+import os
+import tempfile
+
+from src.server.services.file_handler import CHUNK_SIZE, MB, FileHandler, FileTooLargeError
+
+# Cost profiles: light extractors run on the thread pool, CPU-bound ones on the process pool
+LIGHT = "light"
+CPU_BOUND = "cpu"
+
+
+class Extractor:
+    """
+    Turns a file on disk into page text.
+
+    Subclasses declare which file type they belong to (used for size limits),
+    the leading bytes their files start with (empty for plain text formats)
+    and a cost profile telling the scheduler where to run them. Heavy
+    libraries are imported inside ``iter_pages`` so registering an extractor
+    costs nothing until a file of its type arrives.
+
+    A streamable format is UTF-8 text whose extracted text is the file
+    itself, so any leading part that ends at a newline can be analyzed
+    before the rest of the file has arrived.
+    """
+
+    file_type: str = "text"
+    signatures: Tuple[bytes, ...] = ()
+    cost: str = LIGHT
+    streamable: bool = False
+
+    def matches(self, header: bytes) -> bool:
+        """Whether the first bytes of an upload look like this format."""
+        if self.signatures:
+            return header.startswith(self.signatures)
+        return b"\x00" not in header
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        """Yield the text of each page, reading no further than the caller asks."""
+        raise NotImplementedError
+
+
+class ContainerExtractor(Extractor):
+    """An extractor for files that bundle other files, such as archives and emails."""
+
+    # Nesting deeper than this is skipped, which also stops archive recursion bombs
+    MAX_DEPTH = 3
+    # Bytes an upload may unpack across all of its members, nested containers included
+    MAX_UNPACKED_BYTES = int(os.getenv("SCAN_VAULT_MAX_UNPACKED_MB", "500")) * MB
+
+    def iter_pages(self, path: str, depth: int = 0, remaining: list = None) -> Iterator[str]:
+        """
+        Yield the text of each bundled file.
+
+        ``remaining`` holds the unpacked bytes left to the outermost
+        container as a one-item list; nested containers spend from it rather
+        than starting a budget of their own, so nesting cannot multiply it.
+        """
+        raise NotImplementedError
+
+    def unpack_budget(self, remaining: list = None) -> list:
+        """The budget passed down from an outer container, or a fresh one at the top."""
+        return remaining if remaining is not None else [self.MAX_UNPACKED_BYTES]
+
+    def iter_member_pages(self, name: str, path: str, depth: int, remaining: list) -> Iterator[str]:
+        """Extract a bundled file with whichever extractor handles its extension."""
+        from src.server.extractors.registry import registry
+
+        extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+        if depth >= self.MAX_DEPTH or not registry.supports(extension):
+            return
+        extractor = registry.get(extension)
+        if isinstance(extractor, ContainerExtractor):
+            yield from extractor.iter_pages(path, depth + 1, remaining)
+        else:
+            yield from extractor.iter_pages(path)
+
+
+@contextmanager
+def spool_member(source: BinaryIO, limit: int) -> Iterator[Tuple[str, int]]:
+    """
+    Copy a bundled file to a temporary path in chunks.
+
+    Sizes declared in archive headers can lie, so the limit is checked
+    against the bytes actually written. Yields the path and size; the file
+    is deleted on exit.
+    """
+    fd, path = tempfile.mkstemp(prefix="scan_vault_member_", dir=FileHandler.SPOOL_DIRECTORY)
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise FileTooLargeError("Bundled files exceed the unpacked size limit")
+                out.write(chunk)
+        yield path, size
+    finally:
+        FileHandler.delete_file(path)
+
+
+def require(module: str, package: str, file_type: str):
+    """Import an optional dependency, failing with a clear message when it is missing."""
+    import importlib
+
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ValueError(f"{file_type} extraction requires {package} to be installed")
@@ -0,0 +1,56 @@
+from typing import Iterator
+
+from src.server.extractors.base import CPU_BOUND, Extractor
+from src.server.services.file_handler import UnsupportedFileTypeError
+
+
+class TextExtractor(Extractor):
+    streamable = True
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        with open(path, encoding="utf-8") as f:
+            try:
+                text = f.read()
+            except UnicodeDecodeError as e:
+                raise UnsupportedFileTypeError(f"File is not UTF-8 text (invalid byte at offset {e.start})")
+        yield text
+
+
+class CsvExtractor(Extractor):
+    file_type = "csv"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        import pandas as pd
+
+        # No header row: a headerless CSV starts with data, and the redactor reads it the same way
+        df = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+        yield df.to_string(index=False, header=False)
+
+
+class PdfExtractor(Extractor):
+    """Empty pages are kept so page indexes match page numbers."""
+
+    file_type = "pdf"
+    signatures = (b"%PDF-",)
+    cost = CPU_BOUND
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                # Release parsed page objects as we go
+                page.close()
+
+
+class DocxExtractor(Extractor):
+    file_type = "docx"
+    signatures = (b"PK\x03\x04",)
+    cost = CPU_BOUND
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        from docx import Document
+
+        doc = Document(path)
+        yield " ".join([para.text for para in doc.paragraphs])
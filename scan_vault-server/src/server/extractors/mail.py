@@ -0,0 +1,100 @@
+from typing import Iterator
+import io
+import logging
+
+from src.server.extractors.base import ContainerExtractor, require, spool_member
+from src.server.extractors.structured import HtmlTextCollector
+
+logger = logging.getLogger(__name__)
+
+HEADERS = ("From", "To", "Cc", "Bcc", "Reply-To", "Subject", "Date")
+
+
+class EmlExtractor(ContainerExtractor):
+    """
+    The first page holds the headers and body; each attachment follows as its
+    own pages, with attached messages extracted recursively.
+    """
+
+    file_type = "email"
+
+    def iter_pages(self, path: str, depth: int = 0, remaining: list = None) -> Iterator[str]:
+        from email import policy
+        from email.parser import BytesParser
+
+        with open(path, "rb") as f:
+            message = BytesParser(policy=policy.default).parse(f)
+        yield from self._iter_message(message, depth, self.unpack_budget(remaining))
+
+    def _iter_message(self, message, depth: int, remaining: list) -> Iterator[str]:
+        lines = [f"{name}: {message[name]}" for name in HEADERS if message[name]]
+        body = message.get_body(preferencelist=("plain", "html"))
+        if body is not None:
+            text = body.get_content()
+            lines.append(_html_to_text(text) if body.get_content_type() == "text/html" else text)
+        yield "\n".join(lines)
+
+        for part in message.iter_attachments():
+            if part.get_content_type() == "message/rfc822":
+                if depth + 1 < self.MAX_DEPTH:
+                    yield from self._iter_message(part.get_content(), depth + 1, remaining)
+                continue
+            filename = part.get_filename()
+            payload = part.get_payload(decode=True)
+            if not filename or not payload:
+                continue
+            with spool_member(io.BytesIO(payload), remaining[0]) as (member_path, size):
+                remaining[0] -= size
+                yield from self.iter_member_pages(filename, member_path, depth, remaining)
+
+
+class MsgExtractor(ContainerExtractor):
+    """Outlook messages, laid out like EmlExtractor."""
+
+    file_type = "email"
+    signatures = (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",)
+
+    def iter_pages(self, path: str, depth: int = 0, remaining: list = None) -> Iterator[str]:
+        extract_msg = require("extract_msg", "extract-msg", "MSG")
+
+        message = extract_msg.openMsg(path)
+        try:
+            yield from self._iter_message(message, depth, self.unpack_budget(remaining))
+        finally:
+            message.close()
+
+    def _iter_message(self, message, depth: int, remaining: list) -> Iterator[str]:
+        fields = {
+            "From": message.sender,
+            "To": message.to,
+            "Cc": message.cc,
+            "Subject": message.subject,
+            "Date": message.date,
+        }
+        lines = [f"{name}: {value}" for name, value in fields.items() if value]
+        if message.body:
+            lines.append(message.body)
+        yield "\n".join(lines)
+
+        for attachment in message.attachments:
+            data = attachment.data
+            if data is None:
+                continue
+            if not isinstance(data, bytes):
+                # Embedded message
+                if depth + 1 < self.MAX_DEPTH:
+                    yield from self._iter_message(data, depth + 1, remaining)
+                continue
+            filename = attachment.longFilename or attachment.shortFilename
+            if not filename:
+                continue
+            with spool_member(io.BytesIO(data), remaining[0]) as (member_path, size):
+                remaining[0] -= size
+                yield from self.iter_member_pages(filename, member_path, depth, remaining)
+
+
+def _html_to_text(html: str) -> str:
+    parser = HtmlTextCollector()
+    parser.feed(html)
+    parser.close()
+    return " ".join("".join(parser.parts).split())
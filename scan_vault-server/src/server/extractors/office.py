@@ -0,0 +1,49 @@
+from typing import Iterator
+
+from src.server.extractors.base import CPU_BOUND, Extractor, require
+
+
+class XlsxExtractor(Extractor):
+    """One page per worksheet, read row by row without loading the workbook into memory."""
+
+    file_type = "xlsx"
+    signatures = (b"PK\x03\x04",)
+    cost = CPU_BOUND
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        openpyxl = require("openpyxl", "openpyxl", "XLSX")
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                rows = (
+                    "\t".join("" if cell is None else str(cell) for cell in row)
+                    for row in sheet.iter_rows(values_only=True)
+                )
+                yield "\n".join(row for row in rows if row.strip())
+        finally:
+            workbook.close()
+
+
+class PptxExtractor(Extractor):
+    """One page per slide, including tables and speaker notes."""
+
+    file_type = "pptx"
+    signatures = (b"PK\x03\x04",)
+    cost = CPU_BOUND
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        pptx = require("pptx", "python-pptx", "PPTX")
+
+        presentation = pptx.Presentation(path)
+        for slide in presentation.slides:
+            texts = []
+            for shape in slide.shapes:
+                if shape.has_text_frame:
+                    texts.append(shape.text_frame.text)
+                if getattr(shape, "has_table", False):
+                    for row in shape.table.rows:
+                        texts.append("\t".join(cell.text for cell in row.cells))
+            if slide.has_notes_slide:
+                texts.append(slide.notes_slide.notes_text_frame.text)
+            yield "\n".join(text for text in texts if text)
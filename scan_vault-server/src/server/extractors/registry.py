@@ -0,0 +1,108 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Dict, List, Type, Union
+import logging
+
+from src.server.extractors.base import Extractor
+
+logger = logging.getLogger(__name__)
+
+# Third-party packages register extractors under this group, named by file extension:
+#   [project.entry-points."scan_vault.extractors"]
+#   rtf = "scan_vault_rtf:RtfExtractor"
+ENTRY_POINT_GROUP = "scan_vault.extractors"
+
+# Built-in extractors by extension, imported on first use
+BUILTIN_EXTRACTORS: Dict[str, str] = {
+    "txt": "src.server.extractors.documents:TextExtractor",
+    "csv": "src.server.extractors.documents:CsvExtractor",
+    "pdf": "src.server.extractors.documents:PdfExtractor",
+    "docx": "src.server.extractors.documents:DocxExtractor",
+    "xlsx": "src.server.extractors.office:XlsxExtractor",
+    "pptx": "src.server.extractors.office:PptxExtractor",
+    "eml": "src.server.extractors.mail:EmlExtractor",
+    "msg": "src.server.extractors.mail:MsgExtractor",
+    "json": "src.server.extractors.structured:JsonExtractor",
+    "ndjson": "src.server.extractors.structured:NdjsonExtractor",
+    "jsonl": "src.server.extractors.structured:NdjsonExtractor",
+    "html": "src.server.extractors.structured:HtmlExtractor",
+    "htm": "src.server.extractors.structured:HtmlExtractor",
+    "zip": "src.server.extractors.archives:ZipExtractor",
+    "tar": "src.server.extractors.archives:TarExtractor",
+    "tgz": "src.server.extractors.archives:TarExtractor",
+}
+
+
+class ExtractorRegistry:
+    """
+    Maps file extensions to extractors.
+
+    Entries are ``module:Class`` paths, entry points or classes; nothing is
+    imported until an extension is looked up, and each extractor is
+    instantiated once.
+    """
+
+    def __init__(self, extractors: Dict[str, str] = None, group: str = ENTRY_POINT_GROUP):
+        self._specs: Dict[str, Union[str, Type[Extractor], object]] = dict(
+            BUILTIN_EXTRACTORS if extractors is None else extractors
+        )
+        self._instances: Dict[str, Extractor] = {}
+        self._group = group
+        self._discovered = group is None
+
+    def register(self, extension: str, extractor: Union[str, Type[Extractor]]) -> None:
+        """Add or replace the extractor for an extension."""
+        extension = extension.lower()
+        self._specs[extension] = extractor
+        self._instances.pop(extension, None)
+
+    def extensions(self) -> List[str]:
+        self._discover()
+        return sorted(self._specs)
+
+    def supports(self, extension: str) -> bool:
+        self._discover()
+        return extension in self._specs
+
+    def get(self, extension: str) -> Extractor:
+        """
+        Return the extractor for an extension, importing it if needed.
+
+        Raises:
+            ValueError: If no extractor handles the extension
+        """
+        self._discover()
+        if extension not in self._instances:
+            if extension not in self._specs:
+                raise ValueError(f"No processor found for {extension}")
+            self._instances[extension] = self._load(self._specs[extension])()
+        return self._instances[extension]
+
+    def for_file_type(self, file_type: str) -> List[Extractor]:
+        """All extractors declaring the given file type."""
+        return [
+            extractor
+            for extractor in (self.get(extension) for extension in self.extensions())
+            if extractor.file_type == file_type
+        ]
+
+    def _discover(self) -> None:
+        """Register installed plugins; plugins may override built-in extensions."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self._group):
+            self.register(entry_point.name, entry_point)
+            logger.info("Registered extractor plugin %s for .%s", entry_point.value, entry_point.name)
+
+    @staticmethod
+    def _load(spec) -> Type[Extractor]:
+        if isinstance(spec, str):
+            module, _, name = spec.partition(":")
+            return getattr(import_module(module), name)
+        if hasattr(spec, "load"):
+            return spec.load()
+        return spec
+
+
+registry = ExtractorRegistry()
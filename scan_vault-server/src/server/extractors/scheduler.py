@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+import asyncio
+import multiprocessing
+import os
+import threading
+
+from src.server.extractors.base import CPU_BOUND, Extractor
+
+# Worker processes for CPU-bound extractors; 0 runs them on the thread pool instead.
+# Every server worker has a pool of its own, so by default the CPUs are shared
+# among the WEB_CONCURRENCY workers (2 unless set, as in gunicorn.conf.py).
+SERVER_WORKERS = max(int(os.getenv("WEB_CONCURRENCY", "2")), 1)
+EXTRACT_PROCESSES = int(os.getenv(
+    "SCAN_VAULT_EXTRACT_PROCESSES", str(max((os.cpu_count() or 1) // SERVER_WORKERS, 1))
+))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Create the extraction process pool on first use."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            # Spawned rather than forked: the server holds threads and sockets a fork would copy
+            _process_pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+
+
+def extract_all(extractor: Extractor, path: str) -> List[str]:
+    return list(extractor.iter_pages(path))
+
+
+async def run_extractor(extractor: Extractor, path: str) -> List[str]:
+    """
+    Extract every page of a file off the event loop.
+
+    Light extractors run on the default thread pool; CPU-bound ones run in a
+    process pool so parsing does not hold the GIL against request handling.
+    """
+    if extractor.cost == CPU_BOUND and EXTRACT_PROCESSES > 0:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_process_pool(), extract_all, extractor, path)
+    return await asyncio.to_thread(extract_all, extractor, path)
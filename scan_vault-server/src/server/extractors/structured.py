@@ -0,0 +1,103 @@
+from html.parser import HTMLParser
+from typing import Any, Iterator, List
+import json
+
+from src.server.extractors.base import Extractor
+from src.server.services.file_handler import CHUNK_SIZE
+
+# NDJSON records grouped into one page
+NDJSON_RECORDS_PER_PAGE = 1000
+
+
+def flatten_json(value: Any, prefix: str = "") -> Iterator[str]:
+    """Yield ``key.path: value`` lines for every scalar in a JSON document."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten_json(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from flatten_json(item, f"{prefix}[{index}]")
+    elif value is not None:
+        yield f"{prefix}: {value}" if prefix else str(value)
+
+
+class JsonExtractor(Extractor):
+    file_type = "json"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        yield "\n".join(flatten_json(document))
+
+
+class NdjsonExtractor(Extractor):
+    """Streams records line by line, one page per NDJSON_RECORDS_PER_PAGE records."""
+
+    file_type = "json"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        lines: List[str] = []
+        records = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    lines.extend(flatten_json(json.loads(line)))
+                except json.JSONDecodeError:
+                    # Keep malformed records as raw text rather than dropping them
+                    lines.append(line)
+                records += 1
+                if records == NDJSON_RECORDS_PER_PAGE:
+                    yield "\n".join(lines)
+                    lines, records = [], 0
+        if lines:
+            yield "\n".join(lines)
+
+
+class HtmlTextCollector(HTMLParser):
+    """Collects visible text and text-bearing attributes, skipping scripts and styles."""
+
+    SKIPPED_TAGS = {"script", "style", "template"}
+    BLOCK_TAGS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "section"}
+    TEXT_ATTRIBUTES = {"alt", "title", "value", "content", "placeholder"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+            return
+        if tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+        for name, value in attrs:
+            if value and (name in self.TEXT_ATTRIBUTES or (name == "href" and value.startswith(("mailto:", "tel:")))):
+                self.parts.append(f" {value} ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+class HtmlExtractor(Extractor):
+    file_type = "html"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        parser = HtmlTextCollector()
+        with open(path, encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+        parser.close()
+        lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+        yield "\n".join(line for line in lines if line)
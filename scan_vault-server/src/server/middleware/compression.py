@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import asyncio
+import gzip
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Zstandard is optional
+    zstandard = None
+
+# Bodies smaller than this are sent as they are; compression would not pay for itself
+MIN_SIZE = int(os.getenv("SCAN_VAULT_COMPRESS_MIN_BYTES", "1024"))
+# Bodies above this are compressed off the event loop
+THREAD_THRESHOLD = 256 * 1024
+# Compressed bodies kept per worker for responses carrying an ETag
+CACHE_ENTRIES = 16
+# Media types that are compressed already
+INCOMPRESSIBLE_PREFIXES = (b"image/", b"video/", b"audio/")
+INCOMPRESSIBLE_TYPES = (b"application/zip", b"application/gzip", b"application/pdf", b"application/octet-stream")
+
+
+def _codecs() -> Dict[str, Callable[[bytes], bytes]]:
+    codecs = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3)
+        codecs["zstd"] = compressor.compress
+    if brotli is not None:
+        codecs["br"] = lambda data: brotli.compress(data, quality=5)
+    codecs["gzip"] = lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    return codecs
+
+
+# In order of preference when a client accepts several equally
+CODECS = _codecs()
+
+
+def choose_encoding(accept_encoding: str, codecs=CODECS) -> Optional[str]:
+    """The preferred coding that the client accepts with the highest q-value."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in codecs:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with zstd, brotli or gzip, as the client accepts.
+
+    Only complete bodies of at least ``min_size`` bytes are compressed;
+    streamed responses, already encoded bodies and media that is
+    compressed by nature pass through untouched. Compressed bodies of
+    responses with an ETag are cached, so the same version of a large
+    listing is compressed once per worker rather than once per client.
+    zstd and brotli are used when their packages are installed.
+    """
+
+    def __init__(self, app, min_size: int = MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+        self._cache: "OrderedDict[Tuple[str, bytes, str], bytes]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._compressible(start, body):
+                passthrough = True
+                await send(start)
+                return await send(message)
+
+            target = f'{scope["path"]}?{scope.get("query_string", b"").decode("latin-1")}'
+            compressed = await self._compress(target, start, body, encoding)
+            response_headers = [
+                (name, value) for name, value in start.get("headers", [])
+                if name.lower() not in (b"content-length", b"vary")
+            ]
+            vary = [value for name, value in start.get("headers", []) if name.lower() == b"vary"]
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+            ]
+            await send({**start, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _compressible(self, start, body: bytes) -> bool:
+        if start is None or len(body) < self.min_size or start["status"] in (204, 206, 304):
+            return False
+        content_type = b""
+        for name, value in start.get("headers", []):
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.lower()
+        if content_type.startswith(INCOMPRESSIBLE_PREFIXES) or content_type.startswith(INCOMPRESSIBLE_TYPES):
+            return False
+        return True
+
+    async def _compress(self, target: str, start, body: bytes, encoding: str) -> bytes:
+        etag = next((value for name, value in start.get("headers", []) if name.lower() == b"etag"), None)
+        key = (target, etag, encoding)
+        if etag is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        codec = CODECS[encoding]
+        if len(body) >= THREAD_THRESHOLD:
+            compressed = await asyncio.to_thread(codec, body)
+        else:
+            compressed = codec(body)
+
+        if etag is not None:
+            self._cache[key] = compressed
+            while len(self._cache) > CACHE_ENTRIES:
+                self._cache.popitem(last=False)
+        return compressed
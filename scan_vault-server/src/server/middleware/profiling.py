@@ -0,0 +1,127 @@
+from typing import Optional
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+
+from src.server.profiling.sampler import Profile, SamplingProfiler
+from src.utils.auth import ADMIN_KEY_NAME, verify_admin_key
+
+logger = logging.getLogger(__name__)
+
+# Request header asking for the request to be profiled; requires the admin key too
+PROFILE_HEADER = b"x-scan-vault-profile"
+# Response header naming the stored profile
+PROFILE_ID_HEADER = b"x-scan-vault-profile-id"
+# Request profiles kept, oldest dropped first
+MAX_STORED_PROFILES = 20
+PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+class ProfileStore:
+    """
+    The most recent request profiles, by ID, kept as files in a directory.
+
+    Every worker writes to the same directory, so the profile of a request
+    served by one worker can be downloaded through any other.
+    """
+
+    def __init__(self, directory: str, capacity: int = MAX_STORED_PROFILES):
+        self.directory = directory
+        self.capacity = capacity
+
+    @classmethod
+    def from_env(cls) -> "ProfileStore":
+        return cls(os.getenv("SCAN_VAULT_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "scan_vault_profiles"))
+
+    def add(self, profile_id: str, profile: Profile) -> None:
+        # Profiles hold source paths and call stacks, so only the server's user may read them
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(profile.to_dict(), f)
+        # Readers never see a partly written profile
+        os.replace(temporary, self._path(profile_id))
+        self._prune()
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                return Profile.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def _prune(self) -> None:
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    profiles.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        profiles.sort()
+        for _, path in profiles[:max(len(profiles) - self.capacity, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another worker pruned it first
+                pass
+
+
+request_profiles = ProfileStore.from_env()
+
+
+class ProfilingMiddleware:
+    """
+    Samples a single request when it carries the profile header and a valid admin key.
+
+    The response gets an ``X-Scan-Vault-Profile-Id`` header; the profile can
+    be downloaded from ``/admin/profile/requests/{id}``, through any worker,
+    once the request has finished. Samples cover every thread of the worker
+    that served it, so concurrent requests show up too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        if PROFILE_HEADER not in headers:
+            return await self.app(scope, receive, send)
+        admin_key = headers.get(ADMIN_KEY_NAME.encode(), b"").decode("latin-1")
+        if not verify_admin_key(admin_key):
+            logger.warning("Ignoring profile request without a valid admin key")
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex[:16]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+
+        def store() -> Profile:
+            profile = profiler.stop()
+            try:
+                request_profiles.add(profile_id, profile)
+            except OSError as e:
+                logger.warning("Could not store profile %s: %s", profile_id, e)
+            return profile
+
+        profiler = SamplingProfiler().start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile = await asyncio.to_thread(store)
+            logger.info("Stored profile %s for %s (%s samples)", profile_id, scope.get('path'), profile.sample_count)
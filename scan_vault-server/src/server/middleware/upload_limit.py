@@ -0,0 +1,89 @@
+import logging
+import os
+
+from src.server.services.file_handler import FileHandler, MB
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD = 1 * MB
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects request bodies above a size cap while they are still arriving.
+
+    The Content-Length header is checked up front; chunked or mislabelled
+    bodies are counted as they stream in, so an oversized upload is cut off
+    before the multipart parser spools it to disk. Per-type limits are then
+    enforced by ``FileHandler.spool``.
+    """
+
+    def __init__(self, app, max_body_size: int = None):
+        self.app = app
+        self.max_body_size = max_body_size or int(
+            os.getenv(
+                "SCAN_VAULT_MAX_BODY_BYTES",
+                max(FileHandler.MAX_FILE_SIZES.values()) + MULTIPART_OVERHEAD,
+            )
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            return await self._reject(send)
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # The body parser may turn our exception into its own error
+            # response; replace it with a 413
+            if exceeded:
+                if not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send):
+        logger.warning("Rejected request body larger than %s bytes", self.max_body_size)
+        body = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
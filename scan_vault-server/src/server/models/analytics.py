@@ -0,0 +1,26 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class DayCounts(BaseModel):
+    detections: int = 0
+    findings: int = 0
+
+class DetectionSummary(BaseModel):
+    totalDetections: int
+    totalFindings: int
+    byCategory: Dict[str, int]
+    byType: Dict[str, int]
+    byConfidence: Dict[str, int]
+    byDay: Dict[str, DayCounts]
+
+class FileFindingCount(BaseModel):
+    fileName: Optional[str] = None
+    findings: int
+    detections: int
+
+class TopFilesResponse(BaseModel):
+    files: List[FileFindingCount]
+
+class RebuildRollupsResponse(BaseModel):
+    message: str
+    detections: int
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+
+from src.server.models.scan_result import SensitiveField
+
+class Detection(BaseModel):
+    """A saved detection document."""
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = None
+    fileName: Optional[str] = None
+    sensitiveInfo: Optional[List[SensitiveField]] = None
+    createdAt: Optional[datetime] = None
+    timestamp: Optional[datetime] = None
+
+class DetectionsResponse(BaseModel):
+    detections: List[Detection]
+
+class SaveDetectionResponse(BaseModel):
+    message: str
+    id: str
+
+class MessageResponse(BaseModel):
+    message: str
+
+class ValueLookupRequest(BaseModel):
+    value: str
+
+class ValueLookupResponse(BaseModel):
+    detections: List[Detection]
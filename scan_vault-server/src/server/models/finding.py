@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+import sys
+
+
+class Category(str, Enum):
+    PII = "PII"
+    PHI = "PHI"
+    PCI = "PCI"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Confidence(str, Enum):
+    HIGH = "high"
+    MEDIUM = "medium"
+    LOW = "low"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# Raw label spellings already seen, mapped to their shared normalized form
+_LABELS: Dict[Any, Any] = {}
+# Stop remembering new spellings past this many, so junk output cannot grow the cache
+MAX_CACHED_LABELS = 10000
+
+
+def _label(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        return _LABELS[kind, value]
+    except (KeyError, TypeError):
+        pass
+    if kind == "category":
+        text = str(value).strip().upper()
+        normalized = Category.__members__.get(text) or sys.intern(text)
+    elif kind == "confidence":
+        text = str(value).strip().lower()
+        normalized = Confidence.__members__.get(text.upper()) or sys.intern(text)
+    else:
+        # Types keep the spelling they were reported with ("SSN" stays "SSN");
+        # comparisons that should ignore case fold it themselves
+        normalized = sys.intern(str(value).strip())
+    if len(_LABELS) < MAX_CACHED_LABELS and isinstance(value, str):
+        _LABELS[kind, value] = normalized
+    return normalized
+
+
+@dataclass(init=False)
+class Location:
+    """Where a finding's value occurs in the extracted text."""
+    __slots__ = ("page", "start", "end", "bbox")
+
+    page: int  # 1-based
+    start: int  # Character offsets within the page text
+    end: int
+    bbox: Optional[List[float]]  # [x0, top, x1, bottom] in PDF points
+
+    def __init__(self, page: int, start: int, end: int, bbox: Optional[List[float]] = None):
+        self.page = page
+        self.start = start
+        self.end = end
+        self.bbox = bbox
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Location":
+        """
+        Build a location from its stored form.
+
+        Raises:
+            ValueError: If it is not an object with integer page, start and
+                end and an optional four-number bbox, or has other fields
+        """
+        if isinstance(data, Location):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError("A location must be an object")
+        unknown = set(data) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"Unknown location fields: {', '.join(sorted(map(str, unknown)))}")
+        offsets = [data.get(key) for key in ("page", "start", "end")]
+        if not all(_is_number(value, int) for value in offsets):
+            raise ValueError("A location needs integer page, start and end")
+        bbox = data.get("bbox")
+        if bbox is not None and not (
+            isinstance(bbox, list) and len(bbox) == 4 and all(_is_number(value, (int, float)) for value in bbox)
+        ):
+            raise ValueError("A location bbox must be four numbers")
+        return cls(*offsets, bbox)
+
+
+def _is_number(value: Any, types) -> bool:
+    # bool is an int subclass, but never a valid offset or coordinate
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+@dataclass(init=False)
+class Finding:
+    """
+    A single detected value.
+
+    Findings are slotted and their category, confidence and type are shared
+    enum members or interned strings, so large scans hold one small object
+    per finding rather than a dict with its own keys. orjson encodes the
+    dataclass directly; ``to_dict`` is only needed for Firestore.
+    """
+    __slots__ = ("type", "value", "confidence", "context", "category", "locations")
+
+    type: Optional[str]
+    value: Any
+    confidence: Union[Confidence, str, None]  # high, medium, low
+    context: Optional[str]
+    category: Union[Category, str, None]  # PII, PHI, PCI
+    locations: Optional[List[Location]]
+
+    def __init__(
+        self,
+        type: Optional[str],
+        value: Any,
+        confidence: Any = None,
+        context: Optional[str] = None,
+        category: Any = None,
+        locations: Optional[List[Location]] = None,
+    ):
+        self.type = _label("type", type)
+        self.value = value
+        self.confidence = _label("confidence", confidence)
+        self.context = context
+        self.category = _label("category", category)
+        self.locations = locations
+
+    def __repr__(self) -> str:
+        # Keeps values out of logs and tracebacks that render findings
+        return f"Finding(type={self.type!r}, category={self.category!r}, value=<redacted>)"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], strict: bool = False) -> "Finding":
+        """
+        Build a finding from model output or a stored document.
+
+        Unknown keys, such as the document number of a batched response, are
+        dropped unless ``strict`` is set, as for findings sent by clients.
+
+        Raises:
+            ValueError: If the locations are malformed, or with ``strict``,
+                if there are unknown keys
+        """
+        if strict:
+            unknown = set(data) - set(cls.__slots__)
+            if unknown:
+                raise ValueError(f"Unknown finding fields: {', '.join(sorted(map(str, unknown)))}")
+        locations = data.get("locations")
+        if locations is not None and not isinstance(locations, list):
+            raise ValueError("Finding locations must be a list")
+        return cls(
+            type=data.get("type"),
+            value=data.get("value"),
+            confidence=data.get("confidence"),
+            context=data.get("context"),
+            category=data.get("category"),
+            locations=[Location.from_dict(location) for location in locations] if locations is not None else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-value form for the storage layer, without unset fields."""
+        data: Dict[str, Any] = {"type": self.type, "value": self.value}
+        if self.confidence is not None:
+            data["confidence"] = str(self.confidence)
+        if self.context is not None:
+            data["context"] = self.context
+        if self.category is not None:
+            data["category"] = str(self.category)
+        if self.locations is not None:
+            data["locations"] = [
+                {"page": l.page, "start": l.start, "end": l.end, **({"bbox": l.bbox} if l.bbox else {})}
+                for l in self.locations
+            ]
+        return data
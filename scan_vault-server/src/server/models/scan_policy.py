@@ -0,0 +1,38 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from src.server.models.finding import Finding
+
+CONFIDENCE_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+class ScanPolicy(BaseModel):
+    """Findings a caller cares about, and when to stop looking for them."""
+    categories: List[str] = Field(default_factory=list)  # PII, PHI, PCI
+    types: List[str] = Field(default_factory=list)  # e.g. ssn, credit_card
+    min_confidence: Optional[str] = None  # low, medium, high
+    stop_after: int = Field(1, ge=1)  # Matching findings needed to stop
+
+    def matches(self, finding: Finding) -> bool:
+        """Whether a finding falls under this policy."""
+        if not isinstance(finding, Finding):
+            return False
+        if self.categories and str(finding.category) not in {
+            category.upper() for category in self.categories
+        }:
+            return False
+        if self.types and str(finding.type).lower() not in {
+            kind.lower() for kind in self.types
+        }:
+            return False
+        if self.min_confidence:
+            level = CONFIDENCE_LEVELS.get(str(finding.confidence), -1)
+            if level < CONFIDENCE_LEVELS.get(self.min_confidence.lower(), 0):
+                return False
+        return True
+
+class PolicyResult(BaseModel):
+    matched: bool
+    matching_findings: int
+    stopped_early: bool  # True when pages or model calls were skipped
+    pages_scanned: int
+    chunks_analyzed: int
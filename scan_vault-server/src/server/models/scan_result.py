@@ -1,12 +1,31 @@
-from typing import List, Dict, Union
-from pydantic import BaseModel
+from typing import Any, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+from src.server.models.scan_policy import PolicyResult
+
+class FindingLocation(BaseModel):
+    page: int  # 1-based
+    start: int  # Character offsets within the page text
+    end: int
+    bbox: Optional[List[float]] = None  # [x0, top, x1, bottom] in PDF points
 
 class SensitiveField(BaseModel):
-    field_name: str
-    value: str
-    category: str  # PII, PHI, PCI
+    """A single finding as returned by the analysis prompt."""
+    model_config = ConfigDict(extra="allow")
+
+    type: Optional[str] = None
+    value: Any = None
+    confidence: Optional[str] = None  # high, medium, low
+    context: Optional[str] = None
+    category: Optional[str] = None  # PII, PHI, PCI
+    locations: Optional[List[FindingLocation]] = None
 
 class ScanResult(BaseModel):
-    file_name: str
+    file_name: Optional[str] = None
     sensitive_fields: List[SensitiveField]
-    summary: Dict[str, int]  # Count of each sensitive data type
+    policy: Optional[PolicyResult] = None  # Set for policy scans
+
+class ScanResponse(BaseModel):
+    message: str
+    results: ScanResult
+    detection_id: Optional[str] = None  # Set when the scan was persisted
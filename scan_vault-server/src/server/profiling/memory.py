@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional
+import threading
+import tracemalloc
+
+
+class MemoryTracker:
+    """
+    tracemalloc snapshots for finding memory growth in a running worker.
+
+    Each snapshot is compared with the previous one, so calling it before
+    and after a batch of scans shows which lines allocated what is still
+    alive. Tracing slows allocation noticeably; stop it once done.
+    """
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def snapshot(self, limit: int = 25, include: Optional[str] = None, group_by: str = "lineno") -> Dict:
+        """
+        Top allocation sites, with growth since the previous snapshot.
+
+        Args:
+            limit (int): Number of sites to return
+            include (str, optional): Filename glob an allocation's traceback must
+                pass through, e.g. ``*/file_processor.py``
+            group_by (str): ``lineno``, ``filename`` or ``traceback``
+
+        Raises:
+            ValueError: If tracing has not been started
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise ValueError("Memory tracing is not running")
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ])
+            if include:
+                snapshot = snapshot.filter_traces([tracemalloc.Filter(True, include, all_frames=True)])
+            previous = self._previous
+            self._previous = snapshot
+
+        if previous is not None:
+            if include:
+                previous = previous.filter_traces([tracemalloc.Filter(True, include, all_frames=True)])
+            stats = snapshot.compare_to(previous, group_by)
+        else:
+            stats = snapshot.statistics(group_by)
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "compared_to_previous": previous is not None,
+            "top": [self._stat(stat) for stat in stats[:limit]],
+        }
+
+    @staticmethod
+    def _stat(stat) -> Dict:
+        frames: List[str] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+        result = {"location": frames[0] if len(frames) == 1 else frames, "size_bytes": stat.size, "count": stat.count}
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            result["size_diff_bytes"] = stat.size_diff
+            result["count_diff"] = stat.count_diff
+        return result
+
+
+memory_tracker = MemoryTracker()
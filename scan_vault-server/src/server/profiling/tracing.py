@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace
+except ImportError:  # Tracing is optional
+    trace = None
+
+tracer = trace.get_tracer("scan_vault") if trace is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[object]]:
+    """
+    Record a span around a block of work.
+
+    Without the OpenTelemetry API installed, or without an SDK configured,
+    this costs next to nothing. Attributes must not carry file contents or
+    finding values.
+    """
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def configure_tracing() -> bool:
+    """
+    Export spans over OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set.
+
+    Run this in each worker after fork, since the batch exporter owns a
+    background thread. The standard OTEL_* variables (service name, headers,
+    protocol) are read by the SDK itself.
+
+    Returns:
+        bool: Whether an exporter was installed
+    """
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk and "
+            "opentelemetry-exporter-otlp-proto-http are not installed; spans are not exported"
+        )
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "scan-vault")}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    logger.info("Exporting traces over OTLP")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still buffered by the exporter."""
+    if trace is None:
+        return
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
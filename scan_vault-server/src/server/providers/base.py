@@ -0,0 +1,56 @@
+from importlib import import_module
+from typing import Dict, List
+import asyncio
+import os
+
+from src.server.models.finding import Finding
+
+
+class ModelProvider:
+    """
+    A backend that finds sensitive information in text or images.
+
+    Findings are returned as Finding objects with the fields of the
+    analysis prompt's schema. Errors are raised as-is; LLMHandler wraps
+    them.
+    """
+
+    name = ""
+
+    async def analyze_text(self, text: str) -> List[Finding]:
+        raise NotImplementedError
+
+    async def analyze_image(self, image_data: bytes) -> List[Finding]:
+        raise ValueError(f"The {self.name} provider cannot analyze images")
+
+    async def analyze_batch(self, texts: List[str]) -> List[List[Finding]]:
+        """Findings for each of several small texts; providers override this to share one call."""
+        return list(await asyncio.gather(*(self.analyze_text(text) for text in texts)))
+
+    async def warm(self) -> None:
+        """Load anything expensive before the first request."""
+
+
+# Providers by name, imported on first use
+PROVIDERS: Dict[str, str] = {
+    "openai": "src.server.providers.openai_provider:OpenAIProvider",
+    "local": "src.server.providers.local_provider:LocalProvider",
+}
+
+
+def provider_name() -> str:
+    return os.getenv("SCAN_VAULT_MODEL_PROVIDER", "openai").lower()
+
+
+def create_provider(name: str = None, **options) -> ModelProvider:
+    """
+    Instantiate a provider by name, defaulting to SCAN_VAULT_MODEL_PROVIDER.
+
+    Raises:
+        ValueError: If the provider is unknown
+    """
+    name = name or provider_name()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown model provider: {name}")
+    module, _, cls = PROVIDERS[name].partition(":")
+    return getattr(import_module(module), cls)(**options)
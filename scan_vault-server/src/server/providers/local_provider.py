@@ -0,0 +1,262 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import io
+import json
+import logging
+import os
+import threading
+
+from src.server.models.finding import Confidence, Finding
+from src.server.providers.base import ModelProvider
+from src.server.providers.patterns import find_patterns
+
+logger = logging.getLogger(__name__)
+
+# Text is split into segments of about this many characters before tokenization
+SEGMENT_CHARS = 1000
+# Entities scoring below this are dropped
+MIN_ENTITY_SCORE = float(os.getenv("SCAN_VAULT_LOCAL_MIN_SCORE", "0.5"))
+
+# NER labels mapped to finding types; other labels are reported under their own name as PII
+ENTITY_TYPES = {
+    "PER": ("full_name", "PII"),
+    "PERSON": ("full_name", "PII"),
+    "LOC": ("location", "PII"),
+    "ADDRESS": ("physical_address", "PII"),
+    "DATE": ("date", "PII"),
+}
+# Generic NER labels that are not sensitive on their own
+IGNORED_ENTITIES = {"O", "ORG", "MISC"}
+
+
+class BatchRunner:
+    """
+    Groups items submitted by concurrent callers into batches for one model.
+
+    The first item waits up to ``max_wait`` seconds for others to join, so
+    under load each inference call carries up to ``max_batch_size`` items.
+    Batches run one at a time on a worker thread.
+    """
+
+    def __init__(self, infer: Callable[[List[Any]], List[Any]], max_batch_size: int = 16, max_wait: float = 0.005):
+        self.infer = infer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        return await future
+
+    async def submit_many(self, items: Sequence[Any]) -> List[Any]:
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch_size:
+                    # Let concurrent callers join the batch
+                    await asyncio.sleep(self.max_wait)
+                batch = self._pending[:self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size:]
+                batch = [(item, future) for item, future in batch if not future.done()]
+                if not batch:
+                    continue
+                try:
+                    results = await asyncio.to_thread(self.infer, [item for item, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._worker = None
+
+
+def split_segments(text: str, size: int = SEGMENT_CHARS) -> List[Tuple[int, str]]:
+    """Split text at whitespace into (offset, segment) pairs of about ``size`` characters."""
+    segments = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start, end)
+            if cut > start:
+                end = cut
+        if text[start:end].strip():
+            segments.append((start, text[start:end]))
+        start = end
+    return segments
+
+
+def decode_entities(probabilities, offsets, labels: Dict[int, str]) -> List[Dict]:
+    """
+    Merge per-token BIO predictions into character spans.
+
+    Args:
+        probabilities: Softmax scores, one row per token
+        offsets: (start, end) character offsets per token; (0, 0) marks special tokens
+        labels: Label names by class index
+
+    Returns:
+        List[Dict]: Spans with ``label``, ``start``, ``end`` and mean ``score``
+    """
+    entities: List[Dict] = []
+    current = None
+    for scores, (start, end) in zip(probabilities, offsets):
+        if start == end:
+            current = None
+            continue
+        index = int(scores.argmax())
+        tag = labels.get(index, "O")
+        prefix, _, entity = tag.partition("-") if "-" in tag else ("B", "", tag)
+        if entity in IGNORED_ENTITIES or tag == "O":
+            current = None
+            continue
+        if current is not None and prefix == "I" and current["label"] == entity:
+            current["end"] = end
+            current["scores"].append(float(scores[index]))
+            continue
+        current = {"label": entity, "start": start, "end": end, "scores": [float(scores[index])]}
+        entities.append(current)
+
+    for entity in entities:
+        scores = entity.pop("scores")
+        entity["score"] = sum(scores) / len(scores)
+    return entities
+
+
+class OnnxNerModel:
+    """
+    A token-classification model exported to ONNX.
+
+    The model directory holds ``model.onnx``, a Hugging Face ``tokenizer.json``
+    and a ``config.json`` with ``id2label``.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 512):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError:
+            raise ValueError("The local provider's NER model requires onnxruntime and tokenizers to be installed")
+
+        options = onnxruntime.SessionOptions()
+        threads = int(os.getenv("SCAN_VAULT_LOCAL_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+        with open(os.path.join(model_dir, "config.json")) as f:
+            self.labels = {int(index): label for index, label in json.load(f)["id2label"].items()}
+
+    def predict(self, texts: List[str]) -> List[List[Dict]]:
+        """Entity spans for each text, run as one padded batch."""
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        probabilities = exp / exp.sum(axis=-1, keepdims=True)
+        return [
+            decode_entities(probabilities[i], encoding.offsets, self.labels)
+            for i, encoding in enumerate(encodings)
+        ]
+
+
+_models: Dict[str, OnnxNerModel] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_dir: str) -> OnnxNerModel:
+    """Load a model once per worker process and share it between providers."""
+    with _models_lock:
+        if model_dir not in _models:
+            logger.info("Loading local NER model from %s", model_dir)
+            _models[model_dir] = OnnxNerModel(model_dir)
+        return _models[model_dir]
+
+
+class LocalProvider(ModelProvider):
+    """
+    Fully on-box analysis.
+
+    Structured values (emails, card numbers, SSNs, ...) come from validated
+    patterns; names and other free-text entities come from an optional ONNX
+    NER model in SCAN_VAULT_LOCAL_MODEL_DIR. Segments from concurrent
+    requests are batched into shared inference calls. Images are read with
+    OCR when pytesseract is installed.
+    """
+
+    name = "local"
+
+    def __init__(self, model_dir: str = None, max_batch_size: int = None, **_):
+        self.model_dir = model_dir or os.getenv("SCAN_VAULT_LOCAL_MODEL_DIR") or None
+        self.max_batch_size = max_batch_size or int(os.getenv("SCAN_VAULT_LOCAL_BATCH_SIZE", "16"))
+        self._model = None
+        self._runner: Optional[BatchRunner] = None
+
+    async def warm(self) -> None:
+        if self.model_dir and self._model is None:
+            self._model = await asyncio.to_thread(load_model, self.model_dir)
+
+    async def analyze_text(self, text: str) -> List[Finding]:
+        findings = find_patterns(text)
+        await self.warm()
+        if self._model is None:
+            return findings
+
+        if self._runner is None:
+            self._runner = BatchRunner(self._model.predict, max_batch_size=self.max_batch_size)
+        segments = split_segments(text)
+        results = await self._runner.submit_many([segment for _, segment in segments])
+
+        seen = {(finding.type, finding.value) for finding in findings}
+        for (_, segment), entities in zip(segments, results):
+            for entity in entities:
+                if entity["score"] < MIN_ENTITY_SCORE:
+                    continue
+                finding_type, category = ENTITY_TYPES.get(entity["label"], (entity["label"].lower(), "PII"))
+                value = segment[entity["start"]:entity["end"]].strip()
+                if not value or (finding_type, value) in seen:
+                    continue
+                seen.add((finding_type, value))
+                score = entity["score"]
+                findings.append(Finding(
+                    type=finding_type,
+                    value=value,
+                    confidence=Confidence.HIGH if score >= 0.9 else Confidence.MEDIUM if score >= 0.7 else Confidence.LOW,
+                    context=f"Recognized as {entity['label']} by the local model",
+                    category=category,
+                ))
+        return findings
+
+    async def analyze_image(self, image_data: bytes) -> List[Finding]:
+        try:
+            import pytesseract
+        except ImportError:
+            raise ValueError("Local image analysis requires pytesseract to be installed")
+        from PIL import Image
+
+        def ocr() -> str:
+            with Image.open(io.BytesIO(bytes(image_data))) as image:
+                return pytesseract.image_to_string(image)
+
+        return await self.analyze_text(await asyncio.to_thread(ocr))
@@ -0,0 +1,159 @@
+from typing import Dict, List
+import asyncio
+import base64
+import logging
+import time
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from src.server.models.finding import Finding
+from src.server.providers.base import ModelProvider
+from src.server.services.concurrency_limiter import AdaptiveLimiter, model_call_limiter
+from src.server.services.micro_batcher import split_batch_findings
+from src.server.utils.json_parser import JSONParser
+from src.server.utils.prompt_registry import PromptRegistry, PromptVersion, prompt_registry
+from src.utils.tenants import current_tenant
+
+logger = logging.getLogger(__name__)
+
+# Provider errors that mean we are sending too much; they shrink the concurrency limit
+OVERLOAD_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+# Completion budget for a packed batch of small documents
+BATCH_MAX_TOKENS = 4096
+
+
+class OpenAIProvider(ModelProvider):
+    """
+    Chat completion models; calls are capped by the adaptive concurrency limiter.
+
+    Every request starts with the versioned system prompt and puts the
+    document last, so the provider's automatic prefix cache covers the
+    instructions on repeat calls.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: str, limiter: AdaptiveLimiter = None, prompts: PromptRegistry = None):
+        if not api_key:
+            logger.error("OpenAI API key not provided")
+            raise ValueError("OpenAI API key is required")
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.limiter = limiter or model_call_limiter
+        self.prompts = prompts or prompt_registry
+        self.json_parser = JSONParser()
+
+    async def analyze_text(self, text: str) -> List[Finding]:
+        prompt = self._select_prompt()
+        response = await self._complete(prompt, self._text_request(text, prompt))
+        return self._parse_response(response)
+
+    async def analyze_image(self, image_data: bytes) -> List[Finding]:
+        prompt = self._select_prompt()
+        response = await self._complete(prompt, self._image_request(image_data, prompt))
+        return self._parse_response(response)
+
+    async def analyze_batch(self, texts: List[str]) -> List[List[Finding]]:
+        if len(texts) == 1:
+            return [await self.analyze_text(texts[0])]
+        prompt = self._select_prompt()
+        response = await self._complete(prompt, self._batch_request(texts, prompt))
+        content = self._response_content(response)
+        # Cut off at max_tokens, the list does not parse and would read as
+        # no findings for every document; they are analyzed one by one instead
+        if response.choices[0].finish_reason == "length":
+            logger.warning("Batch of %s documents hit the completion limit; analyzing them one by one", len(texts))
+        else:
+            try:
+                return split_batch_findings(self.json_parser.parse_json_list(content, strict=True), texts)
+            except ValueError:
+                logger.warning("Batch of %s documents returned no usable list; analyzing them one by one", len(texts))
+        return list(await asyncio.gather(*(self.analyze_text(text) for text in texts)))
+
+    def _select_prompt(self) -> PromptVersion:
+        """The prompt version for this call, kept stable per tenant."""
+        tenant = current_tenant.get()
+        return self.prompts.select(tenant.id if tenant is not None else None)
+
+    async def _complete(self, prompt: PromptVersion, request: Dict):
+        """Send a request and record its latency and token usage against the prompt version."""
+        async with self.limiter.slot(drop_on=OVERLOAD_ERRORS):
+            started = time.perf_counter()
+            response = await self.client.chat.completions.create(**request)
+        self.prompts.record(prompt.version, time.perf_counter() - started, getattr(response, "usage", None))
+        return response
+
+    def _text_request(self, text: str, prompt: PromptVersion) -> Dict:
+        """Build the chat completion request for text analysis."""
+        return {
+            "model": "gpt-4-turbo-preview",
+            "messages": [
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": text},
+            ],
+            "max_tokens": 1000
+        }
+
+    def _batch_request(self, texts: List[str], prompt: PromptVersion) -> Dict:
+        """Build one chat completion request covering several small documents."""
+        documents = "\n".join(
+            f"<<<DOCUMENT {number}>>>\n{text}\n<<<END DOCUMENT {number}>>>"
+            for number, text in enumerate(texts, start=1)
+        )
+        return {
+            "model": "gpt-4-turbo-preview",
+            "messages": [
+                {"role": "system", "content": prompt.batch_system},
+                {"role": "user", "content": documents},
+            ],
+            "max_tokens": min(1000 * len(texts), BATCH_MAX_TOKENS),
+        }
+
+    def _image_request(self, image_data: bytes, prompt: PromptVersion) -> Dict:
+        """Build the chat completion request for image analysis."""
+        # Convert image to base64
+        img_str = base64.b64encode(image_data).decode()
+        return {
+            "model": "gpt-4-vision-preview",
+            "messages": [
+                {"role": "system", "content": prompt.system},
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{img_str}",
+                                "detail": "high"
+                            }
+                        }
+                    ]
+                },
+            ],
+            "max_tokens": 1000
+        }
+
+    def _parse_response(self, response) -> List[Finding]:
+        """Extract findings from a chat completion response."""
+        return self.json_parser.parse_gpt_response(self._response_content(response))
+
+    def _response_content(self, response) -> str:
+        """Charge the call to the current tenant and return the completion text."""
+        self._charge_tenant(response)
+        if not response.choices:
+            logger.error("No response received from GPT")
+            raise ValueError("No response received from model")
+
+        return response.choices[0].message.content.strip()
+
+    def _charge_tenant(self, response) -> None:
+        """Count the tokens a call used against the quota of the tenant being served."""
+        tenant = current_tenant.get()
+        usage = getattr(response, "usage", None)
+        if tenant is not None and usage is not None and usage.total_tokens:
+            tenant.charge(usage.total_tokens)
@@ -0,0 +1,126 @@
+from typing import Callable, Iterator, List, Optional, Pattern, Tuple
+import re
+
+from src.server.models.finding import Category, Confidence, Finding
+
+
+def luhn_valid(number: str) -> bool:
+    digits = [int(d) for d in number if d.isdigit()]
+    if not 13 <= len(digits) <= 19:
+        return False
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def iban_valid(value: str) -> bool:
+    compact = value.replace(" ", "").upper()
+    rearranged = compact[4:] + compact[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+def ssn_valid(value: str) -> bool:
+    area, group, serial = value[:3], value[4:6], value[7:]
+    return area not in ("000", "666") and not area.startswith("9") and group != "00" and serial != "0000"
+
+
+def aba_valid(value: str) -> bool:
+    digits = [int(d) for d in value]
+    return sum(w * d for w, d in zip([3, 7, 1] * 3, digits)) % 10 == 0
+
+
+class PatternDetector:
+    """
+    One kind of sensitive value found by regular expression.
+
+    ``validate`` (a checksum, say) promotes a match to high confidence and
+    drops it when it fails. ``keywords`` must appear shortly before the
+    match, for values such as passport numbers that are otherwise ambiguous.
+    """
+
+    # Characters before a match searched for keywords
+    KEYWORD_WINDOW = 40
+
+    def __init__(
+        self,
+        finding_type: str,
+        category: str,
+        pattern: str,
+        validate: Callable[[str], bool] = None,
+        keywords: Tuple[str, ...] = (),
+        flags: int = 0,
+    ):
+        self.type = finding_type
+        self.category = Category(category)
+        self.pattern: Pattern = re.compile(pattern, flags)
+        self.validate = validate
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.context = f"Matched {finding_type.replace('_', ' ')} pattern"
+
+    def finditer(self, text: str) -> Iterator[Finding]:
+        lowered = None
+        for match in self.pattern.finditer(text):
+            value = match.group("value") if "value" in self.pattern.groupindex else match.group()
+            if self.keywords:
+                if lowered is None:
+                    lowered = text.lower()
+                window = lowered[max(0, match.start() - self.KEYWORD_WINDOW):match.start()]
+                if not any(keyword in window for keyword in self.keywords):
+                    continue
+            if self.validate is not None and not self.validate(value):
+                continue
+            yield Finding(
+                type=self.type,
+                value=value,
+                confidence=Confidence.HIGH if self.validate or self.keywords else Confidence.MEDIUM,
+                context=self.context,
+                category=self.category,
+            )
+
+
+DETECTORS: List[PatternDetector] = [
+    PatternDetector("email", "PII", r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b"),
+    PatternDetector("ssn", "PII", r"\b\d{3}-\d{2}-\d{4}\b", validate=ssn_valid),
+    PatternDetector("credit_card", "PCI", r"\b(?:\d[ -]?){12,18}\d\b", validate=luhn_valid),
+    PatternDetector(
+        "phone_number", "PII",
+        r"(?<![\w-])(?:\+\d{1,3}[ .-]?)?(?:\(\d{3}\)|\d{3})[ .-]\d{3}[ .-]\d{4}\b",
+    ),
+    PatternDetector("iban", "PCI", r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?\b", validate=iban_valid),
+    PatternDetector("pan_card", "PII", r"\b[A-Z]{5}\d{4}[A-Z]\b"),
+    PatternDetector(
+        "date_of_birth", "PII",
+        r"\b(?:\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|\d{4}-\d{2}-\d{2})\b",
+        keywords=("dob", "date of birth", "birth date", "born"),
+    ),
+    PatternDetector(
+        "passport_number", "PII", r"\b[A-Z0-9]{6,9}\b",
+        keywords=("passport",),
+    ),
+    PatternDetector(
+        "medical_record", "PHI", r"\b(?:MRN|medical record(?: number| no\.?)?)\s*[#:]?\s*(?P<value>[A-Z0-9-]{4,})",
+        flags=re.IGNORECASE,
+    ),
+    PatternDetector(
+        "routing_number", "PCI", r"\b\d{9}\b",
+        validate=aba_valid, keywords=("routing", "aba"),
+    ),
+]
+
+
+def find_patterns(text: str, detectors: Optional[List[PatternDetector]] = None) -> List[Finding]:
+    """Run every detector over the text; each distinct value is reported once per type."""
+    findings = []
+    seen = set()
+    for detector in detectors or DETECTORS:
+        for finding in detector.finditer(text):
+            key = (finding.type, finding.value)
+            if key not in seen:
+                seen.add(key)
+                findings.append(finding)
+    return findings
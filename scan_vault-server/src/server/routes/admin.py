@@ -0,0 +1,140 @@
+from typing import Optional
+import asyncio
+import os
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.server.middleware.profiling import request_profiles
+from src.server.models.analytics import RebuildRollupsResponse
+from src.server.profiling.memory import memory_tracker
+from src.server.profiling.sampler import Profile, SamplingProfiler
+from src.server.utils.responses import ScanVaultJSONResponse
+from src.services.firebase_service import HOT_MONTHS, FirebaseService
+from src.utils.auth import get_admin_key
+
+# Response header naming the worker process that served an admin request
+WORKER_HEADER = "X-Scan-Vault-Worker"
+
+
+def served_by(response: Response) -> None:
+    response.headers[WORKER_HEADER] = str(os.getpid())
+
+
+# Profiling and memory endpoints act on the worker process that serves the
+# request; its PID is in the X-Scan-Vault-Worker header. Request profiles
+# are shared between workers.
+router = APIRouter(
+    prefix="/admin",
+    dependencies=[Depends(get_admin_key), Depends(served_by)],
+    default_response_class=ScanVaultJSONResponse,
+)
+
+MAX_PROFILE_SECONDS = 120
+PROFILE_FORMAT = Query("speedscope", pattern="^(speedscope|folded)$")
+
+# One time-boxed profile at a time per worker
+_profile_lock = threading.Lock()
+
+
+def pinned_worker(
+    worker: Optional[int] = Query(None, description="PID from X-Scan-Vault-Worker; other workers answer 409"),
+) -> None:
+    """
+    Refuse a memory command that landed on a different worker than the one asked for.
+
+    tracemalloc state belongs to one process. Sending start, snapshots and
+    stop over one keep-alive connection keeps them on one worker; passing
+    ``worker`` makes a command that lands elsewhere fail rather than act on
+    the wrong process.
+    """
+    if worker is not None and worker != os.getpid():
+        raise HTTPException(
+            status_code=409,
+            detail=f"Served by worker {os.getpid()}, not {worker}; retry on the same connection",
+            headers={WORKER_HEADER: str(os.getpid())},
+        )
+
+
+def _render(profile: Profile, format: str, name: str):
+    headers = {WORKER_HEADER: str(os.getpid())}
+    if format == "folded":
+        return PlainTextResponse(profile.folded(), headers=headers)
+    return ScanVaultJSONResponse(
+        profile.speedscope(name),
+        headers={**headers, "Content-Disposition": f'attachment; filename="{name}.speedscope.json"'},
+    )
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    format: str = PROFILE_FORMAT,
+    include_idle: bool = Query(False, description="Include threads blocked waiting for work"),
+):
+    """Sample this worker's stacks for ``seconds`` and return a flamegraph-ready profile."""
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        profiler = SamplingProfiler(include_idle=include_idle).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            result = await run_in_threadpool(profiler.stop)
+    finally:
+        _profile_lock.release()
+    return _render(result, format, f"scan-vault-{int(result.started)}")
+
+
+@router.get("/profile/requests/{profile_id}")
+async def request_profile(profile_id: str, format: str = PROFILE_FORMAT):
+    """A profile recorded for a request sent with the X-Scan-Vault-Profile header."""
+    result = request_profiles.get(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return _render(result, format, f"scan-vault-request-{profile_id}")
+
+
+@router.post("/memory/start", dependencies=[Depends(pinned_worker)])
+async def start_memory_tracing(frames: int = Query(10, ge=1, le=100)):
+    """Start tracemalloc; ``frames`` deep tracebacks let snapshots be filtered by caller."""
+    memory_tracker.start(frames)
+    return {"message": "Memory tracing started", "worker": os.getpid()}
+
+
+@router.post("/memory/stop", dependencies=[Depends(pinned_worker)])
+async def stop_memory_tracing():
+    memory_tracker.stop()
+    return {"message": "Memory tracing stopped", "worker": os.getpid()}
+
+
+@router.get("/memory/snapshot", dependencies=[Depends(pinned_worker)])
+async def memory_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    include: str = Query(None, description="Filename glob an allocation must pass through, e.g. */file_processor.py"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Top allocation sites, with growth since the previous snapshot."""
+    try:
+        return {**await run_in_threadpool(memory_tracker.snapshot, limit, include, group_by), "worker": os.getpid()}
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/retention/run")
+async def run_retention(hot_months: int = Query(HOT_MONTHS, ge=1, description="Months to keep in Firestore")):
+    """Archive detections older than the retention window; safe to rerun, e.g. from a daily cron."""
+    try:
+        archived = await FirebaseService().archive_partitions(hot_months)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"archived": archived, "detections": sum(archived.values())}
+
+
+@router.post("/analytics/rebuild", response_model=RebuildRollupsResponse)
+async def rebuild_rollups():
+    """Recompute analytics rollups from all stored detections; reads every detection, so run it sparingly."""
+    detections = await FirebaseService().rebuild_rollups()
+    return {"message": "Rollups rebuilt successfully", "detections": detections}
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+
+from src.server.models.analytics import DetectionSummary, TopFilesResponse
+from src.server.utils.responses import ScanVaultJSONResponse
+from src.services.firebase_service import FirebaseService
+from src.utils.auth import get_api_key
+
+router = APIRouter(prefix="/analytics", default_response_class=ScanVaultJSONResponse)
+
+
+@router.get("/summary", dependencies=[Depends(get_api_key)], response_model=DetectionSummary)
+async def detection_summary():
+    """Counts by category, type, confidence and day, read from a single rollup document."""
+    try:
+        firebase_service = FirebaseService()
+        return await firebase_service.get_detection_summary()
+    except Exception as e:
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
+
+
+@router.get("/top-files", dependencies=[Depends(get_api_key)], response_model=TopFilesResponse)
+async def top_files(limit: int = Query(10, ge=1, le=100)):
+    """Files with the most findings."""
+    try:
+        firebase_service = FirebaseService()
+        return {"files": await firebase_service.get_top_files(limit)}
+    except Exception as e:
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
+
@@ -1,16 +1,23 @@
 from fastapi import APIRouter
+import logging
+from src.server.utils.responses import ScanVaultJSONResponse
 
-from src.services.firebase_service import FirebaseService
+from src.server.models.detection import MessageResponse
+from src.services.firebase_service import DetectionArchivedError, FirebaseService
 
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.delete("/delete-detection/{detection_id}")
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
+
+@router.delete("/delete-detection/{detection_id}", response_model=MessageResponse)
 async def delete_detection(detection_id: str):
-    print(f"Deleting detection with ID: {detection_id}")
+    logger.info("Deleting detection %s", detection_id)
     try:
         firebase_service = FirebaseService()
         await firebase_service.delete_detection(detection_id)
-        return {"message": "Detection deleted successfully"}, 200
+        return {"message": "Detection deleted successfully"}
+    except DetectionArchivedError as e:
+        return ScanVaultJSONResponse(status_code=409, content={"error": str(e)})
     except Exception as e:
-        return {"error": str(e)}, 500
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from src.server.models.detection import ValueLookupRequest, ValueLookupResponse
+from src.server.utils.responses import ScanVaultJSONResponse
+from src.services.firebase_service import FirebaseService
+from src.utils.auth import get_api_key
+
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
+
+
+@router.post(
+    "/detections/by-value",
+    dependencies=[Depends(get_api_key)],
+    response_model=ValueLookupResponse,
+    response_model_exclude_unset=True,
+)
+async def find_detections_by_value(lookup: ValueLookupRequest):
+    """Find every saved detection containing the given sensitive value.
+
+    The value is sent in the request body rather than the URL so it does not
+    end up in access logs.
+    """
+    try:
+        firebase_service = FirebaseService()
+        detections = await firebase_service.find_detections_by_value(lookup.value)
+        return {"detections": detections}
+    except ValueError as e:
+        return ScanVaultJSONResponse(status_code=503, content={"error": str(e)})
+    except Exception as e:
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
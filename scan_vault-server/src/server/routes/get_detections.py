@@ -1,17 +1,79 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Response
+from src.server.models.detection import Detection, DetectionsResponse
+from src.server.services.detection_version import detection_version
+from src.server.utils.etags import detection_etag, etag_matches
+from src.server.utils.responses import ScanVaultJSONResponse
 from src.services.firebase_service import FirebaseService
 from src.utils.auth import get_api_key
 
-router = APIRouter()
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
 
+# Clients may keep the list but must revalidate it with If-None-Match on every use
+CACHE_CONTROL = "private, no-cache"
 
-@router.get("/get-saved-detections", dependencies=[Depends(get_api_key)])
-async def get_detections():
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+@router.get(
+    "/get-saved-detections",
+    dependencies=[Depends(get_api_key)],
+    response_model=DetectionsResponse,
+)
+async def get_detections(
+    if_none_match: Optional[str] = Header(None),
+    since: Optional[datetime] = Query(None, description="Earliest detection time; reaching past the retention window reads the archive"),
+    until: Optional[datetime] = Query(None, description="Latest detection time, exclusive"),
+):
     try:
         firebase_service = FirebaseService()
-        detections = await firebase_service.get_detections()
-        if detections is None:
-            return {"detections": []}, 200
-        return {"detections": detections}, 200
+        if since is not None or until is not None:
+            # Ranged reads may include archived months and are not cached
+            detections = await firebase_service.get_detections(since, until)
+            if detections is None:
+                return ScanVaultJSONResponse(status_code=500, content={"error": "Could not read detections"})
+            return ScanVaultJSONResponse({"detections": detections})
+
+        version = await detection_version.current(firebase_service)
+        etag = detection_version.etag(version)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+        body = detection_version.cached_body(version)
+        if body is None:
+            detections = await firebase_service.get_detections()
+            if detections is None:
+                # A failed read is not cached under the version
+                return ScanVaultJSONResponse({"detections": []})
+            # Stored documents are already in the response shape, so they are
+            # rendered directly instead of being re-validated on every read.
+            body = ScanVaultJSONResponse({"detections": detections}).body
+            detection_version.cache_body(version, body)
+        return Response(
+            body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+    except Exception as e:
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
+
+
+@router.get(
+    "/get-saved-detections/{detection_id}",
+    dependencies=[Depends(get_api_key)],
+    response_model=Detection,
+)
+async def get_detection(detection_id: str, if_none_match: Optional[str] = Header(None)):
+    try:
+        detection = await FirebaseService().get_detection(detection_id)
+        if detection is None:
+            return ScanVaultJSONResponse(status_code=404, content={"error": "Detection not found"})
+        etag = detection_etag(detection)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        return ScanVaultJSONResponse(detection, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
     except Exception as e:
-        return {"error": str(e)}, 500
+        return ScanVaultJSONResponse(status_code=500, content={"error": str(e)})
@@ -1,14 +1,30 @@
-import logging
-import time
 from fastapi import APIRouter
+from src.server.services.readiness import readiness_monitor
+from src.server.utils.responses import ScanVaultJSONResponse
 
 
 router = APIRouter()
 
-logger = logging.getLogger(__name__)
+# Liveness (/health, /health/live) fails only when the worker should be
+# restarted; readiness (/health/ready) fails while it should get no new
+# traffic. Probes are hit every few seconds, so neither logs.
+
 
 @router.get("/health")
+@router.get("/health/live")
 async def health():
-    """Endpoint to check the health of the server."""
-    logger.info("Health check endpoint called successfully", extra={"timestamp": time.time()})
+    """Liveness: the worker is up and its event loop answers."""
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def ready():
+    """
+    Readiness: whether this worker should be sent more traffic.
+
+    Returns 503 while scans or model calls are backed up past their
+    thresholds, the event loop lags, storage was unreachable at the last
+    background check, or the worker is shutting down.
+    """
+    status = readiness_monitor.status()
+    return ScanVaultJSONResponse(status, status_code=200 if not status["failing"] else 503)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.server.services.concurrency_limiter import model_call_limiter
+from src.server.services.fair_scheduler import scan_scheduler
+from src.server.services.near_duplicates import near_duplicate_index
+from src.server.services.readiness import readiness_monitor
+from src.server.utils.prompt_registry import prompt_registry
+
+router = APIRouter()
+
+# Prometheus name, type and help text for each limiter statistic
+LIMITER_METRICS = {
+    "limit": ("scan_vault_model_concurrency_limit", "gauge", "Current adaptive limit on concurrent model calls"),
+    "in_flight": ("scan_vault_model_in_flight", "gauge", "Model calls in flight"),
+    "queue_depth": ("scan_vault_model_queue_depth", "gauge", "Callers waiting for a model slot"),
+    "latency_seconds": ("scan_vault_model_latency_seconds", "gauge", "Recent model call latency (EWMA)"),
+    "baseline_latency_seconds": ("scan_vault_model_baseline_latency_seconds", "gauge", "Long-run model call latency (EWMA)"),
+    "shed_total": ("scan_vault_model_shed_total", "counter", "Requests rejected because the queue wait passed the SLO"),
+    "dropped_total": ("scan_vault_model_dropped_total", "counter", "Model calls throttled or failed upstream"),
+}
+
+# Per prompt version counters, for comparing versions under an A/B split
+PROMPT_METRICS = {
+    "calls": ("scan_vault_prompt_calls_total", "Completed model calls"),
+    "latency_seconds": ("scan_vault_prompt_latency_seconds_total", "Time spent in model calls"),
+    "prompt_tokens": ("scan_vault_prompt_tokens_total", "Input tokens sent"),
+    "cached_tokens": ("scan_vault_prompt_cached_tokens_total", "Input tokens served from the provider's prefix cache"),
+    "completion_tokens": ("scan_vault_prompt_completion_tokens_total", "Output tokens generated"),
+}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Worker metrics in the Prometheus text format."""
+    snapshot = model_call_limiter.snapshot()
+    lines = []
+    for key, (name, kind, description) in LIMITER_METRICS.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {snapshot[key]}"]
+
+    lines += [
+        "# HELP scan_vault_scans_in_flight Scans admitted by the fair scheduler",
+        "# TYPE scan_vault_scans_in_flight gauge",
+        f"scan_vault_scans_in_flight {scan_scheduler.in_flight}",
+        "# HELP scan_vault_scans_queued Scans waiting for a pipeline slot, by tenant",
+        "# TYPE scan_vault_scans_queued gauge",
+    ]
+    lines += [f'scan_vault_scans_queued{{tenant="{tenant}"}} {count}' for tenant, count in scan_scheduler.queued().items()]
+
+    readiness = readiness_monitor.status()
+    lines += [
+        "# HELP scan_vault_ready Whether this worker reports ready for traffic",
+        "# TYPE scan_vault_ready gauge",
+        f"scan_vault_ready {int(not readiness['failing'])}",
+        "# HELP scan_vault_event_loop_lag_seconds Recent delay of the event loop in running due callbacks",
+        "# TYPE scan_vault_event_loop_lag_seconds gauge",
+        f"scan_vault_event_loop_lag_seconds {readiness['event_loop_lag_seconds']}",
+        "# HELP scan_vault_model_saturation Model calls running and waiting, relative to the concurrency limit",
+        "# TYPE scan_vault_model_saturation gauge",
+        f"scan_vault_model_saturation {readiness['model_saturation']}",
+    ]
+
+    dedup = near_duplicate_index.snapshot()
+    lines += [
+        "# HELP scan_vault_dedup_lookups_total Documents checked against the near-duplicate index",
+        "# TYPE scan_vault_dedup_lookups_total counter",
+        f"scan_vault_dedup_lookups_total {dedup['lookups']}",
+        "# HELP scan_vault_dedup_reused_total Documents scanned by reusing a near-duplicate's findings",
+        "# TYPE scan_vault_dedup_reused_total counter",
+        f"scan_vault_dedup_reused_total {dedup['reused']}",
+        "# HELP scan_vault_dedup_chars_total Characters of documents checked against the index",
+        "# TYPE scan_vault_dedup_chars_total counter",
+        f"scan_vault_dedup_chars_total {dedup['chars_total']}",
+        "# HELP scan_vault_dedup_chars_scanned_total Characters of those documents sent to the model",
+        "# TYPE scan_vault_dedup_chars_scanned_total counter",
+        f"scan_vault_dedup_chars_scanned_total {dedup['chars_scanned']}",
+        "# HELP scan_vault_dedup_documents Templates held by the near-duplicate index",
+        "# TYPE scan_vault_dedup_documents gauge",
+        f"scan_vault_dedup_documents {dedup['documents']}",
+    ]
+
+    prompts = prompt_registry.snapshot()
+    for key, (name, description) in PROMPT_METRICS.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{version="{version}"}} {stats[key]}' for version, stats in prompts.items()]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.params import Depends
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from src.server.routes.scan import scan_service
+from src.server.services.file_handler import FileHandler, FileTooLargeError, UnsupportedFileTypeError
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.fair_scheduler import scan_scheduler
+from src.server.services.redaction_service import RedactionService
+from src.utils.auth import get_api_key
+from src.utils.tenants import Tenant
+
+redaction_service = RedactionService(scan_service)
+
+router = APIRouter(prefix="/redact")
+
+
+@router.post("", response_class=FileResponse)
+async def redact(file: UploadFile = File(...), tenant: Optional[Tenant] = Depends(get_api_key)):
+    """Scan a file and return a copy with every detected value masked."""
+    try:
+        async with scan_scheduler.slot_for(tenant):
+            redacted = await redaction_service.redact_file(file)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FileResponse(
+        redacted["path"],
+        media_type=redacted["media_type"],
+        filename=redacted["file_name"],
+        headers={
+            "X-Findings-Count": str(redacted["findings"]),
+            "X-Redactions-Count": str(redacted["redactions"]),
+        },
+        background=BackgroundTask(FileHandler.delete_file, redacted["path"]),
+    )
+
+
+@router.post("/bulk", response_class=FileResponse)
+async def redact_bulk(files: List[UploadFile] = File(...), tenant: Optional[Tenant] = Depends(get_api_key)):
+    """Redact several files and return them in a ZIP archive with a report."""
+    try:
+        async with scan_scheduler.slot_for(tenant):
+            archive_path = await redaction_service.redact_files(files)
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FileResponse(
+        archive_path,
+        media_type="application/zip",
+        filename="redacted_files.zip",
+        background=BackgroundTask(FileHandler.delete_file, archive_path),
+    )
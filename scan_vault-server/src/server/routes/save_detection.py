@@ -1,31 +1,47 @@
-from fastapi import APIRouter, Depends
-from firebase_admin import firestore
+from fastapi import APIRouter, Depends, status
+import logging
+from src.server.utils.responses import ScanVaultJSONResponse
 from typing import Dict, Any
+from src.server.models.detection import SaveDetectionResponse
+from src.server.models.finding import Finding
 from src.utils.auth import get_api_key
 
 from src.services.firebase_service import FirebaseService
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/save-detection", dependencies=[Depends(get_api_key)])
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
+
+@router.post(
+    "/save-detection",
+    dependencies=[Depends(get_api_key)],
+    response_model=SaveDetectionResponse,
+    status_code=status.HTTP_201_CREATED,
+)
 async def save_detection(detection_data: Dict[str, Any]):
     try:
-        print(detection_data)
         # Validate required fields
-        if not detection_data or 'sensitive_fields' not in detection_data:
-            return {'error': 'Missing required data'}, 400
-            
+        if not detection_data or 'sensitive_fields' not in detection_data or 'file_name' not in detection_data:
+            return ScanVaultJSONResponse(status_code=400, content={'error': 'Missing required data'})
+        fields = detection_data['sensitive_fields']
+        if not isinstance(fields, list) or not all(isinstance(field, dict) for field in fields):
+            return ScanVaultJSONResponse(status_code=400, content={'error': 'sensitive_fields must be a list of objects'})
+        try:
+            findings = [Finding.from_dict(field, strict=True) for field in fields]
+        except ValueError as e:
+            return ScanVaultJSONResponse(status_code=400, content={'error': f'Invalid sensitive field: {e}'})
+
         # Create a new document in the 'detections' collection
         firebase_service = FirebaseService()
-        doc_id = await firebase_service.save_detection({
-            'fileName': detection_data['file_name'],
-            'sensitiveInfo': detection_data['sensitive_fields'],
-            'createdAt': firestore.SERVER_TIMESTAMP,
-        })
+        doc_id = await firebase_service.save_detection(FirebaseService.build_detection(
+            detection_data['file_name'],
+            findings,
+        ))
         if not doc_id:
-            return {'error': 'Failed to save detection'}, 500
+            return ScanVaultJSONResponse(status_code=500, content={'error': 'Failed to save detection'})
 
-        return {'message': 'Detection saved successfully', 'id': doc_id}, 201
+        logger.info("Saved detection %s with %d fields", doc_id, len(detection_data['sensitive_fields']))
+        return {'message': 'Detection saved successfully', 'id': doc_id}
         
     except Exception as e:
-        return {'error': str(e)}, 500
+        return ScanVaultJSONResponse(status_code=500, content={'error': str(e)})
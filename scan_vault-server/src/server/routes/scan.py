@@ -1,23 +1,75 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, BackgroundTasks, File, Query, UploadFile, HTTPException
+from src.server.utils.responses import ScanVaultJSONResponse
+from typing import List, Optional
 import logging
 
 from fastapi.params import Depends
 
 from src.server.models.scan_request import ScanRequest
+from src.server.models.scan_policy import ScanPolicy
+from src.server.models.scan_result import ScanResponse
 from src.server.services.scan_service import ScanService
+from src.server.services.file_handler import FileTooLargeError, UnsupportedFileTypeError
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.detection_writer import schedule_persist
+from src.server.services.fair_scheduler import scan_scheduler
 from src.utils.auth import get_api_key
+from src.utils.tenants import Tenant
 
 logger = logging.getLogger(__name__)
 scan_service = ScanService()
 
-router = APIRouter();
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
 
-@router.post("/scan",dependencies=[Depends(get_api_key)])
-async def scan(file: UploadFile = File(...),):
+@router.post(
+    "/scan",
+    response_model=ScanResponse,
+    response_model_exclude_unset=True,
+)
+async def scan(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    persist: bool = Query(False, description="Save the findings as a detection after responding"),
+    stop_on_category: Optional[List[str]] = Query(None, description="Stop once findings in these categories are found"),
+    stop_on_type: Optional[List[str]] = Query(None, description="Stop once findings of these types are found"),
+    min_confidence: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
+    stop_after: int = Query(1, ge=1, description="Matching findings needed before stopping"),
+    tenant: Optional[Tenant] = Depends(get_api_key),
+):
     """Endpoint to scan uploaded files."""
+    policy = build_policy(stop_on_category, stop_on_type, min_confidence, stop_after)
     try:
-        results = await scan_service.scan_file(file)
-        return {"message": "success", "results": results}
+        # Each tenant gets its weighted share of pipeline slots
+        async with scan_scheduler.slot_for(tenant):
+            results = await scan_service.scan_file(file, policy)
+        response = {"message": "success", "results": results}
+        if persist:
+            response["detection_id"] = schedule_persist(results, background_tasks)
+        # Findings are slotted dataclasses orjson encodes directly; validating
+        # them against the response model would copy every one into a dict
+        return ScanVaultJSONResponse(response)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def build_policy(
+    stop_on_category: Optional[List[str]],
+    stop_on_type: Optional[List[str]],
+    min_confidence: Optional[str],
+    stop_after: int,
+) -> Optional[ScanPolicy]:
+    """The early-stop policy described by the scan query parameters, if any."""
+    if not (stop_on_category or stop_on_type):
+        return None
+    return ScanPolicy(
+        categories=stop_on_category or [],
+        types=stop_on_type or [],
+        min_confidence=min_confidence,
+        stop_after=stop_after,
+    )
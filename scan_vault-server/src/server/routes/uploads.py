@@ -0,0 +1,270 @@
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Query, Request, Response
+from fastapi.params import Depends
+from starlette.requests import ClientDisconnect
+from typing import AsyncIterator, Dict, List, Optional
+import base64
+import binascii
+import logging
+
+from src.server.routes.scan import build_policy, scan_service
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.detection_writer import schedule_persist
+from src.server.services.fair_scheduler import scan_scheduler
+from src.server.services.file_handler import FileTooLargeError, UnsupportedFileTypeError
+from src.server.services.upload_sessions import (
+    CHECKSUM_ALGORITHMS,
+    ChecksumMismatchError,
+    UploadBusyError,
+    UploadConflictError,
+    UploadInterruptedError,
+    UploadNotFoundError,
+    UploadQuotaError,
+    UploadSession,
+    upload_store,
+)
+from src.server.utils.responses import ScanVaultJSONResponse
+from src.utils.auth import get_api_key
+from src.utils.tenants import Tenant
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = "1.0.0"
+TUS_HEADERS = {"Tus-Resumable": TUS_VERSION}
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+router = APIRouter(default_response_class=ScanVaultJSONResponse)
+
+
+def parse_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Decode an ``Upload-Metadata`` header: comma-separated keys with base64 values."""
+    metadata = {}
+    for pair in (header or "").split(","):
+        key, _, value = pair.strip().partition(" ")
+        if not key:
+            continue
+        try:
+            metadata[key] = base64.b64decode(value.strip(), validate=True).decode("utf-8")
+        except (binascii.Error, ValueError):
+            raise HTTPException(status_code=400, detail=f"Upload-Metadata value for {key} is not valid base64")
+    return metadata
+
+
+def _tenant_id(tenant: Optional[Tenant]) -> Optional[str]:
+    return tenant.id if tenant is not None else None
+
+
+def _get_session(upload_id: str, tenant: Optional[Tenant]) -> UploadSession:
+    try:
+        return upload_store.get(upload_id, _tenant_id(tenant))
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e), headers=TUS_HEADERS)
+
+
+async def _chunk_body(request: Request) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in request.stream():
+            yield chunk
+    except ClientDisconnect:
+        raise UploadInterruptedError()
+
+
+async def _analyze_received(session: UploadSession, tenant: Optional[Tenant]) -> None:
+    """Analyze newly received lines after the response; the final scan catches up on failure."""
+    try:
+        async with scan_scheduler.slot_for(tenant):
+            await upload_store.analyze_received(session, scan_service.llm_handler.analyze_text_async)
+    except Exception as e:
+        logger.warning("Deferred early analysis of upload %s: %s", session.id, e)
+
+
+@router.options("/uploads")
+async def upload_options():
+    """Describe the supported resumable upload protocol."""
+    return Response(status_code=204, headers={
+        **TUS_HEADERS,
+        "Tus-Version": TUS_VERSION,
+        "Tus-Extension": "creation,checksum,termination",
+        "Tus-Checksum-Algorithm": ",".join(CHECKSUM_ALGORITHMS),
+    })
+
+
+@router.post("/uploads", status_code=201)
+async def create_upload(
+    upload_length: int = Header(..., ge=0),
+    upload_metadata: Optional[str] = Header(None),
+    tenant: Optional[Tenant] = Depends(get_api_key),
+):
+    """
+    Start a resumable upload.
+
+    Send the file size as ``Upload-Length`` and its name as the ``filename``
+    entry of ``Upload-Metadata``, then PATCH the bytes to the returned
+    Location and POST to ``{Location}/scan`` once they have all arrived.
+    """
+    filename = parse_metadata(upload_metadata).get("filename")
+    if not filename:
+        raise HTTPException(status_code=400, detail="Upload-Metadata must include a filename")
+    try:
+        extension = scan_service.file_processor.get_file_extension(filename)
+        file_type = scan_service.file_processor.get_file_type(extension)
+        session = upload_store.create(
+            filename,
+            extension,
+            file_type,
+            upload_length,
+            tenant_id=_tenant_id(tenant),
+            streamable=scan_service.file_processor.is_streamable(extension),
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadQuotaError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info("Created upload %s of %s bytes", session.id, upload_length)
+    return Response(status_code=201, headers={
+        **TUS_HEADERS,
+        "Location": f"/uploads/{session.id}",
+        "Upload-Offset": "0",
+    })
+
+
+@router.head("/uploads/{upload_id}")
+async def upload_offset(upload_id: str, tenant: Optional[Tenant] = Depends(get_api_key)):
+    """How many bytes of an upload have arrived, so an interrupted client knows where to resume."""
+    session = _get_session(upload_id, tenant)
+    try:
+        offset = upload_store.offset(session)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e), headers=TUS_HEADERS)
+    return Response(status_code=200, headers={
+        **TUS_HEADERS,
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(session.length),
+        "Cache-Control": "no-store",
+    })
+
+
+@router.patch("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    upload_offset: int = Header(..., ge=0),
+    upload_checksum: Optional[str] = Header(None),
+    content_type: Optional[str] = Header(None),
+    tenant: Optional[Tenant] = Depends(get_api_key),
+):
+    """
+    Append a chunk at ``Upload-Offset``.
+
+    An ``Upload-Checksum`` header ("sha256 <base64 digest>") is verified
+    and a mismatching chunk is discarded with a 460. Streamable uploads
+    are analyzed as complete lines arrive.
+    """
+    if content_type != CHUNK_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}")
+    session = _get_session(upload_id, tenant)
+    try:
+        offset = await upload_store.append(
+            session,
+            upload_offset,
+            _chunk_body(request),
+            checksum=upload_checksum,
+            sniff=scan_service.file_processor.sniff_file_type,
+        )
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e), headers=TUS_HEADERS)
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers=TUS_HEADERS)
+    except UploadBusyError as e:
+        raise HTTPException(status_code=423, detail=str(e), headers=TUS_HEADERS)
+    except ChecksumMismatchError as e:
+        raise HTTPException(status_code=460, detail=str(e), headers=TUS_HEADERS)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=TUS_HEADERS)
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e), headers=TUS_HEADERS)
+    except UploadInterruptedError:
+        logger.info("Upload %s interrupted; the client can resume from the stored offset", upload_id)
+        raise HTTPException(status_code=400, detail="Upload interrupted", headers=TUS_HEADERS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e), headers=TUS_HEADERS)
+
+    if session.streamable and offset - session.analyzed >= upload_store.analyze_bytes:
+        background_tasks.add_task(_analyze_received, session, tenant)
+    return Response(status_code=204, headers={**TUS_HEADERS, "Upload-Offset": str(offset)})
+
+
+@router.delete("/uploads/{upload_id}")
+async def delete_upload(upload_id: str, tenant: Optional[Tenant] = Depends(get_api_key)):
+    """Abandon an upload and delete what has arrived."""
+    session = _get_session(upload_id, tenant)
+    try:
+        with upload_store.writing(session):
+            upload_store.delete(session)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e), headers=TUS_HEADERS)
+    except UploadBusyError as e:
+        raise HTTPException(status_code=423, detail=str(e), headers=TUS_HEADERS)
+    return Response(status_code=204, headers=TUS_HEADERS)
+
+
+@router.post("/uploads/{upload_id}/scan")
+async def scan_completed_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    persist: bool = Query(False, description="Save the findings as a detection after responding"),
+    stop_on_category: Optional[List[str]] = Query(None, description="Stop once findings in these categories are found"),
+    stop_on_type: Optional[List[str]] = Query(None, description="Stop once findings of these types are found"),
+    min_confidence: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
+    stop_after: int = Query(1, ge=1, description="Matching findings needed before stopping"),
+    tenant: Optional[Tenant] = Depends(get_api_key),
+):
+    """
+    Scan a completed upload, taking the same options as ``/scan``.
+
+    The upload is deleted once it has been scanned; after a failure it is
+    kept so the scan can be retried.
+    """
+    policy = build_policy(stop_on_category, stop_on_type, min_confidence, stop_after)
+    session = _get_session(upload_id, tenant)
+    try:
+        # Held throughout, so no chunk lands while the file is read
+        with upload_store.writing(session):
+            offset = upload_store.offset(session)
+            if offset != session.length:
+                raise UploadConflictError(f"Upload has {offset} of {session.length} bytes")
+            upload = upload_store.spooled(session)
+            async with scan_scheduler.slot_for(tenant):
+                session = upload_store.get(upload_id, _tenant_id(tenant))
+                if session.streamable and session.analyzed:
+                    session = await upload_store.analyze_received(
+                        session, scan_service.llm_handler.analyze_text_async, final=True
+                    )
+                    results = await scan_service.finish_analyzed_upload(
+                        upload, session.early_findings(), session.chunks_analyzed, policy
+                    )
+                else:
+                    results = await scan_service.scan_upload(upload, policy)
+            upload.close()
+            upload_store.delete(session)
+        response = {"message": "success", "results": results}
+        if persist:
+            response["detection_id"] = schedule_persist(results, background_tasks)
+        return ScanVaultJSONResponse(response)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadBusyError as e:
+        raise HTTPException(status_code=423, detail=str(e))
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
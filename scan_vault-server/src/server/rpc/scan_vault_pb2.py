@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: src/server/rpc/scan_vault.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1fsrc/server/rpc/scan_vault.proto\x12\x0cscanvault.v1\"z\n\x0bScanOptions\x12\x0f\n\x07persist\x18\x01 \x01(\x08\x12\x18\n\x10stop_on_category\x18\x02 \x03(\t\x12\x14\n\x0cstop_on_type\x18\x03 \x03(\t\x12\x16\n\x0emin_confidence\x18\x04 \x01(\t\x12\x12\n\nstop_after\x18\x05 \x01(\x05\"v\n\tFileChunk\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12*\n\x07options\x18\x03 \x01(\x0b\x32\x19.scanvault.v1.ScanOptions\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x12\x0c\n\x04last\x18\x05 \x01(\x08\"B\n\x08Location\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\r\n\x05start\x18\x02 \x01(\x03\x12\x0b\n\x03\x65nd\x18\x03 \x01(\x03\x12\x0c\n\x04\x62\x62ox\x18\x04 \x03(\x01\"\x88\x01\n\x07\x46inding\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\x12\n\nconfidence\x18\x03 \x01(\t\x12\x0f\n\x07\x63ontext\x18\x04 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x05 \x01(\t\x12)\n\tlocations\x18\x06 \x03(\x0b\x32\x16.scanvault.v1.Location\"\x82\x01\n\rPolicyVerdict\x12\x0f\n\x07matched\x18\x01 \x01(\x08\x12\x19\n\x11matching_findings\x18\x02 \x01(\x05\x12\x15\n\rstopped_early\x18\x03 \x01(\x08\x12\x15\n\rpages_scanned\x18\x04 \x01(\x05\x12\x17\n\x0f\x63hunks_analyzed\x18\x05 \x01(\x05\"&\n\x05\x45rror\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xc0\x01\n\nScanResult\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\x12\x11\n\tfile_name\x18\x02 \x01(\t\x12\'\n\x08\x66indings\x18\x03 \x03(\x0b\x32\x15.scanvault.v1.Finding\x12+\n\x06policy\x18\x04 \x01(\x0b\x32\x1b.scanvault.v1.PolicyVerdict\x12\x14\n\x0c\x64\x65tection_id\x18\x05 \x01(\t\x12\"\n\x05\x65rror\x18\x06 \x01(\x0b\x32\x13.scanvault.v1.Error\"k\n\tScanEvent\x12(\n\x07\x66inding\x18\x01 \x01(\x0b\x32\x15.scanvault.v1.FindingH\x00\x12+\n\x07summary\x18\x02 \x01(\x0b\x32\x18.scanvault.v1.ScanResultH\x00\x42\x07\n\x05\x65vent2\xd0\x01\n\tScanVault\x12;\n\x04Scan\x12\x17.scanvault.v1.FileChunk\x1a\x18.scanvault.v1.ScanResult(\x01\x12\x42\n\nScanStream\x12\x17.scanvault.v1.FileChunk\x1a\x17.scanvault.v1.ScanEvent(\x01\x30\x01\x12\x42\n\tScanBatch\x12\x17.scanvault.v1.FileChunk\x1a\x18.scanvault.v1.ScanResult(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'src.server.rpc.scan_vault_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_SCANOPTIONS']._serialized_start=49
+  _globals['_SCANOPTIONS']._serialized_end=171
+  _globals['_FILECHUNK']._serialized_start=173
+  _globals['_FILECHUNK']._serialized_end=291
+  _globals['_LOCATION']._serialized_start=293
+  _globals['_LOCATION']._serialized_end=359
+  _globals['_FINDING']._serialized_start=362
+  _globals['_FINDING']._serialized_end=498
+  _globals['_POLICYVERDICT']._serialized_start=501
+  _globals['_POLICYVERDICT']._serialized_end=631
+  _globals['_ERROR']._serialized_start=633
+  _globals['_ERROR']._serialized_end=671
+  _globals['_SCANRESULT']._serialized_start=674
+  _globals['_SCANRESULT']._serialized_end=866
+  _globals['_SCANEVENT']._serialized_start=868
+  _globals['_SCANEVENT']._serialized_end=975
+  _globals['_SCANVAULT']._serialized_start=978
+  _globals['_SCANVAULT']._serialized_end=1186
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,145 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from src.server.rpc import scan_vault_pb2 as src_dot_server_dot_rpc_dot_scan__vault__pb2
+
+
+class ScanVaultStub(object):
+    """Scans files for sensitive information. Send the API key in the
+    "access_token" metadata entry, as for the HTTP API.
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Scan = channel.stream_unary(
+                '/scanvault.v1.ScanVault/Scan',
+                request_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+                response_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.FromString,
+                )
+        self.ScanStream = channel.stream_stream(
+                '/scanvault.v1.ScanVault/ScanStream',
+                request_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+                response_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanEvent.FromString,
+                )
+        self.ScanBatch = channel.stream_stream(
+                '/scanvault.v1.ScanVault/ScanBatch',
+                request_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+                response_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.FromString,
+                )
+
+
+class ScanVaultServicer(object):
+    """Scans files for sensitive information. Send the API key in the
+    "access_token" metadata entry, as for the HTTP API.
+    """
+
+    def Scan(self, request_iterator, context):
+        """Upload one file as a stream of chunks and get its findings once scanned.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ScanStream(self, request_iterator, context):
+        """Upload one file as a stream of chunks and receive its findings one
+        message at a time, followed by a summary without findings.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ScanBatch(self, request_iterator, context):
+        """Scan many files over one stream. Chunks of different files may be
+        interleaved; each file's result is sent as soon as it is scanned, tagged
+        with the file's id. A failed file is reported in its result and the
+        others carry on.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ScanVaultServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Scan': grpc.stream_unary_rpc_method_handler(
+                    servicer.Scan,
+                    request_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.FromString,
+                    response_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.SerializeToString,
+            ),
+            'ScanStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.ScanStream,
+                    request_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.FromString,
+                    response_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanEvent.SerializeToString,
+            ),
+            'ScanBatch': grpc.stream_stream_rpc_method_handler(
+                    servicer.ScanBatch,
+                    request_deserializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.FromString,
+                    response_serializer=src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'scanvault.v1.ScanVault', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class ScanVault(object):
+    """Scans files for sensitive information. Send the API key in the
+    "access_token" metadata entry, as for the HTTP API.
+    """
+
+    @staticmethod
+    def Scan(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/scanvault.v1.ScanVault/Scan',
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ScanStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/scanvault.v1.ScanVault/ScanStream',
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ScanBatch(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/scanvault.v1.ScanVault/ScanBatch',
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.FileChunk.SerializeToString,
+            src_dot_server_dot_rpc_dot_scan__vault__pb2.ScanResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,82 @@
+from typing import Optional
+import logging
+import os
+
+import grpc
+
+from src.server.rpc import scan_vault_pb2_grpc
+from src.server.rpc.service import ScanVaultServicer
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class GrpcServer:
+    """
+    The gRPC scan API, served next to HTTP by each worker.
+
+    Disabled unless a port is configured. Every gunicorn worker binds the
+    same port with SO_REUSEPORT and the kernel spreads connections across
+    them, as it does for the HTTP socket. Keepalive pings let long-lived
+    client channels notice a dead worker instead of hanging.
+    """
+
+    def __init__(
+        self,
+        port: Optional[int] = None,
+        host: str = "0.0.0.0",
+        max_message_bytes: int = 8 * MB,
+        keepalive_seconds: int = 30,
+    ):
+        self.port = port
+        self.host = host
+        self.max_message_bytes = max_message_bytes
+        self.keepalive_seconds = keepalive_seconds
+        self.bound_port: Optional[int] = None
+        self._server: Optional[grpc.aio.Server] = None
+
+    @classmethod
+    def from_env(cls) -> "GrpcServer":
+        port = os.getenv("SCAN_VAULT_GRPC_PORT")
+        return cls(
+            port=int(port) if port else None,
+            host=os.getenv("SCAN_VAULT_GRPC_HOST", "0.0.0.0"),
+            max_message_bytes=int(os.getenv("SCAN_VAULT_GRPC_MAX_MESSAGE_MB", "8")) * MB,
+            keepalive_seconds=int(os.getenv("SCAN_VAULT_GRPC_KEEPALIVE_SECONDS", "30")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.port is not None
+
+    async def start(self, scan_service) -> Optional[int]:
+        """Start serving in this worker's event loop; returns the bound port, or None when disabled."""
+        if not self.enabled or self._server is not None:
+            return self.bound_port
+        self._server = grpc.aio.server(options=[
+            ("grpc.so_reuseport", 1),
+            ("grpc.max_receive_message_length", self.max_message_bytes),
+            ("grpc.max_send_message_length", self.max_message_bytes),
+            ("grpc.keepalive_time_ms", self.keepalive_seconds * 1000),
+            ("grpc.keepalive_timeout_ms", 10000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+        ])
+        scan_vault_pb2_grpc.add_ScanVaultServicer_to_server(ScanVaultServicer(scan_service), self._server)
+        self.bound_port = self._server.add_insecure_port(f"{self.host}:{self.port}")
+        await self._server.start()
+        logger.info("Serving gRPC on %s:%s", self.host, self.bound_port)
+        return self.bound_port
+
+    async def stop(self, grace: float = 5.0) -> None:
+        """Stop accepting calls and give those in flight ``grace`` seconds to finish."""
+        if self._server is None:
+            return
+        await self._server.stop(grace)
+        self._server = None
+        self.bound_port = None
+
+
+# Started per worker, after fork, since grpc.aio servers are bound to an event loop
+grpc_server = GrpcServer.from_env()
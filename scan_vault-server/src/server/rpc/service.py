@@ -0,0 +1,291 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+import asyncio
+import logging
+import os
+
+import grpc
+
+from src.server.models.finding import Finding
+from src.server.models.scan_policy import ScanPolicy
+from src.server.rpc import scan_vault_pb2 as pb
+from src.server.rpc import scan_vault_pb2_grpc
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.detection_writer import schedule_persist
+from src.server.services.fair_scheduler import scan_scheduler
+from src.server.services.file_handler import FileTooLargeError, UnsupportedFileTypeError
+from src.utils import auth
+from src.utils.tenants import QuotaExceededError, Tenant, current_tenant
+
+logger = logging.getLogger(__name__)
+
+# Files a ScanBatch stream may have open (started but not finished) at once
+MAX_OPEN_FILES = int(os.getenv("SCAN_VAULT_GRPC_MAX_OPEN_FILES", "16"))
+# Chunks buffered per open file; past this the stream is not read until the file catches up
+FILE_BUFFER_CHUNKS = 4
+
+
+class _ProtocolError(Exception):
+    """A ScanBatch stream that cannot continue."""
+
+    def __init__(self, code: grpc.StatusCode, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class _InvalidFileError(ValueError):
+    """A file whose name the scan service rejected before reading it."""
+
+
+def status_for(error: Exception) -> grpc.StatusCode:
+    """Status code for a scan error, the counterpart of the HTTP status /scan returns."""
+    if isinstance(error, FileTooLargeError):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED
+    if isinstance(error, OverloadedError):
+        return grpc.StatusCode.UNAVAILABLE
+    # Analysis failures are ValueErrors too, but are not the client's fault
+    if isinstance(error, (UnsupportedFileTypeError, _InvalidFileError)):
+        return grpc.StatusCode.INVALID_ARGUMENT
+    return grpc.StatusCode.INTERNAL
+
+
+def build_policy(options: pb.ScanOptions) -> Optional[ScanPolicy]:
+    """The early-stop policy described by scan options, if any."""
+    if not (options.stop_on_category or options.stop_on_type):
+        return None
+    return ScanPolicy(
+        categories=list(options.stop_on_category),
+        types=list(options.stop_on_type),
+        min_confidence=options.min_confidence or None,
+        stop_after=max(options.stop_after, 1),
+    )
+
+
+def finding_message(finding: Finding) -> pb.Finding:
+    return pb.Finding(
+        type=finding.type or "",
+        value="" if finding.value is None else str(finding.value),
+        confidence="" if finding.confidence is None else str(finding.confidence),
+        context=finding.context or "",
+        category="" if finding.category is None else str(finding.category),
+        locations=[
+            pb.Location(page=location.page, start=location.start, end=location.end, bbox=location.bbox or [])
+            for location in finding.locations or []
+        ],
+    )
+
+
+def result_message(results: Dict, file_id: str = "", include_findings: bool = True) -> pb.ScanResult:
+    """A scan result as a message; summaries of streamed findings leave them out."""
+    message = pb.ScanResult(file_id=file_id, file_name=results.get("file_name") or "")
+    if include_findings:
+        message.findings.extend(finding_message(finding) for finding in results["sensitive_fields"])
+    if "policy" in results:
+        message.policy.CopyFrom(pb.PolicyVerdict(**results["policy"]))
+    if results.get("detection_id"):
+        message.detection_id = results["detection_id"]
+    return message
+
+
+def error_message(file_id: str, filename: str, error: Exception) -> pb.ScanResult:
+    return pb.ScanResult(
+        file_id=file_id,
+        file_name=filename,
+        error=pb.Error(code=status_for(error).value[0], message=str(error)),
+    )
+
+
+class ChunkReader:
+    """
+    A file arriving as chunk messages, read like an upload.
+
+    ``ScanService.spool_file`` only needs a ``filename`` and an async
+    ``read``, so chunk bytes go straight to the spool file with no multipart
+    parsing in between. ``next_chunk`` returns the next chunk's bytes and
+    None once the file has ended.
+    """
+
+    def __init__(self, filename: str, next_chunk: Callable[[], Awaitable[Optional[bytes]]]):
+        self.filename = filename
+        self._next_chunk = next_chunk
+        self._done = False
+
+    @classmethod
+    def from_stream(cls, first: pb.FileChunk, chunks: AsyncIterator[pb.FileChunk]) -> "ChunkReader":
+        """A reader over a request stream carrying one file, whose first chunk has been read."""
+        pending = [first.data]
+
+        async def next_chunk() -> Optional[bytes]:
+            if pending:
+                return pending.pop()
+            try:
+                return (await chunks.__anext__()).data
+            except StopAsyncIteration:
+                return None
+
+        return cls(first.filename, next_chunk)
+
+    async def read(self, size: int = -1) -> bytes:
+        """Up to the end of the chunk that brings the bytes read to ``size``; b"" at the end."""
+        parts = []
+        received = 0
+        while not self._done and (received < size if size >= 0 else not parts):
+            data = await self._next_chunk()
+            if data is None:
+                self._done = True
+            elif data:
+                parts.append(data)
+                received += len(data)
+        return b"".join(parts)
+
+    async def drain(self) -> None:
+        """Discard the rest of the file, so a failed file does not hold up the stream."""
+        while not self._done:
+            await self.read()
+
+
+class ScanVaultServicer(scan_vault_pb2_grpc.ScanVaultServicer):
+    """
+    The scan API over gRPC, for internal services sending many files.
+
+    Files arrive as raw bytes in chunk messages and are spooled to disk as
+    they arrive, then scanned in the same fair-scheduler slots as ``/scan``.
+    Spooling happens before a slot is taken, so a slow sender never holds one.
+    """
+
+    def __init__(self, scan_service):
+        self.scan_service = scan_service
+
+    async def _authenticate(self, context: grpc.aio.ServicerContext) -> Optional[Tenant]:
+        metadata = dict(context.invocation_metadata() or ())
+        api_key = metadata.get(auth.API_KEY_NAME)
+        if not auth.verify_key(api_key):
+            logger.error("Invalid API Key: Unauthorized gRPC call")
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid API Key")
+
+        tenant = auth.tenant_store.get(api_key)
+        if tenant is not None:
+            try:
+                # One request per call, however many files a batch carries
+                auth.tenant_store.check_request(tenant)
+            except QuotaExceededError as e:
+                logger.warning("Tenant %s throttled: %s", tenant.name, e)
+                await context.abort(
+                    grpc.StatusCode.RESOURCE_EXHAUSTED, str(e), (("retry-after", str(e.retry_after)),)
+                )
+        current_tenant.set(tenant)
+        return tenant
+
+    async def _first_chunk(self, request_iterator, context: grpc.aio.ServicerContext) -> pb.FileChunk:
+        try:
+            first = await request_iterator.__anext__()
+        except StopAsyncIteration:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "No file sent")
+        if not first.filename:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "The first chunk must carry the filename")
+        return first
+
+    async def _scan(self, reader: ChunkReader, options: pb.ScanOptions, tenant: Optional[Tenant]) -> Dict:
+        """Spool and scan one file, and start saving it as a detection if asked to."""
+        policy = build_policy(options)
+        try:
+            upload = await self.scan_service.spool_file(reader)
+        except (FileTooLargeError, UnsupportedFileTypeError):
+            raise
+        except ValueError as e:
+            raise _InvalidFileError(str(e)) from e
+        with upload:
+            async with scan_scheduler.slot_for(tenant):
+                results = await self.scan_service.scan_upload(upload, policy)
+        if options.persist:
+            results = {**results, "detection_id": schedule_persist(results)}
+        return results
+
+    async def _scan_or_abort(self, request_iterator, context: grpc.aio.ServicerContext) -> Dict:
+        tenant = await self._authenticate(context)
+        first = await self._first_chunk(request_iterator, context)
+        try:
+            return await self._scan(ChunkReader.from_stream(first, request_iterator), first.options, tenant)
+        except OverloadedError as e:
+            await context.abort(status_for(e), str(e), (("retry-after", str(e.retry_after)),))
+        except Exception as e:
+            logger.error("gRPC scan of %s failed: %s", first.filename, e)
+            await context.abort(status_for(e), str(e))
+
+    async def Scan(self, request_iterator, context):
+        return result_message(await self._scan_or_abort(request_iterator, context))
+
+    async def ScanStream(self, request_iterator, context):
+        results = await self._scan_or_abort(request_iterator, context)
+        for finding in results["sensitive_fields"]:
+            yield pb.ScanEvent(finding=finding_message(finding))
+        yield pb.ScanEvent(summary=result_message(results, include_findings=False))
+
+    async def ScanBatch(self, request_iterator, context):
+        tenant = await self._authenticate(context)
+        # Results of finished files, then the outcome of reading the stream
+        finished: asyncio.Queue = asyncio.Queue()
+        scans: Set[asyncio.Task] = set()
+        started = 0
+
+        async def scan_one(file_id: str, first: pb.FileChunk, chunks: asyncio.Queue) -> None:
+            reader = ChunkReader(first.filename, chunks.get)
+            try:
+                message = result_message(await self._scan(reader, first.options, tenant), file_id)
+            except Exception as e:
+                logger.warning("gRPC batch scan of %s failed: %s", first.filename, e)
+                message = error_message(file_id, first.filename, e)
+                await reader.drain()
+            await finished.put(message)
+
+        async def read_stream() -> None:
+            nonlocal started
+            open_files: Dict[str, asyncio.Queue] = {}
+            try:
+                async for chunk in request_iterator:
+                    chunks = open_files.get(chunk.file_id)
+                    if chunks is None:
+                        if not chunk.filename:
+                            raise _ProtocolError(
+                                grpc.StatusCode.INVALID_ARGUMENT,
+                                f"The first chunk of file {chunk.file_id!r} must carry the filename",
+                            )
+                        if len(open_files) >= MAX_OPEN_FILES:
+                            raise _ProtocolError(
+                                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                f"At most {MAX_OPEN_FILES} files may be open at once",
+                            )
+                        chunks = open_files[chunk.file_id] = asyncio.Queue(FILE_BUFFER_CHUNKS)
+                        task = asyncio.ensure_future(scan_one(chunk.file_id, chunk, chunks))
+                        scans.add(task)
+                        task.add_done_callback(scans.discard)
+                        started += 1
+                    if chunk.data:
+                        # Waits while the file's buffer is full, which stops the stream being read
+                        await chunks.put(chunk.data)
+                    if chunk.last:
+                        await open_files.pop(chunk.file_id).put(None)
+                for chunks in open_files.values():
+                    await chunks.put(None)
+                await finished.put(None)
+            except Exception as e:
+                await finished.put(e)
+
+        reading = asyncio.ensure_future(read_stream())
+        sent = 0
+        done_reading = False
+        try:
+            while not (done_reading and sent == started):
+                item = await finished.get()
+                if isinstance(item, pb.ScanResult):
+                    sent += 1
+                    yield item
+                elif isinstance(item, _ProtocolError):
+                    await context.abort(item.code, str(item))
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    done_reading = True
+        finally:
+            # The client went away or the stream failed: stop whatever is left
+            for task in (reading, *scans):
+                task.cancel()
@@ -0,0 +1,191 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple, Type
+import asyncio
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(RuntimeError):
+    """Raised when a request would wait longer than the queue SLO for a model slot."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """
+    Adaptive cap on concurrent model calls.
+
+    The limit follows a gradient of latency: when recent calls are slower
+    than the long-run average the limit shrinks in proportion, otherwise it
+    grows by about the square root of the limit. Throttling or failed calls
+    halve it (the multiplicative decrease of AIMD). Callers over the limit
+    wait in FIFO order; a caller whose estimated or actual wait passes
+    ``queue_timeout`` is shed with OverloadedError instead of queueing
+    behind work it cannot outlast.
+    """
+
+    BACKOFF_RATIO = 0.5  # Applied to the limit when a call is throttled or fails
+    SMOOTHING = 0.2  # Weight of each new limit estimate
+    SHORT_WINDOW = 0.2  # EWMA weight for recent latency
+    LONG_WINDOW = 0.02  # EWMA weight for the latency baseline
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        queue_timeout: float = 10.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_timeout = queue_timeout
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self.shed_total = 0
+        self.dropped_total = 0
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveLimiter":
+        return cls(
+            initial_limit=int(os.getenv("SCAN_VAULT_MODEL_CONCURRENCY", "8")),
+            min_limit=int(os.getenv("SCAN_VAULT_MODEL_CONCURRENCY_MIN", "1")),
+            max_limit=int(os.getenv("SCAN_VAULT_MODEL_CONCURRENCY_MAX", "64")),
+            queue_timeout=float(os.getenv("SCAN_VAULT_QUEUE_SLO_SECONDS", "10")),
+        )
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self.min_limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """Seconds a new caller would likely wait for a slot."""
+        if self._in_flight < self.limit or self._short_latency is None:
+            return 0.0
+        return (len(self._waiters) + 1) * self._short_latency / self.limit
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.estimated_wait() or self.queue_timeout))
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+
+        Raises:
+            OverloadedError: If the wait would pass or has passed the queue SLO
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        if self.estimated_wait() > self.queue_timeout:
+            self._shed()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up: hand the slot on
+                self._in_flight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed()
+            raise
+
+    def release(self, latency: Optional[float] = None, dropped: bool = False) -> None:
+        """
+        Free a slot and adjust the limit from the call's outcome.
+
+        Args:
+            latency (float, optional): Call duration; omit when the call was cancelled
+            dropped (bool): The call was throttled or failed upstream
+        """
+        utilized = self._in_flight >= self.limit / 2
+        self._in_flight -= 1
+        if dropped:
+            self.dropped_total += 1
+            self._limit = max(self.min_limit, self._limit * self.BACKOFF_RATIO)
+        elif latency is not None:
+            self._observe(latency, utilized)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, drop_on: Tuple[Type[BaseException], ...] = (Exception,)):
+        """Hold a slot for the duration of a call; exceptions in ``drop_on`` count as drops."""
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except drop_on:
+            self.release(time.monotonic() - start, dropped=True)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.release(time.monotonic() - start)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "latency_seconds": self._short_latency or 0.0,
+            "baseline_latency_seconds": self._long_latency or 0.0,
+            "shed_total": self.shed_total,
+            "dropped_total": self.dropped_total,
+        }
+
+    def _observe(self, latency: float, utilized: bool) -> None:
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+            return
+        self._short_latency += self.SHORT_WINDOW * (latency - self._short_latency)
+        self._long_latency += self.LONG_WINDOW * (latency - self._long_latency)
+
+        gradient = max(0.5, min(1.0, self._long_latency / self._short_latency))
+        if gradient >= 1.0 and not utilized:
+            # Latency is fine but callers are not using the slots we have
+            return
+        estimate = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = (1 - self.SMOOTHING) * self._limit + self.SMOOTHING * estimate
+        self._limit = min(max(self._limit, self.min_limit), self.max_limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _shed(self) -> None:
+        self.shed_total += 1
+        retry_after = self.retry_after()
+        logger.warning("Shedding model call: limit %s, queue depth %s", self.limit, len(self._waiters))
+        raise OverloadedError("Model capacity is saturated, retry later", retry_after)
+
+
+# Shared by every LLMHandler in the worker process
+model_call_limiter = AdaptiveLimiter.from_env()
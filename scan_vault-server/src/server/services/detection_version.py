@@ -0,0 +1,88 @@
+from typing import Optional, Tuple
+import logging
+import threading
+
+from src.server.utils.etags import weak_etag
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionVersion:
+    """
+    This worker's view of the detections collection version.
+
+    While a Firestore listener is running it pushes the version whenever
+    any worker writes, so a conditional GET is answered without a storage
+    read; without one the version document is read per request, which is
+    still far cheaper than the collection. A write made by this worker
+    clears the version until the listener reports the new one, so a client
+    never gets a 304 for data it has just changed. The rendered list is
+    kept for the latest version, so other clients loading that version
+    skip the collection read too.
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._body: Optional[Tuple[int, bytes]] = None
+        self._watch = None
+        # Bumped by every local write; a storage read that raced one is not kept
+        self._generation = 0
+        # The listener calls in from a Firestore thread
+        self._lock = threading.Lock()
+
+    @property
+    def watching(self) -> bool:
+        return self._watch is not None
+
+    def set(self, version: int) -> None:
+        with self._lock:
+            self._version = version
+            if self._body is not None and self._body[0] != version:
+                self._body = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version = None
+            self._body = None
+            self._generation += 1
+
+    def etag(self, version: int) -> str:
+        return weak_etag(f"detections-{version}")
+
+    async def current(self, firebase) -> int:
+        """The collection version, read from storage unless the listener has reported it."""
+        version = self._version
+        if version is not None and self.watching:
+            return version
+        generation = self._generation
+        version = await firebase.get_detections_version()
+        with self._lock:
+            if self.watching and self._version is None and self._generation == generation:
+                self._version = version
+        return version
+
+    def cached_body(self, version: int) -> Optional[bytes]:
+        body = self._body
+        return body[1] if body is not None and body[0] == version else None
+
+    def cache_body(self, version: int, body: bytes) -> None:
+        with self._lock:
+            self._body = (version, body)
+
+    def watch(self, firebase_factory) -> None:
+        """Follow version changes through a Firestore listener; best effort."""
+        if self._watch is not None:
+            return
+        try:
+            self._watch = firebase_factory().watch_detections_version(self.set)
+        except Exception as e:
+            logger.warning("Could not watch the detections version; reading it per request: %s", e)
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        self.invalidate()
+
+
+detection_version = DetectionVersion()
@@ -0,0 +1,91 @@
+from typing import Any, Dict, Optional, Set
+import asyncio
+import logging
+import os
+
+from fastapi import BackgroundTasks
+
+from src.services.firebase_service import FirebaseService
+
+logger = logging.getLogger(__name__)
+
+# Saves of a detection whose ID was already returned to the client
+SAVE_ATTEMPTS = int(os.getenv("SCAN_VAULT_PERSIST_ATTEMPTS", "3"))
+SAVE_BACKOFF_SECONDS = float(os.getenv("SCAN_VAULT_PERSIST_BACKOFF_SECONDS", "0.5"))
+
+# Saves started without a response to run after; referenced so the tasks are not collected early
+_saving: Set[asyncio.Task] = set()
+
+
+class DetectionSaveError(Exception):
+    """Raised when a detection could not be saved under its reserved ID"""
+
+
+async def save_reserved_detection(
+    detection: Dict[str, Any],
+    detection_id: str,
+    attempts: int = SAVE_ATTEMPTS,
+    backoff: float = SAVE_BACKOFF_SECONDS,
+) -> str:
+    """
+    Save a detection whose ID the client already holds, retrying failures
+
+    The detection is written with create, so a retry after a commit that
+    succeeded but reported an error does not count it twice.
+
+    Args:
+        detection (Dict[str, Any]): Detection document from build_detection
+        detection_id (str): ID reserved with new_detection_id
+        attempts (int): Saves to try before giving up
+        backoff (float): Delay before the first retry, doubled after each one
+
+    Returns:
+        str: The detection ID
+
+    Raises:
+        DetectionSaveError: If every attempt failed
+    """
+    firebase_service = FirebaseService()
+    for attempt in range(1, attempts + 1):
+        # save_detection stamps the document it is given
+        if await firebase_service.save_detection(dict(detection), detection_id) is not None:
+            return detection_id
+        if attempt < attempts:
+            logger.warning("Saving detection %s failed (attempt %s of %s), retrying", detection_id, attempt, attempts)
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+
+    logger.error(
+        "Detection %s for %s was not saved after %s attempts; its ID was already returned to the client",
+        detection_id, detection.get('fileName'), attempts,
+    )
+    raise DetectionSaveError(f"Detection {detection_id} was not saved")
+
+
+def schedule_persist(results: Dict, background_tasks: Optional[BackgroundTasks] = None) -> str:
+    """
+    Reserve a detection ID for scan results and save them in the background.
+
+    With ``background_tasks`` the save runs once the response is sent;
+    without, as a task started now, for callers such as gRPC that have no
+    response to wait for. A save that still fails after its retries is
+    logged with the ID the client was given.
+
+    Returns:
+        str: The reserved detection ID
+    """
+    detection_id = FirebaseService().new_detection_id()
+    detection = FirebaseService.build_detection(results["file_name"], results["sensitive_fields"])
+    if background_tasks is not None:
+        background_tasks.add_task(save_reserved_detection, detection, detection_id)
+    else:
+        task = asyncio.ensure_future(save_reserved_detection(detection, detection_id))
+        _saving.add(task)
+        task.add_done_callback(_saved)
+    return detection_id
+
+
+def _saved(task: asyncio.Task) -> None:
+    _saving.discard(task)
+    # save_reserved_detection logged the failure already
+    if not task.cancelled():
+        task.exception()
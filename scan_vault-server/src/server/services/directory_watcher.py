@@ -0,0 +1,620 @@
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import heapq
+import logging
+import os
+import stat as stat_module
+import struct
+import sys
+import time
+
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.detection_writer import save_reserved_detection
+from src.server.services.fair_scheduler import scan_scheduler
+from src.server.services.file_handler import FileTooLargeError, UnsupportedFileTypeError
+from src.server.services.file_index import FileIndex
+from src.services.firebase_service import DetectionArchivedError, FirebaseService
+
+logger = logging.getLogger(__name__)
+
+# Receives the path of every file created, changed or removed
+Emit = Callable[[str], None]
+
+# Longest wait before retrying a file whose scan or save failed
+MAX_RETRY_BACKOFF = 3600.0
+
+
+def stat_is_file(stat: os.stat_result) -> bool:
+    return stat_module.S_ISREG(stat.st_mode)
+
+
+def list_directory(directory: str, with_stat: bool = False) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """
+    Files and subdirectories of a directory, without following symlinks.
+
+    Files come as (path, mtime_ns, size) when ``with_stat`` is set and with
+    zeros otherwise, so a walk that only needs names costs no stat calls.
+    """
+    files, directories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if with_stat:
+                            stat = entry.stat(follow_symlinks=False)
+                            files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+                        else:
+                            files.append((entry.path, 0, 0))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning("Cannot list %s: %s", directory, e)
+    return files, directories
+
+
+async def walk(root: str, with_stat: bool = False) -> AsyncIterator[Tuple[str, int, int]]:
+    """Files under a root, listed one directory at a time off the event loop."""
+    pending = [root]
+    while pending:
+        files, directories = await asyncio.to_thread(list_directory, pending.pop(), with_stat)
+        pending.extend(directories)
+        for file in files:
+            yield file
+
+
+class EventCoalescer:
+    """
+    Debounces file events and merges those for the same path.
+
+    A path is released ``debounce`` seconds after its last event, so a file
+    written in bursts is scanned once, when it settles. One that never
+    settles, like a growing log, is released ``max_wait`` seconds after its
+    first event. Pending paths are held in a dict, so a flood of events
+    takes memory per distinct path rather than per event.
+    """
+
+    def __init__(self, debounce: float = 2.0, max_wait: float = 30.0):
+        self.debounce = debounce
+        self.max_wait = max_wait
+        # path -> (release time, first event time)
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        # (release time, path); entries superseded by a later event are skipped when popped
+        self._deadlines: List[Tuple[float, str]] = []
+        self._wake = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, path: str) -> None:
+        now = time.monotonic()
+        pending = self._pending.get(path)
+        first = pending[1] if pending else now
+        release = min(now + self.debounce, first + self.max_wait)
+        self._pending[path] = (release, first)
+        heapq.heappush(self._deadlines, (release, path))
+        self._wake.set()
+
+    async def ready(self) -> List[str]:
+        """Wait for paths whose events have settled, and return them."""
+        while True:
+            now = time.monotonic()
+            released = []
+            while self._deadlines and self._deadlines[0][0] <= now:
+                release, path = heapq.heappop(self._deadlines)
+                pending = self._pending.get(path)
+                if pending is not None and pending[0] == release:
+                    del self._pending[path]
+                    released.append(path)
+            if released:
+                return released
+
+            self._wake.clear()
+            timeout = self._deadlines[0][0] - now if self._deadlines else None
+            try:
+                # Idle watchers sleep here until the next event
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class PollingSource:
+    """
+    Finds changes by listing the watched trees every ``interval`` seconds.
+
+    The fallback for filesystems without inotify, such as network shares.
+    Only listings and stat calls are made; nothing is read.
+    """
+
+    def __init__(self, roots: List[str], emit: Emit, interval: float = 30.0):
+        self.roots = roots
+        self.emit = emit
+        self.interval = interval
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        seen = {}
+        for root in self.roots:
+            async for path, mtime_ns, size in walk(root, with_stat=True):
+                seen[path] = (mtime_ns, size)
+        return seen
+
+    async def poll(self) -> None:
+        """Compare the trees with the previous listing and report what changed."""
+        seen = await self._snapshot()
+        for path, state in seen.items():
+            if self._seen.get(path) != state:
+                self.emit(path)
+        for path in self._seen.keys() - seen.keys():
+            self.emit(path)
+        self._seen = seen
+
+    async def start(self) -> None:
+        # The first listing is the baseline; the catch-up walk covers what was there already
+        self._seen = await self._snapshot()
+
+        async def run():
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.poll()
+                except Exception as e:
+                    logger.warning("Polling watched directories failed: %s", e)
+
+        self._task = asyncio.ensure_future(run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class InotifySource:
+    """
+    Reports file events from Linux inotify, with one watch per directory.
+
+    The inotify descriptor is registered with the event loop, so nothing
+    runs until the kernel has events. Files are reported once written and
+    closed or moved in, so a copy in progress is not picked up half way.
+    ``rescan`` is called when the kernel queue overflows and events were lost.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: List[str], emit: Emit, rescan: Callable[[], None]):
+        self.roots = roots
+        self.emit = emit
+        self.rescan = rescan
+        self._fd: Optional[int] = None
+        self._libc = None
+        self._directories: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+        # Walks of directories created or moved in, running on worker threads
+        self._walks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux") and bool(ctypes.util.find_library("c"))
+
+    def _add_watch(self, directory: str) -> None:
+        fd = self._fd
+        if fd is None:
+            return
+        wd = self._libc.inotify_add_watch(fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                logger.error("Out of inotify watches at %s; raise fs.inotify.max_user_watches", directory)
+            else:
+                logger.warning("Cannot watch %s: %s", directory, os.strerror(error))
+            return
+        self._directories[wd] = directory
+        self._watches[directory] = wd
+
+    def _add_tree(self, root: str, report_files: bool = False) -> List[str]:
+        """Watch a tree; runs on a worker thread and returns its files when ``report_files`` is set."""
+        found = []
+        pending = [root]
+        while pending and self._fd is not None:
+            directory = pending.pop()
+            self._add_watch(directory)
+            files, directories = list_directory(directory)
+            pending.extend(directories)
+            if report_files:
+                # Written before the watch existed, so no event will come for them
+                found.extend(path for path, _, _ in files)
+        return found
+
+    async def _add_new_tree(self, root: str) -> None:
+        try:
+            files = await asyncio.to_thread(self._add_tree, root, True)
+        except Exception as e:
+            logger.warning("Cannot watch %s: %s", root, e)
+            return
+        if self._fd is not None:
+            for path in files:
+                self.emit(path)
+
+    def _remove_tree(self, root: str) -> None:
+        prefix = root + os.sep
+        # Copied first: a walk on a worker thread may be adding watches
+        for directory in [d for d in list(self._watches) if d == root or d.startswith(prefix)]:
+            wd = self._watches.pop(directory)
+            self._directories.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    async def start(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        for root in self.roots:
+            await asyncio.to_thread(self._add_tree, root)
+        asyncio.get_running_loop().add_reader(self._fd, self._read)
+        logger.info("Watching %s directories with inotify", len(self._watches))
+
+    def stop(self) -> None:
+        if self._fd is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._fd)
+        for walk in self._walks:
+            walk.cancel()
+        self._walks.clear()
+        os.close(self._fd)
+        self._fd = None
+        self._directories.clear()
+        self._watches.clear()
+
+    def _read(self) -> None:
+        while self._fd is not None:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = self._EVENT.unpack_from(buffer, offset)
+                start = offset + self._EVENT.size
+                name = os.fsdecode(buffer[start:start + length].rstrip(b"\0"))
+                offset = start + length
+                self._handle(wd, mask, name)
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & self.IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed; rescanning watched directories")
+            self.rescan()
+            return
+        directory = self._directories.get(wd)
+        if mask & self.IN_IGNORED:
+            # The watch is gone, e.g. its directory was deleted
+            if directory is not None:
+                self._directories.pop(wd, None)
+                self._watches.pop(directory, None)
+            return
+        if directory is None or not name:
+            return
+
+        path = os.path.join(directory, name)
+        if mask & self.IN_ISDIR:
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # A tree moved in can be large; walk it off the event loop
+                walk = asyncio.ensure_future(self._add_new_tree(path))
+                self._walks.add(walk)
+                walk.add_done_callback(self._walks.discard)
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                self._remove_tree(path)
+                self.emit(path)
+        elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_DELETE | self.IN_MOVED_FROM):
+            self.emit(path)
+
+
+class LocalFile:
+    """A file on disk read like an upload, hashed as it is read."""
+
+    def __init__(self, path: str):
+        self.filename = path
+        self._file = open(path, "rb")
+        self._hash = hashlib.sha256()
+        self.complete = False
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Hash of the content, once all of it has been read."""
+        return self._hash.hexdigest() if self.complete else None
+
+    async def read(self, size: int = -1) -> bytes:
+        data = await asyncio.to_thread(self._file.read, size)
+        if data:
+            self._hash.update(data)
+        else:
+            self.complete = True
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class DirectoryWatcher:
+    """
+    Scans new and modified files under watched directories as they change.
+
+    Events from inotify, or from polling where inotify is unavailable, are
+    coalesced per path and passed through a bounded queue to ``concurrency``
+    scan workers. When scanning falls behind, the queue fills and events
+    keep merging in the coalescer instead of piling up. Workers skip files
+    whose mtime, size or content hash match the index, so only changed files
+    are read and scanned. At startup, and after inotify loses events, the
+    trees are walked once to catch up.
+
+    A file is indexed only once its detection is saved. One whose scan or
+    save fails is retried after ``retry_backoff`` seconds, doubling on
+    each failure. A file is rescanned at most once per
+    ``min_rescan_interval`` seconds, and its new detection replaces the
+    previous one, so a file that never settles does not pile up detections.
+    """
+
+    def __init__(
+        self,
+        roots: List[str],
+        scan_service,
+        index: FileIndex,
+        debounce: float = 2.0,
+        max_wait: float = 30.0,
+        concurrency: int = 4,
+        queue_size: int = 64,
+        poll_interval: float = 30.0,
+        use_inotify: bool = True,
+        persist: bool = True,
+        retry_backoff: float = 30.0,
+        min_rescan_interval: float = 300.0,
+    ):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.scan_service = scan_service
+        self.index = index
+        self.coalescer = EventCoalescer(debounce, max_wait)
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.persist = persist
+        self.retry_backoff = retry_backoff
+        self.min_rescan_interval = min_rescan_interval
+        self.stats = {"scanned": 0, "unchanged": 0, "deferred": 0, "failed": 0, "removed": 0}
+        self.source = None
+        self._queue: Optional[asyncio.Queue] = None
+        # Paths a worker is on; another event for one waits in the coalescer
+        self._in_progress: Set[str] = set()
+        self._catch_up: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        # Consecutive failures by path, for the retry backoff
+        self._failures: Dict[str, int] = {}
+        # Paths waiting out a retry backoff or the rescan interval
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    @classmethod
+    def from_env(cls, scan_service, roots: Optional[List[str]] = None) -> "DirectoryWatcher":
+        paths = os.getenv("SCAN_VAULT_WATCH_PATHS", "")
+        return cls(
+            roots=roots or [path for path in paths.split(os.pathsep) if path],
+            scan_service=scan_service,
+            index=FileIndex.from_env(),
+            debounce=float(os.getenv("SCAN_VAULT_WATCH_DEBOUNCE_SECONDS", "2")),
+            max_wait=float(os.getenv("SCAN_VAULT_WATCH_MAX_WAIT_SECONDS", "30")),
+            concurrency=int(os.getenv("SCAN_VAULT_WATCH_CONCURRENCY", "4")),
+            queue_size=int(os.getenv("SCAN_VAULT_WATCH_QUEUE_SIZE", "64")),
+            poll_interval=float(os.getenv("SCAN_VAULT_WATCH_POLL_SECONDS", "30")),
+            use_inotify=os.getenv("SCAN_VAULT_WATCH_POLL", "").lower() not in ("1", "true", "yes"),
+            persist=os.getenv("SCAN_VAULT_WATCH_PERSIST", "true").lower() in ("1", "true", "yes"),
+            retry_backoff=float(os.getenv("SCAN_VAULT_WATCH_RETRY_SECONDS", "30")),
+            min_rescan_interval=float(os.getenv("SCAN_VAULT_WATCH_MIN_RESCAN_SECONDS", "300")),
+        )
+
+    async def _start_source(self):
+        if self.use_inotify and InotifySource.available():
+            source = InotifySource(self.roots, self.coalescer.add, self.catch_up)
+            try:
+                await source.start()
+                return source
+            except OSError as e:
+                source.stop()
+                logger.warning("inotify unavailable (%s); polling every %ss", e, self.poll_interval)
+        source = PollingSource(self.roots, self.coalescer.add, self.poll_interval)
+        await source.start()
+        return source
+
+    async def run(self) -> None:
+        """Watch until ``stop`` is called."""
+        if not self.roots:
+            raise ValueError("No directories to watch; set SCAN_VAULT_WATCH_PATHS")
+        self._stopping = asyncio.Event()
+        self._queue = asyncio.Queue(self.queue_size)
+        # Watch first, so nothing changed during the catch-up walk is missed
+        self.source = await self._start_source()
+        tasks = [asyncio.ensure_future(self._dispatch())]
+        tasks += [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+        self.catch_up()
+        try:
+            await self._stopping.wait()
+        finally:
+            self.source.stop()
+            # Failed and deferred files are not indexed as scanned, so the next catch-up finds them
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            if self._catch_up is not None:
+                tasks.append(self._catch_up)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("Directory watcher stopped: %s", self.stats)
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def catch_up(self) -> None:
+        """Walk the watched trees and queue every file; unchanged ones are skipped by the index."""
+        if self._catch_up is not None and not self._catch_up.done():
+            return
+
+        async def run():
+            for root in self.roots:
+                async for path, _, _ in walk(root):
+                    await self._queue.put(path)
+            logger.info("Caught up with %s", ", ".join(self.roots))
+
+        self._catch_up = asyncio.ensure_future(run())
+
+    async def _dispatch(self) -> None:
+        while True:
+            for path in await self.coalescer.ready():
+                # Waits while the workers are behind
+                await self._queue.put(path)
+
+    async def _work(self) -> None:
+        while True:
+            path = await self._queue.get()
+            if path in self._in_progress:
+                # Look again once the current scan of the file is done
+                self.coalescer.add(path)
+                continue
+            self._in_progress.add(path)
+            try:
+                await self.process(path)
+                self._failures.pop(path, None)
+            except Exception as e:
+                self.stats["failed"] += 1
+                failures = self._failures[path] = self._failures.get(path, 0) + 1
+                delay = min(self.retry_backoff * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+                logger.error("Scanning %s failed: %s; retrying in %.0fs", path, e, delay)
+                self._later(path, delay)
+            finally:
+                self._in_progress.discard(path)
+
+    def _later(self, path: str, delay: float) -> None:
+        """Queue a path again after ``delay`` seconds, unless it is already waiting."""
+        if path in self._timers:
+            return
+
+        def release():
+            del self._timers[path]
+            self.coalescer.add(path)
+
+        self._timers[path] = asyncio.get_running_loop().call_later(delay, release)
+
+    def _supported(self, path: str) -> bool:
+        processor = self.scan_service.file_processor
+        try:
+            processor.get_file_type(processor.get_file_extension(path))
+            return True
+        except ValueError:
+            return False
+
+    async def process(self, path: str) -> Optional[str]:
+        """
+        Bring the index up to date for one path, scanning it if its content changed.
+
+        Returns:
+            Optional[str]: "scanned", "unchanged", "deferred", "removed" or "failed"; None for paths
+            not scanned at all
+
+        Raises:
+            DetectionSaveError: If the detection could not be saved; the file is left unindexed
+        """
+        try:
+            stat = os.stat(path, follow_symlinks=False)
+        except FileNotFoundError:
+            # A removed file, or a removed directory and everything under it
+            if self.index.forget(path):
+                self.stats["removed"] += 1
+                return "removed"
+            return None
+        if not stat_is_file(stat) or not self._supported(path):
+            return None
+
+        indexed = self.index.get(path)
+        if indexed is not None and (indexed.mtime_ns, indexed.size) == (stat.st_mtime_ns, stat.st_size):
+            self.stats["unchanged"] += 1
+            return "unchanged"
+        if indexed is not None:
+            wait = indexed.scanned_at + self.min_rescan_interval - time.time()
+            if wait > 0:
+                # Changed again soon after its last scan, like a growing log
+                self._later(path, wait)
+                self.stats["deferred"] += 1
+                return "deferred"
+
+        # Hashed while spooled, so a changed file is read once
+        file = LocalFile(path)
+        try:
+            try:
+                upload = await self.scan_service.spool_file(file)
+            except (FileTooLargeError, UnsupportedFileTypeError, ValueError) as e:
+                # Recorded, so the file is not retried until it changes again
+                self.index.record(path, stat.st_mtime_ns, stat.st_size, file.digest, error=str(e))
+                self.stats["failed"] += 1
+                logger.warning("Not scanning %s: %s", path, e)
+                return "failed"
+        finally:
+            file.close()
+
+        with upload:
+            if indexed is not None and indexed.error is None and indexed.digest == file.digest:
+                # Touched, not changed
+                self.index.record(path, stat.st_mtime_ns, stat.st_size, file.digest, indexed.detection_id)
+                self.stats["unchanged"] += 1
+                return "unchanged"
+            results = await self._scan(upload)
+
+        detection_id = await self._save(results) if self.persist else None
+        self.index.record(path, stat.st_mtime_ns, stat.st_size, file.digest, detection_id)
+        if self.persist and indexed is not None and indexed.detection_id:
+            await self._discard(indexed.detection_id)
+        self.stats["scanned"] += 1
+        logger.info("Scanned %s: %s findings", path, len(results["sensitive_fields"]))
+        return "scanned"
+
+    async def _scan(self, upload) -> dict:
+        while True:
+            try:
+                async with scan_scheduler.slot_for(None):
+                    return await self.scan_service.scan_upload(upload)
+            except OverloadedError as e:
+                # The model is saturated; hold this worker back rather than dropping the file
+                logger.info("Model overloaded; retrying %s in %ss", upload.filename, e.retry_after)
+                await asyncio.sleep(e.retry_after)
+
+    async def _save(self, results: dict) -> str:
+        return await save_reserved_detection(
+            FirebaseService.build_detection(results["file_name"], results["sensitive_fields"]),
+            FirebaseService().new_detection_id(),
+        )
+
+    async def _discard(self, detection_id: str) -> None:
+        """Delete the detection a rescan replaced; a failure leaves it behind, logged."""
+        try:
+            await FirebaseService().delete_detection(detection_id)
+        except DetectionArchivedError:
+            pass
+        except Exception as e:
+            logger.warning("Could not delete replaced detection %s: %s", detection_id, e)
@@ -0,0 +1,96 @@
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+import asyncio
+import heapq
+import itertools
+import os
+
+
+class FairScheduler:
+    """
+    Weighted-fair admission in front of the scan pipeline.
+
+    At most ``concurrency`` scans run at once. Waiting scans are admitted by
+    start-time fair queuing: each request is tagged with the later of the
+    scheduler's virtual time and its tenant's previous finish tag, and a
+    tenant's tags advance by ``1 / weight`` per request. A tenant submitting
+    a large batch therefore queues behind its own work while other tenants
+    keep getting slots in proportion to their weights.
+    """
+
+    def __init__(self, concurrency: int = 16):
+        self.concurrency = max(concurrency, 1)
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._queue: List[Tuple[float, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "FairScheduler":
+        return cls(concurrency=int(os.getenv("SCAN_VAULT_SCAN_CONCURRENCY", "16")))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queued(self) -> Dict[str, int]:
+        """Waiting requests per tenant."""
+        counts: Dict[str, int] = {}
+        for _, _, tenant_id, waiter in self._queue:
+            if not waiter.done():
+                counts[tenant_id] = counts.get(tenant_id, 0) + 1
+        return counts
+
+    async def acquire(self, tenant_id: str, weight: float = 1.0) -> None:
+        start = max(self._virtual_time, self._finish_tags.get(tenant_id, 0.0))
+        self._finish_tags[tenant_id] = start + 1 / max(weight, 0.01)
+
+        if self._in_flight < self.concurrency and not self._queue:
+            self._in_flight += 1
+            self._virtual_time = start
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (start, next(self._sequence), tenant_id, waiter))
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                # Left in the heap; skipped when it reaches the front
+                waiter.cancel()
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        while self._queue and self._in_flight < self.concurrency:
+            start, _, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            self._virtual_time = start
+            waiter.set_result(None)
+        if not self._queue and not self._in_flight:
+            # Idle: forget old tags so they cannot grow without bound
+            self._virtual_time = 0.0
+            self._finish_tags.clear()
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str, weight: float = 1.0):
+        await self.acquire(tenant_id, weight)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def slot_for(self, tenant):
+        """Slot for an authenticated tenant, or the default share when there is none."""
+        if tenant is None:
+            return self.slot("default")
+        return self.slot(tenant.id, tenant.weight)
+
+
+# Shared by the scan and redaction routes in the worker process
+scan_scheduler = FairScheduler.from_env()
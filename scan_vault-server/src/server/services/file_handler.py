@@ -1,14 +1,89 @@
+import mmap
 import os
+import shutil
+import tempfile
 from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Uploads are copied in fixed-size chunks so memory use does not grow with file size
+CHUNK_SIZE = 1024 * 1024
+
+MB = 1024 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit for its type."""
+
+
+class UnsupportedFileTypeError(ValueError):
+    """Raised when an upload's content does not match a supported type."""
+
+
+class SpooledUpload:
+    """An upload spooled to a temporary file, exposed to extractors as a memory-mapped view."""
+
+    def __init__(self, path: str, filename: str, file_type: str, size: int, extension: str = None):
+        self.path = path
+        self.filename = filename
+        self.file_type = file_type
+        self.size = size
+        self.extension = extension
+        self._file = None
+        self._view: Optional[mmap.mmap] = None
+
+    def view(self) -> Union[mmap.mmap, bytes]:
+        """Return a read-only memory map of the spooled content."""
+        if self.size == 0:
+            return b""
+        if self._view is None:
+            self._file = open(self.path, "rb")
+            self._view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._view
+
+    def close(self) -> None:
+        """Release the memory map and delete the temporary file."""
+        if self._view is not None:
+            self._view.close()
+            self._view = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        FileHandler.delete_file(self.path)
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 class FileHandler:
+    # Maximum accepted size per file type, checked while the upload is copied
+    MAX_FILE_SIZES: Dict[str, int] = {
+        "text": int(os.getenv("SCAN_VAULT_MAX_TEXT_MB", "20")) * MB,
+        "csv": int(os.getenv("SCAN_VAULT_MAX_CSV_MB", "50")) * MB,
+        "pdf": int(os.getenv("SCAN_VAULT_MAX_PDF_MB", "100")) * MB,
+        "docx": int(os.getenv("SCAN_VAULT_MAX_DOCX_MB", "50")) * MB,
+        "image": int(os.getenv("SCAN_VAULT_MAX_IMAGE_MB", "20")) * MB,
+        "xlsx": int(os.getenv("SCAN_VAULT_MAX_XLSX_MB", "50")) * MB,
+        "pptx": int(os.getenv("SCAN_VAULT_MAX_PPTX_MB", "100")) * MB,
+        "email": int(os.getenv("SCAN_VAULT_MAX_EMAIL_MB", "50")) * MB,
+        "json": int(os.getenv("SCAN_VAULT_MAX_JSON_MB", "50")) * MB,
+        "html": int(os.getenv("SCAN_VAULT_MAX_HTML_MB", "20")) * MB,
+        "archive": int(os.getenv("SCAN_VAULT_MAX_ARCHIVE_MB", "100")) * MB,
+    }
+    # Limit for file types added by extractor plugins
+    DEFAULT_MAX_FILE_SIZE = int(os.getenv("SCAN_VAULT_MAX_OTHER_MB", "20")) * MB
+
+    SPOOL_DIRECTORY = os.getenv("SCAN_VAULT_SPOOL_DIR") or None
+
     @staticmethod
     def save_file(file, directory: str) -> str:
         """Save uploaded file to the specified directory."""
         Path(directory).mkdir(parents=True, exist_ok=True)
-        file_path = os.path.join(directory, file.filename)
+        file_path = os.path.join(directory, os.path.basename(file.filename))
         with open(file_path, "wb") as f:
-            f.write(file.file.read())
+            shutil.copyfileobj(file.file, f, CHUNK_SIZE)
         return file_path
 
     @staticmethod
@@ -16,3 +91,51 @@ class FileHandler:
         """Delete the file from disk."""
         if os.path.exists(file_path):
             os.remove(file_path)
+
+    @classmethod
+    async def spool(cls, file, file_type: str, sniff, extension: str = None) -> SpooledUpload:
+        """
+        Stream an upload to a temporary file in fixed-size chunks.
+
+        Args:
+            file: Uploaded file exposing an async ``read(size)``
+            file_type: Type declared by the file extension
+            sniff: Callable checking the first chunk against ``file_type``
+            extension: Validated file extension, kept on the returned handle
+
+        Returns:
+            SpooledUpload: Handle to the spooled file; close it when done
+
+        Raises:
+            UnsupportedFileTypeError: If the content does not match the declared type
+            FileTooLargeError: If the upload exceeds the limit for its type
+        """
+        limit = cls.MAX_FILE_SIZES.get(file_type, cls.DEFAULT_MAX_FILE_SIZE)
+
+        if cls.SPOOL_DIRECTORY:
+            Path(cls.SPOOL_DIRECTORY).mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="scan_vault_", dir=cls.SPOOL_DIRECTORY)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                first = True
+                while True:
+                    chunk = await file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if first:
+                        # Reject by magic bytes before anything is parsed
+                        sniff(chunk, file_type)
+                        first = False
+                    size += len(chunk)
+                    if size > limit:
+                        raise FileTooLargeError(
+                            f"File exceeds the {limit // MB} MB limit for {file_type} files"
+                        )
+                    out.write(chunk)
+        except BaseException:
+            # Including cancellation, when the sender goes away mid-file
+            cls.delete_file(path)
+            raise
+
+        return SpooledUpload(path, file.filename, file_type, size, extension)
@@ -0,0 +1,92 @@
+from typing import NamedTuple, Optional
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedFile(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    digest: Optional[str]  # sha256 of the content; None when it was never read in full
+    detection_id: Optional[str]
+    error: Optional[str]  # Why the file could not be scanned, e.g. too large
+    scanned_at: float
+
+
+class FileIndex:
+    """
+    What the directory watcher last saw of each file, kept on disk.
+
+    A file whose mtime and size match its entry is skipped without being
+    read. One that was touched but hashes the same is skipped without being
+    scanned. Entries survive restarts, so the catch-up walk at startup only
+    rescans what changed while the watcher was down.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        # Readers never block the writer, and commits skip the fsync of every transaction
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " digest TEXT,"
+            " detection_id TEXT,"
+            " error TEXT,"
+            " scanned_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "FileIndex":
+        return cls(os.getenv("SCAN_VAULT_WATCH_INDEX") or os.path.abspath("watch_index.sqlite3"))
+
+    def get(self, path: str) -> Optional[IndexedFile]:
+        row = self._db.execute(
+            "SELECT path, mtime_ns, size, digest, detection_id, error, scanned_at FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+        return IndexedFile(*row) if row else None
+
+    def record(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        digest: Optional[str] = None,
+        detection_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest, detection_id, error, scanned_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, mtime_ns, size, digest, detection_id, error, time.time()),
+        )
+        self._db.commit()
+
+    def forget(self, path: str) -> int:
+        """Drop a removed file, or everything under a removed directory; returns entries dropped."""
+        prefix = path.rstrip(os.sep) + os.sep
+        # Range rather than LIKE, so % and _ in paths are not wildcards and the primary key is used
+        cursor = self._db.execute(
+            "DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+            (path, prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,117 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+
+from src.server.models.finding import Finding
+from src.utils.tenants import current_tenant
+
+logger = logging.getLogger(__name__)
+
+
+def split_batch_findings(findings: List, texts: List[str]) -> List[List[Finding]]:
+    """
+    Distribute findings from a packed prompt back to their documents.
+
+    Findings carry the 1-based ``document`` index the model was asked to
+    echo. When it is missing or out of range, the finding goes to every
+    document whose text contains its value, and is dropped if none does.
+    """
+    per_document: List[List[Finding]] = [[] for _ in texts]
+    for item in findings:
+        if not isinstance(item, dict):
+            continue
+        finding = Finding.from_dict(item)
+        document = item.get("document")
+        try:
+            index = int(str(document).strip().lstrip("#")) - 1
+        except (TypeError, ValueError):
+            index = -1
+        if 0 <= index < len(texts):
+            per_document[index].append(finding)
+            continue
+        value = str(finding.value) if finding.value is not None else ""
+        owners = [i for i, text in enumerate(texts) if value and value in text]
+        if not owners:
+            logger.warning("Dropping batched finding that matches no document")
+        for i in owners:
+            per_document[i].append(finding)
+    return per_document
+
+
+class MicroBatcher:
+    """
+    Packs small texts submitted at about the same time into one model call.
+
+    A submitted text waits up to ``max_wait`` seconds for company. The batch
+    goes out sooner once it holds ``max_documents`` texts or ``max_chars``
+    characters. Texts are only batched with texts from the same tenant, so
+    documents never share a prompt across tenants and token usage is charged
+    to the right quota.
+    """
+
+    def __init__(
+        self,
+        analyze_batch: Callable[[List[str]], Awaitable[List[List[Finding]]]],
+        max_wait: float = 0.005,
+        max_documents: int = 16,
+        max_chars: int = 8000,
+    ):
+        self.analyze_batch = analyze_batch
+        self.max_wait = max_wait
+        self.max_documents = max(max_documents, 1)
+        self.max_chars = max_chars
+        self._pending: Dict[Optional[str], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Optional[str], asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls, analyze_batch: Callable[[List[str]], Awaitable[List[List[Finding]]]]) -> "MicroBatcher":
+        return cls(
+            analyze_batch,
+            max_wait=float(os.getenv("SCAN_VAULT_BATCH_WAIT_MS", "5")) / 1000,
+            max_documents=int(os.getenv("SCAN_VAULT_BATCH_MAX_DOCUMENTS", "16")),
+            max_chars=int(os.getenv("SCAN_VAULT_BATCH_MAX_CHARS", "8000")),
+        )
+
+    async def submit(self, text: str) -> List[Finding]:
+        tenant = current_tenant.get()
+        key = tenant.id if tenant is not None else None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.setdefault(key, [])
+        pending.append((text, future))
+        if len(pending) >= self.max_documents or sum(len(t) for t, _ in pending) >= self.max_chars:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: Optional[str]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [(text, future) for text, future in self._pending.pop(key, []) if not future.done()]
+        if batch:
+            # The task copies the current context, which belongs to a caller of this tenant
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            results = await self.analyze_batch(texts)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), findings in zip(batch, results):
+            if not future.done():
+                future.set_result(findings)
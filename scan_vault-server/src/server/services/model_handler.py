@@ -1,37 +1,56 @@
-from typing import List, Dict, Optional, Union
+from typing import List, Optional
+import asyncio
 import logging
-from openai import OpenAI
-import base64
-from io import BytesIO
-from src.server.utils.analysis_prompts import AnalysisPrompts
-from src.server.utils.json_parser import JSONParser
+import os
+from src.server.models.finding import Finding
+from src.server.providers.base import ModelProvider, create_provider
+from src.server.services.concurrency_limiter import AdaptiveLimiter, OverloadedError
+from src.server.services.micro_batcher import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+# Texts up to this many characters are packed with others into one model call; 0 disables batching
+SMALL_TEXT_CHARS = int(os.getenv("SCAN_VAULT_BATCH_SMALL_CHARS", "2000"))
+
 class LLMHandler:
-    """Handles all Large Language Model (LLM) interactions including text and vision analysis."""
-    
-    def __init__(self, api_key: str):
+    """Handles all model interactions including text and vision analysis."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        provider: ModelProvider = None,
+        limiter: AdaptiveLimiter = None,
+        small_text_chars: int = SMALL_TEXT_CHARS,
+    ):
         """
         Initialize the LLM handler.
-        
+
         Args:
-            api_key (str): OpenAI API key for authentication
-            
+            api_key (str, optional): OpenAI API key, used when no provider is given
+            provider (ModelProvider, optional): Backend to analyze with; defaults
+                to OpenAI
+            limiter (AdaptiveLimiter, optional): Caps concurrent OpenAI calls;
+                defaults to the limiter shared by the worker process
+            small_text_chars (int, optional): Texts up to this length are
+                micro-batched; 0 disables batching
+
         Raises:
             ValueError: If API key is invalid or initialization fails
         """
-        self._validate_api_key(api_key)
-        self.client = self._initialize_client(api_key)
-        self.json_parser = JSONParser()
+        if provider is None:
+            self._validate_api_key(api_key)
+            provider = create_provider("openai", api_key=api_key, limiter=limiter)
+        self.provider = provider
+        self.small_text_chars = small_text_chars
+        self.batcher = MicroBatcher.from_env(provider.analyze_batch)
 
     def _validate_api_key(self, api_key: str) -> None:
         """
         Validate the OpenAI API key.
-        
+
         Args:
             api_key (str): API key to validate
-            
+
         Raises:
             ValueError: If API key is missing or invalid
         """
@@ -39,113 +58,65 @@ class LLMHandler:
             logger.error("OpenAI API key not provided")
             raise ValueError("OpenAI API key is required")
 
-    def _initialize_client(self, api_key: str) -> OpenAI:
-        """
-        Initialize the OpenAI client.
-        
-        Args:
-            api_key (str): Valid OpenAI API key
-            
-        Returns:
-            OpenAI: Initialized OpenAI client
-            
-        Raises:
-            ValueError: If client initialization fails
-        """
-        try:
-            return OpenAI(api_key=api_key)
-        except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {e}")
-            raise ValueError(f"Failed to initialize OpenAI client: {str(e)}")
+    async def warm(self) -> None:
+        """Load the provider's models ahead of the first request."""
+        await self.provider.warm()
 
-    def analyze_text(self, text: str) -> List[Dict]:
+    async def analyze_text_async(self, text: str) -> List[Finding]:
         """
-        Analyze text content for sensitive information.
-        
+        Analyze text content without blocking the event loop.
+
+        Small texts are batched with other small texts that arrive within a
+        few milliseconds. Cancelling the awaiting task aborts the underlying
+        request unless other texts share it.
+
         Args:
             text (str): Text content to analyze
-            
+
         Returns:
-            List[Dict]: List of detected sensitive information
-            
+            List[Finding]: Detected sensitive information
+
         Raises:
             ValueError: If analysis fails
+            OverloadedError: If no model slot frees up within the queue SLO
         """
         try:
             logger.info("Starting text analysis")
-            response = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": AnalysisPrompts.SYSTEM_ROLE},
-                    {"role": "user", "content": f"{AnalysisPrompts.TEXT_ANALYSIS}\n\n{text}"}
-                ],
-                max_tokens=1000
-            )
-            
-            if not response.choices:
-                logger.error("No response received from GPT")
-                raise ValueError("No response received from model")
-
-            content = response.choices[0].message.content.strip()
-            results = self.json_parser.parse_gpt_response(content)
+            if len(text) <= self.small_text_chars:
+                results = await self.batcher.submit(text)
+            else:
+                results = await self.provider.analyze_text(text)
             logger.info("Text analysis completed successfully")
             return results
 
+        except (asyncio.CancelledError, OverloadedError):
+            raise
         except Exception as e:
-            logger.error(f"Error in text analysis: {e}")
+            logger.error("Error in text analysis: %s", e)
             raise ValueError(f"Failed to analyze text: {str(e)}")
 
-    def analyze_image(self, image_data: bytes) -> List[Dict]:
+    async def analyze_image_async(self, image_data: bytes) -> List[Finding]:
         """
-        Analyze image content for sensitive information using Vision API.
-        
+        Analyze image content without blocking the event loop.
+
         Args:
-            image_data (bytes): Raw image data
-            
+            image_data (bytes): Raw image data or any bytes-like view of it
+
         Returns:
-            List[Dict]: List of detected sensitive information
-            
+            List[Finding]: Detected sensitive information
+
         Raises:
             ValueError: If image analysis fails
+            OverloadedError: If no model slot frees up within the queue SLO
         """
         try:
             logger.info("Starting image analysis")
-            # Convert image to base64
-            img_str = base64.b64encode(image_data).decode()
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4-vision-preview",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": AnalysisPrompts.TEXT_ANALYSIS},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{img_str}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    },
-                    {
-                        "role": "system",
-                        "content": AnalysisPrompts.SYSTEM_ROLE
-                    }
-                ],
-                max_tokens=1000
-            )
-
-            if not response.choices:
-                logger.error("No response received from Vision API")
-                raise ValueError("No response received from model")
-
-            content = response.choices[0].message.content.strip()
-            results = self.json_parser.parse_gpt_response(content)
+            results = await self.provider.analyze_image(image_data)
             logger.info("Image analysis completed successfully")
             return results
 
+        except (asyncio.CancelledError, OverloadedError):
+            raise
         except Exception as e:
-            logger.error(f"Error in image analysis: {e}")
+            logger.error("Error in image analysis: %s", e)
             raise ValueError(f"Failed to analyze image: {str(e)}")
@@ -0,0 +1,337 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import logging
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from src.server.models.finding import Finding
+
+logger = logging.getLogger(__name__)
+
+# Words per shingle; long enough that shared boilerplate words alone do not match
+SHINGLE_SIZE = 5
+# MinHash functions per signature
+NUM_PERMUTATIONS = 128
+# Unchanged words sent along each side of a changed region, so values keep their labels
+CONTEXT_WORDS = 8
+# Past this share of changed text a full scan is cheaper than stitching results together
+MAX_CHANGED_RATIO = 0.5
+# Longer documents are always scanned in full and never kept as templates
+MAX_DIFF_WORDS = 50000
+# Past this many element comparisons a gap between anchors counts as changed rather than diffed
+MAX_GAP_WORK = 1_000_000
+# Memory held by templates' shingle hashes and signatures across all tenants
+MAX_TEMPLATE_BYTES = 64 * 1024 * 1024
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD = re.compile(r"\S+")
+
+
+def _hash_functions(count: int, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    generator = np.random.default_rng(seed)
+    a = generator.integers(1, 1 << 32, size=count, dtype=np.uint64)
+    b = generator.integers(0, 1 << 32, size=count, dtype=np.uint64)
+    return a.reshape(-1, 1), b.reshape(-1, 1)
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Bands and rows per band for the LSH index.
+
+    Picks the most rows per band whose candidate curve still rises well
+    below ``threshold``, so true near-duplicates are rarely missed while
+    unrelated documents rarely become candidates.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold * 0.9:
+            best = (num_perm // rows, rows)
+    return best
+
+
+def _anchors(old: Sequence, new: Sequence) -> List[Tuple[int, int]]:
+    """Longest in-order chain of elements that occur exactly once in each sequence."""
+    old_counts, new_counts = Counter(old), Counter(new)
+    old_at = {value: i for i, value in enumerate(old) if old_counts[value] == 1}
+    pairs = [(old_at[value], j) for j, value in enumerate(new) if new_counts[value] == 1 and value in old_at]
+
+    # Patience sorting: tails[n] is the smallest old position ending a chain of n + 1 pairs
+    tails: List[int] = []
+    tail_pairs: List[int] = []
+    previous: List[int] = []
+    for k, (i, _) in enumerate(pairs):
+        n = bisect_left(tails, i)
+        previous.append(tail_pairs[n - 1] if n else -1)
+        if n == len(tails):
+            tails.append(i)
+            tail_pairs.append(k)
+        else:
+            tails[n] = i
+            tail_pairs[n] = k
+
+    chain = []
+    k = tail_pairs[-1] if tail_pairs else -1
+    while k >= 0:
+        chain.append(pairs[k])
+        k = previous[k]
+    chain.reverse()
+    return chain
+
+
+def changed_ranges(old: Sequence, new: Sequence) -> List[Tuple[int, int]]:
+    """
+    Ranges of ``new`` that are replaced or inserted relative to ``old``.
+
+    A patience diff: elements unique to both sides anchor the alignment and
+    only the gaps between anchors go through SequenceMatcher, which is
+    quadratic on repetitive input. A gap too large to diff counts as
+    changed.
+    """
+    ranges = []
+    i = j = 0
+    for anchor_i, anchor_j in _anchors(old, new) + [(len(old), len(new))]:
+        if anchor_j > j:
+            if anchor_i == i or (anchor_i - i) * (anchor_j - j) > MAX_GAP_WORK:
+                ranges.append((j, anchor_j))
+            else:
+                matcher = SequenceMatcher(None, old[i:anchor_i], new[j:anchor_j], autojunk=False)
+                ranges.extend(
+                    (j + start, j + end)
+                    for tag, _, _, start, end in matcher.get_opcodes()
+                    if tag in ("replace", "insert")
+                )
+        i, j = anchor_i + 1, anchor_j + 1
+    return ranges
+
+
+class Document:
+    """Extracted text split into words, with its shingle hashes and MinHash signature."""
+
+    __slots__ = ("text", "spans", "shingles", "signature")
+
+    def __init__(self, text: str, spans: List[Tuple[int, int]], shingles: array, signature: np.ndarray):
+        self.text = text
+        self.spans = spans
+        self.shingles = shingles  # crc32 of the shingle starting at each word
+        self.signature = signature
+
+
+class Reuse:
+    """A near-duplicate match: what still needs scanning and what carries over."""
+
+    def __init__(self, template_id: int, similarity: float, changed_text: str, findings: List[Finding]):
+        self.template_id = template_id
+        self.similarity = similarity
+        self.changed_text = changed_text
+        self.findings = findings
+
+    def merge(self, fresh: List[Finding]) -> List[Finding]:
+        """Carried-over findings plus those found in the changed regions."""
+        seen = {(finding.type, finding.value) for finding in self.findings}
+        return self.findings + [finding for finding in fresh if (finding.type, finding.value) not in seen]
+
+
+class _Template:
+    __slots__ = ("scope", "shingles", "signature", "findings")
+
+    def __init__(self, scope, shingles, signature, findings):
+        self.scope = scope
+        self.shingles = shingles
+        self.signature = signature
+        self.findings = findings
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.shingles) * self.shingles.itemsize + self.signature.nbytes
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of recently scanned documents, per worker.
+
+    Much of what we scan is template-generated, so a new upload is often a
+    known document with a few fields changed. When one is found, only the
+    changed regions go to the model and the template's findings whose
+    values still appear are reused. Templates are scoped by tenant, so one
+    tenant's findings never answer another's scan, and the least recently
+    matched are dropped past ``capacity`` templates or ``max_bytes`` of
+    template data. Documents over ``max_words`` are neither matched nor
+    kept.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        capacity: int = 500,
+        min_words: int = 50,
+        num_perm: int = NUM_PERMUTATIONS,
+        shingle_size: int = SHINGLE_SIZE,
+        max_words: int = MAX_DIFF_WORDS,
+        max_bytes: int = MAX_TEMPLATE_BYTES,
+    ):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.min_words = min_words
+        self.max_words = max_words
+        self.max_bytes = max_bytes
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._a, self._b = _hash_functions(num_perm)
+        self._templates: "OrderedDict[int, _Template]" = OrderedDict()
+        self._buckets: Dict[Tuple, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self._bytes = 0
+        # Matching and adding run on worker threads
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.reused = 0
+        self.chars_total = 0
+        self.chars_scanned = 0
+
+    @classmethod
+    def from_env(cls) -> "NearDuplicateIndex":
+        return cls(
+            threshold=float(os.getenv("SCAN_VAULT_DEDUP_THRESHOLD", "0.9")),
+            capacity=int(os.getenv("SCAN_VAULT_DEDUP_MAX_DOCUMENTS", "500")),
+            min_words=int(os.getenv("SCAN_VAULT_DEDUP_MIN_WORDS", "50")),
+            max_words=int(os.getenv("SCAN_VAULT_DEDUP_MAX_WORDS", str(MAX_DIFF_WORDS))),
+            max_bytes=int(os.getenv("SCAN_VAULT_DEDUP_MAX_BYTES", str(MAX_TEMPLATE_BYTES))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def prepare(self, text: str) -> Optional[Document]:
+        """Split and sign a document; None when it is too short or too long to be worth matching."""
+        if not self.enabled:
+            return None
+        matches = list(_WORD.finditer(text))
+        if not max(self.min_words, self.shingle_size) <= len(matches) <= self.max_words:
+            return None
+        words = [match.group().lower() for match in matches]
+        size = self.shingle_size
+        shingles = array("Q", (zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)))
+        return Document(text, [match.span() for match in matches], shingles, self._signature(shingles))
+
+    def _signature(self, shingles: array) -> np.ndarray:
+        hashes = np.frombuffer(shingles, dtype=np.uint64)
+        signature = np.full(self._a.shape[0], _MAX_HASH, dtype=np.uint64)
+        # Blocks bound the (permutations x shingles) working array for long documents
+        for start in range(0, len(hashes), 4096):
+            block = hashes[start:start + 4096]
+            permuted = ((self._a * block + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature
+
+    def _band_keys(self, scope, signature: np.ndarray):
+        for band in range(self.bands):
+            yield scope, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def match(self, scope, document: Document) -> Optional[Reuse]:
+        """The closest known template at or above the threshold, as a plan for reuse."""
+        with self._lock:
+            self.lookups += 1
+            self.chars_total += len(document.text)
+            template_id, similarity = self._closest(scope, document.signature)
+            if template_id is not None:
+                self._templates.move_to_end(template_id)
+                template = self._templates[template_id]
+
+        changed_text = self._changed_text(template.shingles, document) if template_id is not None else None
+        with self._lock:
+            if changed_text is None or len(changed_text) > len(document.text) * MAX_CHANGED_RATIO:
+                self.chars_scanned += len(document.text)
+                return None
+            self.reused += 1
+            self.chars_scanned += len(changed_text)
+
+        findings = [
+            Finding(finding.type, finding.value, finding.confidence, finding.context, finding.category)
+            for finding in template.findings
+            if isinstance(finding.value, str) and finding.value in document.text
+        ]
+        return Reuse(template_id, similarity, changed_text, findings)
+
+    def _closest(self, scope, signature: np.ndarray) -> Tuple[Optional[int], float]:
+        candidates = set()
+        for key in self._band_keys(scope, signature):
+            candidates |= self._buckets.get(key, set())
+
+        best_id, best_similarity = None, 0.0
+        for template_id in candidates:
+            similarity = float(np.mean(self._templates[template_id].signature == signature))
+            if similarity > best_similarity:
+                best_id, best_similarity = template_id, similarity
+        if best_similarity < self.threshold:
+            return None, best_similarity
+        return best_id, best_similarity
+
+    def _changed_text(self, template_shingles: array, document: Document) -> str:
+        """Regions of the document that differ from the template, with some context."""
+        regions: List[List[int]] = []
+        # Shingles are far more often unique than words, so they anchor the diff
+        for start, end in changed_ranges(template_shingles, document.shingles):
+            # Shingles start..end-1 cover words start..end+size-2
+            start = max(start - CONTEXT_WORDS, 0)
+            end = min(end + self.shingle_size - 1 + CONTEXT_WORDS, len(document.spans))
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
+            else:
+                regions.append([start, end])
+        return "\n".join(
+            document.text[document.spans[start][0]:document.spans[end - 1][1]]
+            for start, end in regions
+        )
+
+    def add(self, scope, document: Document, findings: List[Finding]) -> None:
+        """Remember a fully scanned document as a template."""
+        if not self.enabled:
+            return
+        # Copies without locations, so later scans cannot alter what was returned
+        stored = [
+            Finding(finding.type, finding.value, finding.confidence, finding.context, finding.category)
+            for finding in findings
+        ]
+        with self._lock:
+            template_id = self._next_id
+            self._next_id += 1
+            template = _Template(scope, document.shingles, document.signature, stored)
+            self._templates[template_id] = template
+            self._bytes += template.nbytes
+            for key in self._band_keys(scope, document.signature):
+                self._buckets[key].add(template_id)
+            while len(self._templates) > self.capacity or self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        template_id, template = self._templates.popitem(last=False)
+        self._bytes -= template.nbytes
+        for key in self._band_keys(template.scope, template.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(template_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "documents": len(self._templates),
+            "bytes": self._bytes,
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "reuse_rate": self.reused / self.lookups if self.lookups else 0.0,
+            "chars_total": self.chars_total,
+            "chars_scanned": self.chars_scanned,
+        }
+
+
+near_duplicate_index = NearDuplicateIndex.from_env()
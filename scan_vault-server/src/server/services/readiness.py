@@ -0,0 +1,162 @@
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import math
+import os
+import time
+
+from src.server.services.concurrency_limiter import AdaptiveLimiter, model_call_limiter
+from src.server.services.fair_scheduler import FairScheduler, scan_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessMonitor:
+    """
+    Whether this worker should be sent more traffic.
+
+    Probes read state gathered in the background, so they never wait on
+    I/O: event-loop lag is sampled continuously (the worst sample of the
+    last ``lag_window`` seconds counts) and storage is pinged every
+    ``storage_interval`` seconds. The worker reports not ready while any
+    signal is past its threshold, and from shutdown onwards so load
+    balancers drain it.
+    """
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter = None,
+        scheduler: FairScheduler = None,
+        max_scans_queued: int = 32,
+        max_model_saturation: float = 2.0,
+        max_loop_lag: float = 0.5,
+        require_storage: bool = True,
+        storage_interval: float = 30.0,
+        storage_timeout: float = 5.0,
+        lag_interval: float = 0.25,
+        lag_window: float = 5.0,
+    ):
+        self.limiter = limiter or model_call_limiter
+        self.scheduler = scheduler or scan_scheduler
+        self.max_scans_queued = max_scans_queued
+        self.max_model_saturation = max_model_saturation
+        self.max_loop_lag = max_loop_lag
+        self.require_storage = require_storage
+        self.storage_interval = storage_interval
+        self.storage_timeout = storage_timeout
+        self.lag_interval = lag_interval
+        # Worst recent sample, so a stall is not forgotten by the next tick
+        self._lag_samples: Deque[float] = deque(maxlen=max(math.ceil(lag_window / lag_interval), 1))
+        # None until the first check finishes
+        self.storage_ok: Optional[bool] = None
+        self.storage_checked_at: Optional[float] = None
+        self.draining = False
+        self._ready = True
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "ReadinessMonitor":
+        return cls(
+            max_scans_queued=int(os.getenv("SCAN_VAULT_READY_MAX_SCANS_QUEUED", "32")),
+            max_model_saturation=float(os.getenv("SCAN_VAULT_READY_MAX_MODEL_SATURATION", "2.0")),
+            max_loop_lag=float(os.getenv("SCAN_VAULT_READY_MAX_LOOP_LAG_MS", "500")) / 1000,
+            require_storage=os.getenv("SCAN_VAULT_READY_REQUIRE_STORAGE", "true").lower() == "true",
+            storage_interval=float(os.getenv("SCAN_VAULT_READY_STORAGE_INTERVAL", "30")),
+        )
+
+    @property
+    def loop_lag(self) -> float:
+        """Longest event-loop delay seen over the last ``lag_window`` seconds."""
+        return max(self._lag_samples, default=0.0)
+
+    @property
+    def model_saturation(self) -> float:
+        """Model calls running and waiting, relative to the current concurrency limit."""
+        return (self.limiter.in_flight + self.limiter.queue_depth) / self.limiter.limit
+
+    def start(self, storage_check: Callable[[], Awaitable[None]] = None) -> None:
+        """
+        Start sampling in the running event loop.
+
+        Args:
+            storage_check: Coroutine function that raises when storage is unreachable
+        """
+        self.draining = False
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._sample_loop_lag()))
+        if storage_check is not None:
+            self._tasks.append(asyncio.create_task(self._check_storage(storage_check)))
+
+    async def stop(self) -> None:
+        """Report not ready from now on and stop sampling."""
+        self.draining = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _sample_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self._lag_samples.append(max(loop.time() - started - self.lag_interval, 0.0))
+
+    async def _check_storage(self, storage_check: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(storage_check(), self.storage_timeout)
+                ok = True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                ok = False
+                if self.storage_ok is not False:
+                    logger.warning("Storage unreachable: %s", e)
+            if ok and self.storage_ok is False:
+                logger.info("Storage reachable again")
+            self.storage_ok = ok
+            self.storage_checked_at = time.time()
+            await asyncio.sleep(self.storage_interval)
+
+    def status(self) -> Dict:
+        """Current signals and the checks that are failing, if any."""
+        scans_queued = sum(self.scheduler.queued().values())
+        failing = []
+        if self.draining:
+            failing.append("draining")
+        if scans_queued > self.max_scans_queued:
+            failing.append("scans_queued")
+        if self.model_saturation > self.max_model_saturation:
+            failing.append("model_saturation")
+        if self.loop_lag > self.max_loop_lag:
+            failing.append("event_loop_lag")
+        if self.require_storage and self.storage_ok is False:
+            failing.append("storage")
+
+        ready = not failing
+        if ready != self._ready:
+            self._ready = ready
+            if ready:
+                logger.info("Worker ready again")
+            else:
+                logger.warning("Worker not ready: %s", ", ".join(failing))
+
+        return {
+            "status": "ready" if ready else "not_ready",
+            "failing": failing,
+            "scans_in_flight": self.scheduler.in_flight,
+            "scans_queued": scans_queued,
+            "model_in_flight": self.limiter.in_flight,
+            "model_queue_depth": self.limiter.queue_depth,
+            "model_concurrency_limit": self.limiter.limit,
+            "model_saturation": round(self.model_saturation, 3),
+            "event_loop_lag_seconds": round(self.loop_lag, 4),
+            "storage_reachable": self.storage_ok,
+            "storage_checked_at": self.storage_checked_at,
+        }
+
+
+readiness_monitor = ReadinessMonitor.from_env()
@@ -0,0 +1,122 @@
+from typing import Dict, List
+import json
+import logging
+import os
+import tempfile
+import zipfile
+
+from starlette.concurrency import run_in_threadpool
+
+from src.server.services.file_handler import FileHandler, FileTooLargeError, UnsupportedFileTypeError
+from src.server.services.scan_service import ScanService
+from src.server.utils.redactor import Redactor
+
+logger = logging.getLogger(__name__)
+
+class RedactionService:
+    """Service for producing sanitized copies of files with detected values masked."""
+
+    MEDIA_TYPES = {
+        "txt": "text/plain",
+        "csv": "text/csv",
+        "pdf": "application/pdf",
+        "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "jpg": "image/jpeg",
+        "jpeg": "image/jpeg",
+        "png": "image/png",
+        "bmp": "image/bmp",
+    }
+
+    def __init__(self, scan_service: ScanService):
+        """
+        Initialize the redaction service.
+        
+        Args:
+            scan_service (ScanService): Service used to extract and analyze files
+        """
+        self.scan_service = scan_service
+        self.redactor = Redactor()
+
+    async def redact_file(self, file) -> Dict:
+        """
+        Scan an upload and write a redacted copy of it.
+        
+        The upload is spooled once; extraction, analysis and redaction all read
+        the same spooled file.
+        
+        Args:
+            file: Uploaded file to redact
+            
+        Returns:
+            Dict: Path, name and media type of the redacted copy, with finding
+            and redaction counts. The caller must delete ``path``.
+            
+        Raises:
+            ValueError: If scanning or redaction fails
+        """
+        if not file or not file.filename:
+            raise ValueError("No file provided or invalid file")
+
+        with await self.scan_service.spool_file(file) as upload:
+            results = await self.scan_service.scan_upload(upload)
+            findings = results["sensitive_fields"]
+
+            fd, output_path = tempfile.mkstemp(prefix="scan_vault_redacted_", dir=FileHandler.SPOOL_DIRECTORY)
+            os.close(fd)
+            try:
+                redactions = await run_in_threadpool(self.redactor.redact_file, upload, output_path, findings)
+            except Exception as e:
+                FileHandler.delete_file(output_path)
+                logger.error("Error redacting file %s: %s", file.filename, e)
+                raise ValueError(f"Error redacting file: {str(e)}")
+
+        return {
+            "path": output_path,
+            "file_name": f"redacted_{os.path.basename(file.filename)}",
+            "media_type": self.MEDIA_TYPES.get(upload.extension, "application/octet-stream"),
+            "findings": len(findings),
+            "redactions": redactions,
+        }
+
+    async def redact_files(self, files: List) -> str:
+        """
+        Redact several uploads into one ZIP archive.
+        
+        Files are processed one at a time so only one spooled upload and one
+        redacted copy exist on disk at once. A ``redaction_report.json`` entry
+        records the outcome for each file.
+        
+        Args:
+            files (List): Uploaded files to redact
+            
+        Returns:
+            str: Path to the ZIP archive; the caller must delete it
+        """
+        fd, archive_path = tempfile.mkstemp(prefix="scan_vault_redacted_", suffix=".zip", dir=FileHandler.SPOOL_DIRECTORY)
+        os.close(fd)
+        report = []
+        try:
+            with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for index, file in enumerate(files):
+                    try:
+                        redacted = await self.redact_file(file)
+                    except (ValueError, FileTooLargeError, UnsupportedFileTypeError) as e:
+                        report.append({"file_name": getattr(file, "filename", None), "error": str(e)})
+                        continue
+                    try:
+                        # Prefix with the position so duplicate names do not collide
+                        arcname = f"{index:04d}_{redacted['file_name']}"
+                        archive.write(redacted["path"], arcname)
+                    finally:
+                        FileHandler.delete_file(redacted["path"])
+                    report.append({
+                        "file_name": file.filename,
+                        "archive_name": arcname,
+                        "findings": redacted["findings"],
+                        "redactions": redacted["redactions"],
+                    })
+                archive.writestr("redaction_report.json", json.dumps(report, indent=2))
+        except Exception:
+            FileHandler.delete_file(archive_path)
+            raise
+        return archive_path
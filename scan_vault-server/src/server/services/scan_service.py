@@ -1,4 +1,5 @@
-from typing import Dict, Union
+from typing import Dict, Iterator, List, Optional, Union
+import asyncio
 import logging
 import os
 from PIL import Image
@@ -12,22 +13,47 @@ load_dotenv()
 from src.server.utils.file_processor import FileProcessor
 from src.server.utils.analysis_prompts import AnalysisPrompts
 from src.server.utils.json_parser import JSONParser
+from src.server.utils.finding_locator import FindingLocator
 from src.server.services.model_handler import LLMHandler
+from src.server.providers.base import create_provider, provider_name
+from src.server.services.concurrency_limiter import OverloadedError
+from src.server.services.near_duplicates import near_duplicate_index
+from src.server.models.finding import Finding
+from src.server.models.scan_policy import ScanPolicy
+from src.server.profiling.tracing import span
+from src.utils.tenants import current_tenant
+from src.server.services.file_handler import (
+    FileHandler,
+    FileTooLargeError,
+    SpooledUpload,
+    UnsupportedFileTypeError,
+)
 
 logger = logging.getLogger(__name__)
 
+# Policy scans send text to the model in chunks of about this many characters
+POLICY_CHUNK_CHARS = int(os.getenv("SCAN_VAULT_POLICY_CHUNK_CHARS", "12000"))
+# Model calls a policy scan may have in flight at once
+POLICY_MAX_IN_FLIGHT = int(os.getenv("SCAN_VAULT_POLICY_MAX_IN_FLIGHT", "4"))
+
 class ScanService:
     """Service for scanning files for sensitive information."""
     
     def __init__(self,):
         """Initialize scan service with necessary components."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        self._validate_api_key(api_key)
-        
+        provider = provider_name()
+        if provider == "openai":
+            api_key = os.getenv("OPENAI_API_KEY")
+            self._validate_api_key(api_key)
+            self.llm_handler = LLMHandler(api_key=api_key)
+        else:
+            # Offline providers never need the OpenAI key
+            self.llm_handler = LLMHandler(provider=create_provider(provider))
+
         # Initialize components
-        self.llm_handler = LLMHandler(api_key=api_key)
         self.file_processor = FileProcessor()
         self.json_parser = JSONParser()
+        self.finding_locator = FindingLocator()
 
     def _validate_api_key(self, api_key: str) -> None:
         """Validate OpenAI API key."""
@@ -35,55 +61,275 @@ class ScanService:
             logger.error("OpenAI API key not found")
             raise ValueError("OpenAI API key is required")
 
-    async def scan_file(self, file) -> Dict:
+    async def scan_file(self, file, policy: Optional[ScanPolicy] = None) -> Dict:
         """
         Handle end-to-end scanning process for both text and image files.
         
         Args:
             file: File object to scan
+            policy (ScanPolicy, optional): Stop as soon as this policy is satisfied
             
         Returns:
             Dict: Scan results including file name and detected sensitive fields
             
         Raises:
             ValueError: If file processing fails
+            OverloadedError: If model capacity is saturated
         """
         if not file or not file.filename:
             raise ValueError("No file provided or invalid file")
 
         try:
-            file_extension = self.file_processor.get_file_extension(file.filename)
-            
-            # Process image files
-            if file_extension.lower() in ["jpg", "jpeg", "png", "bmp"]:
-                content = await file.read()
-                results = self.llm_handler.analyze_image(content)
-            else:
-                # Process text-based files
-                content = await self._process_file_content(file, file_extension)
-                if not content:
-                    logger.warning(f"No content extracted from file: {file.filename}")
-                    return self._empty_result(file.filename)
-                    
-                results = self.llm_handler.analyze_text(content)
-
-            return {
-                "file_name": file.filename,
-                "sensitive_fields": results
-            }
+            with span("scan", policy=policy is not None):
+                # Stream the upload to disk so memory stays bounded regardless of file size
+                with span("scan.spool"):
+                    upload = await self.spool_file(file)
+                with upload:
+                    return await self.scan_upload(upload, policy)
 
+        except (FileTooLargeError, UnsupportedFileTypeError, OverloadedError):
+            raise
         except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {e}")
+            logger.error("Error processing file %s: %s", file.filename, e)
             raise ValueError(f"Error processing file: {str(e)}")
 
-    async def _process_file_content(self, file, file_extension: str) -> str:
-        """Process file content based on file type."""
+    async def spool_file(self, file) -> SpooledUpload:
+        """
+        Validate an upload's extension and content, and spool it to disk.
+        
+        Args:
+            file: Uploaded file
+            
+        Returns:
+            SpooledUpload: Spooled file; the caller must close it
+            
+        Raises:
+            ValueError: If the extension is not supported
+            UnsupportedFileTypeError: If the content does not match the extension
+            FileTooLargeError: If the file exceeds its size limit
+        """
+        file_extension = self.file_processor.get_file_extension(file.filename)
+        file_type = self.file_processor.get_file_type(file_extension)
+        return await FileHandler.spool(
+            file, file_type, self.file_processor.sniff_file_type, extension=file_extension
+        )
+
+    async def scan_upload(self, upload: SpooledUpload, policy: Optional[ScanPolicy] = None) -> Dict:
+        """
+        Extract content from a spooled upload and analyze it.
+        
+        Args:
+            upload (SpooledUpload): File spooled with spool_file
+            policy (ScanPolicy, optional): Stop as soon as this policy is satisfied
+            
+        Returns:
+            Dict: Scan results including file name and detected sensitive fields
+        """
+        if policy is not None:
+            with span("scan.policy", file_type=upload.file_type, size=upload.size):
+                return await self._scan_with_policy(upload, policy)
+
+        # Process image files
+        if upload.file_type == "image":
+            with span("scan.analyze_image", file_type=upload.file_type, size=upload.size):
+                results = await self.llm_handler.analyze_image_async(upload.view())
+        else:
+            # Process text-based files
+            with span("scan.extract", file_type=upload.file_type, size=upload.size) as current:
+                pages = await self._process_file_content(upload, upload.extension)
+                content = " ".join(page for page in pages if page)
+                if current is not None:
+                    current.set_attribute("pages", len(pages))
+                    current.set_attribute("chars", len(content))
+            if not content:
+                logger.warning("No content extracted from file: %s", upload.filename)
+                return self._empty_result(upload.filename)
+
+            with span("scan.analyze_text", chars=len(content)) as current:
+                results = await self._analyze_content(content, current)
+                if current is not None:
+                    current.set_attribute("findings", len(results))
+            self._locate_findings(results, pages, upload)
+
+        return {
+            "file_name": upload.filename,
+            "sensitive_fields": results
+        }
+
+    async def finish_analyzed_upload(
+        self,
+        upload: SpooledUpload,
+        findings: List[Finding],
+        chunks_analyzed: int,
+        policy: Optional[ScanPolicy] = None,
+    ) -> Dict:
+        """
+        Build the results of an upload that was analyzed while it arrived.
+
+        Args:
+            upload (SpooledUpload): The complete upload
+            findings (List[Finding]): Everything its analysis found
+            chunks_analyzed (int): Model calls the analysis took
+            policy (ScanPolicy, optional): Policy to report a verdict for
+
+        Returns:
+            Dict: Scan results including file name and detected sensitive fields
+        """
+        with span("scan.extract", file_type=upload.file_type, size=upload.size):
+            pages = await self._process_file_content(upload, upload.extension)
+        self._locate_findings(findings, pages, upload)
+        if policy is not None:
+            return self._policy_result(upload, findings, policy, len(pages), chunks_analyzed, stopped_early=False)
+        return {
+            "file_name": upload.filename,
+            "sensitive_fields": findings
+        }
+
+    async def _analyze_content(self, content: str, current_span=None) -> List[Finding]:
+        """
+        Analyze extracted text, reusing a near-duplicate's findings when one is known.
+        
+        For a near-duplicate of a document scanned before, only the regions
+        that differ go to the model; otherwise the whole text does and the
+        document becomes a template for later scans.
+        """
+        tenant = current_tenant.get()
+        scope = tenant.id if tenant is not None else None
+        document = await asyncio.to_thread(near_duplicate_index.prepare, content)
+        reuse = await asyncio.to_thread(near_duplicate_index.match, scope, document) if document else None
+        if current_span is not None:
+            current_span.set_attribute("reused", reuse is not None)
+        if reuse is None:
+            results = await self.llm_handler.analyze_text_async(content)
+            if document is not None:
+                near_duplicate_index.add(scope, document, results)
+            return results
+
+        logger.info(
+            "Near-duplicate of a known document (similarity %.2f); analyzing %d of %d characters",
+            reuse.similarity, len(reuse.changed_text), len(content),
+        )
+        fresh = await self.llm_handler.analyze_text_async(reuse.changed_text) if reuse.changed_text else []
+        return reuse.merge(fresh)
+
+    async def _scan_with_policy(self, upload: SpooledUpload, policy: ScanPolicy) -> Dict:
+        """
+        Analyze an upload chunk by chunk until the policy is satisfied.
+        
+        Pages are extracted only as chunks are needed and up to
+        POLICY_MAX_IN_FLIGHT chunks are analyzed concurrently. Once enough
+        matching findings arrive, remaining pages are left unread and model
+        calls still in flight are cancelled.
+        """
+        if upload.file_type == "image":
+            results = await self.llm_handler.analyze_image_async(upload.view())
+            return self._policy_result(upload, results, policy, 1, 1, stopped_early=False)
+
+        pages = self.file_processor.iter_pages(upload, upload.extension)
+        read: List[str] = []
+        chunks = self._iter_chunks(pages, read)
+        findings: List[Finding] = []
+        pending = set()
+        analyzed = 0
+        exhausted = satisfied = False
         try:
-            return await self.file_processor.process_file(file, file_extension)
+            while True:
+                if pending and (exhausted or len(pending) >= POLICY_MAX_IN_FLIGHT):
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    done = {task for task in pending if task.done()}
+                    pending -= done
+                for task in done:
+                    findings.extend(task.result())
+                    analyzed += 1
+
+                satisfied = sum(policy.matches(finding) for finding in findings) >= policy.stop_after
+                if satisfied or (exhausted and not pending):
+                    break
+
+                if not exhausted:
+                    # Extraction runs off the event loop so model calls keep progressing
+                    chunk = await asyncio.to_thread(next, chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending.add(asyncio.create_task(self.llm_handler.analyze_text_async(chunk)))
+            stopped_early = satisfied and (not exhausted or bool(pending))
+        finally:
+            for task in pending:
+                task.cancel()
+            chunks.close()
+
+        if stopped_early:
+            logger.info("Policy satisfied for %s after %s page(s)", upload.filename, len(read))
+        self._locate_findings(findings, read, upload)
+        return self._policy_result(upload, findings, policy, len(read), analyzed, stopped_early)
+
+    @staticmethod
+    def _iter_chunks(pages: Iterator[str], read: List[str]) -> Iterator[str]:
+        """
+        Group page text into chunks of about POLICY_CHUNK_CHARS.
+        
+        Each page is appended to ``read`` as it is consumed, so the caller
+        knows how far extraction got when it stops early.
+        """
+        buffer = ""
+        for page in pages:
+            read.append(page)
+            if page:
+                buffer = f"{buffer} {page}" if buffer else page
+            while len(buffer) >= POLICY_CHUNK_CHARS:
+                # Prefer cutting at whitespace so values are not split across chunks
+                cut = buffer.rfind(" ", 0, POLICY_CHUNK_CHARS)
+                if cut <= 0:
+                    cut = POLICY_CHUNK_CHARS
+                yield buffer[:cut]
+                buffer = buffer[cut:].lstrip()
+        if buffer.strip():
+            yield buffer
+
+    def _policy_result(
+        self,
+        upload: SpooledUpload,
+        findings: List[Finding],
+        policy: ScanPolicy,
+        pages_scanned: int,
+        chunks_analyzed: int,
+        stopped_early: bool,
+    ) -> Dict:
+        """Build scan results with the policy verdict attached."""
+        matching = sum(policy.matches(finding) for finding in findings)
+        return {
+            "file_name": upload.filename,
+            "sensitive_fields": findings,
+            "policy": {
+                "matched": matching >= policy.stop_after,
+                "matching_findings": matching,
+                "stopped_early": stopped_early,
+                "pages_scanned": pages_scanned,
+                "chunks_analyzed": chunks_analyzed,
+            },
+        }
+
+    async def _process_file_content(self, upload, file_extension: str) -> List[str]:
+        """Extract spooled file content page by page based on file type."""
+        try:
+            return await self.file_processor.extract_pages(upload, file_extension)
+        except (FileTooLargeError, UnsupportedFileTypeError):
+            raise
         except Exception as e:
-            logger.error(f"Error processing file content: {e}")
+            logger.error("Error processing file content: %s", e)
             raise ValueError(f"Error processing file content: {str(e)}")
 
+    def _locate_findings(self, results: List[Finding], pages: List[str], upload: SpooledUpload) -> None:
+        """Attach positions to findings; a failure here never fails the scan."""
+        try:
+            pdf_path = upload.path if upload.file_type == "pdf" else None
+            with span("scan.locate", findings=len(results), pages=len(pages)):
+                self.finding_locator.locate(results, pages, pdf_path)
+        except Exception as e:
+            logger.warning("Could not locate findings in %s: %s", upload.filename, e)
+
     def _empty_result(self, filename: str = None) -> Dict:
         """Return empty result structure."""
         return {
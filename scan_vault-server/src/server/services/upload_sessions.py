@@ -0,0 +1,481 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+import asyncio
+import base64
+import binascii
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from src.server.models.finding import Finding
+from src.server.services.file_handler import MB, FileHandler, FileTooLargeError, SpooledUpload, UnsupportedFileTypeError
+
+logger = logging.getLogger(__name__)
+
+# Algorithms accepted in an Upload-Checksum header
+CHECKSUM_ALGORITHMS = {"sha1": hashlib.sha1, "sha256": hashlib.sha256, "md5": hashlib.md5}
+
+# Leading bytes checked against the declared type; more than any signature or BMP header needs
+SNIFF_BYTES = 512
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadNotFoundError(LookupError):
+    """Raised for an unknown, expired or other tenant's upload."""
+
+
+class UploadConflictError(ValueError):
+    """Raised when a chunk's offset does not match the bytes received, or finalizing too early."""
+
+
+class UploadBusyError(ValueError):
+    """Raised when another request is writing to the same upload."""
+
+
+class UploadQuotaError(ValueError):
+    """Raised when a tenant already has too many uploads or bytes in progress."""
+
+
+class ChecksumMismatchError(ValueError):
+    """Raised when a chunk does not match the checksum sent with it."""
+
+
+class UploadInterruptedError(Exception):
+    """Raised by a chunk stream whose client went away mid-transfer."""
+
+
+class UploadSession:
+    """
+    What is known about a resumable upload besides its bytes.
+
+    Stored as JSON next to the partial file. ``analyzed`` is how many
+    leading bytes have been analyzed already and ``findings`` what that
+    analysis found, so a streamable upload is mostly scanned by the time
+    its last chunk arrives.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        filename: str,
+        extension: str,
+        file_type: str,
+        length: int,
+        tenant_id: Optional[str] = None,
+        streamable: bool = False,
+        created_at: float = None,
+        analyzed: int = 0,
+        chunks_analyzed: int = 0,
+        findings: List[Dict[str, Any]] = None,
+    ):
+        self.id = upload_id
+        self.filename = filename
+        self.extension = extension
+        self.file_type = file_type
+        self.length = length
+        self.tenant_id = tenant_id
+        self.streamable = streamable
+        self.created_at = created_at if created_at is not None else time.time()
+        self.analyzed = analyzed
+        self.chunks_analyzed = chunks_analyzed
+        self.findings = findings or []
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UploadSession":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "extension": self.extension,
+            "file_type": self.file_type,
+            "length": self.length,
+            "tenant_id": self.tenant_id,
+            "streamable": self.streamable,
+            "created_at": self.created_at,
+            "analyzed": self.analyzed,
+            "chunks_analyzed": self.chunks_analyzed,
+            "findings": self.findings,
+        }
+
+    def early_findings(self) -> List[Finding]:
+        return [Finding.from_dict(finding) for finding in self.findings]
+
+
+def parse_checksum(header: Optional[str]):
+    """
+    A hasher and the digest expected for an ``Upload-Checksum`` header.
+
+    Returns (None, None) when no header was sent.
+
+    Raises:
+        ValueError: If the algorithm is unsupported or the digest is not base64
+    """
+    if not header:
+        return None, None
+    algorithm, _, encoded = header.strip().partition(" ")
+    if algorithm.lower() not in CHECKSUM_ALGORITHMS:
+        raise ValueError(f"Unsupported checksum algorithm: {algorithm}")
+    try:
+        expected = base64.b64decode(encoded.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Checksum is not valid base64")
+    return CHECKSUM_ALGORITHMS[algorithm.lower()](), expected
+
+
+class UploadStore:
+    """
+    Resumable uploads spooled to a shared directory.
+
+    Each upload is a partial file, whose size is the offset the client
+    resumes from, and a JSON session file. Everything lives on disk so any
+    worker can take the next chunk; file locks make sure one request
+    writes to an upload at a time and one worker analyzes it at a time.
+    Uploads not touched for ``ttl`` seconds are removed.
+
+    Each tenant may have ``max_sessions`` uploads in progress, declaring
+    ``max_bytes`` between them; 0 means no limit.
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        ttl: float = 24 * 3600,
+        analyze_bytes: int = 256 * 1024,
+        max_sessions: int = 0,
+        max_bytes: int = 0,
+    ):
+        self.directory = directory or os.path.join(
+            FileHandler.SPOOL_DIRECTORY or tempfile.gettempdir(), "scan_vault_uploads"
+        )
+        self.ttl = ttl
+        # Complete lines of a streamable upload are analyzed once this many bytes are waiting
+        self.analyze_bytes = analyze_bytes
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> "UploadStore":
+        return cls(
+            directory=os.getenv("SCAN_VAULT_UPLOAD_DIR") or None,
+            ttl=float(os.getenv("SCAN_VAULT_UPLOAD_TTL_HOURS", "24")) * 3600,
+            analyze_bytes=int(os.getenv("SCAN_VAULT_UPLOAD_ANALYZE_KB", "256")) * 1024,
+            max_sessions=int(os.getenv("SCAN_VAULT_UPLOAD_MAX_SESSIONS", "20")),
+            max_bytes=int(os.getenv("SCAN_VAULT_UPLOAD_MAX_MB", "2048")) * MB,
+        )
+
+    def _path(self, upload_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}{suffix}")
+
+    def _save(self, session: UploadSession) -> None:
+        # Written aside and renamed, so other workers never read half a file
+        path = self._path(session.id, ".json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(session.to_dict(), f)
+        os.replace(f"{path}.tmp", path)
+
+    def _load(self, upload_id: str) -> UploadSession:
+        try:
+            with open(self._path(upload_id, ".json")) as f:
+                return UploadSession.from_dict(json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            raise UploadNotFoundError(f"Upload {upload_id} not found")
+
+    def create(
+        self,
+        filename: str,
+        extension: str,
+        file_type: str,
+        length: int,
+        tenant_id: Optional[str] = None,
+        streamable: bool = False,
+    ) -> UploadSession:
+        """
+        Start an upload of ``length`` bytes.
+
+        Raises:
+            FileTooLargeError: If the declared length exceeds the limit for the file type
+            UploadQuotaError: If the tenant is at its upload count or byte quota
+        """
+        limit = FileHandler.MAX_FILE_SIZES.get(file_type, FileHandler.DEFAULT_MAX_FILE_SIZE)
+        if length > limit:
+            raise FileTooLargeError(f"File exceeds the {limit // MB} MB limit for {file_type} files")
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.sweep()
+        with self._creating():
+            self._check_quota(tenant_id, length)
+            session = UploadSession(uuid.uuid4().hex, filename, extension, file_type, length, tenant_id, streamable)
+            open(self._path(session.id, ".part"), "wb").close()
+            self._save(session)
+        return session
+
+    @contextmanager
+    def _creating(self) -> Iterator[None]:
+        """Hold the store-wide creation lock, so concurrent creates in any worker see each other."""
+        fd = os.open(os.path.join(self.directory, "create.lock"), os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _check_quota(self, tenant_id: Optional[str], length: int) -> None:
+        if not self.max_sessions and not self.max_bytes:
+            return
+        sessions, reserved = 0, 0
+        for name in os.listdir(self.directory):
+            upload_id, _, suffix = name.partition(".")
+            if suffix != "json" or not _UPLOAD_ID.match(upload_id):
+                continue
+            try:
+                session = self._load(upload_id)
+            except UploadNotFoundError:
+                # Finished or removed since the listing
+                continue
+            if session.tenant_id == tenant_id and not self._expired(upload_id):
+                sessions += 1
+                # Declared lengths, so uploads cannot grow past the quota later
+                reserved += session.length
+        if self.max_sessions and sessions >= self.max_sessions:
+            raise UploadQuotaError(f"At most {self.max_sessions} uploads may be in progress")
+        if self.max_bytes and reserved + length > self.max_bytes:
+            raise UploadQuotaError(
+                f"Uploads in progress may total at most {self.max_bytes // MB} MB; {reserved // MB} MB are in use"
+            )
+
+    def get(self, upload_id: str, tenant_id: Optional[str] = None) -> UploadSession:
+        """
+        Load an upload belonging to ``tenant_id``.
+
+        Raises:
+            UploadNotFoundError: If there is no such upload for this tenant
+        """
+        if not _UPLOAD_ID.match(upload_id):
+            raise UploadNotFoundError(f"Upload {upload_id} not found")
+        session = self._load(upload_id)
+        if session.tenant_id != tenant_id or self._expired(upload_id):
+            raise UploadNotFoundError(f"Upload {upload_id} not found")
+        return session
+
+    def offset(self, session: UploadSession) -> int:
+        """Bytes received so far."""
+        try:
+            return os.path.getsize(self._path(session.id, ".part"))
+        except FileNotFoundError:
+            raise UploadNotFoundError(f"Upload {session.id} not found")
+
+    def expires_at(self, upload_id: str) -> float:
+        return os.path.getmtime(self._path(upload_id, ".json")) + self.ttl
+
+    def _expired(self, upload_id: str) -> bool:
+        try:
+            return self.expires_at(upload_id) < time.time()
+        except FileNotFoundError:
+            return True
+
+    @contextmanager
+    def writing(self, session: UploadSession) -> Iterator[None]:
+        """
+        Hold the upload's write lock.
+
+        Raises:
+            UploadBusyError: If another request holds it, in this worker or another
+        """
+        fd = os.open(self._path(session.id, ".part"), os.O_RDWR)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusyError(f"Upload {session.id} is being written by another request")
+            yield
+        finally:
+            os.close(fd)
+
+    async def append(
+        self,
+        session: UploadSession,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        checksum: Optional[str] = None,
+        sniff: Callable[[bytes, str], None] = None,
+    ) -> int:
+        """
+        Write a chunk at ``offset`` and return the new offset.
+
+        The chunk is discarded if it fails validation. The upload's first
+        ``SNIFF_BYTES`` are checked against its type once they have all
+        arrived, over as many chunks as that takes. A transfer cut off
+        midway keeps the bytes that arrived, so the client resumes from
+        there, unless a checksum was sent: a partial chunk cannot be
+        verified against it.
+
+        Args:
+            session: Upload to write to
+            offset: Offset the client believes the upload is at
+            chunks: The chunk's bytes as they arrive
+            checksum: ``Upload-Checksum`` header, "<algorithm> <base64 digest>"
+            sniff: Callable checking the upload's leading bytes against its type
+
+        Raises:
+            UploadConflictError: If ``offset`` is not the number of bytes received
+            UploadBusyError: If another request is writing to the upload
+            ChecksumMismatchError: If the chunk does not match ``checksum``
+            FileTooLargeError: If the chunk runs past the declared length
+            UnsupportedFileTypeError: If the leading bytes do not match the file type
+        """
+        hasher, expected = parse_checksum(checksum)
+        sniff_length = min(SNIFF_BYTES, session.length) if sniff is not None else 0
+        with self.writing(session):
+            current = self.offset(session)
+            if offset != current:
+                raise UploadConflictError(f"Upload is at offset {current}, not {offset}")
+
+            written = 0
+            with open(self._path(session.id, ".part"), "r+b") as out:
+                # Leading bytes from earlier chunks too short to sniff on their own
+                header = out.read(offset) if offset < sniff_length else b""
+                out.seek(offset)
+                try:
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        if len(header) < sniff_length:
+                            header += chunk[:sniff_length - len(header)]
+                            if len(header) == sniff_length:
+                                # Reject by magic bytes before anything past the header is stored
+                                sniff(header, session.file_type)
+                        if offset + written + len(chunk) > session.length:
+                            raise FileTooLargeError(
+                                f"Chunk runs past the declared length of {session.length} bytes"
+                            )
+                        out.write(chunk)
+                        written += len(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
+                    if hasher is not None and hasher.digest() != expected:
+                        raise ChecksumMismatchError("Chunk does not match its checksum")
+                except UploadInterruptedError:
+                    if hasher is not None:
+                        out.truncate(offset)
+                        written = 0
+                    raise
+                except Exception:
+                    out.truncate(offset)
+                    raise
+                finally:
+                    os.utime(self._path(session.id, ".json"))
+        return offset + written
+
+    def delete(self, session: UploadSession) -> None:
+        self._remove(session.id)
+
+    def _remove(self, upload_id: str) -> None:
+        for suffix in (".part", ".json", ".lock"):
+            FileHandler.delete_file(self._path(upload_id, suffix))
+
+    def sweep(self) -> int:
+        """Remove uploads not touched within the TTL; returns how many."""
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            upload_id, _, suffix = name.partition(".")
+            if suffix == "json" and _UPLOAD_ID.match(upload_id) and self._expired(upload_id):
+                self._remove(upload_id)
+                removed += 1
+        if removed:
+            logger.info("Removed %s expired upload(s)", removed)
+        return removed
+
+    def spooled(self, session: UploadSession) -> SpooledUpload:
+        """The complete upload as a spooled file; closing it deletes the bytes."""
+        return SpooledUpload(
+            self._path(session.id, ".part"), session.filename, session.file_type, session.length, session.extension
+        )
+
+    @asynccontextmanager
+    async def _analyzing(self, session: UploadSession, wait: bool) -> AsyncIterator[bool]:
+        """Hold the upload's analysis lock; yields False when busy and not waiting."""
+        fd = os.open(self._path(session.id, ".lock"), os.O_RDWR | os.O_CREAT)
+        try:
+            held = True
+            if wait:
+                await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            else:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    held = False
+            yield held
+        finally:
+            os.close(fd)
+
+    async def analyze_received(
+        self,
+        session: UploadSession,
+        analyze: Callable[[str], Awaitable[List[Finding]]],
+        final: bool = False,
+    ) -> UploadSession:
+        """
+        Analyze the part of a streamable upload received since the last pass.
+
+        Before the upload is complete, complete lines are analyzed in pieces
+        of about ``analyze_bytes`` once that many are waiting, and a pass
+        already running in any worker is left to it. The final pass waits
+        for a running one and analyzes everything that remains. Progress is
+        saved after each piece, so a failed call only loses that piece.
+
+        Returns:
+            UploadSession: The session with the analysis done so far
+
+        Raises:
+            UnsupportedFileTypeError: If the upload is not valid UTF-8
+        """
+        async with self._analyzing(session, wait=final) as held:
+            if not held:
+                return session
+            session = self._load(session.id)
+            end = self.offset(session)
+            while end > session.analyzed:
+                remaining = end - session.analyzed
+                with open(self._path(session.id, ".part"), "rb") as f:
+                    f.seek(session.analyzed)
+                    if final:
+                        data = f.read(remaining)
+                    else:
+                        if remaining < self.analyze_bytes:
+                            break
+                        data = f.read(self.analyze_bytes)
+                        while b"\n" not in data and len(data) < remaining:
+                            # A line longer than a piece is analyzed whole
+                            data += f.read(min(remaining - len(data), self.analyze_bytes))
+                        # Cut after a newline, which never falls inside a UTF-8 sequence
+                        data = data[:data.rfind(b"\n") + 1]
+                        if not data:
+                            break
+                try:
+                    text = data.decode("utf-8")
+                except UnicodeDecodeError as e:
+                    raise UnsupportedFileTypeError(
+                        f"Upload is not UTF-8 text (invalid byte at offset {session.analyzed + e.start})"
+                    )
+                findings = await analyze(text) if text.strip() else []
+                session.findings.extend(finding.to_dict() for finding in findings)
+                session.analyzed += len(data)
+                session.chunks_analyzed += 1
+                self._save(session)
+            return session
+
+
+upload_store = UploadStore.from_env()
@@ -0,0 +1,64 @@
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher.
+
+    Builds an automaton over all patterns once, then finds every occurrence
+    of every pattern in a single pass over the text, in time linear in the
+    text length plus the number of matches.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, index: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Inherit matches ending at the failure target
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield every match as ``(start, end, pattern_index)``.
+
+        Overlapping matches are all reported, ordered by end position.
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                end = position + 1
+                yield end - len(patterns[index]), end, index
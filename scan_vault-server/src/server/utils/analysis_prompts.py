@@ -1,5 +1,11 @@
 class AnalysisPrompts:
-    """Collection of prompts for different types of analysis."""
+    """
+    Collection of prompts for different types of analysis.
+
+    These are the raw texts; the prompt registry versions them and lays them
+    out for the model, so edit a prompt by registering a new version rather
+    than changing one that is live.
+    """
     
     TEXT_ANALYSIS = """
            Analyze this image and extract sensitive information, classifying it into the following categories:
@@ -107,4 +113,32 @@ class AnalysisPrompts:
         .
     """
 
-    SYSTEM_ROLE = "You are a data security expert specializing in identifying sensitive information."
\ No newline at end of file
+    SYSTEM_ROLE = "You are a data security expert specializing in identifying sensitive information."
+
+    BATCH_ANALYSIS = """
+        The content below holds several separate documents. Each starts with a
+        line <<<DOCUMENT n>>> and ends with a line <<<END DOCUMENT n>>>, where n
+        is the document number. Analyze every document on its own and return a
+        single list of findings for all of them. Add a "document" field to each
+        finding holding the number of the document it was found in.
+    """
+
+    COMPACT_ANALYSIS = """
+        Find sensitive information in the content and classify each item:
+        - PII: names, SSNs, dates of birth, driver's license, passport, PAN card and
+          other government ID numbers, email addresses, phone numbers, physical
+          addresses, biometric data
+        - PHI: medical record numbers, patient IDs, diagnoses, test results,
+          medications, treatment plans, health insurance IDs, visit details,
+          doctor's notes, mental health information
+        - PCI: card numbers, expiration dates, CVV codes, cardholder names, bank
+          account and routing numbers, transaction details, payment history,
+          billing addresses, digital wallet information
+
+        Return only a JSON list, one object per item, with the value exactly as it
+        appears (never redacted):
+        [{"type": "phone_number", "value": "555-123-4567", "confidence": "high",
+          "context": "Contact information section", "category": "PII"}]
+        confidence is high, medium or low; context says where the item was found.
+        Return [] when nothing is found.
+    """
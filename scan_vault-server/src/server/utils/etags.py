@@ -0,0 +1,29 @@
+from typing import Optional
+import hashlib
+
+
+def weak_etag(tag: str) -> str:
+    """Weak validator; stays valid whatever content coding the body is sent with."""
+    return f'W/"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def detection_etag(detection: dict) -> str:
+    """ETag of a saved detection; detections are never edited, so ID and save time identify the content."""
+    timestamp = detection.get("timestamp")
+    stamp = timestamp.isoformat() if hasattr(timestamp, "isoformat") else str(timestamp)
+    digest = hashlib.sha1(f"{detection.get('id')}|{stamp}".encode("utf-8")).hexdigest()[:20]
+    return weak_etag(digest)
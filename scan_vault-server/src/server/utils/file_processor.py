@@ -1,78 +1,110 @@
-from typing import Optional
-import pdfplumber
-import pandas as pd
-from io import BytesIO
+from typing import Iterator, List, Optional
 import logging
+import struct
+
+from src.server.extractors.registry import ExtractorRegistry, registry as default_registry
+from src.server.extractors.scheduler import run_extractor
+from src.server.services.file_handler import UnsupportedFileTypeError
 
 logger = logging.getLogger(__name__)
 
 class FileProcessor:
     """Utility class for processing different file types."""
 
-    SUPPORTED_EXTENSIONS = {
-        "txt": "text",
-        "pdf": "pdf",
-        "csv": "csv",
-        "docx": "docx",
-        "jpg": "image",
-        "jpeg": "image",
-        "png": "image",
-        "bmp": "image"
+    # Images are sent to the vision model as-is rather than extracted
+    IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "bmp")
+
+    # Leading bytes identifying binary formats
+    MAGIC_NUMBERS = {
+        b"%PDF-": "pdf",
+        b"PK\x03\x04": "zip",
+        b"\xff\xd8\xff": "image",
+        b"\x89PNG\r\n\x1a\n": "image",
+        b"\x1f\x8b": "gzip",
+        b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1": "ole",
     }
 
-    async def process_file(self, file, file_extension: str) -> Optional[str]:
-        """Process file based on its extension."""
-        if file_extension not in self.SUPPORTED_EXTENSIONS:
+    # "BM" alone starts ordinary text ("BMI,age"), so BMP also needs a known
+    # DIB header size after the 14-byte file header
+    BMP_MAGIC = b"BM"
+    BMP_DIB_HEADER_SIZES = (12, 40, 52, 56, 64, 108, 124)
+
+    def __init__(self, registry: ExtractorRegistry = None):
+        self.registry = registry or default_registry
+
+    async def process_file(self, upload, file_extension: str) -> Optional[str]:
+        """Process a spooled upload based on its extension."""
+        pages = await self.extract_pages(upload, file_extension)
+        return " ".join(page for page in pages if page)
+
+    async def extract_pages(self, upload, file_extension: str) -> List[str]:
+        """Extract the text of a spooled upload, one entry per page."""
+        if not self.registry.supports(file_extension):
             raise ValueError(f"Unsupported file type: {file_extension}")
 
-        processors = {
-            "txt": self._process_text,
-            "pdf": self._process_pdf,
-            "csv": self._process_csv,
-            "docx": self._process_docx
-        }
+        return await run_extractor(self.registry.get(file_extension), upload.path)
 
-        processor = processors.get(file_extension)
-        if not processor:
-            raise ValueError(f"No processor found for {file_extension}")
+    def iter_pages(self, upload, file_extension: str) -> Iterator[str]:
+        """Yield page text lazily, in the calling thread, so callers can stop early."""
+        if not self.registry.supports(file_extension):
+            raise ValueError(f"Unsupported file type: {file_extension}")
 
-        return await processor(file)
+        return self.registry.get(file_extension).iter_pages(upload.path)
 
     def get_file_extension(self, filename: str) -> str:
         """Extract and validate file extension."""
         try:
             extension = filename.split(".")[-1].lower()
-            if extension not in self.SUPPORTED_EXTENSIONS:
+            if extension not in self.IMAGE_EXTENSIONS and not self.registry.supports(extension):
                 raise ValueError(f"Unsupported file type: {extension}")
             return extension
         except Exception as e:
-            logger.error(f"Error extracting file extension: {e}")
+            logger.error("Error extracting file extension: %s", e)
             raise ValueError("Invalid filename")
 
-    async def _process_text(self, file) -> str:
-        """Process text file."""
-        content = await file.read()
-        return content.decode("utf-8")
-
-    async def _process_pdf(self, file) -> str:
-        """Process PDF file."""
-        content = []
-        with pdfplumber.open(file.file) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    content.append(text)
-        return " ".join(content)
-
-    async def _process_csv(self, file) -> str:
-        """Process CSV file."""
-        content = await file.read()
-        df = pd.read_csv(BytesIO(content))
-        return df.to_string(index=False)
-
-    async def _process_docx(self, file) -> str:
-        """Process DOCX file."""
-        from docx import Document
-        content = await file.read()
-        doc = Document(BytesIO(content))
-        return " ".join([para.text for para in doc.paragraphs]) 
\ No newline at end of file
+    def get_file_type(self, file_extension: str) -> str:
+        """Map a validated extension to its file type."""
+        if file_extension in self.IMAGE_EXTENSIONS:
+            return "image"
+        return self.registry.get(file_extension).file_type
+
+    def is_streamable(self, file_extension: str) -> bool:
+        """Whether a file can be analyzed piece by piece while it is still arriving."""
+        if file_extension in self.IMAGE_EXTENSIONS:
+            return False
+        return self.registry.get(file_extension).streamable
+
+    def sniff_file_type(self, header: bytes, file_type: str) -> None:
+        """
+        Check the first bytes of an upload against its declared type.
+
+        Args:
+            header (bytes): Leading bytes of the upload
+            file_type (str): Type implied by the file extension
+
+        Raises:
+            UnsupportedFileTypeError: If the content does not match the declared type
+        """
+        if file_type == "image":
+            accepted = self.is_bmp(header) or any(
+                header.startswith(magic) for magic, kind in self.MAGIC_NUMBERS.items() if kind == "image"
+            )
+        else:
+            extractors = self.registry.for_file_type(file_type)
+            accepted = any(extractor.matches(header) for extractor in extractors)
+            if accepted and not any(extractor.signatures for extractor in extractors):
+                # Text formats have no signature of their own; reject known binary content
+                accepted = not (header.startswith(tuple(self.MAGIC_NUMBERS)) or self.is_bmp(header))
+
+        if not accepted:
+            raise UnsupportedFileTypeError(
+                f"File content does not match its extension (expected {file_type})"
+            )
+
+    @classmethod
+    def is_bmp(cls, header: bytes) -> bool:
+        """Whether the header is a BMP file header followed by a DIB header."""
+        if len(header) < 18 or not header.startswith(cls.BMP_MAGIC):
+            return False
+        _, _, pixel_offset, dib_size = struct.unpack_from("<IIII", header, 2)
+        return dib_size in cls.BMP_DIB_HEADER_SIZES and pixel_offset >= 14 + dib_size
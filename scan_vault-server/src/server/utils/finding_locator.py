@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional
+import logging
+
+from src.server.models.finding import Finding, Location
+from src.server.utils.aho_corasick import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+class FindingLocator:
+    """Resolves finding values to page, character offsets and PDF bounding boxes."""
+
+    # Common values (names, dates) can repeat thousands of times; cap the payload
+    MAX_LOCATIONS_PER_FINDING = 100
+
+    def locate(self, findings: List[Finding], pages: List[str], pdf_path: Optional[str] = None) -> List[Finding]:
+        """
+        Set the ``locations`` of each finding.
+
+        All values are matched together in one Aho-Corasick pass over the
+        extracted pages. Offsets are relative to the page text; for PDFs each
+        location also gets a ``bbox`` of ``[x0, top, x1, bottom]`` in PDF points.
+        Findings with the same value share their Location objects.
+
+        Args:
+            findings (List[Finding]): Findings returned by the model; updated in place
+            pages (List[str]): Extracted text, one entry per page
+            pdf_path (Optional[str]): Source PDF, used to resolve bounding boxes
+
+        Returns:
+            List[Finding]: The same findings with locations attached
+        """
+        patterns: List[str] = []
+        pattern_index: Dict[str, int] = {}
+        finding_patterns = []
+        for finding in findings:
+            value = finding.value if isinstance(finding, Finding) else None
+            key = self._fold(str(value).strip()) if value not in (None, "") else ""
+            if key and key not in pattern_index:
+                pattern_index[key] = len(patterns)
+                patterns.append(key)
+            finding_patterns.append(pattern_index.get(key))
+
+        locations: List[List[Location]] = [[] for _ in patterns]
+        if patterns:
+            automaton = AhoCorasick(patterns)
+            for page_number, text in enumerate(pages, start=1):
+                for start, end, index in automaton.finditer(self._fold(text)):
+                    if len(locations[index]) >= self.MAX_LOCATIONS_PER_FINDING:
+                        continue
+                    if not self._on_word_boundary(text, start, end):
+                        continue
+                    locations[index].append(Location(page_number, start, end))
+
+            if pdf_path and any(locations):
+                self._add_pdf_boxes(pdf_path, pages, locations)
+
+        for finding, index in zip(findings, finding_patterns):
+            if isinstance(finding, Finding):
+                finding.locations = locations[index] if index is not None else []
+        return findings
+
+    @staticmethod
+    def _fold(text: str) -> str:
+        """Lower-case text without changing its length, so offsets stay valid."""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        return "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+    @staticmethod
+    def _on_word_boundary(text: str, start: int, end: int) -> bool:
+        """Reject matches inside a longer word, e.g. "John" in "Johnson"."""
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def _add_pdf_boxes(self, pdf_path: str, pages: List[str], locations: List[List[Location]]) -> None:
+        """Map text offsets back to pdfplumber chars for pages that have matches."""
+        import pdfplumber
+
+        by_page: Dict[int, List[Location]] = {}
+        for page_locations in locations:
+            for location in page_locations:
+                by_page.setdefault(location.page, []).append(location)
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_number, page_locations in by_page.items():
+                page = pdf.pages[page_number - 1]
+                textmap = page.get_textmap()
+                # extract_text renders the same text map, so offsets line up char for char
+                if textmap.as_string != pages[page_number - 1]:
+                    logger.warning("Text map mismatch on page %s, skipping bounding boxes", page_number)
+                    page.close()
+                    continue
+                for location in page_locations:
+                    chars = [
+                        obj for _, obj in textmap.tuples[location.start:location.end]
+                        if obj is not None
+                    ]
+                    if chars:
+                        location.bbox = [
+                            round(min(char["x0"] for char in chars), 2),
+                            round(min(char["top"] for char in chars), 2),
+                            round(max(char["x1"] for char in chars), 2),
+                            round(max(char["bottom"] for char in chars), 2),
+                        ]
+                page.close()
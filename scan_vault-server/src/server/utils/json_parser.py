@@ -1,14 +1,25 @@
 import json
 import logging
-from typing import Dict
+from typing import Dict, List
+
+from src.server.models.finding import Finding
 
 logger = logging.getLogger(__name__)
 
 class JSONParser:
     """Utility class for parsing and validating JSON responses."""
     
-    def parse_gpt_response(self, response: str) -> Dict:
+    def parse_gpt_response(self, response: str) -> List[Finding]:
         """Parse and validate GPT response."""
+        return [Finding.from_dict(item) for item in self.parse_json_list(response) if isinstance(item, dict)]
+
+    def parse_json_list(self, response: str, strict: bool = False) -> List:
+        """
+        Parse the JSON list in a model response, keeping its items as-is.
+
+        An unparseable response reads as no findings, unless ``strict`` is
+        set, in which case it raises ValueError so the caller can retry.
+        """
         try:
             # Clean the response string
             json_content = self._extract_json_content(response)
@@ -16,13 +27,20 @@ class JSONParser:
             # Parse JSON
             result = json.loads(json_content)
             
-            # Convert flat array to categorized structure
+            if not isinstance(result, list):
+                logger.warning("GPT response is not a list of findings")
+                if strict:
+                    raise ValueError("Model response is not a list of findings")
+                return []
             return result
             
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse GPT response: {e}")
-            logger.debug(f"Problematic response: {response}")
-            return self._get_empty_result()
+            logger.error("Failed to parse GPT response: %s", e)
+            # Never log the response itself; it can hold the values it was meant to find
+            logger.debug("Unparseable response was %d characters", len(response))
+            if strict:
+                raise ValueError("Model response is not valid JSON") from e
+            return []
 
     def _extract_json_content(self, response: str) -> str:
         """Extract JSON content from response string."""
@@ -47,11 +65,11 @@ class JSONParser:
             return content
             
         except Exception as e:
-            logger.error(f"Error extracting JSON content: {e}")
+            logger.error("Error extracting JSON content: %s", e)
             return response.strip()
 
-    def _categorize_results(self, results: list) -> Dict:
-        """Organize flat array results into categories."""
+    def _categorize_results(self, results: List[Finding]) -> Dict:
+        """Organize flat array results into categories; findings are grouped, not copied."""
         categorized = {
             "pii": [],
             "phi": [],
@@ -59,13 +77,10 @@ class JSONParser:
         }
         
         for item in results:
-            if isinstance(item, dict) and "category" in item:
-                category = item["category"].lower()
+            if isinstance(item, Finding) and item.category is not None:
+                category = str(item.category).lower()
                 if category in categorized:
-                    # Remove the category field since it's now implicit
-                    item_copy = item.copy()
-                    item_copy.pop("category", None)
-                    categorized[category].append(item_copy)
+                    categorized[category].append(item)
         
         return categorized
 
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+import os
+import random
+import zlib
+
+from src.server.utils.analysis_prompts import AnalysisPrompts
+
+logger = logging.getLogger(__name__)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Traffic weights per prompt version from ``v1=90,v2=10``; a bare name weighs 1."""
+    weights = {}
+    for pair in spec.split(","):
+        version, _, weight = pair.partition("=")
+        if version.strip():
+            weights[version.strip()] = float(weight) if weight.strip() else 1.0
+    return weights
+
+
+@dataclass(frozen=True)
+class PromptVersion:
+    """
+    One version of the analysis prompts, laid out for prefix caching.
+
+    ``system`` holds the role and all instructions and goes first in every
+    request, so consecutive calls share a byte-identical prefix the provider
+    can cache; document text or images always follow it. ``batch_system``
+    extends the same prefix, so packed batches reuse the cached part too.
+    """
+
+    version: str
+    system: str
+    batch_system: str
+
+    @classmethod
+    def build(cls, version: str, instructions: str) -> "PromptVersion":
+        system = f"{AnalysisPrompts.SYSTEM_ROLE}\n\n{instructions}"
+        return cls(version, system, f"{system}\n\n{AnalysisPrompts.BATCH_ANALYSIS}")
+
+
+class PromptStats:
+    """Calls, latency and token usage of one prompt version in this worker."""
+
+    __slots__ = ("calls", "latency_seconds", "prompt_tokens", "cached_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.calls = 0
+        self.latency_seconds = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, elapsed: float, usage) -> None:
+        self.calls += 1
+        self.latency_seconds += elapsed
+        if usage is None:
+            return
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_tokens += getattr(details, "cached_tokens", 0) or 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "latency_seconds": self.latency_seconds,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hit_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+        }
+
+
+class PromptRegistry:
+    """
+    Registered prompt versions and the traffic split between them.
+
+    With more than one version weighted, each tenant is pinned to one of
+    them by a hash of its ID, which keeps that tenant's calls on a single
+    cached prefix; calls outside a tenant are split at random. Compare
+    versions on the per-version latency and token counters in /metrics.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, PromptVersion] = {}
+        self._stats: Dict[str, PromptStats] = {}
+        self._weights: Dict[str, float] = {}
+
+    def register(self, prompt: PromptVersion) -> PromptVersion:
+        self._versions[prompt.version] = prompt
+        self._stats.setdefault(prompt.version, PromptStats())
+        return prompt
+
+    def set_weights(self, weights: Dict[str, float]) -> None:
+        """Split traffic between registered versions in proportion to ``weights``."""
+        unknown = set(weights) - set(self._versions)
+        if unknown:
+            logger.warning("Ignoring unregistered prompt versions: %s", ", ".join(sorted(unknown)))
+        self._weights = {version: weight for version, weight in weights.items() if version in self._versions and weight > 0}
+
+    def get(self, version: str) -> PromptVersion:
+        return self._versions[version]
+
+    def select(self, key: Optional[str] = None) -> PromptVersion:
+        """The prompt version for a call; the same ``key`` always gets the same version."""
+        weights = self._weights or {next(iter(self._versions)): 1.0}
+        if len(weights) == 1:
+            return self._versions[next(iter(weights))]
+        point = (zlib.crc32(key.encode()) / 0xFFFFFFFF) if key is not None else random.random()
+        point *= sum(weights.values())
+        for version, weight in weights.items():
+            point -= weight
+            if point <= 0:
+                break
+        return self._versions[version]
+
+    def record(self, version: str, elapsed: float, usage) -> None:
+        """Count a completed call against the version it used."""
+        self._stats[version].record(elapsed, usage)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {version: stats.as_dict() for version, stats in self._stats.items()}
+
+
+prompt_registry = PromptRegistry()
+# v1 keeps the original wording so its output matches what was shipped before versioning
+prompt_registry.register(PromptVersion.build("v1", AnalysisPrompts.TEXT_ANALYSIS))
+prompt_registry.register(PromptVersion.build("v2", AnalysisPrompts.COMPACT_ANALYSIS))
+prompt_registry.set_weights(parse_weights(os.getenv("SCAN_VAULT_PROMPT_VERSIONS", "v1")))
@@ -0,0 +1,350 @@
+from typing import Dict, Iterable, List, Optional, Pattern
+import codecs
+import logging
+import re
+
+from src.server.models.finding import Finding
+
+logger = logging.getLogger(__name__)
+
+# Lines or CSV rows are processed in batches so memory stays bounded
+CSV_CHUNK_ROWS = 10000
+TEXT_CHUNK_SIZE = 1024 * 1024
+
+# WordprocessingML element names, in the form lxml reports them
+W_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_PARAGRAPH = W_NAMESPACE + "p"
+# Text, deleted text kept for tracked changes, and field codes such as link targets
+W_TEXT_TAGS = (W_NAMESPACE + "t", W_NAMESPACE + "delText", W_NAMESPACE + "instrText")
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+class Redactor:
+    """Writes sanitized copies of spooled files with detected values masked."""
+
+    MASK = "[REDACTED]"
+    PDF_RESOLUTION = 150
+
+    @staticmethod
+    def finding_values(findings: Iterable[Finding]) -> List[str]:
+        """Distinct non-empty finding values, longest first."""
+        values = {
+            str(finding.value).strip()
+            for finding in findings
+            if isinstance(finding, Finding) and finding.value not in (None, "")
+        }
+        values.discard("")
+        return sorted(values, key=len, reverse=True)
+
+    def build_pattern(self, findings: Iterable[Finding], wrapped: bool = False) -> Optional[Pattern]:
+        """
+        Compile one alternation matching every finding value.
+
+        Longer values come first so a value containing another is masked whole.
+        With ``wrapped``, a value may also be broken by whitespace between any
+        two characters, as in text laid out on a page where it wraps onto the
+        next line.
+        """
+        values = self.finding_values(findings)
+        if not values:
+            return None
+        if wrapped:
+            alternatives = (
+                r"\s+".join(r"\s*".join(re.escape(char) for char in word) for word in value.split())
+                for value in values
+            )
+        else:
+            alternatives = (re.escape(value) for value in values)
+        return re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def redact_file(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """
+        Write a redacted copy of a spooled upload.
+
+        Args:
+            upload: SpooledUpload to redact
+            output_path (str): Where to write the redacted file
+            findings (List[Finding]): Findings whose values should be masked
+
+        Returns:
+            int: Number of masked occurrences
+
+        Raises:
+            ValueError: If the file type cannot be redacted
+        """
+        redactors = {
+            "txt": self._redact_text,
+            "csv": self._redact_csv,
+            "docx": self._redact_docx,
+            "pdf": self._redact_pdf,
+            "jpg": self._redact_image,
+            "jpeg": self._redact_image,
+            "png": self._redact_image,
+            "bmp": self._redact_image,
+        }
+        redactor = redactors.get(upload.extension)
+        if not redactor:
+            raise ValueError(f"No redactor found for {upload.extension}")
+
+        return redactor(upload, output_path, findings)
+
+    def _redact_text(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """Mask values in a text file, streaming it in chunks."""
+        pattern = self.build_pattern(findings)
+        values = self.finding_values(findings)
+        count = 0
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        # A match starting this far before the end of what has been read is
+        # settled: every value fits in the text after it. Later matches wait
+        # for the next chunk, so a shorter value is never masked where a
+        # longer one continues past the boundary.
+        overlap = max(len(values[0]) - 1, 0) if values else 0
+        pending = ""
+        with open(upload.path, "rb") as source, open(output_path, "w", encoding="utf-8") as out:
+            while True:
+                raw = source.read(TEXT_CHUNK_SIZE)
+                final = not raw
+                pending += decoder.decode(raw, final=final)
+                settled = len(pending) if final else max(len(pending) - overlap, 0)
+                written = 0
+                if pattern:
+                    for match in pattern.finditer(pending):
+                        if match.start() >= settled:
+                            break
+                        out.write(pending[written:match.start()])
+                        out.write(self.MASK)
+                        written = match.end()
+                        count += 1
+                keep = max(settled, written)
+                out.write(pending[written:keep])
+                pending = pending[keep:]
+                if final:
+                    break
+        return count
+
+    def _redact_csv(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """
+        Mask values column by column with vectorized string replacement.
+
+        The first line is read as a row like any other, as CsvExtractor
+        reads it: a headerless CSV starts with data, and a header row can
+        hold values too.
+        """
+        import pandas as pd
+
+        pattern = self.build_pattern(findings)
+        count = 0
+        mode = "w"
+        try:
+            chunks = pd.read_csv(upload.path, header=None, dtype=str, keep_default_na=False, chunksize=CSV_CHUNK_ROWS)
+        except pd.errors.EmptyDataError:
+            chunks = []
+        for chunk in chunks:
+            if pattern:
+                for column in chunk.columns:
+                    values = chunk[column]
+                    count += int(values.str.count(pattern).sum())
+                    chunk[column] = values.str.replace(pattern, self.MASK, regex=True)
+            chunk.to_csv(output_path, mode=mode, header=False, index=False)
+            mode = "a"
+        if mode == "w":
+            # Empty input
+            open(output_path, "w").close()
+        return count
+
+    def _redact_docx(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """
+        Mask values paragraph by paragraph, keeping the formatting of each run.
+
+        Word splits text into runs wherever formatting, spell checking or
+        revisions change, so values are matched against a paragraph's joined
+        text and masked in every run they cover. Body, tables, text boxes,
+        headers and footers are all paragraphs in the parts python-docx
+        loads. A value still present anywhere afterwards, such as in a
+        footnote or a hyperlink target, fails the redaction rather than
+        returning a copy that is only partly masked.
+        """
+        from docx import Document
+
+        pattern = self.build_pattern(findings)
+        doc = Document(upload.path)
+        count = 0
+        if pattern:
+            for part in doc.part.package.iter_parts():
+                element = getattr(part, "element", None)
+                if element is None:
+                    continue
+                for paragraph in element.iter(W_PARAGRAPH):
+                    count += self._redact_paragraph(paragraph, pattern)
+            self._check_docx(doc, pattern)
+        doc.save(output_path)
+        return count
+
+    def _redact_paragraph(self, paragraph, pattern: Pattern) -> int:
+        """Mask matches in the joined text of a paragraph, returning how many."""
+        nodes = self._paragraph_text_nodes(paragraph)
+        text = "".join(node.text or "" for node in nodes)
+        matches = list(pattern.finditer(text))
+        if not matches:
+            return 0
+
+        starts = []
+        offset = 0
+        for node in nodes:
+            starts.append(offset)
+            offset += len(node.text or "")
+        # Back to front, so the offsets of earlier matches stay valid
+        for match in reversed(matches):
+            first = True
+            for node, start in zip(nodes, starts):
+                value = node.text or ""
+                end = start + len(value)
+                if end <= match.start() or start >= match.end():
+                    continue
+                local_start = max(match.start(), start) - start
+                local_end = min(match.end(), end) - start
+                # The first run covered takes the mask; the others lose their part of the value
+                node.text = value[:local_start] + (self.MASK if first else "") + value[local_end:]
+                node.set(XML_SPACE, "preserve")
+                first = False
+        return len(matches)
+
+    def _check_docx(self, doc, pattern: Pattern) -> None:
+        """Raise if a value is left in any text or hyperlink target of the document."""
+        from lxml import etree
+
+        for part in doc.part.package.iter_parts():
+            element = getattr(part, "element", None)
+            if element is None:
+                if not part.content_type.endswith("+xml") or not str(part.partname).startswith("/word/"):
+                    continue
+                # Footnotes, endnotes and other parts python-docx keeps as raw XML
+                element = etree.fromstring(part.blob)
+            for paragraph in element.iter(W_PARAGRAPH):
+                text = "".join(node.text or "" for node in self._paragraph_text_nodes(paragraph))
+                if pattern.search(text):
+                    raise ValueError(f"A detected value could not be masked in {part.partname}")
+            for relationship in part.rels.values():
+                if relationship.is_external and pattern.search(relationship.target_ref):
+                    raise ValueError(f"A detected value could not be masked in a link in {part.partname}")
+
+    @staticmethod
+    def _paragraph_text_nodes(paragraph) -> List:
+        """Text nodes of a paragraph itself, not of one nested in it such as a text box."""
+        return [
+            node for node in paragraph.iter(*W_TEXT_TAGS)
+            if next(node.iterancestors(W_PARAGRAPH), None) is paragraph
+        ]
+
+    def _redact_pdf(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """
+        Rasterize each page and draw boxes over matched characters.
+
+        Pages are rendered to images so the original text layer is not carried
+        into the output; an overlay on the original PDF would leave the values
+        extractable. Each page is appended to the output as it is rendered.
+        Values are matched across line breaks, as they wrap in the layout.
+        """
+        import pdfplumber
+        from PIL import ImageDraw
+
+        pattern = self.build_pattern(findings, wrapped=True)
+        count = 0
+        with pdfplumber.open(upload.path) as pdf:
+            for index, page in enumerate(pdf.pages):
+                matches = page.search(pattern, return_groups=False) if pattern else []
+                count += len(matches)
+                scale = self.PDF_RESOLUTION / 72
+                image = page.to_image(resolution=self.PDF_RESOLUTION).original.convert("RGB")
+                draw = ImageDraw.Draw(image)
+                for match in matches:
+                    # One box per line, so a wrapped value does not black out
+                    # the rest of both lines
+                    for x0, top, x1, bottom in self._line_boxes(match["chars"]):
+                        draw.rectangle(
+                            [
+                                (x0 - page.bbox[0]) * scale,
+                                (top - page.bbox[1]) * scale,
+                                (x1 - page.bbox[0]) * scale,
+                                (bottom - page.bbox[1]) * scale,
+                            ],
+                            fill="black",
+                        )
+                image.save(output_path, "PDF", resolution=self.PDF_RESOLUTION, append=index > 0)
+                image.close()
+                page.close()
+        return count
+
+    @staticmethod
+    def _line_boxes(chars: List[Dict]) -> List[tuple]:
+        """Bounding boxes of the characters of a match, one per line they are on."""
+        boxes: List[list] = []
+        for char in chars:
+            box = boxes[-1] if boxes else None
+            if box is not None and abs(char["top"] - box[1]) < (char["bottom"] - char["top"]) / 2:
+                box[0] = min(box[0], char["x0"])
+                box[2] = max(box[2], char["x1"])
+                box[3] = max(box[3], char["bottom"])
+            else:
+                boxes.append([char["x0"], char["top"], char["x1"], char["bottom"]])
+        return [tuple(box) for box in boxes]
+
+    def _redact_image(self, upload, output_path: str, findings: List[Finding]) -> int:
+        """Draw boxes over matched words located by OCR."""
+        try:
+            import pytesseract
+        except ImportError:
+            raise ValueError("Image redaction requires pytesseract to be installed")
+        from PIL import Image, ImageDraw
+
+        pattern = self.build_pattern(findings)
+        count = 0
+        with Image.open(upload.path) as source:
+            image = source.convert("RGB")
+        if pattern:
+            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            draw = ImageDraw.Draw(image)
+            for line in self._ocr_lines(data):
+                text = " ".join(word["text"] for word in line)
+                for match in pattern.finditer(text):
+                    boxes = self._words_in_span(line, match.start(), match.end())
+                    if not boxes:
+                        continue
+                    count += 1
+                    draw.rectangle(
+                        [
+                            min(word["left"] for word in boxes),
+                            min(word["top"] for word in boxes),
+                            max(word["left"] + word["width"] for word in boxes),
+                            max(word["top"] + word["height"] for word in boxes),
+                        ],
+                        fill="black",
+                    )
+        image.save(output_path, format=Image.registered_extensions().get(f".{upload.extension}", "PNG"))
+        return count
+
+    @staticmethod
+    def _ocr_lines(data: Dict) -> Iterable[List[Dict]]:
+        """Group tesseract word boxes into lines with their character offsets."""
+        lines: Dict[tuple, List[Dict]] = {}
+        for i, text in enumerate(data["text"]):
+            if not text.strip():
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append({
+                "text": text,
+                "left": data["left"][i],
+                "top": data["top"][i],
+                "width": data["width"][i],
+                "height": data["height"][i],
+            })
+        for words in lines.values():
+            offset = 0
+            for word in words:
+                word["start"] = offset
+                offset += len(word["text"]) + 1
+            yield words
+
+    @staticmethod
+    def _words_in_span(line: List[Dict], start: int, end: int) -> List[Dict]:
+        return [word for word in line if word["start"] < end and word["start"] + len(word["text"]) > start]
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    # Firestore returns DatetimeWithNanoseconds, a datetime subclass orjson rejects
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ScanVaultJSONResponse(ORJSONResponse):
+    """orjson-backed response that also serializes Firestore timestamps and models."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
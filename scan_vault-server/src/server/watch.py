@@ -0,0 +1,54 @@
+"""
+Directory watcher daemon.
+
+Scans new and modified files under the given directories as they change
+and saves their findings as detections. Run one per set of directories,
+next to the API server rather than inside its workers, so each change is
+scanned once.
+
+Usage (from the server directory):
+    python -m src.server.watch /mnt/shared /srv/documents
+    SCAN_VAULT_WATCH_PATHS=/mnt/shared:/srv/documents python -m src.server.watch
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from typing import List
+
+from src.server.services.directory_watcher import DirectoryWatcher
+from src.server.services.scan_service import ScanService
+from src.utils.logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+async def watch(paths: List[str], poll: bool) -> None:
+    scan_service = ScanService()
+    # Built inside the running loop, which its queues and events belong to
+    watcher = DirectoryWatcher.from_env(scan_service, paths)
+    if poll:
+        watcher.use_inotify = False
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, watcher.stop)
+
+    await scan_service.llm_handler.warm()
+    try:
+        await watcher.run()
+    finally:
+        watcher.index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Directories to watch; defaults to SCAN_VAULT_WATCH_PATHS")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify")
+    args = parser.parse_args()
+    asyncio.run(watch(args.paths, args.poll))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from uvicorn.workers import UvicornWorker
+
+
+class ScanVaultWorker(UvicornWorker):
+    """Gunicorn worker running the ASGI app on uvloop with the httptools parser."""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+    }
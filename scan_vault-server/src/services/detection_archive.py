@@ -0,0 +1,253 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed once partitions are archived
+    pa = pafs = pq = None
+
+# Detection IDs start with the month they belong to, e.g. "2024-03_Xk3...", so
+# a detection is found without asking which partition holds it
+_PARTITION_PREFIX = re.compile(r"^(\d{4}-\d{2})_")
+
+# Top-level detection fields stored as their own columns; anything else is kept as JSON
+_COLUMNS = ("id", "fileName", "timestamp", "createdAt", "sensitiveInfo")
+
+
+def month_of(moment: datetime) -> str:
+    """Partition key for a moment, as YYYY-MM."""
+    return moment.strftime("%Y-%m")
+
+
+def partition_of(detection_id: str) -> Optional[str]:
+    """Partition a detection ID belongs to; None for IDs saved before partitioning."""
+    match = _PARTITION_PREFIX.match(detection_id or "")
+    return match.group(1) if match else None
+
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """Start of the month and start of the next one, in UTC."""
+    year, number = (int(part) for part in month.split("-"))
+    start = datetime(year, number, 1, tzinfo=timezone.utc)
+    end = datetime(year + number // 12, number % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def oldest_hot_month(now: datetime, hot_months: int) -> str:
+    """First month of the retention window; older partitions are archived."""
+    index = now.year * 12 + now.month - 1 - (max(hot_months, 1) - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def as_utc(moment: Any) -> Optional[datetime]:
+    """A timezone-aware UTC datetime, treating naive ones as UTC; None for anything else."""
+    if not isinstance(moment, datetime):
+        return None
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def overlaps(month: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> bool:
+    """Whether any part of a month falls within [since, until)."""
+    start, end = month_bounds(month)
+    since, until = as_utc(since), as_utc(until)
+    return (since is None or end > since) and (until is None or start < until)
+
+
+def _schema():
+    location = pa.struct([
+        ("page", pa.int32()),
+        ("start", pa.int64()),
+        ("end", pa.int64()),
+        ("bbox", pa.list_(pa.float64())),
+    ])
+    finding = pa.struct([
+        ("type", pa.string()),
+        ("value", pa.string()),
+        ("confidence", pa.string()),
+        ("category", pa.string()),
+        ("context", pa.string()),
+        ("locations", pa.list_(location)),
+    ])
+    return pa.schema([
+        ("id", pa.string()),
+        ("fileName", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("createdAt", pa.timestamp("us", tz="UTC")),
+        ("sensitiveInfo", pa.list_(finding)),
+        ("extra", pa.string()),
+    ])
+
+
+def _to_row(detection: Dict[str, Any]) -> Dict[str, Any]:
+    findings = []
+    for finding in detection.get("sensitiveInfo") or []:
+        if not isinstance(finding, dict):
+            continue
+        value = finding.get("value")
+        findings.append({
+            "type": finding.get("type"),
+            # Values are archived as text
+            "value": None if value is None else str(value),
+            "confidence": finding.get("confidence"),
+            "category": finding.get("category"),
+            "context": finding.get("context"),
+            "locations": finding.get("locations"),
+        })
+    extra = {key: value for key, value in detection.items() if key not in _COLUMNS}
+    return {
+        "id": detection.get("id"),
+        "fileName": detection.get("fileName"),
+        "timestamp": as_utc(detection.get("timestamp")),
+        "createdAt": as_utc(detection.get("createdAt")),
+        "sensitiveInfo": findings,
+        "extra": json.dumps(extra, default=str) if extra else None,
+    }
+
+
+def _from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    extra = row.pop("extra", None)
+    row.pop("month", None)
+    if "sensitiveInfo" in row:
+        row["sensitiveInfo"] = [
+            {
+                **{key: value for key, value in finding.items() if value is not None and key != "locations"},
+                **({"locations": [
+                    {key: value for key, value in location.items() if value is not None}
+                    for location in finding["locations"]
+                ]} if finding.get("locations") is not None else {}),
+            }
+            for finding in row["sensitiveInfo"] or []
+        ]
+    detection = {key: value for key, value in row.items() if value is not None}
+    if extra:
+        detection.update(json.loads(extra))
+    return detection
+
+
+class DetectionArchive:
+    """
+    Detections of past months as compressed Parquet files.
+
+    Each month is a Hive-style directory, ``month=YYYY-MM``, under ``uri``.
+    The uri can be a local path or object storage such as ``s3://bucket/prefix``
+    or ``gs://bucket/prefix``. A batch is written under a name derived from the
+    IDs it holds, so archiving the same documents twice overwrites rather than
+    duplicates. Findings are nested columns, so reads that filter on time or
+    ID skip row groups without parsing them. Requires pyarrow.
+    """
+
+    def __init__(self, uri: str, compression: str = "zstd"):
+        self.uri = uri
+        self.compression = compression
+        self._filesystem = None
+        self._root = None
+
+    @classmethod
+    def from_env(cls) -> "DetectionArchive":
+        return cls(
+            uri=os.getenv("SCAN_VAULT_ARCHIVE_URI") or os.path.abspath("detection_archive"),
+            compression=os.getenv("SCAN_VAULT_ARCHIVE_COMPRESSION", "zstd"),
+        )
+
+    def _fs(self):
+        if pa is None:
+            raise ValueError("Archiving detections requires pyarrow to be installed")
+        if self._filesystem is None:
+            uri = self.uri if "://" in self.uri else os.path.abspath(self.uri)
+            self._filesystem, self._root = pafs.FileSystem.from_uri(uri)
+        return self._filesystem
+
+    def _directory(self, month: str) -> str:
+        return f"{self._root}/month={month}"
+
+    def write(self, month: str, detections: List[Dict[str, Any]]) -> str:
+        """
+        Archive detections of one month and return the file written.
+
+        The file is written aside, its row count checked and then moved into
+        place, so readers never see a partial file and callers may delete the
+        originals once this returns.
+        """
+        fs = self._fs()
+        table = pa.Table.from_pylist([_to_row(detection) for detection in detections], schema=_schema())
+        ids = "\n".join(sorted(str(detection.get("id")) for detection in detections))
+        name = hashlib.sha1(ids.encode("utf-8")).hexdigest()[:16]
+
+        directory = self._directory(month)
+        fs.create_dir(directory, recursive=True)
+        # Readers skip names starting with a dot
+        staging, path = f"{directory}/.part-{name}.parquet.tmp", f"{directory}/part-{name}.parquet"
+        pq.write_table(table, staging, filesystem=fs, compression=self.compression)
+        with fs.open_input_file(staging) as f:
+            written = pq.read_metadata(f).num_rows
+        if written != len(detections):
+            fs.delete_file(staging)
+            raise IOError(f"Archive of {month} has {written} of {len(detections)} detections")
+        fs.move(staging, path)
+        logger.info("Archived %s detections of %s", len(detections), month)
+        return path
+
+    def read(
+        self,
+        months: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        ids: Optional[Iterable[str]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Archived detections, optionally limited to months, a time range and IDs.
+
+        Args:
+            months: Months to read; every archived month when omitted
+            since: Earliest timestamp, inclusive
+            until: Latest timestamp, exclusive
+            ids: Detection IDs to return
+            columns: Columns to read; all when omitted
+        """
+        fs = self._fs()
+        filters = []
+        if since is not None:
+            filters.append(("timestamp", ">=", as_utc(since)))
+        if until is not None:
+            filters.append(("timestamp", "<", as_utc(until)))
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                return []
+            filters.append(("id", "in", ids))
+        if columns is not None and "id" not in columns:
+            columns = ["id", *columns]
+
+        if months is None:
+            sources = [self._root]
+        else:
+            sources = [self._directory(month) for month in sorted(set(months))]
+
+        detections: Dict[str, Dict[str, Any]] = {}
+        for source in sources:
+            if fs.get_file_info(source).type != pafs.FileType.Directory:
+                continue
+            table = pq.read_table(
+                source,
+                filesystem=fs,
+                columns=columns,
+                filters=filters or None,
+                partitioning="hive" if months is None else None,
+            )
+            for row in table.to_pylist():
+                # A detection archived twice is returned once
+                detections.setdefault(row["id"], _from_row(row))
+        return list(detections.values())
+
+
+detection_archive = DetectionArchive.from_env()
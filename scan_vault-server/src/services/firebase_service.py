@@ -1,11 +1,59 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
-from typing import Dict, Any, Optional
+from google.api_core.exceptions import AlreadyExists
+from typing import Dict, Any, Iterator, List, Optional
+import asyncio
+import hashlib
 import logging
+import os
+import re
 from datetime import datetime
+from src.utils.value_hash import get_index_key, value_digest
+from src.server.models.finding import Finding
+from src.server.services.detection_version import detection_version
+from src.services.detection_archive import (
+    as_utc,
+    detection_archive,
+    month_bounds,
+    month_of,
+    oldest_hot_month,
+    overlaps,
+    partition_of,
+)
 
 logger = logging.getLogger(__name__)
 
+# Detections are partitioned by month: detections/{YYYY-MM}/items/{id}. Documents
+# saved before partitioning sit directly in the collection and are still read.
+DETECTIONS_COLLECTION = 'detections'
+PARTITION_ITEMS = 'items'
+# Single document mapping each month to whether it is in Firestore, archived or both
+PARTITIONS_DOCUMENT = ('detection_meta', 'partitions')
+# Months kept in Firestore, the current one included; older ones go to the archive
+HOT_MONTHS = int(os.getenv("SCAN_VAULT_HOT_MONTHS", "3"))
+ROLLUPS_COLLECTION = 'detection_rollups'
+FILE_ROLLUPS_COLLECTION = 'detection_file_rollups'
+# One document per finding type; types come from the LLM, so they are not
+# kept as keys of the summary document, which would grow without bound
+TYPE_ROLLUPS_COLLECTION = 'detection_type_rollups'
+MAX_TYPE_LENGTH = 64
+SUMMARY_DOCUMENT = 'summary'
+VALUE_INDEX_COLLECTION = 'detection_value_index'
+# Tenant documents are keyed by tenant ID and hold the SHA-256 digest of the tenant's API key
+TENANTS_COLLECTION = 'tenants'
+TENANT_USAGE_COLLECTION = 'tenant_usage'
+# Single document counting writes to the detections collection; read by conditional GETs
+DETECTIONS_VERSION_DOCUMENT = ('detection_meta', 'version')
+# Firestore caps a batch at 500 writes
+BATCH_WRITE_LIMIT = 450
+# Passes rebuild_rollups makes before giving up on a quiet moment between writes
+REBUILD_ATTEMPTS = 3
+
+
+class DetectionArchivedError(Exception):
+    """Raised when changing a detection that is only in the archive, which is read-only"""
+
+
 class FirebaseService:
     _instance = None
     
@@ -24,17 +72,47 @@ class FirebaseService:
             
             # Initialize Firestore client
             self.db = firestore.client()
+            # Months this worker has registered as holding detections
+            self._registered_months = set()
             logger.info("Firebase initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize Firebase: {str(e)}")
+            logger.error("Failed to initialize Firebase: %s", e)
             raise
     
-    async def save_detection(self, detection_data: Dict[str, Any]) -> Optional[str]:
+    async def ping(self) -> None:
+        """Read one tenant document; raises when Firestore cannot be reached."""
+        await asyncio.to_thread(lambda: list(self.db.collection(TENANTS_COLLECTION).limit(1).stream()))
+
+    @staticmethod
+    def build_detection(file_name: str, sensitive_fields: List[Finding]) -> Dict[str, Any]:
+        """
+        Build the stored detection document from scan results
+        
+        Args:
+            file_name (str): Name of the scanned file
+            sensitive_fields (List[Finding]): Findings returned by the scan
+            
+        Returns:
+            Dict[str, Any]: Detection document ready for save_detection
+        """
+        return {
+            'fileName': file_name,
+            'sensitiveInfo': [finding.to_dict() for finding in sensitive_fields],
+            'createdAt': firestore.SERVER_TIMESTAMP,
+        }
+
+    def new_detection_id(self) -> str:
+        """Reserve a detection ID before the detection is written; it names the current month's partition."""
+        month = month_of(datetime.utcnow())
+        return f"{month}_{self._partition(month).document().id}"
+
+    async def save_detection(self, detection_data: Dict[str, Any], detection_id: Optional[str] = None) -> Optional[str]:
         """
         Save detection data to Firestore
         
         Args:
             detection_data (Dict[str, Any]): Detection data to save
+            detection_id (Optional[str]): ID reserved with new_detection_id; generated if omitted
             
         Returns:
             Optional[str]: Document ID if successful, None if failed
@@ -43,43 +121,633 @@ class FirebaseService:
             # Add timestamp
             detection_data['timestamp'] = datetime.utcnow()
             
-            # Create a new document in the detections collection
-            doc_ref = self.db.collection('detections').document()
+            # Create a new document in its month's partition and update
+            # the analytics rollups in the same atomic batch
+            detection_id = detection_id or self.new_detection_id()
+            doc_ref = self._detection_reference(detection_id)
             detection_data['id'] = doc_ref.id
-            doc_ref.set(detection_data)
-            
-            logger.info(f"Detection saved successfully with ID: {doc_ref.id}")
-            return doc_ref.id
-            
+            batch = self.db.batch()
+            # create, not set: retrying a save whose commit went through
+            # fails instead of counting the detection in the rollups twice
+            batch.create(doc_ref, detection_data)
+            month = partition_of(detection_id)
+            if month is not None and month not in self._registered_months:
+                self._register_partition(batch, month)
+            self._apply_rollups(batch, detection_data, 1)
+            self._bump_version(batch)
+            try:
+                batch.commit()
+            except AlreadyExists:
+                logger.info("Detection %s was already saved", doc_ref.id)
+            if month is not None:
+                self._registered_months.add(month)
+            detection_version.invalidate()
         except Exception as e:
-            logger.error(f"Error saving detection: {str(e)}")
+            logger.error("Error saving detection: %s", e)
             return None
+
+        # The detection is committed, so a failure here must not report the
+        # save as failed: a client retrying it would store a duplicate.
+        # rebuild_rollups repairs the index.
+        try:
+            self._update_value_index(doc_ref.id, detection_data, add=True)
+        except Exception as e:
+            logger.error("Error indexing values of detection %s: %s", doc_ref.id, e)
+
+        logger.info("Detection saved successfully with ID: %s", doc_ref.id)
+        return doc_ref.id
     
-    async def get_detections(self) -> Optional[Dict[str, Any]]:
+    async def get_detections(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> Optional[List[Dict[str, Any]]]:
         """
-        Retrieve all detections
+        Retrieve detections, newest partition first
         
+        Without a range only the partitions still in Firestore are read, so
+        the cost follows the retention window rather than all history.
+        Archived months are read only when the range reaches into them.
+        
+        Args:
+            since (Optional[datetime]): Earliest timestamp, inclusive
+            until (Optional[datetime]): Latest timestamp, exclusive
+            
         Returns:
-            Optional[Dict[str, Any]]: Detection data if found, None if not found
+            Optional[List[Dict[str, Any]]]: Detections, None if the read failed
         """
         try:
-            docs = self.db.collection('detections').get()
+            partitions = await self.get_partitions()
+            in_range = sorted(
+                (month for month in partitions if overlaps(month, since, until)), reverse=True
+            )
             detections = []
-            
-            for doc in docs:
-                detection = doc.to_dict()
-                detection['id'] = doc.id
-                detections.append(detection)
-                
+            for month in in_range:
+                if partitions[month].get('hot'):
+                    detections.extend(self._read_detections(self._partition(month), since, until))
+            # Saved before partitioning
+            detections.extend(self._read_detections(self.db.collection(DETECTIONS_COLLECTION), since, until))
+
+            archived = [month for month in in_range if partitions[month].get('archived')]
+            if archived and (since is not None or until is not None):
+                detections.extend(await asyncio.to_thread(detection_archive.read, archived, since, until))
             return detections
             
         except Exception as e:
-            logger.error(f"Error retrieving detections: {str(e)}")
+            logger.error("Error retrieving detections: %s", e)
             return None
+
+    async def get_partitions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the partition registry
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: By month, whether it is in Firestore ('hot')
+            and whether it has been archived ('archived')
+        """
+        snapshot = self._partitions_reference().get()
+        return dict((snapshot.to_dict() or {}).get('months') or {}) if snapshot.exists else {}
     
+    async def get_detection(self, detection_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve one detection
+        
+        Args:
+            detection_id (str): Detection document ID
+            
+        Returns:
+            Optional[Dict[str, Any]]: Detection data, None if it does not exist
+        """
+        snapshot = self._detection_reference(detection_id).get()
+        if not snapshot.exists:
+            # Only partitioned IDs name the one archived month worth reading;
+            # any other miss would scan every archived month
+            if partition_of(detection_id) is None:
+                return None
+            archived = await self._read_archived([detection_id])
+            return archived[0] if archived else None
+        detection = snapshot.to_dict()
+        detection['id'] = snapshot.id
+        return detection
+
+    async def get_detections_version(self) -> int:
+        """
+        Read the detections collection version
+        
+        Returns:
+            int: Number of writes to the collection since versioning started
+        """
+        snapshot = self._version_reference().get()
+        return int((snapshot.to_dict() or {}).get('version', 0)) if snapshot.exists else 0
+
+    def watch_detections_version(self, callback):
+        """
+        Call ``callback`` with the collection version now and whenever it changes
+        
+        Firestore delivers changes on its own thread, so the callback must
+        not touch the event loop.
+        
+        Returns:
+            Watch handle; call its ``unsubscribe`` to stop
+        """
+        def on_snapshot(snapshots, changes, read_time):
+            snapshot = snapshots[0] if snapshots else None
+            callback(int((snapshot.to_dict() or {}).get('version', 0)) if snapshot is not None and snapshot.exists else 0)
+
+        return self._version_reference().on_snapshot(on_snapshot)
+
     async def delete_detection(self, detection_id: str) -> None:
+        """
+        Delete a detection and take it out of the rollups
+        
+        Deleting one that no longer exists does nothing.
+        
+        Raises:
+            DetectionArchivedError: If the detection has been archived
+        """
         try:
-            self.db.collection('detections').document(detection_id).delete()
+            doc_ref = self._detection_reference(detection_id)
+
+            # The read and the rollup decrements share a transaction, so
+            # concurrent deletes of one detection decrement it only once
+            @firestore.transactional
+            def delete_in(transaction):
+                snapshot = doc_ref.get(transaction=transaction)
+                transaction.delete(doc_ref)
+                if snapshot.exists:
+                    self._apply_rollups(transaction, snapshot.to_dict(), -1)
+                    self._bump_version(transaction)
+                return snapshot
+
+            snapshot = delete_in(self.db.transaction())
+            detection_version.invalidate()
+            if snapshot.exists:
+                self._update_value_index(detection_id, snapshot.to_dict(), add=False)
+                return
         except Exception as e:
-            logger.error(f"Error deleting detection: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("Error deleting detection: %s", e)
+            raise
+        if partition_of(detection_id) is not None and await self._read_archived([detection_id], columns=['fileName']):
+            raise DetectionArchivedError(f"Detection {detection_id} is archived and cannot be deleted")
+
+    async def get_detection_summary(self) -> Dict[str, Any]:
+        """
+        Retrieve the precomputed detection counts
+        
+        Returns:
+            Dict[str, Any]: Totals and counts by category, type, confidence and day
+        """
+        snapshot = self.db.collection(ROLLUPS_COLLECTION).document(SUMMARY_DOCUMENT).get()
+        summary = snapshot.to_dict() if snapshot.exists else {}
+        # Summaries written before type rollups had their own documents keep
+        # counts in 'byType'; deletes since then are in the type documents
+        by_type: Dict[str, int] = {}
+        for finding_type, count in (summary.get('byType') or {}).items():
+            finding_type = self._normalize_type(finding_type)
+            by_type[finding_type] = by_type.get(finding_type, 0) + count
+        for doc in self.db.collection(TYPE_ROLLUPS_COLLECTION).stream():
+            rollup = doc.to_dict()
+            finding_type = rollup.get('type') or doc.id
+            by_type[finding_type] = by_type.get(finding_type, 0) + rollup.get('findings', 0)
+        return {
+            'totalDetections': summary.get('totalDetections', 0),
+            'totalFindings': summary.get('totalFindings', 0),
+            'byCategory': self._non_zero(summary.get('byCategory')),
+            'byType': self._non_zero(by_type),
+            'byConfidence': self._non_zero(summary.get('byConfidence')),
+            'byDay': {
+                day: counts for day, counts in (summary.get('byDay') or {}).items()
+                if counts.get('detections', 0) > 0
+            },
+        }
+
+    async def get_top_files(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retrieve the files with the most findings
+        
+        Args:
+            limit (int): Maximum number of files to return
+            
+        Returns:
+            List[Dict[str, Any]]: File rollups ordered by finding count
+        """
+        docs = (
+            self.db.collection(FILE_ROLLUPS_COLLECTION)
+            .order_by('findings', direction=firestore.Query.DESCENDING)
+            .limit(limit)
+            .get()
+        )
+        return [
+            {
+                'fileName': rollup.get('fileName'),
+                'findings': rollup.get('findings', 0),
+                'detections': rollup.get('detections', 0),
+            }
+            for rollup in (doc.to_dict() for doc in docs)
+            if rollup.get('findings', 0) > 0
+        ]
+
+    async def find_detections_by_value(self, value: str) -> List[Dict[str, Any]]:
+        """
+        Find every detection containing a finding with the given value
+        
+        Args:
+            value (str): Raw sensitive value; it is normalized and hashed before lookup
+            
+        Returns:
+            List[Dict[str, Any]]: ID and file name of each matching detection
+            
+        Raises:
+            ValueError: If the value index key is not configured
+        """
+        key = get_index_key()
+        if not key:
+            raise ValueError("Value index is not configured")
+
+        entry = self.db.collection(VALUE_INDEX_COLLECTION).document(value_digest(value, key)).get()
+        detection_ids = (entry.to_dict() or {}).get('detectionIds', []) if entry.exists else []
+        if not detection_ids:
+            return []
+
+        refs = [self._detection_reference(doc_id) for doc_id in detection_ids]
+        matches = []
+        for doc in self.db.get_all(refs, field_paths=['fileName', 'createdAt']):
+            if doc.exists:
+                detection = doc.to_dict()
+                detection['id'] = doc.id
+                matches.append(detection)
+        found = {detection['id'] for detection in matches}
+        missing = [doc_id for doc_id in detection_ids if doc_id not in found]
+        if missing:
+            matches.extend(await self._read_archived(missing, columns=['fileName', 'createdAt']))
+        return matches
+
+    async def rebuild_rollups(self) -> int:
+        """
+        Recompute all rollups from every detection, archived ones included
+        
+        Used to backfill detections saved before rollups or the value index
+        existed, or to repair drift. Reads every detection, so it is not meant
+        for the request path; it runs on a worker thread, off the event loop.
+        
+        Counts are built in memory and then written over the rollup
+        documents, so readers see the old counts until the new ones land
+        rather than zeros. A save or delete during a pass bumps the
+        detections version, and its increment may have been overwritten, so
+        the pass is repeated from a fresh read.
+        
+        Returns:
+            int: Number of detections counted
+        """
+        return await asyncio.to_thread(self._rebuild_rollups)
+
+    def _rebuild_rollups(self) -> int:
+        for attempt in range(1, REBUILD_ATTEMPTS + 1):
+            version = self._version_reference().get().to_dict() or {}
+            summary, types, files = self._empty_summary(), {}, {}
+            count = 0
+            for detection in self._all_detections():
+                self._add_to_rollups(summary, types, files, detection)
+                # Saves index themselves, so one pass over the index is enough
+                if attempt == 1:
+                    self._update_value_index(detection['id'], detection, add=True)
+                count += 1
+            self._write_rollups(summary, types, files)
+            if (self._version_reference().get().to_dict() or {}) == version:
+                break
+            logger.info("Detections changed while rebuilding rollups (pass %s)", attempt)
+        else:
+            logger.warning("Detections kept changing; rollups may be off until the next rebuild")
+        logger.info("Rebuilt detection rollups from %s detections", count)
+        return count
+
+    def _all_detections(self) -> Iterator[Dict[str, Any]]:
+        """Every detection: hot partitions, unpartitioned documents and the archive."""
+        snapshot = self._partitions_reference().get()
+        partitions = dict((snapshot.to_dict() or {}).get('months') or {}) if snapshot.exists else {}
+        for month, state in partitions.items():
+            if state.get('hot'):
+                yield from self._read_detections(self._partition(month))
+        yield from self._read_detections(self.db.collection(DETECTIONS_COLLECTION))
+        if any(state.get('archived') for state in partitions.values()):
+            yield from detection_archive.read()
+
+    @staticmethod
+    def _empty_summary() -> Dict[str, Any]:
+        return {'totalDetections': 0, 'totalFindings': 0, 'byCategory': {}, 'byConfidence': {}, 'byDay': {}}
+
+    def _add_to_rollups(self, summary: Dict[str, Any], types: Dict[str, int],
+                        files: Dict[str, Dict[str, Any]], detection_data: Dict[str, Any]) -> None:
+        """Add one detection to rollups counted in memory."""
+        counts = self._rollup_counts(detection_data)
+
+        def add(totals: Dict[str, int], values: Dict[str, int]) -> None:
+            for key, value in values.items():
+                totals[key] = totals.get(key, 0) + value
+
+        summary['totalDetections'] += 1
+        summary['totalFindings'] += counts['findings']
+        add(summary['byCategory'], counts['byCategory'])
+        add(summary['byConfidence'], counts['byConfidence'])
+        add(summary['byDay'].setdefault(counts['day'], {'detections': 0, 'findings': 0}),
+            {'detections': 1, 'findings': counts['findings']})
+        add(types, counts['byType'])
+        rollup = files.setdefault(counts['fileId'], {'fileName': counts['fileName'], 'detections': 0, 'findings': 0})
+        add(rollup, {'detections': 1, 'findings': counts['findings']})
+
+    def _write_rollups(self, summary: Dict[str, Any], types: Dict[str, int], files: Dict[str, Dict[str, Any]]) -> None:
+        """Overwrite the rollup documents with counts built in memory, then drop the ones left over."""
+        writes = [(self.db.collection(ROLLUPS_COLLECTION).document(SUMMARY_DOCUMENT), summary)]
+        type_rollups = self.db.collection(TYPE_ROLLUPS_COLLECTION)
+        writes += [(type_rollups.document(finding_type), {'type': finding_type, 'findings': findings})
+                   for finding_type, findings in types.items()]
+        file_rollups = self.db.collection(FILE_ROLLUPS_COLLECTION)
+        writes += [(file_rollups.document(file_id), rollup) for file_id, rollup in files.items()]
+        for start in range(0, len(writes), BATCH_WRITE_LIMIT):
+            batch = self.db.batch()
+            for reference, data in writes[start:start + BATCH_WRITE_LIMIT]:
+                batch.set(reference, data)
+            batch.commit()
+
+        stale = [
+            doc.reference
+            for collection, current in ((type_rollups, types), (file_rollups, files))
+            for doc in collection.get()
+            if doc.id not in current
+        ]
+        for start in range(0, len(stale), BATCH_WRITE_LIMIT):
+            batch = self.db.batch()
+            for reference in stale[start:start + BATCH_WRITE_LIMIT]:
+                batch.delete(reference)
+            batch.commit()
+
+    async def archive_partitions(self, hot_months: int = HOT_MONTHS, now: datetime = None) -> Dict[str, int]:
+        """
+        Move detections older than the retention window to the archive
+        
+        Each month is written to the archive and checked before its
+        documents are deleted, so a failure part way leaves them in Firestore
+        and a rerun archives them again in place. Detections saved before
+        partitioning are archived by the month of their timestamp. Rollups
+        and the value index keep covering archived detections. Reads and
+        deletes run on worker threads, off the event loop.
+        
+        Args:
+            hot_months (int): Months to keep in Firestore, the current one included
+            now (datetime): Reference time; the current UTC time by default
+            
+        Returns:
+            Dict[str, int]: Detections archived by month
+        """
+        cutoff = oldest_hot_month(now or datetime.utcnow(), hot_months)
+        archived: Dict[str, int] = {}
+
+        for month, state in sorted((await self.get_partitions()).items()):
+            if month >= cutoff or not state.get('hot'):
+                continue
+            docs = await asyncio.to_thread(lambda: list(self._partition(month).stream()))
+            archived[month] = await self._archive_documents(month, docs)
+
+        legacy: Dict[str, list] = {}
+        window_start, _ = month_bounds(cutoff)
+        query = self.db.collection(DETECTIONS_COLLECTION).where('timestamp', '<', window_start)
+        for doc in await asyncio.to_thread(lambda: list(query.stream())):
+            timestamp = as_utc(doc.to_dict().get('timestamp'))
+            if timestamp is not None:
+                legacy.setdefault(month_of(timestamp), []).append(doc)
+        for month, docs in sorted(legacy.items()):
+            archived[month] = archived.get(month, 0) + await self._archive_documents(month, docs)
+
+        if archived:
+            batch = self.db.batch()
+            self._bump_version(batch)
+            batch.commit()
+            detection_version.invalidate()
+            logger.info("Archived %s detections from %s month(s)", sum(archived.values()), len(archived))
+        return archived
+
+    async def get_tenants(self) -> List[Dict[str, Any]]:
+        """
+        Get tenant configurations
+        
+        Returns:
+            List[Dict[str, Any]]: Tenant documents with their IDs
+        """
+        return [
+            {**doc.to_dict(), 'id': doc.id}
+            for doc in self.db.collection(TENANTS_COLLECTION).stream()
+        ]
+
+    async def record_tenant_usage(self, day: str, usage: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """
+        Add per-tenant usage deltas for a day and read back the day's totals
+        
+        Every worker flushes its own deltas with increments, so the totals
+        returned include usage recorded by all workers.
+        
+        Args:
+            day (str): UTC day as YYYY-MM-DD
+            usage (Dict[str, Dict[str, int]]): Request and token deltas by tenant ID
+            
+        Returns:
+            Dict[str, Dict[str, int]]: Request and token totals for the day by tenant ID
+        """
+        collection = self.db.collection(TENANT_USAGE_COLLECTION)
+        if usage:
+            batch = self.db.batch()
+            for tenant_id, counts in usage.items():
+                batch.set(
+                    collection.document(f"{day}_{tenant_id}"),
+                    {
+                        'tenantId': tenant_id,
+                        'day': day,
+                        'requests': firestore.Increment(counts.get('requests', 0)),
+                        'tokens': firestore.Increment(counts.get('tokens', 0)),
+                    },
+                    merge=True,
+                )
+            batch.commit()
+
+        totals = {}
+        for doc in collection.where('day', '==', day).stream():
+            data = doc.to_dict()
+            totals[data['tenantId']] = {'requests': data.get('requests', 0), 'tokens': data.get('tokens', 0)}
+        return totals
+
+    def _partition(self, month: str):
+        return self.db.collection(DETECTIONS_COLLECTION).document(month).collection(PARTITION_ITEMS)
+
+    def _detection_reference(self, detection_id: str):
+        month = partition_of(detection_id)
+        if month is None:
+            # Saved before partitioning
+            return self.db.collection(DETECTIONS_COLLECTION).document(detection_id)
+        return self._partition(month).document(detection_id)
+
+    def _partitions_reference(self):
+        collection, document = PARTITIONS_DOCUMENT
+        return self.db.collection(collection).document(document)
+
+    def _register_partition(self, batch, month: str) -> None:
+        """Record that a month has detections in Firestore, in the batch that writes its first one."""
+        batch.set(self._partitions_reference(), {'months': {month: {'hot': True}}}, merge=True)
+
+    @staticmethod
+    def _read_detections(collection, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        query = collection
+        if since is not None:
+            query = query.where('timestamp', '>=', as_utc(since))
+        if until is not None:
+            query = query.where('timestamp', '<', as_utc(until))
+        for doc in query.stream():
+            detection = doc.to_dict()
+            detection['id'] = doc.id
+            yield detection
+
+    async def _read_archived(self, detection_ids: List[str], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Look detections up in the archive; a partitioned ID only reads its own month."""
+        partitions = await self.get_partitions()
+        archived_months = {month for month, state in partitions.items() if state.get('archived')}
+        if not archived_months:
+            return []
+        months = {partition_of(detection_id) for detection_id in detection_ids}
+        if None not in months:
+            months &= archived_months
+            if not months:
+                return []
+        return await asyncio.to_thread(
+            detection_archive.read, None if None in months else months, ids=detection_ids, columns=columns
+        )
+
+    async def _archive_documents(self, month: str, docs: list) -> int:
+        """Write documents of one month to the archive, then delete them from Firestore."""
+        if docs:
+            detections = [{**doc.to_dict(), 'id': doc.id} for doc in docs]
+            await asyncio.to_thread(detection_archive.write, month, detections)
+
+        def delete_archived():
+            for start in range(0, len(docs), BATCH_WRITE_LIMIT):
+                batch = self.db.batch()
+                for doc in docs[start:start + BATCH_WRITE_LIMIT]:
+                    batch.delete(doc.reference)
+                batch.commit()
+            # Marks the month archived and no longer in Firestore in one write
+            self._partitions_reference().set(
+                {'months': {month: {'hot': False, 'archived': True}}}, merge=True
+            )
+
+        await asyncio.to_thread(delete_archived)
+        self._registered_months.discard(month)
+        return len(docs)
+
+    def _version_reference(self):
+        collection, document = DETECTIONS_VERSION_DOCUMENT
+        return self.db.collection(collection).document(document)
+
+    def _bump_version(self, batch) -> None:
+        """Advance the collection version in the same batch as the write it covers."""
+        batch.set(self._version_reference(), {'version': firestore.Increment(1)}, merge=True)
+
+    def _rollup_counts(self, detection_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Finding counts of one detection, keyed the way the rollups store them."""
+        findings = detection_data.get('sensitiveInfo') or []
+        timestamp = detection_data.get('timestamp')
+        day = timestamp.strftime('%Y-%m-%d') if isinstance(timestamp, datetime) else 'unknown'
+
+        by_category: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        by_confidence: Dict[str, int] = {}
+        for finding in findings:
+            if not isinstance(finding, dict):
+                continue
+            category = str(finding.get('category') or 'unknown').upper()
+            finding_type = self._normalize_type(finding.get('type'))
+            confidence = str(finding.get('confidence') or 'unknown').lower()
+            by_category[category] = by_category.get(category, 0) + 1
+            by_type[finding_type] = by_type.get(finding_type, 0) + 1
+            by_confidence[confidence] = by_confidence.get(confidence, 0) + 1
+
+        file_name = detection_data.get('fileName') or 'unknown'
+        return {
+            'day': day,
+            'findings': sum(by_category.values()),
+            'byCategory': by_category,
+            'byType': by_type,
+            'byConfidence': by_confidence,
+            'fileName': file_name,
+            'fileId': hashlib.sha1(file_name.encode('utf-8')).hexdigest(),
+        }
+
+    def _apply_rollups(self, batch, detection_data: Dict[str, Any], sign: int) -> None:
+        """Add increments for one detection to the summary, type and file rollups."""
+        counts = self._rollup_counts(detection_data)
+        finding_count = counts['findings']
+
+        def increments(values: Dict[str, int]) -> Dict[str, Any]:
+            return {key: firestore.Increment(sign * value) for key, value in values.items()}
+
+        # Nested maps with merge=True keep keys literal, so values such as
+        # file types containing dots are not interpreted as field paths
+        batch.set(
+            self.db.collection(ROLLUPS_COLLECTION).document(SUMMARY_DOCUMENT),
+            {
+                'totalDetections': firestore.Increment(sign),
+                'totalFindings': firestore.Increment(sign * finding_count),
+                'byCategory': increments(counts['byCategory']),
+                'byConfidence': increments(counts['byConfidence']),
+                'byDay': {counts['day']: {
+                    'detections': firestore.Increment(sign),
+                    'findings': firestore.Increment(sign * finding_count),
+                }},
+            },
+            merge=True,
+        )
+
+        types = self.db.collection(TYPE_ROLLUPS_COLLECTION)
+        for finding_type, count in counts['byType'].items():
+            batch.set(
+                types.document(finding_type),
+                {'type': finding_type, 'findings': firestore.Increment(sign * count)},
+                merge=True,
+            )
+
+        batch.set(
+            self.db.collection(FILE_ROLLUPS_COLLECTION).document(counts['fileId']),
+            {
+                'fileName': counts['fileName'],
+                'detections': firestore.Increment(sign),
+                'findings': firestore.Increment(sign * finding_count),
+            },
+            merge=True,
+        )
+
+    def _update_value_index(self, detection_id: str, detection_data: Dict[str, Any], add: bool) -> None:
+        """Add or remove a detection from the keyed-hash index of its finding values."""
+        key = get_index_key()
+        if not key:
+            logger.debug("SCAN_VAULT_INDEX_KEY not set, skipping value index update")
+            return
+
+        digests = {
+            value_digest(finding['value'], key)
+            for finding in detection_data.get('sensitiveInfo') or []
+            if isinstance(finding, dict) and finding.get('value') not in (None, '')
+        }
+        transform = firestore.ArrayUnion if add else firestore.ArrayRemove
+        index = self.db.collection(VALUE_INDEX_COLLECTION)
+
+        digests = sorted(digests)
+        for start in range(0, len(digests), BATCH_WRITE_LIMIT):
+            batch = self.db.batch()
+            for digest in digests[start:start + BATCH_WRITE_LIMIT]:
+                batch.set(index.document(digest), {'detectionIds': transform([detection_id])}, merge=True)
+            batch.commit()
+
+    @staticmethod
+    def _normalize_type(finding_type: Any) -> str:
+        """Fold spelling variants of a finding type ('Credit Card', 'credit-card') into one key."""
+        normalized = re.sub(r'[^a-z0-9]+', '_', str(finding_type or '').lower()).strip('_')
+        return normalized[:MAX_TYPE_LENGTH].rstrip('_') or 'unknown'
+
+    @staticmethod
+    def _non_zero(counts: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """Drop keys whose count has been decremented back to zero."""
+        return {key: value for key, value in (counts or {}).items() if value > 0}
\ No newline at end of file
@@ -0,0 +1,244 @@
+import pytest
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch, AsyncMock
+
+from src.server.routes.admin import router as admin_router
+from src.server.routes.analytics import router
+from src.services.firebase_service import FirebaseService
+
+
+client = TestClient(router)
+admin_app = FastAPI()
+admin_app.include_router(admin_router)
+admin_client = TestClient(admin_app)
+
+
+MOCK_DETECTION = {
+    "fileName": "records.pdf",
+    "sensitiveInfo": [
+        {"type": "email", "value": "test@example.com", "confidence": "high", "category": "PII"},
+        {"type": "credit_card", "value": "4111111111111111", "confidence": "high", "category": "PCI"},
+        {"type": "email", "value": "other@example.com", "confidence": "medium", "category": "pii"},
+    ],
+    "timestamp": datetime(2024, 3, 14, 12, 0, 0),
+}
+
+MOCK_SUMMARY = {
+    "totalDetections": 2,
+    "totalFindings": 3,
+    "byCategory": {"PII": 2, "PCI": 1, "PHI": 0},
+    "byType": {"email": 2, "credit_card": 1},
+    "byConfidence": {"high": 3},
+    "byDay": {"2024-03-14": {"detections": 2, "findings": 3}, "2024-03-13": {"detections": 0, "findings": 0}},
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def mock_firebase_service():
+    with patch("src.server.routes.analytics.FirebaseService") as mock:
+        mock_instance = Mock()
+        mock_instance.get_detection_summary = AsyncMock()
+        mock_instance.get_top_files = AsyncMock()
+        mock.return_value = mock_instance
+        yield mock_instance
+
+@pytest.fixture
+def service():
+    """FirebaseService with a mocked Firestore client, bypassing the singleton."""
+    instance = object.__new__(FirebaseService)
+    instance.db = Mock()
+    return instance
+
+
+def increment_values(data):
+    """Replace Firestore Increment transforms with their numeric values."""
+    if isinstance(data, dict):
+        return {key: increment_values(value) for key, value in data.items()}
+    return getattr(data, "value", data)
+
+
+class TestRollups:
+    def test_apply_rollups_counts(self, service):
+        """Test increments written for a saved detection"""
+        batch = Mock()
+        service._apply_rollups(batch, MOCK_DETECTION, 1)
+
+        summary_call, *type_calls, file_call = batch.set.call_args_list
+        summary = increment_values(summary_call.args[1])
+        assert summary_call.kwargs == {"merge": True}
+        assert summary["totalDetections"] == 1
+        assert summary["totalFindings"] == 3
+        assert summary["byCategory"] == {"PII": 2, "PCI": 1}
+        assert "byType" not in summary
+        assert summary["byConfidence"] == {"high": 2, "medium": 1}
+        assert [increment_values(call.args[1]) for call in type_calls] == [
+            {"type": "email", "findings": 2},
+            {"type": "credit_card", "findings": 1},
+        ]
+        assert summary["byDay"] == {"2024-03-14": {"detections": 1, "findings": 3}}
+
+        file_rollup = increment_values(file_call.args[1])
+        assert file_rollup == {"fileName": "records.pdf", "detections": 1, "findings": 3}
+
+    def test_apply_rollups_decrement(self, service):
+        """Test deletes write negative increments"""
+        batch = Mock()
+        service._apply_rollups(batch, MOCK_DETECTION, -1)
+
+        summary = increment_values(batch.set.call_args_list[0].args[1])
+        assert summary["totalDetections"] == -1
+        assert summary["byCategory"] == {"PII": -2, "PCI": -1}
+
+    def test_apply_rollups_normalizes_types(self, service):
+        """Test spelling variants of a type share one rollup document"""
+        batch = Mock()
+        detection = {"fileName": "a.txt", "sensitiveInfo": [
+            {"type": "Credit Card"}, {"type": "credit-card"}, {"type": "  "},
+        ]}
+        service._apply_rollups(batch, detection, 1)
+
+        type_writes = [increment_values(call.args[1]) for call in batch.set.call_args_list[1:-1]]
+        assert type_writes == [{"type": "credit_card", "findings": 2}, {"type": "unknown", "findings": 1}]
+        assert FirebaseService._normalize_type("x" * 100 + "/.." ) == "x" * 64
+
+    @pytest.mark.asyncio
+    async def test_get_detection_summary_merges_type_rollups(self, service):
+        """Test type counts combine legacy summary keys with the type documents"""
+        service.db.collection().document().get.return_value = Mock(
+            exists=True, to_dict=Mock(return_value=MOCK_SUMMARY)
+        )
+        service.db.collection().stream.return_value = [
+            Mock(id="email", to_dict=Mock(return_value={"type": "email", "findings": -1})),
+            Mock(id="ssn", to_dict=Mock(return_value={"type": "ssn", "findings": 4})),
+        ]
+
+        summary = await service.get_detection_summary()
+
+        assert summary["byType"] == {"email": 1, "credit_card": 1, "ssn": 4}
+
+    @pytest.mark.asyncio
+    async def test_get_detection_summary_drops_zero_counts(self, service):
+        """Test summary hides counters decremented back to zero"""
+        service.db.collection().document().get.return_value = Mock(
+            exists=True, to_dict=Mock(return_value=MOCK_SUMMARY)
+        )
+
+        service.db.collection().stream.return_value = []
+
+        summary = await service.get_detection_summary()
+
+        assert summary["byCategory"] == {"PII": 2, "PCI": 1}
+        assert summary["byDay"] == {"2024-03-14": {"detections": 2, "findings": 3}}
+
+    @pytest.mark.asyncio
+    async def test_get_detection_summary_empty(self, service):
+        """Test summary before any detection is saved"""
+        service.db.collection().document().get.return_value = Mock(exists=False)
+        service.db.collection().stream.return_value = []
+
+        summary = await service.get_detection_summary()
+
+        assert summary["totalDetections"] == 0
+        assert summary["byType"] == {}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_rollups_overwrites_counts(self, service):
+        """Test counts are built aside and written over the rollups, leftover documents deleted last"""
+        service._all_detections = Mock(return_value=iter([{**MOCK_DETECTION, "id": "a"}, {**MOCK_DETECTION, "id": "b"}]))
+        service._version_reference = Mock()
+        service._version_reference().get().to_dict.return_value = {"version": 7}
+        service.db.collection().get.return_value = [Mock(id="email"), Mock(id="stale")]
+
+        with patch.object(service, "_update_value_index") as index:
+            assert await service.rebuild_rollups() == 2
+
+        batch = service.db.batch()
+        assert all(call.kwargs == {} for call in batch.set.call_args_list)
+        summary, *type_writes, file_write = [call.args[1] for call in batch.set.call_args_list]
+        assert summary == {
+            "totalDetections": 2,
+            "totalFindings": 6,
+            "byCategory": {"PII": 4, "PCI": 2},
+            "byConfidence": {"high": 4, "medium": 2},
+            "byDay": {"2024-03-14": {"detections": 2, "findings": 6}},
+        }
+        assert type_writes == [{"type": "email", "findings": 4}, {"type": "credit_card", "findings": 2}]
+        assert file_write == {"fileName": "records.pdf", "detections": 2, "findings": 6}
+        # The stale type document and both unknown file documents
+        assert batch.delete.call_count == 3
+        calls = [name for name, _, _ in batch.method_calls]
+        assert max(i for i, name in enumerate(calls) if name == "set") < calls.index("delete")
+        assert index.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rebuild_rollups_recounts_after_concurrent_write(self, service):
+        """Test a save or delete during a pass makes the rebuild count again"""
+        service._all_detections = Mock(side_effect=lambda: iter([{**MOCK_DETECTION, "id": "a"}]))
+        service._version_reference = Mock()
+        service._version_reference().get().to_dict.side_effect = [{"version": 1}, {"version": 2}, {"version": 2}, {"version": 2}]
+        service.db.collection().get.return_value = []
+
+        with patch.object(service, "_update_value_index") as index:
+            assert await service.rebuild_rollups() == 1
+
+        assert service._all_detections.call_count == 2
+        index.assert_called_once()
+
+
+class TestAnalyticsEndpoints:
+    def test_summary_success(self, mock_firebase_service):
+        """Test summary endpoint"""
+        mock_firebase_service.get_detection_summary.return_value = {
+            **MOCK_SUMMARY,
+            "byDay": {"2024-03-14": {"detections": 2, "findings": 3}},
+        }
+
+        response = client.get("/analytics/summary")
+
+        assert response.status_code == 200
+        assert response.json()["totalFindings"] == 3
+
+    def test_summary_error(self, mock_firebase_service):
+        """Test summary endpoint error handling"""
+        mock_firebase_service.get_detection_summary.side_effect = Exception("Database error")
+
+        response = client.get("/analytics/summary")
+
+        assert response.status_code == 500
+        assert response.json() == {"error": "Database error"}
+
+    def test_top_files(self, mock_firebase_service):
+        """Test top files endpoint passes the limit through"""
+        mock_firebase_service.get_top_files.return_value = [
+            {"fileName": "records.pdf", "findings": 3, "detections": 1}
+        ]
+
+        response = client.get("/analytics/top-files?limit=5")
+
+        assert response.status_code == 200
+        assert response.json() == {"files": [{"fileName": "records.pdf", "findings": 3, "detections": 1}]}
+        mock_firebase_service.get_top_files.assert_awaited_once_with(5)
+
+
+class TestRebuildEndpoint:
+    @pytest.fixture(autouse=True)
+    def admin_key(self, monkeypatch):
+        monkeypatch.setenv("SCAN_VAULT_ADMIN_KEY", "admin-secret")
+
+    def test_requires_admin_key(self):
+        assert admin_client.post("/admin/analytics/rebuild").status_code == 403
+
+    def test_rebuild(self):
+        with patch("src.server.routes.admin.FirebaseService") as mock:
+            mock.return_value.rebuild_rollups = AsyncMock(return_value=4)
+            response = admin_client.post("/admin/analytics/rebuild", headers={"admin_token": "admin-secret"})
+
+        assert response.status_code == 200
+        assert response.json() == {"message": "Rollups rebuilt successfully", "detections": 4}
@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.server.middleware import compression
+from src.server.middleware.compression import CompressionMiddleware, choose_encoding
+from src.server.utils.etags import etag_matches
+
+
+LARGE = b'{"detections": [' + b",".join(b'{"id": "%d"}' % n for n in range(500)) + b"]}"
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/large")
+    def large():
+        return Response(LARGE, media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([LARGE, LARGE]), media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware, min_size=1024)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+class TestChooseEncoding:
+    def test_prefers_server_order(self):
+        codecs = {"zstd": None, "br": None, "gzip": None}
+        assert choose_encoding("gzip, br, zstd", codecs) == "zstd"
+        assert choose_encoding("gzip, br", codecs) == "br"
+
+    def test_quality_values(self):
+        codecs = {"br": None, "gzip": None}
+        assert choose_encoding("br;q=0.5, gzip", codecs) == "gzip"
+        assert choose_encoding("gzip;q=0", codecs) is None
+        assert choose_encoding("*", codecs) == "br"
+        assert choose_encoding("", codecs) is None
+
+
+class TestCompressionMiddleware:
+    def test_large_json_compressed(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert int(response.headers["content-length"]) < len(LARGE)
+        assert response.content == LARGE
+
+    def test_small_body_untouched(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_images_untouched(self, client):
+        response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_streams_untouched(self, client):
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == LARGE * 2
+
+    def test_no_accept_encoding(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_compressed_once_per_etag(self, client, monkeypatch):
+        calls = []
+        real = compression.CODECS["gzip"]
+        monkeypatch.setitem(compression.CODECS, "gzip", lambda data: calls.append(1) or real(data))
+
+        for _ in range(3):
+            response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+            assert response.content == LARGE
+        assert len(calls) == 1
+
+
+class TestEtags:
+    def test_weak_comparison(self):
+        assert etag_matches('W/"a"', 'W/"a"')
+        assert etag_matches('"a"', 'W/"a"')
+        assert etag_matches('W/"b", W/"a"', 'W/"a"')
+        assert etag_matches("*", 'W/"a"')
+        assert not etag_matches('W/"b"', 'W/"a"')
+        assert not etag_matches(None, 'W/"a"')
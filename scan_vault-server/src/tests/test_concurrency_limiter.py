@@ -0,0 +1,128 @@
+import asyncio
+import io
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+
+from src.server.routes.metrics import router as metrics_router
+from src.server.routes.scan import router as scan_router
+from src.server.services.concurrency_limiter import AdaptiveLimiter, OverloadedError
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+
+class TestAdaptiveLimiter:
+    @pytest.mark.asyncio
+    async def test_queues_over_limit_in_order(self):
+        """Test callers over the limit wait and are granted slots first come, first served"""
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire()
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 2
+
+        limiter.release(0.1)
+        await asyncio.sleep(0)
+        limiter.release(0.1)
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b"]
+        assert limiter.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_sheds_after_queue_timeout(self):
+        limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(OverloadedError) as error:
+            await limiter.acquire()
+
+        assert error.value.retry_after >= 1
+        assert limiter.shed_total == 1
+        assert limiter.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_fast_when_estimated_wait_exceeds_slo(self):
+        """Test callers are rejected without queueing when the wait is already too long"""
+        limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=5)
+        await limiter.acquire()
+        limiter._short_latency = 30.0
+
+        with pytest.raises(OverloadedError) as error:
+            await asyncio.wait_for(limiter.acquire(), 1)
+
+        assert error.value.retry_after == 30
+
+    @pytest.mark.asyncio
+    async def test_throttling_halves_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=16)
+        with pytest.raises(RuntimeError):
+            async with limiter.slot(drop_on=(RuntimeError,)):
+                raise RuntimeError("429")
+
+        assert limiter.limit == 8
+        assert limiter.dropped_total == 1
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_other_errors_do_not_change_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=16)
+        with pytest.raises(ValueError):
+            async with limiter.slot(drop_on=(RuntimeError,)):
+                raise ValueError("bad request")
+
+        assert limiter.limit == 16
+        assert limiter.in_flight == 0
+
+    def test_limit_follows_latency(self):
+        """Test the limit grows under steady latency and shrinks when latency rises"""
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=64)
+        limiter._in_flight = 8
+        for _ in range(20):
+            limiter._in_flight += 1
+            limiter.release(1.0)
+        grown = limiter.limit
+        assert grown > 8
+
+        for _ in range(20):
+            limiter._in_flight += 1
+            limiter.release(5.0)
+        assert limiter.limit < grown
+
+    def test_limit_does_not_grow_when_idle(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for _ in range(20):
+            limiter._in_flight = 1
+            limiter.release(1.0)
+        assert limiter.limit == 8
+
+
+class TestLoadShedding:
+    def test_scan_returns_503_when_overloaded(self):
+        with patch("src.server.routes.scan.scan_service") as mock:
+            mock.scan_file = AsyncMock(side_effect=OverloadedError("Model capacity is saturated", 7))
+            app = FastAPI()
+            app.include_router(scan_router)
+            response = TestClient(app).post(
+                "/scan", files={"file": ("test.txt", io.BytesIO(b"test content"))}
+            )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+    def test_metrics(self):
+        response = TestClient(metrics_router).get("/metrics")
+
+        assert response.status_code == 200
+        assert "scan_vault_model_concurrency_limit " in response.text
+        assert "scan_vault_model_queue_depth 0" in response.text
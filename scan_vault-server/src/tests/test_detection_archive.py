@@ -0,0 +1,169 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from src.services.detection_archive import (
+    DetectionArchive,
+    month_bounds,
+    oldest_hot_month,
+    overlaps,
+    partition_of,
+)
+from src.services.firebase_service import DetectionArchivedError, FirebaseService
+
+pytest.importorskip("pyarrow")
+
+
+def detection(detection_id, timestamp, **fields):
+    return {
+        "id": detection_id,
+        "fileName": "notes.txt",
+        "timestamp": timestamp,
+        "sensitiveInfo": [
+            {"type": "email", "value": "a@example.com", "confidence": "high", "category": "PII",
+             "locations": [{"page": 1, "start": 0, "end": 13}]},
+        ],
+        **fields,
+    }
+
+
+class TestPartitions:
+    def test_partition_of(self):
+        assert partition_of("2024-03_Xk3abc") == "2024-03"
+        assert partition_of("Xk3abc") is None
+
+    def test_month_bounds_and_overlap(self):
+        assert month_bounds("2024-12") == (
+            datetime(2024, 12, 1, tzinfo=timezone.utc), datetime(2025, 1, 1, tzinfo=timezone.utc)
+        )
+        assert overlaps("2024-03", since=datetime(2024, 3, 31))
+        assert not overlaps("2024-03", since=datetime(2024, 4, 1))
+        assert not overlaps("2024-03", until=datetime(2024, 3, 1))
+
+    def test_oldest_hot_month(self):
+        assert oldest_hot_month(datetime(2024, 2, 10), 3) == "2023-12"
+        assert oldest_hot_month(datetime(2024, 2, 10), 1) == "2024-02"
+
+
+class TestDetectionArchive:
+    def test_round_trip_with_filters(self, tmp_path):
+        archive = DetectionArchive(str(tmp_path))
+        archive.write("2024-03", [
+            detection("2024-03_a", datetime(2024, 3, 5), tenant="acme"),
+            detection("2024-03_b", datetime(2024, 3, 25)),
+        ])
+
+        everything = archive.read(["2024-03"])
+        assert {item["id"] for item in everything} == {"2024-03_a", "2024-03_b"}
+        first = next(item for item in everything if item["id"] == "2024-03_a")
+        assert first["tenant"] == "acme"
+        assert first["sensitiveInfo"][0]["locations"] == [{"page": 1, "start": 0, "end": 13}]
+
+        late = archive.read(["2024-03"], since=datetime(2024, 3, 10))
+        assert [item["id"] for item in late] == ["2024-03_b"]
+
+        by_id = archive.read(ids=["2024-03_a"], columns=["fileName"])
+        assert by_id == [{"id": "2024-03_a", "fileName": "notes.txt"}]
+        assert archive.read(["2024-04"]) == []
+
+    def test_rewriting_a_batch_does_not_duplicate(self, tmp_path):
+        archive = DetectionArchive(str(tmp_path))
+        batch = [detection("2024-03_a", datetime(2024, 3, 5))]
+        assert archive.write("2024-03", batch) == archive.write("2024-03", batch)
+        assert len(archive.read(["2024-03"])) == 1
+
+
+class TestPartitionedStorage:
+    @pytest.fixture(autouse=True)
+    def firebase(self):
+        FirebaseService._instance = None
+        with patch("firebase_admin.initialize_app"), patch("firebase_admin.credentials.Certificate"), \
+                patch("firebase_admin.firestore.client") as client:
+            self.db = Mock()
+            client.return_value = self.db
+            yield
+        FirebaseService._instance = None
+
+    @pytest.fixture
+    def archive(self, tmp_path):
+        archive = DetectionArchive(str(tmp_path))
+        with patch("src.services.firebase_service.detection_archive", archive):
+            yield archive
+
+    def registry(self, months):
+        self.collections = {"detections": Mock(), "detection_meta": Mock()}
+        self.collections["detection_meta"].document.return_value.get.return_value = Mock(
+            exists=True, to_dict=Mock(return_value={"months": months})
+        )
+        self.collections["detections"].stream.return_value = []
+        # Range filters chain back to the same query
+        self.collections["detections"].where.return_value = self.collections["detections"]
+        self.db.collection.side_effect = lambda name: self.collections.setdefault(name, Mock())
+
+    @pytest.mark.asyncio
+    async def test_archive_read_only_for_ranges(self, archive):
+        archive.write("2024-01", [detection("2024-01_old", datetime(2024, 1, 5))])
+        self.registry({"2024-01": {"hot": False, "archived": True}})
+
+        service = FirebaseService()
+        assert await service.get_detections() == []
+
+        ranged = await service.get_detections(since=datetime(2024, 1, 1), until=datetime(2024, 2, 1))
+        assert [item["id"] for item in ranged] == ["2024-01_old"]
+
+        outside = await service.get_detections(since=datetime(2024, 2, 1))
+        assert outside == []
+
+    @pytest.mark.asyncio
+    async def test_get_detection_falls_back_to_archive(self, archive):
+        archive.write("2024-01", [detection("2024-01_old", datetime(2024, 1, 5))])
+        self.registry({"2024-01": {"hot": False, "archived": True}})
+        self.collections["detections"].document.return_value.collection.return_value \
+            .document.return_value.get.return_value = Mock(exists=False)
+
+        result = await FirebaseService().get_detection("2024-01_old")
+        assert result["fileName"] == "notes.txt"
+
+    @pytest.mark.asyncio
+    async def test_unpartitioned_miss_skips_archive(self, archive):
+        self.registry({"2024-01": {"hot": False, "archived": True}})
+        self.collections["detections"].document.return_value.get.return_value = Mock(exists=False)
+
+        with patch.object(archive, "read") as read:
+            assert await FirebaseService().get_detection("legacy-id") is None
+        read.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_archived_detection_refused(self, archive):
+        archive.write("2024-01", [detection("2024-01_old", datetime(2024, 1, 5))])
+        self.registry({"2024-01": {"hot": False, "archived": True}})
+        self.collections["detections"].document.return_value.collection.return_value \
+            .document.return_value.get.return_value = Mock(exists=False)
+
+        with patch("src.services.firebase_service.firestore.transactional", side_effect=lambda fn: fn):
+            with pytest.raises(DetectionArchivedError):
+                await FirebaseService().delete_detection("2024-01_old")
+            # Already gone from both: nothing to do
+            await FirebaseService().delete_detection("2024-01_other")
+
+    @pytest.mark.asyncio
+    async def test_archive_partitions(self, archive):
+        self.registry({"2024-01": {"hot": True}, "2024-03": {"hot": True}})
+        doc = Mock(id="2024-01_old")
+        doc.to_dict.return_value = detection("2024-01_old", datetime(2024, 1, 5))
+        partition = self.collections["detections"].document.return_value.collection.return_value
+        partition.stream.return_value = [doc]
+
+        result = await FirebaseService().archive_partitions(hot_months=3, now=datetime(2024, 4, 15))
+
+        assert result == {"2024-01": 1}
+        self.collections["detections"].document.assert_any_call("2024-01")
+        assert call_made(self.db.batch().delete, doc.reference)
+        self.collections["detection_meta"].document.return_value.set.assert_any_call(
+            {"months": {"2024-01": {"hot": False, "archived": True}}}, merge=True
+        )
+        assert [item["id"] for item in archive.read(["2024-01"])] == ["2024-01_old"]
+
+
+def call_made(mock, *args):
+    return any(call.args == args for call in mock.call_args_list)
@@ -0,0 +1,312 @@
+import asyncio
+import os
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from src.server.models.finding import Finding
+from src.server.services import directory_watcher
+from src.server.services.directory_watcher import (
+    DirectoryWatcher,
+    EventCoalescer,
+    InotifySource,
+    PollingSource,
+)
+from src.server.services.detection_writer import DetectionSaveError
+from src.server.services.file_handler import FileTooLargeError
+from src.server.services.file_index import FileIndex
+from src.server.utils.file_processor import FileProcessor
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = FileIndex(str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+@pytest.fixture
+def mock_scan_service():
+    scan_service = Mock()
+    scan_service.file_processor = FileProcessor()
+
+    async def spool_file(file):
+        content = b""
+        while True:
+            data = await file.read(4)
+            if not data:
+                break
+            content += data
+        if len(content) > 100:
+            raise FileTooLargeError("File exceeds the limit")
+        upload = MagicMock(filename=file.filename, content=content)
+        upload.__enter__.return_value = upload
+        return upload
+
+    scan_service.spool_file = AsyncMock(side_effect=spool_file)
+    scan_service.scan_upload = AsyncMock(side_effect=lambda upload: {
+        "file_name": upload.filename,
+        "sensitive_fields": [Finding("email", "a@example.com")] if b"@" in upload.content else [],
+    })
+    return scan_service
+
+@pytest.fixture
+def watched(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    return directory
+
+
+def watcher_for(directory, scan_service, index, **options):
+    options = {"persist": False, "min_rescan_interval": 0, **options}
+    return DirectoryWatcher([str(directory)], scan_service, index, **options)
+
+
+@pytest.fixture
+def firebase():
+    with patch("src.server.services.directory_watcher.FirebaseService") as firebase, \
+            patch("src.server.services.directory_watcher.save_reserved_detection") as save:
+        ids = iter(f"2024-03_{n}" for n in range(100))
+        firebase.return_value.new_detection_id.side_effect = lambda: next(ids)
+        firebase.return_value.delete_detection = AsyncMock()
+        firebase.build_detection.side_effect = lambda name, fields: {"fileName": name}
+        save.side_effect = AsyncMock(side_effect=lambda detection, detection_id: detection_id)
+        firebase.save = save
+        yield firebase
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+class TestFileIndex:
+    def test_record_and_forget_directory(self, index):
+        index.record("/data/a/one.txt", 1, 10, "digest")
+        index.record("/data/a/two.txt", 1, 10)
+        index.record("/data/ab.txt", 1, 10)
+
+        assert index.get("/data/a/one.txt").digest == "digest"
+        assert index.forget("/data/a") == 2
+        assert index.get("/data/ab.txt") is not None
+        assert len(index) == 1
+
+    def test_survives_reopening(self, tmp_path):
+        path = str(tmp_path / "index.sqlite3")
+        first = FileIndex(path)
+        first.record("/data/one.txt", 5, 10, "digest", "2024-03_abc")
+        first.close()
+
+        reopened = FileIndex(path)
+        assert reopened.get("/data/one.txt").detection_id == "2024-03_abc"
+        reopened.close()
+
+
+class TestEventCoalescer:
+    @pytest.mark.asyncio
+    async def test_merges_bursts(self):
+        coalescer = EventCoalescer(debounce=0.05, max_wait=1.0)
+        for _ in range(3):
+            coalescer.add("/data/a.txt")
+        coalescer.add("/data/b.txt")
+
+        assert sorted(await coalescer.ready()) == ["/data/a.txt", "/data/b.txt"]
+        assert len(coalescer) == 0
+
+    @pytest.mark.asyncio
+    async def test_releases_unsettled_path_after_max_wait(self):
+        coalescer = EventCoalescer(debounce=0.05, max_wait=0.15)
+
+        async def keep_writing():
+            for _ in range(20):
+                coalescer.add("/data/growing.log")
+                await asyncio.sleep(0.02)
+
+        writer = asyncio.ensure_future(keep_writing())
+        started = asyncio.get_running_loop().time()
+        assert await coalescer.ready() == ["/data/growing.log"]
+        assert asyncio.get_running_loop().time() - started < 0.35
+        writer.cancel()
+
+
+class TestDirectoryWatcher:
+    @pytest.mark.asyncio
+    async def test_skips_unchanged_files(self, watched, mock_scan_service, index):
+        path = watched / "notes.txt"
+        path.write_text("mail a@example.com")
+        watcher = watcher_for(watched, mock_scan_service, index)
+
+        assert await watcher.process(str(path)) == "scanned"
+        assert await watcher.process(str(path)) == "unchanged"
+        mock_scan_service.spool_file.assert_awaited_once()
+
+        # Touched: read and hashed, not scanned
+        os.utime(path, ns=(1, 1))
+        assert await watcher.process(str(path)) == "unchanged"
+        assert mock_scan_service.scan_upload.await_count == 1
+
+        path.write_text("nothing here")
+        assert await watcher.process(str(path)) == "scanned"
+        assert mock_scan_service.scan_upload.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_records_failures_and_removals(self, watched, mock_scan_service, index):
+        large = watched / "large.txt"
+        large.write_text("x" * 200)
+        ignored = watched / "program.exe"
+        ignored.write_bytes(b"MZ")
+        watcher = watcher_for(watched, mock_scan_service, index)
+
+        assert await watcher.process(str(large)) == "failed"
+        assert await watcher.process(str(large)) == "unchanged"
+        assert index.get(str(large)).error == "File exceeds the limit"
+        assert await watcher.process(str(ignored)) is None
+
+        large.unlink()
+        assert await watcher.process(str(large)) == "removed"
+        assert index.get(str(large)) is None
+
+    @pytest.mark.asyncio
+    async def test_polling_catches_up_then_follows_changes(self, watched, mock_scan_service, index):
+        (watched / "old.txt").write_text("mail a@example.com")
+        watcher = watcher_for(watched, mock_scan_service, index, use_inotify=False, poll_interval=0.05, debounce=0.01)
+        running = asyncio.ensure_future(watcher.run())
+        try:
+            await wait_for(lambda: watcher.stats["scanned"] == 1)
+            assert isinstance(watcher.source, PollingSource)
+
+            (watched / "sub").mkdir()
+            (watched / "sub" / "new.txt").write_text("fresh")
+            await wait_for(lambda: watcher.stats["scanned"] == 2)
+        finally:
+            watcher.stop()
+            await running
+
+        # A restart only catches up on what changed
+        restarted = watcher_for(watched, mock_scan_service, index, use_inotify=False, debounce=0.01)
+        running = asyncio.ensure_future(restarted.run())
+        try:
+            await wait_for(lambda: restarted.stats["unchanged"] == 2)
+        finally:
+            restarted.stop()
+            await running
+        assert mock_scan_service.scan_upload.await_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not InotifySource.available(), reason="inotify is Linux only")
+    async def test_inotify_picks_up_new_files(self, watched, mock_scan_service, index):
+        watcher = watcher_for(watched, mock_scan_service, index, debounce=0.01)
+        running = asyncio.ensure_future(watcher.run())
+        try:
+            await wait_for(lambda: watcher.source is not None)
+            assert isinstance(watcher.source, InotifySource)
+
+            (watched / "new.txt").write_text("mail a@example.com")
+            (watched / "nested" / "deeper").mkdir(parents=True)
+            (watched / "nested" / "deeper" / "inner.txt").write_text("inside")
+            await wait_for(lambda: watcher.stats["scanned"] == 2)
+
+            (watched / "new.txt").unlink()
+            await wait_for(lambda: watcher.stats["removed"] == 1)
+        finally:
+            watcher.stop()
+            await running
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not InotifySource.available(), reason="inotify is Linux only")
+    async def test_inotify_walks_moved_in_tree_off_loop(self, tmp_path, watched):
+        """Test a tree moved in is walked on a worker thread and its existing files reported"""
+        (tmp_path / "outside" / "deeper").mkdir(parents=True)
+        (tmp_path / "outside" / "deeper" / "inner.txt").write_text("inside")
+        emitted = []
+        source = InotifySource([str(watched)], emitted.append, Mock())
+        threads = set()
+        list_directory = directory_watcher.list_directory
+
+        def listing(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return list_directory(*args, **kwargs)
+
+        with patch.object(directory_watcher, "list_directory", side_effect=listing):
+            await source.start()
+            try:
+                os.rename(tmp_path / "outside", watched / "moved")
+                await wait_for(lambda: emitted)
+            finally:
+                source.stop()
+
+        assert emitted == [str(watched / "moved" / "deeper" / "inner.txt")]
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_rescan_replaces_prior_detection(self, watched, mock_scan_service, index, firebase):
+        path = watched / "notes.txt"
+        path.write_text("mail a@example.com")
+        watcher = watcher_for(watched, mock_scan_service, index, persist=True)
+
+        assert await watcher.process(str(path)) == "scanned"
+        path.write_text("mail b@example.com")
+        assert await watcher.process(str(path)) == "scanned"
+
+        assert index.get(str(path)).detection_id == "2024-03_1"
+        firebase.return_value.delete_detection.assert_awaited_once_with("2024-03_0")
+
+    @pytest.mark.asyncio
+    async def test_rescans_rate_limited(self, watched, mock_scan_service, index):
+        path = watched / "growing.log.txt"
+        path.write_text("line one")
+        watcher = watcher_for(watched, mock_scan_service, index, min_rescan_interval=60)
+
+        assert await watcher.process(str(path)) == "scanned"
+        path.write_text("line one, line two")
+        assert await watcher.process(str(path)) == "deferred"
+        assert await watcher.process(str(path)) == "deferred"
+        assert mock_scan_service.scan_upload.await_count == 1
+        assert list(watcher._timers) == [str(path)]
+        watcher._timers.pop(str(path)).cancel()
+
+    @pytest.mark.asyncio
+    async def test_failed_save_not_indexed_and_retried(self, watched, mock_scan_service, index, firebase):
+        path = watched / "notes.txt"
+        path.write_text("mail a@example.com")
+        saves = [DetectionSaveError("Detection 2024-03_0 was not saved"), "2024-03_1"]
+
+        async def save(detection, detection_id):
+            outcome = saves.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        firebase.save.side_effect = save
+        watcher = watcher_for(watched, mock_scan_service, index, persist=True, debounce=0.01, retry_backoff=0.05)
+        running = asyncio.ensure_future(watcher.run())
+        try:
+            await wait_for(lambda: watcher.stats["failed"] == 1)
+            assert index.get(str(path)) is None
+            await wait_for(lambda: watcher.stats["scanned"] == 1)
+        finally:
+            watcher.stop()
+            await running
+        assert index.get(str(path)).detection_id == "2024-03_1"
+
+    @pytest.mark.asyncio
+    async def test_scan_failure_retried(self, watched, mock_scan_service, index):
+        (watched / "notes.txt").write_text("mail a@example.com")
+        scan = mock_scan_service.scan_upload.side_effect
+        outages = [ValueError("Failed to analyze text: model down")]
+
+        def scan_or_fail(upload):
+            if outages:
+                raise outages.pop()
+            return scan(upload)
+
+        mock_scan_service.scan_upload.side_effect = scan_or_fail
+        watcher = watcher_for(watched, mock_scan_service, index, debounce=0.01, retry_backoff=0.05)
+        running = asyncio.ensure_future(watcher.run())
+        try:
+            await wait_for(lambda: watcher.stats["scanned"] == 1)
+        finally:
+            watcher.stop()
+            await running
+        assert watcher.stats["failed"] == 1
@@ -0,0 +1,203 @@
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import zipfile
+import pytest
+from email.message import EmailMessage
+from unittest.mock import Mock, patch
+
+from src.server.extractors import scheduler
+from src.server.extractors.base import ContainerExtractor, Extractor, CPU_BOUND
+from src.server.extractors.registry import ExtractorRegistry, registry
+from src.server.services.file_handler import FileTooLargeError, SpooledUpload
+from src.server.services.file_handler import UnsupportedFileTypeError
+from src.server.utils.file_processor import FileProcessor
+from src.tests.test_redactor import make_pdf
+
+
+class UpperExtractor(Extractor):
+    def iter_pages(self, path):
+        with open(path) as f:
+            yield f.read().upper()
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write_file(name: str, data: bytes) -> str:
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+    return write_file
+
+def zip_bytes(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def pages(extension: str, path: str) -> list:
+    return list(registry.get(extension).iter_pages(path))
+
+
+class TestExtractorRegistry:
+    def test_heavy_libraries_load_lazily(self):
+        """Test importing the file processor does not import pandas or pdfplumber"""
+        code = (
+            "import sys, src.server.utils.file_processor as fp; "
+            "fp.FileProcessor().get_file_extension('a.pdf'); "
+            "print('pandas' in sys.modules, 'pdfplumber' in sys.modules)"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert output.stdout.split() == ["False", "False"]
+
+    def test_entry_point_plugins(self, write):
+        """Test extractors installed as entry points are discovered"""
+        entry_point = Mock(value="plugin:UpperExtractor", load=Mock(return_value=UpperExtractor))
+        entry_point.name = "rtf"
+        with patch("src.server.extractors.registry.entry_points", return_value=[entry_point]):
+            plugins = ExtractorRegistry()
+            assert "rtf" in plugins.extensions()
+
+        path = write("a.rtf", b"hello")
+        assert list(plugins.get("rtf").iter_pages(path)) == ["HELLO"]
+        entry_point.load.assert_called_once()
+
+    def test_register(self):
+        custom = ExtractorRegistry({}, group=None)
+        custom.register("RTF", UpperExtractor)
+        assert FileProcessor(custom).get_file_extension("notes.rtf") == "rtf"
+        with pytest.raises(ValueError):
+            custom.get("pdf")
+
+
+class TestExtractors:
+    def test_json(self, write):
+        path = write("a.json", json.dumps({"user": {"email": "a@example.com", "ids": [1, 2]}}).encode())
+        assert pages("json", path) == ["user.email: a@example.com\nuser.ids[0]: 1\nuser.ids[1]: 2"]
+
+    def test_csv_first_line_is_data(self, write):
+        path = write("a.csv", b"123-45-6789,John\n987-65-4321,Jane\n")
+        assert "123-45-6789" in pages("csv", path)[0]
+
+    def test_text_must_be_utf8(self, write):
+        with pytest.raises(UnsupportedFileTypeError):
+            pages("txt", write("a.txt", b"caf\xe9"))
+
+    def test_ndjson_pages(self, write):
+        lines = b"\n".join(json.dumps({"ssn": f"000-00-{i:04d}"}).encode() for i in range(3)) + b"\nnot json\n"
+        path = write("a.ndjson", lines)
+        with patch("src.server.extractors.structured.NDJSON_RECORDS_PER_PAGE", 2):
+            result = pages("ndjson", path)
+        assert result == ["ssn: 000-00-0000\nssn: 000-00-0001", "ssn: 000-00-0002\nnot json"]
+
+    def test_html(self, write):
+        html = b"<html><head><style>p {}</style><script>var ssn = 1;</script></head>" \
+               b"<body><p>Name: John</p><a href='mailto:john@example.com'>mail</a></body></html>"
+        text = pages("html", write("a.html", html))[0]
+        assert "Name: John" in text
+        assert "john@example.com" in text
+        assert "var ssn" not in text
+
+    def test_eml_with_attachments(self, write):
+        """Test headers, body and attachments are extracted, recursing into attached messages"""
+        inner = EmailMessage()
+        inner["Subject"] = "Forwarded"
+        inner.set_content("SSN 123-45-6789")
+
+        message = EmailMessage()
+        message["From"] = "john@example.com"
+        message["Subject"] = "Records"
+        message.set_content("See attached")
+        message.add_attachment(b"card 4111111111111111", maintype="text", subtype="plain", filename="card.txt")
+        message.add_attachment(inner)
+
+        result = pages("eml", write("a.eml", message.as_bytes()))
+        assert "From: john@example.com" in result[0]
+        assert "See attached" in result[0]
+        assert result[1] == "card 4111111111111111"
+        assert "123-45-6789" in result[2]
+
+    def test_nested_archives(self, write):
+        inner = zip_bytes({"inner.txt": b"SSN 123-45-6789", "photo.png": b"\x89PNG\r\n\x1a\n"})
+        path = write("a.zip", zip_bytes({"notes.txt": b"hello", "nested.zip": inner, "dir/": b""}))
+        assert pages("zip", path) == ["hello", "SSN 123-45-6789"]
+
+    def test_archive_depth_limit(self, write):
+        data = zip_bytes({"deep.txt": b"secret"})
+        for _ in range(ContainerExtractor.MAX_DEPTH):
+            data = zip_bytes({"nested.zip": data})
+        assert pages("zip", write("a.zip", data)) == []
+
+    def test_archive_size_limit(self, write):
+        """Test the unpacked size is enforced on bytes written, not declared sizes"""
+        path = write("a.zip", zip_bytes({"a.txt": b"a" * 5000, "b.txt": b"b" * 5000}))
+        with patch.object(ContainerExtractor, "MAX_UNPACKED_BYTES", 8000):
+            with pytest.raises(FileTooLargeError):
+                pages("zip", path)
+
+    def test_nested_archives_share_size_limit(self, write):
+        """Test nested archives spend the outer archive's budget instead of starting their own"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("a.txt", b"a" * 3000)
+            archive.writestr("b.txt", b"b" * 3000)
+        inner = buffer.getvalue()
+        path = write("a.zip", zip_bytes({"one.zip": inner, "two.zip": inner}))
+        # Each nested archive fits on its own; together they do not
+        with patch.object(ContainerExtractor, "MAX_UNPACKED_BYTES", 9000):
+            with pytest.raises(FileTooLargeError):
+                pages("zip", path)
+
+    def test_tar(self, write):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            info = tarfile.TarInfo("data.json")
+            data = b'{"email": "a@example.com"}'
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        assert pages("tgz", write("a.tgz", buffer.getvalue())) == ["email: a@example.com"]
+
+
+class TestFileProcessor:
+    @pytest.mark.parametrize("header,file_type", [
+        (b"PK\x03\x04", "archive"),
+        (b"\x1f\x8b\x08", "archive"),
+        (b"From: a@example.com", "email"),
+        (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "email"),
+        (b"<html>", "html"),
+        (b'{"a": 1}', "json"),
+    ])
+    def test_sniff_new_types(self, header, file_type):
+        FileProcessor().sniff_file_type(header, file_type)
+
+    @pytest.mark.parametrize("header,file_type", [
+        (b"%PDF-1.7", "json"),
+        (b"plain text", "archive"),
+        (b"PK\x03\x04", "html"),
+    ])
+    def test_sniff_rejects_mismatched_types(self, header, file_type):
+        with pytest.raises(UnsupportedFileTypeError):
+            FileProcessor().sniff_file_type(header, file_type)
+
+    @pytest.mark.asyncio
+    async def test_cpu_bound_extractors_use_process_pool(self, write):
+        """Test CPU-bound extractors run in the process pool and light ones in threads"""
+        path = write("a.pdf", make_pdf("SSN 123-45-6789"))
+        upload = SpooledUpload(path, "a.pdf", "pdf", 0, "pdf")
+        assert registry.get("pdf").cost == CPU_BOUND
+
+        with patch.object(scheduler, "EXTRACT_PROCESSES", 1):
+            try:
+                result = await FileProcessor().extract_pages(upload, "pdf")
+                assert scheduler._process_pool is not None
+            finally:
+                scheduler.shutdown_process_pool()
+        assert "123-45-6789" in result[0]
+
+        text = SpooledUpload(write("a.txt", b"hello"), "a.txt", "text", 5, "txt")
+        with patch.object(scheduler, "get_process_pool") as pool:
+            assert await FileProcessor().extract_pages(text, "txt") == ["hello"]
+        pool.assert_not_called()
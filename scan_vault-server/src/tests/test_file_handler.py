@@ -0,0 +1,141 @@
+import io
+import os
+import struct
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.server.middleware.upload_limit import UploadLimitMiddleware
+from src.server.services.file_handler import (
+    CHUNK_SIZE,
+    FileHandler,
+    FileTooLargeError,
+    UnsupportedFileTypeError,
+)
+from src.server.utils.file_processor import FileProcessor
+
+
+class MockUpload:
+    """Async upload stand-in that returns data in the requested chunk sizes."""
+
+    def __init__(self, filename: str, data: bytes):
+        self.filename = filename
+        self._buffer = io.BytesIO(data)
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return self._buffer.read(size)
+
+
+@pytest.fixture
+def file_processor():
+    return FileProcessor()
+
+
+class TestSpool:
+    @pytest.mark.asyncio
+    async def test_spool_text_file(self, file_processor):
+        """Test upload is copied in chunks and exposed as a memory map"""
+        data = b"name,email\nJohn,john@example.com\n" * (CHUNK_SIZE // 16)
+        upload = MockUpload("people.csv", data)
+
+        spooled = await FileHandler.spool(upload, "csv", file_processor.sniff_file_type)
+        with spooled:
+            assert spooled.size == len(data)
+            assert spooled.view()[:10] == data[:10]
+            assert all(size == CHUNK_SIZE for size in upload.reads)
+            path = spooled.path
+
+        assert not os.path.exists(path)
+
+    @pytest.mark.asyncio
+    async def test_spool_rejects_oversized_file(self, file_processor):
+        """Test the size limit is enforced while copying"""
+        upload = MockUpload("big.txt", b"a" * (CHUNK_SIZE * 3))
+
+        with patch.dict(FileHandler.MAX_FILE_SIZES, {"text": CHUNK_SIZE}):
+            with pytest.raises(FileTooLargeError):
+                await FileHandler.spool(upload, "text", file_processor.sniff_file_type)
+
+        assert len(upload.reads) == 2
+
+    @pytest.mark.asyncio
+    async def test_spool_rejects_mismatched_content(self, file_processor):
+        """Test magic bytes are checked before the file is parsed"""
+        upload = MockUpload("report.pdf", b"just some text")
+
+        with pytest.raises(UnsupportedFileTypeError):
+            await FileHandler.spool(upload, "pdf", file_processor.sniff_file_type)
+
+    @pytest.mark.asyncio
+    async def test_spool_empty_file(self, file_processor):
+        """Test empty uploads spool without a memory map"""
+        spooled = await FileHandler.spool(MockUpload("empty.txt", b""), "text", file_processor.sniff_file_type)
+        with spooled:
+            assert spooled.view() == b""
+
+
+class TestSniffFileType:
+    @pytest.mark.parametrize("header,file_type", [
+        (b"%PDF-1.7\n", "pdf"),
+        (b"PK\x03\x04\x14\x00", "docx"),
+        (b"\xff\xd8\xff\xe0", "image"),
+        (b"\x89PNG\r\n\x1a\n", "image"),
+        (b"BM" + struct.pack("<IIII", 1078, 0, 54, 40), "image"),
+        (b"plain text", "text"),
+        (b"a,b,c\n1,2,3", "csv"),
+        # Starts like a BMP but is text
+        (b"BMI,age\n22.5,41\n", "csv"),
+        (b"BM", "text"),
+    ])
+    def test_sniff_accepts_matching_content(self, file_processor, header, file_type):
+        file_processor.sniff_file_type(header, file_type)
+
+    @pytest.mark.parametrize("header,file_type", [
+        (b"\x7fELF\x02\x01\x01\x00", "text"),
+        (b"%PDF-1.7\n", "image"),
+        (b"plain text", "docx"),
+        (b"BMI,age\n22.5,41\n", "image"),
+        (b"BM" + struct.pack("<IIII", 1078, 0, 54, 40), "text"),
+    ])
+    def test_sniff_rejects_mismatched_content(self, file_processor, header, file_type):
+        with pytest.raises(UnsupportedFileTypeError):
+            file_processor.sniff_file_type(header, file_type)
+
+
+class TestUploadLimitMiddleware:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            return {"size": len(await file.read())}
+
+        app.add_middleware(UploadLimitMiddleware, max_body_size=4096)
+        return TestClient(app)
+
+    def test_accepts_small_upload(self, client):
+        response = client.post("/upload", files={"file": ("a.txt", b"a" * 100)})
+        assert response.status_code == 200
+        assert response.json() == {"size": 100}
+
+    def test_rejects_large_upload(self, client):
+        response = client.post("/upload", files={"file": ("a.txt", b"a" * 10000)})
+        assert response.status_code == 413
+
+    def test_rejects_streamed_body_without_length(self, client):
+        def body():
+            yield b'--boundary\r\nContent-Disposition: form-data; name="file"; filename="a.txt"\r\n\r\n'
+            for _ in range(10):
+                yield b"a" * 1000
+            yield b"\r\n--boundary--\r\n"
+
+        response = client.post(
+            "/upload",
+            content=body(),
+            headers={"content-type": "multipart/form-data; boundary=boundary"},
+        )
+        assert response.status_code == 413
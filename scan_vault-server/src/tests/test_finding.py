@@ -0,0 +1,93 @@
+import io
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+from src.server.models.finding import Category, Confidence, Finding, Location
+from src.server.routes.scan import router as scan_router
+from src.server.utils.json_parser import JSONParser
+from src.services.firebase_service import FirebaseService
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+
+class TestFinding:
+    def test_normalizes_and_shares_labels(self):
+        """Test categories and confidences become enum members and types are interned as reported"""
+        first = Finding.from_dict({"type": "Full_Name", "value": "Jane", "confidence": "HIGH", "category": "pii"})
+        second = Finding.from_dict({"type": "".join(["Full", "_Name "]), "value": "Joe", "category": "PII"})
+
+        assert first.category is Category.PII
+        assert first.confidence is Confidence.HIGH
+        assert first.type == "Full_Name"
+        assert first.type is second.type
+
+    def test_strict_rejects_unknown_fields(self):
+        data = {"type": "ssn", "value": "1", "document": 2}
+        assert Finding.from_dict(data) == Finding("ssn", "1")
+        with pytest.raises(ValueError, match="Unknown finding fields: document"):
+            Finding.from_dict(data, strict=True)
+
+    @pytest.mark.parametrize("location", [
+        "page 1",
+        {"page": 1, "start": 0},
+        {"page": 1, "start": 0, "end": 4, "line": 2},
+        {"page": True, "start": 0, "end": 4},
+        {"page": 1, "start": 0, "end": 4, "bbox": [1, 2]},
+    ])
+    def test_malformed_locations_raise_value_error(self, location):
+        with pytest.raises(ValueError):
+            Finding.from_dict({"type": "ssn", "value": "1", "locations": [location]})
+
+    def test_unknown_labels_kept_as_strings(self):
+        finding = Finding("note", "x", confidence="Certain", category="secret")
+        assert (finding.confidence, finding.category) == ("certain", "SECRET")
+
+    def test_slotted(self):
+        finding = Finding("email", "a@example.com")
+        assert not hasattr(finding, "__dict__")
+        with pytest.raises(AttributeError):
+            finding.extra = 1
+
+    def test_orjson_encodes_directly(self):
+        """Test orjson writes findings without an intermediate dict"""
+        finding = Finding("ssn", "123-45-6789", "high", "Form", "PII", [Location(1, 5, 16)])
+        assert orjson.loads(orjson.dumps(finding)) == {
+            "type": "ssn", "value": "123-45-6789", "confidence": "high", "context": "Form",
+            "category": "PII", "locations": [{"page": 1, "start": 5, "end": 16, "bbox": None}],
+        }
+
+    def test_storage_round_trip(self):
+        """Test the stored form holds plain values and loads back to an equal finding"""
+        finding = Finding("ssn", "123-45-6789", "high", None, "PII", [Location(1, 5, 16, [1.0, 2.0, 3.0, 4.0])])
+        stored = FirebaseService.build_detection("a.txt", [finding])["sensitiveInfo"][0]
+
+        assert stored == {
+            "type": "ssn", "value": "123-45-6789", "confidence": "high", "category": "PII",
+            "locations": [{"page": 1, "start": 5, "end": 16, "bbox": [1.0, 2.0, 3.0, 4.0]}],
+        }
+        assert type(stored["category"]) is str
+        assert Finding.from_dict(stored) == finding
+
+    def test_parser_returns_findings(self):
+        parsed = JSONParser().parse_gpt_response('```json\n[{"type": "email", "value": "a@b.co", "extra": 1}, 3]\n```')
+        assert parsed == [Finding("email", "a@b.co")]
+
+    def test_categorize_groups_without_copies(self):
+        finding = Finding("ssn", "1", category="PII")
+        assert JSONParser()._categorize_results([finding])["pii"][0] is finding
+
+    def test_scan_route_renders_findings(self):
+        app_client = TestClient(scan_router)
+        results = {"file_name": "a.txt", "sensitive_fields": [Finding("email", "a@b.co", "high", "x", "PII")]}
+        with patch("src.server.routes.scan.scan_service") as service:
+            service.scan_file = AsyncMock(return_value=results)
+            response = app_client.post("/scan", files={"file": ("a.txt", io.BytesIO(b"a@b.co"))})
+
+        assert response.status_code == 200
+        assert response.json()["results"]["sensitive_fields"][0]["category"] == "PII"
@@ -0,0 +1,80 @@
+import re
+import pytest
+
+from src.server.models.finding import Finding, Location
+from src.server.utils.aho_corasick import AhoCorasick
+from src.server.utils.finding_locator import FindingLocator
+from src.tests.test_redactor import make_pdf
+
+
+@pytest.fixture
+def locator():
+    return FindingLocator()
+
+
+class TestAhoCorasick:
+    def test_overlapping_matches(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        assert sorted(automaton.finditer("ushers")) == [(1, 4, 1), (2, 4, 0), (2, 6, 3)]
+
+    def test_matches_agree_with_regex(self):
+        patterns = ["ab", "bab", "a", "abba", "c"]
+        text = "abbabcababbac" * 3
+        expected = sorted(
+            (match.start(), match.start() + len(pattern), index)
+            for index, pattern in enumerate(patterns)
+            for match in re.finditer(f"(?={re.escape(pattern)})", text)
+        )
+        assert sorted(AhoCorasick(patterns).finditer(text)) == expected
+
+    def test_no_patterns(self):
+        assert list(AhoCorasick([]).finditer("anything")) == []
+
+
+class TestFindingLocator:
+    def test_locate_across_pages(self, locator):
+        findings = [
+            Finding("ssn", "123-45-6789"),
+            Finding("full_name", "john doe"),
+        ]
+        pages = ["SSN: 123-45-6789", "Patient John Doe, SSN 123-45-6789"]
+
+        locator.locate(findings, pages)
+
+        assert findings[0].locations == [Location(1, 5, 16), Location(2, 22, 33)]
+        assert findings[1].locations == [Location(2, 8, 16)]
+
+    def test_locate_respects_word_boundaries(self, locator):
+        findings = [Finding("full_name", "John")]
+
+        locator.locate(findings, ["Johnson met John."])
+
+        assert findings[0].locations == [Location(1, 12, 16)]
+
+    def test_locate_missing_value(self, locator):
+        findings = [Finding("email", "nobody@example.com"), Finding("note", None)]
+
+        locator.locate(findings, ["no emails here"])
+
+        assert findings[0].locations == []
+        assert findings[1].locations == []
+
+    def test_locate_caps_repeated_values(self, locator):
+        findings = [Finding("full_name", "Ann")]
+
+        locator.locate(findings, ["Ann " * (FindingLocator.MAX_LOCATIONS_PER_FINDING + 10)])
+
+        assert len(findings[0].locations) == FindingLocator.MAX_LOCATIONS_PER_FINDING
+
+    def test_locate_pdf_bounding_boxes(self, locator, tmp_path):
+        path = tmp_path / "input.pdf"
+        path.write_bytes(make_pdf("SSN 123-45-6789"))
+        findings = [Finding("ssn", "123-45-6789")]
+
+        locator.locate(findings, ["SSN 123-45-6789"], str(path))
+
+        location = findings[0].locations[0]
+        x0, top, x1, bottom = location.bbox
+        assert location.start == 4
+        assert 10 < x0 < x1
+        assert top < bottom
@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, AsyncMock
 
 from src.server.routes.get_detections import router
+from src.server.services.detection_version import DetectionVersion
 
 
 client = TestClient(router)
@@ -19,12 +20,24 @@ MOCK_DETECTIONS = [
     }
 ]
 
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def version():
+    with patch("src.server.routes.get_detections.detection_version", DetectionVersion()) as instance:
+        yield instance
+
 @pytest.fixture
-def mock_firebase_service():
+def mock_firebase_service(version):
     with patch("src.server.routes.get_detections.FirebaseService") as mock:
         mock_instance = Mock()
        
         mock_instance.get_detections = AsyncMock()
+        mock_instance.get_detections_version = AsyncMock(return_value=7)
+        mock_instance.get_detection = AsyncMock()
         mock.return_value = mock_instance
         yield mock_instance
 
@@ -80,3 +93,70 @@ class TestGetDetectionsEndpoint:
         assert response.status_code == 200
        
         mock_firebase_service.get_detections.assert_awaited_once()
+
+
+class TestConditionalGet:
+    def test_etag_and_not_modified(self, mock_firebase_service):
+        """Test a repeat load with the same ETag gets a 304 without reading the collection"""
+        mock_firebase_service.get_detections.return_value = MOCK_DETECTIONS
+
+        first = client.get("/get-saved-detections")
+        etag = first.headers["ETag"]
+        assert etag == 'W/"detections-7"'
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        second = client.get("/get-saved-detections", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        mock_firebase_service.get_detections.assert_awaited_once()
+
+    def test_new_version_served_in_full(self, mock_firebase_service):
+        mock_firebase_service.get_detections.return_value = MOCK_DETECTIONS
+        etag = client.get("/get-saved-detections").headers["ETag"]
+
+        mock_firebase_service.get_detections_version.return_value = 8
+        response = client.get("/get-saved-detections", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == 'W/"detections-8"'
+        assert mock_firebase_service.get_detections.await_count == 2
+
+    def test_rendered_list_reused_for_same_version(self, mock_firebase_service):
+        """Test other clients loading an unchanged collection skip the collection read"""
+        mock_firebase_service.get_detections.return_value = MOCK_DETECTIONS
+        client.get("/get-saved-detections")
+        response = client.get("/get-saved-detections")
+
+        assert response.json() == {"detections": MOCK_DETECTIONS}
+        mock_firebase_service.get_detections.assert_awaited_once()
+
+    def test_watched_version_needs_no_storage(self, mock_firebase_service, version):
+        version._watch = Mock()
+        version.set(3)
+
+        response = client.get("/get-saved-detections", headers={"If-None-Match": 'W/"detections-3"'})
+        assert response.status_code == 304
+        mock_firebase_service.get_detections_version.assert_not_awaited()
+
+    def test_local_write_invalidates(self, mock_firebase_service, version):
+        mock_firebase_service.get_detections.return_value = MOCK_DETECTIONS
+        version._watch = Mock()
+        version.set(3)
+        version.invalidate()
+
+        response = client.get("/get-saved-detections", headers={"If-None-Match": 'W/"detections-3"'})
+        assert response.status_code == 200
+        mock_firebase_service.get_detections_version.assert_awaited_once()
+
+    def test_single_detection_etag(self, mock_firebase_service):
+        mock_firebase_service.get_detection.return_value = MOCK_DETECTIONS[0]
+
+        first = client.get("/get-saved-detections/123")
+        assert first.status_code == 200
+        assert first.json()["id"] == "123"
+
+        second = client.get("/get-saved-detections/123", headers={"If-None-Match": first.headers["ETag"]})
+        assert second.status_code == 304
+
+    def test_single_detection_missing(self, mock_firebase_service):
+        mock_firebase_service.get_detection.return_value = None
+        assert client.get("/get-saved-detections/missing").status_code == 404
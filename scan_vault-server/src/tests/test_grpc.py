@@ -0,0 +1,184 @@
+import grpc
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from src.server.models.finding import Finding
+from src.server.rpc import scan_vault_pb2 as pb
+from src.server.rpc import scan_vault_pb2_grpc
+from src.server.rpc.server import GrpcServer
+from src.server.services.file_handler import FileTooLargeError
+
+KEY = (("access_token", "test"),)
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", side_effect=lambda key: key == "test"):
+        yield
+
+@pytest.fixture
+def mock_scan_service():
+    scan_service = Mock()
+    received = {}
+
+    async def spool_file(reader):
+        content = b""
+        while True:
+            data = await reader.read(64 * 1024)
+            if not data:
+                break
+            content += data
+        if reader.filename.endswith(".big"):
+            raise FileTooLargeError("File exceeds the 1 MB limit for text files")
+        if reader.filename.endswith(".exe"):
+            raise ValueError("Invalid filename")
+        received[reader.filename] = content
+        upload = MagicMock(filename=reader.filename)
+        upload.__enter__.return_value = upload
+        return upload
+
+    async def scan_upload(upload, policy=None):
+        if upload.filename.startswith("outage"):
+            raise ValueError("Failed to analyze text: connection reset")
+        findings = [Finding("email", "a@example.com", "high", category="PII")] \
+            if b"a@example.com" in received[upload.filename] else []
+        results = {"file_name": upload.filename, "sensitive_fields": findings}
+        if policy is not None:
+            results["policy"] = {"matched": bool(findings), "matching_findings": len(findings),
+                                 "stopped_early": False, "pages_scanned": 1, "chunks_analyzed": 1}
+        return results
+
+    scan_service.spool_file = AsyncMock(side_effect=spool_file)
+    scan_service.scan_upload = AsyncMock(side_effect=scan_upload)
+    scan_service.received = received
+    return scan_service
+
+@pytest_asyncio.fixture
+async def stub(mock_scan_service):
+    server = GrpcServer(port=0, host="127.0.0.1")
+    port = await server.start(mock_scan_service)
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        yield scan_vault_pb2_grpc.ScanVaultStub(channel)
+    await server.stop(0)
+
+
+def file_chunks(filename, content, file_id="", size=4, **options):
+    pieces = [content[i:i + size] for i in range(0, len(content), size)] or [b""]
+    for index, piece in enumerate(pieces):
+        yield pb.FileChunk(
+            file_id=file_id,
+            filename=filename if index == 0 else "",
+            options=pb.ScanOptions(**options) if index == 0 else None,
+            data=piece,
+            last=index == len(pieces) - 1,
+        )
+
+
+def interleave(*streams):
+    streams = [iter(stream) for stream in streams]
+    while streams:
+        for stream in list(streams):
+            try:
+                yield next(stream)
+            except StopIteration:
+                streams.remove(stream)
+
+
+class TestGrpcScan:
+    @pytest.mark.asyncio
+    async def test_scan_reassembles_chunks(self, stub, mock_scan_service):
+        content = b"mail a@example.com now"
+        result = await stub.Scan(file_chunks("notes.txt", content), metadata=KEY)
+
+        assert mock_scan_service.received["notes.txt"] == content
+        assert result.file_name == "notes.txt"
+        assert [(f.type, f.value, f.confidence, f.category) for f in result.findings] == [
+            ("email", "a@example.com", "high", "PII")
+        ]
+        assert not result.HasField("policy")
+
+    @pytest.mark.asyncio
+    async def test_scan_with_policy_and_persist(self, stub):
+        with patch("src.server.services.detection_writer.FirebaseService") as firebase:
+            firebase.return_value.new_detection_id.return_value = "2024-03_abc"
+            firebase.return_value.save_detection = AsyncMock()
+            result = await stub.Scan(
+                file_chunks("notes.txt", b"a@example.com", persist=True, stop_on_category=["PII"]),
+                metadata=KEY,
+            )
+
+        assert result.policy.matched
+        assert result.detection_id == "2024-03_abc"
+
+    @pytest.mark.asyncio
+    async def test_rejects_missing_key(self, stub):
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.Scan(file_chunks("notes.txt", b"hello"), metadata=(("access_token", "wrong"),))
+        assert error.value.code() == grpc.StatusCode.UNAUTHENTICATED
+
+    @pytest.mark.asyncio
+    async def test_scan_error_status(self, stub):
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.Scan(file_chunks("notes.big", b"hello"), metadata=KEY)
+        assert error.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filename,code", [
+        ("program.exe", grpc.StatusCode.INVALID_ARGUMENT),
+        ("outage.txt", grpc.StatusCode.INTERNAL),
+    ])
+    async def test_analysis_failure_is_not_invalid_argument(self, stub, filename, code):
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.Scan(file_chunks(filename, b"hello"), metadata=KEY)
+        assert error.value.code() == code
+
+    @pytest.mark.asyncio
+    async def test_scan_stream_yields_findings_then_summary(self, stub):
+        events = [event async for event in stub.ScanStream(file_chunks("notes.txt", b"a@example.com"), metadata=KEY)]
+
+        assert [event.WhichOneof("event") for event in events] == ["finding", "summary"]
+        assert events[0].finding.value == "a@example.com"
+        assert events[1].summary.file_name == "notes.txt"
+        assert not events[1].summary.findings
+
+
+class TestGrpcBatch:
+    @pytest.mark.asyncio
+    async def test_interleaved_files(self, stub, mock_scan_service):
+        stream = interleave(
+            file_chunks("a.txt", b"write to a@example.com", file_id="1"),
+            file_chunks("b.txt", b"nothing to see here", file_id="2"),
+            file_chunks("c.big", b"far too large", file_id="3"),
+        )
+        results = {result.file_id: result async for result in stub.ScanBatch(stream, metadata=KEY)}
+
+        assert mock_scan_service.received == {"a.txt": b"write to a@example.com", "b.txt": b"nothing to see here"}
+        assert [f.value for f in results["1"].findings] == ["a@example.com"]
+        assert results["2"].file_name == "b.txt" and not results["2"].findings
+        assert results["3"].error.code == grpc.StatusCode.RESOURCE_EXHAUSTED.value[0]
+
+    @pytest.mark.asyncio
+    async def test_end_of_stream_ends_open_files(self, stub):
+        stream = [pb.FileChunk(file_id="1", filename="a.txt", data=b"a@example.com")]
+        results = [result async for result in stub.ScanBatch(iter(stream), metadata=KEY)]
+        assert [f.value for f in results[0].findings] == ["a@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_limits_open_files(self, stub):
+        with patch("src.server.rpc.service.MAX_OPEN_FILES", 2):
+            stream = [pb.FileChunk(file_id=str(i), filename=f"{i}.txt", data=b"x") for i in range(3)]
+            with pytest.raises(grpc.aio.AioRpcError) as error:
+                async for _ in stub.ScanBatch(iter(stream), metadata=KEY):
+                    pass
+        assert error.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filename,code", [
+        ("program.exe", grpc.StatusCode.INVALID_ARGUMENT),
+        ("outage.txt", grpc.StatusCode.INTERNAL),
+    ])
+    async def test_analysis_failure_is_not_invalid_argument(self, stub, filename, code):
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.Scan(file_chunks(filename, b"hello"), metadata=KEY)
+        assert error.value.code() == code
@@ -0,0 +1,161 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from src.server.models.finding import Finding
+from src.server.providers.base import ModelProvider, create_provider
+from src.server.providers.local_provider import BatchRunner, LocalProvider, decode_entities, split_segments
+from src.server.providers.patterns import find_patterns, luhn_valid, ssn_valid
+from src.server.services.model_handler import LLMHandler
+
+
+class TestPatterns:
+    def test_luhn(self):
+        """Test card numbers are checked with the Luhn checksum"""
+        assert luhn_valid("4111 1111 1111 1111")
+        assert not luhn_valid("4111 1111 1111 1112")
+
+    def test_ssn_rejects_reserved_areas(self):
+        """Test SSNs in never-issued ranges are rejected"""
+        assert ssn_valid("123-45-6789")
+        assert not ssn_valid("000-45-6789")
+        assert not ssn_valid("900-45-6789")
+
+    def test_find_patterns(self):
+        """Test structured values are found, validated and reported once"""
+        text = (
+            "Contact jane@example.com or jane@example.com. SSN 123-45-6789, "
+            "card 4111 1111 1111 1111, bad card 4111 1111 1111 1112."
+        )
+        findings = find_patterns(text)
+        values = {(f.type, f.value) for f in findings}
+
+        assert ("email", "jane@example.com") in values
+        assert ("ssn", "123-45-6789") in values
+        assert ("credit_card", "4111 1111 1111 1111") in values
+        assert ("credit_card", "4111 1111 1111 1112") not in values
+        assert len([f for f in findings if f.type == "email"]) == 1
+
+    def test_keyword_required_nearby(self):
+        """Test ambiguous values are reported only next to their keyword"""
+        assert not [f for f in find_patterns("Order X1234567 shipped") if f.type == "passport_number"]
+        found = find_patterns("Passport no: X1234567")
+        assert ("passport_number", "X1234567") in {(f.type, f.value) for f in found}
+
+
+class TestBatchRunner:
+    @pytest.mark.asyncio
+    async def test_concurrent_submits_share_a_batch(self):
+        """Test items from concurrent callers go to the model in one call"""
+        batches = []
+
+        def infer(items):
+            batches.append(list(items))
+            return [item.upper() for item in items]
+
+        runner = BatchRunner(infer, max_batch_size=8, max_wait=0.01)
+        results = await asyncio.gather(*(runner.submit(text) for text in ["a", "b", "c"]))
+
+        assert results == ["A", "B", "C"]
+        assert batches == [["a", "b", "c"]]
+
+    @pytest.mark.asyncio
+    async def test_batches_capped_at_max_size(self):
+        """Test a burst larger than the batch size is split"""
+        sizes = []
+
+        def infer(items):
+            sizes.append(len(items))
+            return items
+
+        runner = BatchRunner(infer, max_batch_size=2, max_wait=0.01)
+        assert await runner.submit_many(list(range(5))) == [0, 1, 2, 3, 4]
+        assert sizes == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failed inference fails every item in its batch"""
+        def infer(items):
+            raise RuntimeError("boom")
+
+        runner = BatchRunner(infer, max_wait=0)
+        with pytest.raises(RuntimeError):
+            await runner.submit_many(["a", "b"])
+
+
+class TestLocalProvider:
+    def test_decode_entities_merges_bio_spans(self):
+        """Test B-/I- tokens become one span and special tokens are skipped"""
+        labels = {0: "O", 1: "B-PER", 2: "I-PER", 3: "B-ORG"}
+        probabilities = np.array([
+            [0.9, 0.05, 0.03, 0.02],  # [CLS]
+            [0.1, 0.8, 0.05, 0.05],   # Jane
+            [0.1, 0.1, 0.7, 0.1],     # Doe
+            [0.1, 0.0, 0.0, 0.9],     # Acme
+        ])
+        offsets = [(0, 0), (0, 4), (5, 8), (12, 16)]
+
+        entities = decode_entities(probabilities, offsets, labels)
+
+        assert len(entities) == 1
+        assert entities[0]["label"] == "PER"
+        assert (entities[0]["start"], entities[0]["end"]) == (0, 8)
+        assert entities[0]["score"] == pytest.approx(0.75)
+
+    def test_split_segments_at_whitespace(self):
+        """Test long text is split between words with correct offsets"""
+        text = "alpha beta gamma delta"
+        segments = split_segments(text, size=11)
+        assert all(text[offset:offset + len(segment)] == segment for offset, segment in segments)
+        assert "".join(segment for _, segment in segments) == text
+
+    @pytest.mark.asyncio
+    async def test_patterns_only_without_model(self):
+        """Test the provider works offline with no model directory configured"""
+        provider = LocalProvider(model_dir="")
+        findings = await provider.analyze_text("Reach me at jane@example.com")
+        assert findings[0].type == "email"
+
+    @pytest.mark.asyncio
+    async def test_model_entities_become_findings(self):
+        """Test model spans are mapped to finding types with confidence levels"""
+        class FakeModel:
+            def __init__(self):
+                self.calls = 0
+
+            def predict(self, texts):
+                self.calls += 1
+                return [[{"label": "PER", "start": 0, "end": 8, "score": 0.95}] for _ in texts]
+
+        provider = LocalProvider(model_dir="")
+        provider._model = FakeModel()
+
+        findings = await provider.analyze_text("Jane Doe lives here")
+
+        assert Finding(
+            "full_name", "Jane Doe", confidence="high",
+            context="Recognized as PER by the local model", category="PII",
+        ) in findings
+
+
+class TestProviderSelection:
+    def test_unknown_provider(self):
+        """Test unknown provider names are rejected"""
+        with pytest.raises(ValueError):
+            create_provider("nope")
+
+    def test_local_provider_by_name(self):
+        """Test the local provider needs no API key"""
+        assert isinstance(create_provider("local"), LocalProvider)
+
+    @pytest.mark.asyncio
+    async def test_handler_delegates_to_provider(self):
+        """Test LLMHandler forwards to its provider and wraps failures"""
+        provider = ModelProvider()
+        provider.analyze_text = AsyncMock(return_value=[{"type": "email"}])
+        handler = LLMHandler(provider=provider)
+
+        assert await handler.analyze_text_async("text") == [{"type": "email"}]
+        with pytest.raises(ValueError):
+            await handler.analyze_image_async(b"image")
@@ -0,0 +1,117 @@
+import logging
+import queue
+from logging.handlers import QueueListener
+
+import orjson
+import pytest
+
+from src.server.models.finding import Finding
+from src.utils.logging_config import (
+    DeferredQueueHandler,
+    FindingRedactionFilter,
+    JsonFormatter,
+    SamplingFilter,
+    parse_sample_rates,
+)
+
+
+def make_record(msg, *args, name="src.test", level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args or None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestRedaction:
+    def test_finding_repr_hides_value(self):
+        finding = Finding(type="SSN", value="123-45-6789", category="PII")
+        assert "123-45-6789" not in repr(finding)
+        assert "123-45-6789" not in f"{[finding]}"
+
+    @pytest.mark.parametrize("argument", [
+        Finding(type="SSN", value="123-45-6789"),
+        [Finding(type="SSN", value="123-45-6789")],
+        {"type": "SSN", "value": "123-45-6789"},
+        [{"type": "SSN", "value": "123-45-6789"}],
+        {"file_name": "a.pdf", "sensitive_fields": [{"value": "123-45-6789"}]},
+    ])
+    def test_arguments_scrubbed(self, argument):
+        record = make_record("Findings: %s", argument)
+        FindingRedactionFilter().filter(record)
+        assert "123-45-6789" not in record.getMessage()
+
+    def test_extra_fields_scrubbed(self):
+        record = make_record("Scanned", findings=[{"value": "4111111111111111"}])
+        FindingRedactionFilter().filter(record)
+        assert "4111111111111111" not in JsonFormatter().format(record)
+
+    def test_plain_arguments_kept(self):
+        record = make_record("Scanned %s in %d ms", "a.pdf", 12)
+        FindingRedactionFilter().filter(record)
+        assert record.getMessage() == "Scanned a.pdf in 12 ms"
+
+
+class TestSampling:
+    def test_parse_rates(self):
+        rates = parse_sample_rates("src.a=0.5, src.b=2")
+        assert rates["src.a"] == 0.5
+        assert rates["src.b"] == 1.0
+        assert "src.server.services.model_handler" in rates
+
+    def test_nearest_parent_rate(self):
+        sampler = SamplingFilter({"src.server": 0.0, "src.server.routes.scan": 1.0})
+        assert sampler.rate("src.server.services.model_handler") == 0.0
+        assert sampler.rate("src.server.routes.scan") == 1.0
+        assert sampler.rate("uvicorn.error") == 1.0
+
+    def test_warnings_never_dropped(self):
+        sampler = SamplingFilter({"src": 0.0})
+        assert not sampler.filter(make_record("chatty", name="src.hot"))
+        assert sampler.filter(make_record("problem", name="src.hot", level=logging.WARNING))
+
+
+class TestPipeline:
+    def test_json_output(self):
+        record = make_record("Scanned %s", "a.pdf", tenant="acme", pages=3)
+        entry = orjson.loads(JsonFormatter().format(record))
+        assert entry["message"] == "Scanned a.pdf"
+        assert entry["level"] == "INFO"
+        assert entry["tenant"] == "acme"
+        assert entry["pages"] == 3
+
+    def test_immutable_arguments_formatted_on_listener(self):
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        record = handler.prepare(make_record("Scanned %s", "a.pdf"))
+        assert record.args == ("a.pdf",)
+
+    def test_mutable_arguments_rendered_at_call(self):
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        pages = [1]
+        record = handler.prepare(make_record("Pages %s", pages))
+        pages.append(2)
+        assert record.getMessage() == "Pages [1]"
+
+    def test_records_written_by_listener(self):
+        records = queue.SimpleQueue()
+        handler = DeferredQueueHandler(records)
+        handler.addFilter(FindingRedactionFilter())
+        lines = []
+
+        class Collect(logging.Handler):
+            def emit(self, record):
+                lines.append(self.format(record))
+
+        output = Collect()
+        output.setFormatter(JsonFormatter())
+        listener = QueueListener(records, output)
+        listener.start()
+        logger = logging.getLogger("src.tests.pipeline")
+        logger.addHandler(handler)
+        try:
+            logger.warning("Found %s", [Finding(type="SSN", value="123-45-6789")])
+        finally:
+            logger.removeHandler(handler)
+            listener.stop()
+
+        assert len(lines) == 1
+        assert "123-45-6789" not in lines[0]
+        assert orjson.loads(lines[0])["message"] == "Found <redacted 1 items>"
@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.server.models.finding import Finding
+from src.server.providers.base import ModelProvider
+from src.server.providers.openai_provider import OpenAIProvider
+from src.server.services.concurrency_limiter import AdaptiveLimiter
+from src.server.services.micro_batcher import MicroBatcher, split_batch_findings
+from src.server.services.model_handler import LLMHandler
+from src.utils.tenants import Tenant, current_tenant
+
+
+def raw(value, document=None):
+    result = {"type": "email", "value": value, "confidence": "high", "context": "", "category": "PII"}
+    if document is not None:
+        result["document"] = document
+    return result
+
+
+def finding(value):
+    return Finding.from_dict(raw(value))
+
+
+class TestSplitBatchFindings:
+    def test_split_by_document_number(self):
+        """Test findings go to the document number the model echoed"""
+        texts = ["a@x.com", "b@x.com"]
+        split = split_batch_findings([raw("b@x.com", 2), raw("a@x.com", "1")], texts)
+        assert split == [[finding("a@x.com")], [finding("b@x.com")]]
+
+    def test_missing_number_falls_back_to_value(self):
+        """Test findings without a usable number are matched by value"""
+        texts = ["a@x.com", "nothing here"]
+        split = split_batch_findings([raw("a@x.com"), raw("c@x.com", 7)], texts)
+        assert split == [[finding("a@x.com")], []]
+
+
+class TestMicroBatcher:
+    @pytest.mark.asyncio
+    async def test_concurrent_texts_share_one_call(self):
+        """Test texts submitted together are analyzed in one call and split back"""
+        analyze = AsyncMock(side_effect=lambda texts: [[finding(text)] for text in texts])
+        batcher = MicroBatcher(analyze, max_wait=0.01)
+
+        results = await asyncio.gather(*(batcher.submit(text) for text in ["one", "two", "three"]))
+
+        assert analyze.await_count == 1
+        assert results == [[finding("one")], [finding("two")], [finding("three")]]
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_full(self):
+        """Test a full batch goes out without waiting"""
+        analyze = AsyncMock(side_effect=lambda texts: [[] for _ in texts])
+        batcher = MicroBatcher(analyze, max_wait=10, max_documents=2)
+
+        await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1)
+        assert analyze.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_tenants_are_not_mixed(self):
+        """Test texts from different tenants never share a prompt"""
+        batches = []
+
+        async def analyze(texts):
+            batches.append((current_tenant.get().id, sorted(texts)))
+            return [[] for _ in texts]
+
+        batcher = MicroBatcher(analyze, max_wait=0.01)
+
+        async def submit(tenant, text):
+            current_tenant.set(tenant)
+            return await batcher.submit(text)
+
+        acme, globex = Tenant("acme"), Tenant("globex")
+        await asyncio.gather(submit(acme, "a1"), submit(globex, "g1"), submit(acme, "a2"))
+
+        assert sorted(batches) == [("acme", ["a1", "a2"]), ("globex", ["g1"])]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failed batch call fails each text in it"""
+        batcher = MicroBatcher(AsyncMock(side_effect=RuntimeError("boom")), max_wait=0)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestBatchedAnalysis:
+    @pytest.mark.asyncio
+    async def test_handler_batches_small_texts_only(self):
+        """Test small texts go through the batcher and large ones go straight to the provider"""
+        provider = ModelProvider()
+        provider.analyze_text = AsyncMock(return_value=[])
+        provider.analyze_batch = AsyncMock(side_effect=lambda texts: [[] for _ in texts])
+        handler = LLMHandler(provider=provider, small_text_chars=10)
+
+        await asyncio.gather(handler.analyze_text_async("short"), handler.analyze_text_async("tiny"))
+        await handler.analyze_text_async("x" * 50)
+
+        assert provider.analyze_batch.await_count == 1
+        provider.analyze_text.assert_awaited_once_with("x" * 50)
+
+    @pytest.mark.asyncio
+    async def test_openai_packs_documents_into_one_request(self):
+        """Test the OpenAI provider sends one delimited prompt and splits findings per document"""
+        content = '[{"type": "email", "value": "b@x.com", "confidence": "high", "context": "", "category": "PII", "document": 2}]'
+        response = Mock(choices=[Mock(message=Mock(content=content))], usage=None)
+        provider = OpenAIProvider(api_key="test", limiter=AdaptiveLimiter())
+        provider.client = Mock()
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+
+        results = await provider.analyze_batch(["mail a@x.com", "mail b@x.com"])
+
+        request = provider.client.chat.completions.create.await_args.kwargs
+        prompt = request["messages"][-1]["content"]
+        assert "<<<DOCUMENT 1>>>\nmail a@x.com\n<<<END DOCUMENT 1>>>" in prompt
+        assert "<<<DOCUMENT 2>>>" in prompt
+        assert results == [[], [finding("b@x.com")]]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content,finish_reason", [
+        ('[{"type": "email", "value": "a@x.com", "document": 1}, {"type": "em', "length"),
+        ("Sorry, I cannot help with that.", "stop"),
+    ])
+    async def test_openai_falls_back_when_batch_output_unusable(self, content, finish_reason):
+        """Test a truncated or unparseable batch is analyzed document by document rather than read as clean"""
+        single = '[{"type": "email", "value": "b@x.com", "confidence": "high", "context": "", "category": "PII"}]'
+        responses = [
+            Mock(choices=[Mock(message=Mock(content=content), finish_reason=finish_reason)], usage=None),
+            Mock(choices=[Mock(message=Mock(content="[]"), finish_reason="stop")], usage=None),
+            Mock(choices=[Mock(message=Mock(content=single), finish_reason="stop")], usage=None),
+        ]
+        provider = OpenAIProvider(api_key="test", limiter=AdaptiveLimiter())
+        provider.client = Mock()
+        provider.client.chat.completions.create = AsyncMock(side_effect=responses)
+
+        results = await provider.analyze_batch(["mail a@x.com", "mail b@x.com"])
+
+        assert provider.client.chat.completions.create.await_count == 3
+        assert results == [[], [finding("b@x.com")]]
@@ -0,0 +1,167 @@
+from unittest.mock import AsyncMock, Mock
+import random
+import pytest
+from fastapi.testclient import TestClient
+
+from src.server.models.finding import Finding
+from src.server.routes.metrics import router as metrics_router
+from src.server.services import scan_service as scan_service_module
+from src.server.services.near_duplicates import NearDuplicateIndex, changed_ranges, lsh_bands
+from src.server.services.scan_service import ScanService
+
+
+BOILERPLATE = " ".join(
+    f"Clause {n}: payment is due within thirty days of the invoice date and late fees apply thereafter."
+    for n in range(12)
+)
+
+
+def invoice(name: str, email: str, amount: str) -> str:
+    return f"INVOICE Bill to {name} contact {email} {BOILERPLATE} Total due {amount} Thank you for your business."
+
+
+def findings(name: str, email: str):
+    return [
+        Finding("full_name", name, confidence="high", category="PII"),
+        Finding("email", email, confidence="high", category="PII"),
+    ]
+
+
+def unrelated_text(seed: int) -> str:
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+    generator = random.Random(seed)
+    return " ".join(generator.choice(words) + str(generator.randint(0, 99)) for _ in range(200))
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex(threshold=0.8, capacity=10, min_words=20)
+
+
+class TestNearDuplicateIndex:
+    def test_bands_sit_below_threshold(self):
+        bands, rows = lsh_bands(128, 0.9)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) < 0.9
+
+    def test_changed_ranges(self):
+        old = [1, 2, 3, 4, 5, 6]
+        assert changed_ranges(old, old) == []
+        assert changed_ranges(old, [1, 2, 9, 4, 5, 6, 7]) == [(2, 3), (6, 7)]
+        # Repeated elements between unique anchors are still diffed
+        assert changed_ranges([0, 7, 7, 7, 1], [0, 7, 8, 7, 1]) == [(2, 3)]
+
+    def test_short_documents_skipped(self, index):
+        assert index.prepare("too short to bother") is None
+
+    def test_identical_document_needs_no_scan(self, index):
+        text = invoice("John Doe", "john@example.com", "$120.00")
+        index.add("acme", index.prepare(text), findings("John Doe", "john@example.com"))
+
+        reuse = index.match("acme", index.prepare(text))
+        assert reuse.similarity == 1.0
+        assert reuse.changed_text == ""
+        assert [f.value for f in reuse.findings] == ["John Doe", "john@example.com"]
+
+    def test_only_changed_regions_scanned(self, index):
+        index.add("acme", index.prepare(invoice("John Doe", "john@example.com", "$120.00")), findings("John Doe", "john@example.com"))
+
+        text = invoice("Jane Roe", "john@example.com", "$120.00")
+        reuse = index.match("acme", index.prepare(text))
+
+        assert reuse is not None
+        assert "Jane Roe" in reuse.changed_text
+        assert len(reuse.changed_text) < len(text) / 4
+        # The old name is gone from the document, so only the email carries over
+        assert [f.value for f in reuse.findings] == ["john@example.com"]
+
+    def test_reused_findings_are_copies(self, index):
+        stored = findings("John Doe", "john@example.com")
+        text = invoice("John Doe", "john@example.com", "$120.00")
+        index.add("acme", index.prepare(text), stored)
+
+        reused = index.match("acme", index.prepare(text)).findings
+        reused[0].locations = []
+        assert all(f.locations is None for f in stored)
+        assert reused[0] is not stored[0]
+
+    def test_scoped_by_tenant(self, index):
+        text = invoice("John Doe", "john@example.com", "$120.00")
+        index.add("acme", index.prepare(text), findings("John Doe", "john@example.com"))
+        assert index.match("globex", index.prepare(text)) is None
+
+    def test_unrelated_document_not_matched(self, index):
+        index.add("acme", index.prepare(unrelated_text(1)), [])
+        assert index.match("acme", index.prepare(unrelated_text(2))) is None
+
+    def test_least_recent_evicted(self):
+        index = NearDuplicateIndex(threshold=0.8, capacity=1, min_words=20)
+        first, second = unrelated_text(1), unrelated_text(2)
+        index.add(None, index.prepare(first), [])
+        index.add(None, index.prepare(second), [])
+
+        assert index.match(None, index.prepare(first)) is None
+        assert index.match(None, index.prepare(second)) is not None
+        assert index.snapshot()["documents"] == 1
+
+    def test_byte_budget_evicts(self):
+        first, second = unrelated_text(1), unrelated_text(2)
+        probe = NearDuplicateIndex(threshold=0.8, min_words=20)
+        probe.add(None, probe.prepare(first), [])
+        index = NearDuplicateIndex(threshold=0.8, min_words=20, max_bytes=probe.snapshot()["bytes"] + 1)
+        index.add(None, index.prepare(first), [])
+        index.add(None, index.prepare(second), [])
+
+        assert index.match(None, index.prepare(first)) is None
+        assert index.snapshot()["documents"] == 1
+        assert index.snapshot()["bytes"] <= index.max_bytes
+
+    def test_long_documents_scanned_in_full(self):
+        index = NearDuplicateIndex(threshold=0.8, min_words=20, max_words=100)
+        assert index.prepare(unrelated_text(1)) is None
+
+    def test_repetitive_text_diffs_changed_region(self, index):
+        """Test a long document full of repeated words still diffs down to the edit"""
+        filler = " ".join(f"Clause {n}: the fee is due on the first day of the month" for n in range(300))
+        index.add(None, index.prepare(f"Dear John Doe, {filler}"), findings("John Doe", "none"))
+
+        reuse = index.match(None, index.prepare(f"Dear Jane Roe, {filler}"))
+        assert "Jane Roe" in reuse.changed_text
+        assert len(reuse.changed_text) < 200
+
+    def test_reuse_stats(self, index):
+        text = invoice("John Doe", "john@example.com", "$120.00")
+        index.add(None, index.prepare(text), [])
+        index.match(None, index.prepare(text))
+        index.match(None, index.prepare(unrelated_text(3)))
+
+        stats = index.snapshot()
+        assert stats["lookups"] == 2
+        assert stats["reused"] == 1
+        assert stats["reuse_rate"] == 0.5
+        assert stats["chars_scanned"] < stats["chars_total"]
+
+
+class TestScanServiceReuse:
+    @pytest.mark.asyncio
+    async def test_second_scan_sends_changed_region(self, index, monkeypatch):
+        monkeypatch.setattr(scan_service_module, "near_duplicate_index", index)
+        service = object.__new__(ScanService)
+        service.llm_handler = Mock()
+        service.llm_handler.analyze_text_async = AsyncMock(side_effect=[
+            findings("John Doe", "john@example.com"),
+            [Finding("full_name", "Jane Roe", confidence="high", category="PII")],
+        ])
+
+        await service._analyze_content(invoice("John Doe", "john@example.com", "$120.00"))
+        results = await service._analyze_content(invoice("Jane Roe", "john@example.com", "$120.00"))
+
+        sent = service.llm_handler.analyze_text_async.await_args.args[0]
+        assert "Jane Roe" in sent and "Clause 5" not in sent
+        assert sorted(f.value for f in results) == ["Jane Roe", "john@example.com"]
+
+
+def test_dedup_metrics_exported():
+    body = TestClient(metrics_router).get("/metrics").text
+    assert "scan_vault_dedup_reused_total" in body
+    assert "scan_vault_dedup_chars_scanned_total" in body
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.server.middleware.profiling import PROFILE_ID_HEADER, ProfileStore, ProfilingMiddleware, request_profiles
+from src.server.profiling import tracing
+from src.server.profiling.memory import memory_tracker
+from src.server.profiling.sampler import SamplingProfiler
+from src.server.routes.admin import router as admin_router
+
+
+ADMIN_HEADERS = {"admin_token": "admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_key(monkeypatch):
+    monkeypatch.setenv("SCAN_VAULT_ADMIN_KEY", "admin-secret")
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(request_profiles, "directory", str(tmp_path / "profiles"))
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(admin_router)
+
+    @app.get("/work")
+    def work():
+        busy_loop(0.1)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware)
+    return TestClient(app)
+
+
+def busy_loop(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+class TestSamplingProfiler:
+    def test_samples_busy_thread(self):
+        profiler = SamplingProfiler(interval=0.001).start()
+        worker = threading.Thread(target=busy_loop, args=(0.2,), name="busy")
+        worker.start()
+        worker.join()
+        profile = profiler.stop()
+
+        folded = profile.folded()
+        assert profile.sample_count > 0
+        assert any(line.startswith("busy;") and "busy_loop" in line for line in folded.splitlines())
+
+    def test_speedscope_format(self):
+        profiler = SamplingProfiler(interval=0.001).start()
+        busy_loop(0.05)
+        document = profiler.stop().speedscope("test")
+
+        assert document["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+        frames = document["shared"]["frames"]
+        for profile in document["profiles"]:
+            assert profile["type"] == "sampled"
+            assert len(profile["samples"]) == len(profile["weights"])
+            assert all(index < len(frames) for sample in profile["samples"] for index in sample)
+
+    def test_idle_threads_skipped(self):
+        stop = threading.Event()
+        idle = threading.Thread(target=stop.wait, name="idle")
+        idle.start()
+        try:
+            profiler = SamplingProfiler(interval=0.001).start()
+            time.sleep(0.05)
+            profile = profiler.stop()
+        finally:
+            stop.set()
+            idle.join()
+        assert not any(thread == "idle" for thread, _ in profile.samples)
+
+    def test_idle_uvloop_thread_skipped(self):
+        uvloop = pytest.importorskip("uvloop")
+        started = threading.Event()
+
+        async def serve():
+            started.set()
+            await asyncio.sleep(0.2)
+
+        def run():
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            try:
+                asyncio.run(serve())
+            finally:
+                asyncio.set_event_loop_policy(None)
+
+        loop_thread = threading.Thread(target=run, name="uvloop")
+        loop_thread.start()
+        started.wait()
+        profiler = SamplingProfiler(interval=0.001).start()
+        time.sleep(0.05)
+        profile = profiler.stop()
+        loop_thread.join()
+        assert not any(thread == "uvloop" for thread, _ in profile.samples)
+
+
+class TestProfileStore:
+    def test_shared_between_workers(self, tmp_path):
+        """Test a profile stored by one worker's store is read by another's"""
+        profiler = SamplingProfiler(interval=0.001).start()
+        busy_loop(0.05)
+        profile = profiler.stop()
+        ProfileStore(str(tmp_path)).add("0123456789abcdef", profile)
+
+        loaded = ProfileStore(str(tmp_path)).get("0123456789abcdef")
+        assert loaded.folded() == profile.folded()
+        assert ProfileStore(str(tmp_path)).get("../0123456789abcdef") is None
+
+    def test_keeps_most_recent(self, tmp_path):
+        store = ProfileStore(str(tmp_path), capacity=2)
+        profile = SamplingProfiler(interval=0.001).start().stop()
+        for i in range(3):
+            store.add(f"{i:016x}", profile)
+            os.utime(store._path(f"{i:016x}"), (i, i))
+
+        assert store.get(f"{0:016x}") is None
+        assert store.get(f"{2:016x}") is not None
+
+
+class TestAdminRoutes:
+    def test_requires_admin_key(self, client):
+        assert client.get("/admin/profile?seconds=0.01").status_code == 403
+        assert client.get("/admin/profile?seconds=0.01", headers={"admin_token": "wrong"}).status_code == 403
+
+    def test_disabled_without_configured_key(self, client, monkeypatch):
+        monkeypatch.delenv("SCAN_VAULT_ADMIN_KEY")
+        assert client.get("/admin/profile?seconds=0.01", headers=ADMIN_HEADERS).status_code == 403
+
+    def test_timed_profile(self, client):
+        response = client.get("/admin/profile?seconds=0.05", headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        assert "speedscope" in response.headers["content-disposition"]
+        assert response.json()["exporter"] == "scan-vault"
+
+        folded = client.get("/admin/profile?seconds=0.05&format=folded&include_idle=true", headers=ADMIN_HEADERS)
+        assert folded.status_code == 200
+        assert folded.headers["content-type"].startswith("text/plain")
+
+    def test_request_profile_via_header(self, client):
+        """Test a request sent with the profile header can be downloaded afterwards"""
+        response = client.get("/work", headers={**ADMIN_HEADERS, "X-Scan-Vault-Profile": "1"})
+        profile_id = response.headers[PROFILE_ID_HEADER.decode()]
+
+        assert request_profiles.get(profile_id) is not None
+        folded = client.get(f"/admin/profile/requests/{profile_id}?format=folded", headers=ADMIN_HEADERS)
+        assert "busy_loop" in folded.text
+
+    def test_profile_header_ignored_without_admin_key(self, client):
+        response = client.get("/work", headers={"X-Scan-Vault-Profile": "1"})
+        assert response.status_code == 200
+        assert PROFILE_ID_HEADER.decode() not in response.headers
+
+    def test_unknown_request_profile(self, client):
+        assert client.get("/admin/profile/requests/missing", headers=ADMIN_HEADERS).status_code == 404
+
+    def test_memory_snapshots(self, client):
+        assert client.get("/admin/memory/snapshot", headers=ADMIN_HEADERS).status_code == 409
+
+        client.post("/admin/memory/start", headers=ADMIN_HEADERS)
+        try:
+            first = client.get("/admin/memory/snapshot?limit=5", headers=ADMIN_HEADERS).json()
+            retained = [bytearray(1000) for _ in range(100)]
+            second = client.get("/admin/memory/snapshot?limit=5", headers=ADMIN_HEADERS).json()
+        finally:
+            client.post("/admin/memory/stop", headers=ADMIN_HEADERS)
+
+        assert first["compared_to_previous"] is False
+        assert second["compared_to_previous"] is True
+        assert len(second["top"]) <= 5
+        assert "size_diff_bytes" in second["top"][0]
+        assert retained and not memory_tracker.tracing
+        assert second["worker"] == os.getpid()
+
+    def test_memory_commands_pinned_to_worker(self, client):
+        response = client.post(f"/admin/memory/start?worker={os.getpid() + 1}", headers=ADMIN_HEADERS)
+        assert response.status_code == 409
+        assert response.headers["X-Scan-Vault-Worker"] == str(os.getpid())
+        assert not memory_tracker.tracing
+
+
+class TestTracing:
+    def test_span_without_tracer(self, monkeypatch):
+        monkeypatch.setattr(tracing, "tracer", None)
+        with tracing.span("scan.extract", pages=1) as current:
+            assert current is None
+
+    def test_no_exporter_without_endpoint(self, monkeypatch):
+        monkeypatch.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+        assert tracing.configure_tracing() is False
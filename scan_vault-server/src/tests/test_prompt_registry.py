@@ -0,0 +1,119 @@
+from unittest.mock import AsyncMock, Mock
+import pytest
+from fastapi.testclient import TestClient
+
+from src.server.providers.openai_provider import OpenAIProvider
+from src.server.routes.metrics import router as metrics_router
+from src.server.services.concurrency_limiter import AdaptiveLimiter
+from src.server.utils.prompt_registry import PromptRegistry, PromptVersion, parse_weights, prompt_registry
+from src.utils.tenants import Tenant, current_tenant
+
+
+def registry(*versions, weights=None):
+    prompts = PromptRegistry()
+    for version in versions:
+        prompts.register(PromptVersion.build(version, f"Instructions {version}"))
+    if weights:
+        prompts.set_weights(weights)
+    return prompts
+
+
+def response(content="[]", usage=None):
+    return Mock(choices=[Mock(message=Mock(content=content))], usage=usage)
+
+
+def provider(prompts):
+    provider = OpenAIProvider(api_key="test", limiter=AdaptiveLimiter(), prompts=prompts)
+    provider.client = Mock()
+    provider.client.chat.completions.create = AsyncMock(return_value=response())
+    return provider
+
+
+class TestPromptRegistry:
+    def test_parse_weights(self):
+        assert parse_weights("v1=90, v2=10") == {"v1": 90.0, "v2": 10.0}
+        assert parse_weights("v1") == {"v1": 1.0}
+
+    def test_default_is_first_version(self):
+        assert registry("a", "b").select().version == "a"
+
+    def test_unknown_versions_ignored(self):
+        prompts = registry("a", "b", weights={"b": 1, "missing": 5})
+        assert prompts.select("any").version == "b"
+
+    def test_split_is_sticky_per_key(self):
+        prompts = registry("a", "b", weights={"a": 1, "b": 1})
+        chosen = {key: prompts.select(key).version for key in map(str, range(200))}
+        assert all(prompts.select(key).version == version for key, version in chosen.items())
+        assert set(chosen.values()) == {"a", "b"}
+
+    def test_batch_prompt_extends_text_prefix(self):
+        prompt = PromptVersion.build("v", "Find things")
+        assert prompt.batch_system.startswith(prompt.system)
+
+    def test_records_cached_tokens(self):
+        prompts = registry("a")
+        usage = Mock(prompt_tokens=1500, completion_tokens=20, prompt_tokens_details=Mock(cached_tokens=1280))
+        prompts.record("a", 0.5, usage)
+        prompts.record("a", 0.5, None)
+
+        stats = prompts.snapshot()["a"]
+        assert stats["calls"] == 2
+        assert stats["latency_seconds"] == 1.0
+        assert stats["cached_tokens"] == 1280
+        assert stats["cache_hit_ratio"] == pytest.approx(1280 / 1500)
+
+
+class TestPromptLayout:
+    @pytest.mark.asyncio
+    async def test_text_request_keeps_document_last(self):
+        prompts = registry("a")
+        openai = provider(prompts)
+        await openai.analyze_text("call 555-123-4567")
+
+        messages = openai.client.chat.completions.create.await_args.kwargs["messages"]
+        assert messages[0] == {"role": "system", "content": prompts.get("a").system}
+        assert messages[-1] == {"role": "user", "content": "call 555-123-4567"}
+        assert prompts.snapshot()["a"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_image_request_starts_with_system_prompt(self):
+        prompts = registry("a")
+        openai = provider(prompts)
+        await openai.analyze_image(b"image")
+
+        messages = openai.client.chat.completions.create.await_args.kwargs["messages"]
+        assert [message["role"] for message in messages] == ["system", "user"]
+        assert messages[0]["content"] == prompts.get("a").system
+        assert messages[1]["content"][-1]["type"] == "image_url"
+
+    @pytest.mark.asyncio
+    async def test_prefix_identical_across_documents(self):
+        openai = provider(registry("a"))
+        await openai.analyze_text("first")
+        await openai.analyze_batch(["second", "third"])
+
+        calls = openai.client.chat.completions.create.await_args_list
+        text_system = calls[0].kwargs["messages"][0]["content"]
+        assert calls[1].kwargs["messages"][0]["content"].startswith(text_system)
+
+    @pytest.mark.asyncio
+    async def test_tenant_pinned_to_version(self):
+        prompts = registry("a", "b", weights={"a": 1, "b": 1})
+        openai = provider(prompts)
+        tenant = Tenant("acme")
+        token = current_tenant.set(tenant)
+        try:
+            for _ in range(5):
+                await openai.analyze_text("text")
+        finally:
+            current_tenant.reset(token)
+
+        expected = prompts.select("acme").version
+        assert prompts.snapshot()[expected]["calls"] == 5
+
+
+def test_prompt_metrics_exported():
+    body = TestClient(metrics_router).get("/metrics").text
+    for version in prompt_registry.snapshot():
+        assert f'scan_vault_prompt_cached_tokens_total{{version="{version}"}}' in body
@@ -0,0 +1,127 @@
+from unittest.mock import patch
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.server.routes.health import router as health_router
+from src.server.services.concurrency_limiter import AdaptiveLimiter
+from src.server.services.fair_scheduler import FairScheduler
+from src.server.services.readiness import ReadinessMonitor
+
+
+@pytest.fixture
+def monitor():
+    return ReadinessMonitor(
+        limiter=AdaptiveLimiter(initial_limit=2, max_limit=2),
+        scheduler=FairScheduler(concurrency=1),
+        max_scans_queued=1,
+        max_model_saturation=1.0,
+        max_loop_lag=0.05,
+        storage_interval=0.01,
+        lag_interval=0.01,
+    )
+
+
+@pytest.fixture
+def client(monitor):
+    app = FastAPI()
+    app.include_router(health_router)
+    with patch("src.server.routes.health.readiness_monitor", monitor):
+        yield TestClient(app)
+
+
+class TestReadinessMonitor:
+    def test_ready_when_idle(self, monitor):
+        status = monitor.status()
+        assert status["status"] == "ready"
+        assert status["failing"] == []
+        assert status["storage_reachable"] is None
+
+    @pytest.mark.asyncio
+    async def test_scan_queue_depth(self, monitor):
+        await monitor.scheduler.acquire("a")
+        waiters = [asyncio.create_task(monitor.scheduler.acquire(tenant)) for tenant in ("a", "b")]
+        await asyncio.sleep(0)
+        try:
+            assert monitor.status()["failing"] == ["scans_queued"]
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_model_saturation(self, monitor):
+        for _ in range(2):
+            await monitor.limiter.acquire()
+        waiter = asyncio.create_task(monitor.limiter.acquire())
+        await asyncio.sleep(0)
+        try:
+            status = monitor.status()
+            assert status["model_saturation"] == 1.5
+            assert status["failing"] == ["model_saturation"]
+        finally:
+            waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag(self, monitor):
+        monitor.start()
+        try:
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # Block the loop the way a CPU-bound call would
+            await asyncio.sleep(0.02)
+            assert "event_loop_lag" in monitor.status()["failing"]
+        finally:
+            await monitor.stop()
+
+    @pytest.mark.asyncio
+    async def test_storage_checked_in_background(self, monitor):
+        calls = []
+
+        async def unreachable():
+            calls.append(1)
+            raise ConnectionError("no route to Firestore")
+
+        monitor.start(unreachable)
+        try:
+            await asyncio.sleep(0.05)
+            status = monitor.status()
+            assert status["storage_reachable"] is False
+            assert "storage" in status["failing"]
+            # Probes read the cached result rather than calling storage
+            before = len(calls)
+            monitor.status()
+            assert len(calls) == before
+        finally:
+            await monitor.stop()
+
+    @pytest.mark.asyncio
+    async def test_storage_optional(self, monitor):
+        monitor.require_storage = False
+        monitor.storage_ok = False
+        assert monitor.status()["failing"] == []
+
+    @pytest.mark.asyncio
+    async def test_draining_after_stop(self, monitor):
+        monitor.start()
+        await monitor.stop()
+        assert monitor.status()["failing"] == ["draining"]
+
+
+class TestHealthRoutes:
+    def test_liveness(self, client):
+        for path in ("/health", "/health/live"):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert response.json() == {"status": "ok"}
+
+    def test_ready(self, client):
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    def test_not_ready(self, client, monitor):
+        monitor._lag_samples.append(1.0)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["failing"] == ["event_loop_lag"]
@@ -0,0 +1,196 @@
+import io
+import os
+import pytest
+import pdfplumber
+from docx import Document
+from unittest.mock import patch
+
+from src.server.models.finding import Finding
+from src.server.services.file_handler import SpooledUpload
+from src.server.utils import redactor as redactor_module
+from src.server.utils.redactor import Redactor
+
+
+FINDINGS = [
+    Finding("ssn", "123-45-6789", category="PII"),
+    Finding("email", "john@example.com", category="PII"),
+    Finding("full_name", "John", category="PII"),
+]
+
+# Single-page PDF with one line of Helvetica text
+PDF_TEMPLATE = b"""%PDF-1.4
+1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj
+2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj
+3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 300 100] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >> endobj
+4 0 obj << /Length LENGTH >> stream
+STREAM
+endstream endobj
+5 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj
+trailer << /Root 1 0 R >>
+%%EOF
+"""
+
+
+def make_pdf(*lines: str) -> bytes:
+    shown = " 0 -14 Td ".join(f"({line}) Tj" for line in lines)
+    stream = f"BT /F1 12 Tf 10 70 Td {shown} ET".encode()
+    return PDF_TEMPLATE.replace(b"LENGTH", str(len(stream)).encode()).replace(b"STREAM", stream)
+
+
+@pytest.fixture
+def redactor():
+    return Redactor()
+
+@pytest.fixture
+def spooled(tmp_path):
+    def spool(extension: str, data: bytes) -> SpooledUpload:
+        path = tmp_path / f"input.{extension}"
+        path.write_bytes(data)
+        return SpooledUpload(str(path), f"input.{extension}", extension, len(data), extension)
+    return spool
+
+
+class TestRedactor:
+    def test_build_pattern_prefers_longer_values(self, redactor):
+        """Test a value containing another is masked whole"""
+        pattern = redactor.build_pattern(FINDINGS + [Finding("email", "john@example.com.au")])
+        assert pattern.sub("X", "john@example.com.au") == "X"
+
+    def test_build_pattern_without_values(self, redactor):
+        assert redactor.build_pattern([Finding("note", "")]) is None
+
+    def test_redact_text(self, redactor, spooled, tmp_path):
+        upload = spooled("txt", b"Name: John\nSSN: 123-45-6789\nEmail: JOHN@example.com\n")
+        output = tmp_path / "out.txt"
+
+        count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 3
+        assert output.read_text() == "Name: [REDACTED]\nSSN: [REDACTED]\nEmail: [REDACTED]\n"
+
+    def test_redact_text_across_chunks(self, redactor, spooled, tmp_path):
+        """Test values split across read chunks are still masked"""
+        data = b"a" * 14 + b"123-45-6789" + b"b" * 20
+        upload = spooled("txt", data)
+        output = tmp_path / "out.txt"
+
+        with patch.object(redactor_module, "TEXT_CHUNK_SIZE", 16):
+            count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 1
+        assert output.read_text() == "a" * 14 + "[REDACTED]" + "b" * 20
+
+    def test_redact_text_longer_value_across_chunks(self, redactor, spooled, tmp_path):
+        """Test a shorter value at a chunk boundary does not leave the tail of a longer one"""
+        findings = FINDINGS + [Finding("full_name", "John Smith")]
+        # The first chunk ends inside "John Smith", just after "John" matches
+        data = b"x" * 9 + b"John Smith" + b" and John."
+        upload = spooled("txt", data)
+        output = tmp_path / "out.txt"
+
+        with patch.object(redactor_module, "TEXT_CHUNK_SIZE", 16):
+            count = redactor.redact_file(upload, str(output), findings)
+
+        assert count == 2
+        assert output.read_text() == "x" * 9 + "[REDACTED] and [REDACTED]."
+
+    def test_redact_csv(self, redactor, spooled, tmp_path):
+        upload = spooled("csv", b"name,ssn,id\nJohn,123-45-6789,007\nJane,none,008\n")
+        output = tmp_path / "out.csv"
+
+        with patch.object(redactor_module, "CSV_CHUNK_ROWS", 1):
+            count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 2
+        assert output.read_text() == "name,ssn,id\n[REDACTED],[REDACTED],007\nJane,none,008\n"
+
+    def test_redact_csv_first_line(self, redactor, spooled, tmp_path):
+        """Test a value on the first line of a headerless CSV is masked"""
+        upload = spooled("csv", b"123-45-6789,John\n987-65-4321,Jane\n")
+        output = tmp_path / "out.csv"
+
+        count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 2
+        assert output.read_text() == "[REDACTED],[REDACTED]\n987-65-4321,Jane\n"
+
+    def test_redact_docx(self, redactor, spooled, tmp_path):
+        doc = Document()
+        paragraph = doc.add_paragraph("Patient: ")
+        paragraph.add_run("John").bold = True
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = "SSN 123-45-6789"
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        upload = spooled("docx", buffer.getvalue())
+        output = tmp_path / "out.docx"
+
+        count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        result = Document(str(output))
+        assert count == 2
+        assert result.paragraphs[0].text == "Patient: [REDACTED]"
+        assert result.paragraphs[0].runs[1].bold
+        assert result.tables[0].cell(0, 0).text == "SSN [REDACTED]"
+
+    def test_redact_docx_across_runs(self, redactor, spooled, tmp_path):
+        """Test a value split over differently formatted runs is masked whole"""
+        doc = Document()
+        paragraph = doc.add_paragraph("SSN 123-")
+        paragraph.add_run("45").bold = True
+        paragraph.add_run("-6789 and mail john@")
+        paragraph.add_run("example.com").italic = True
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        upload = spooled("docx", buffer.getvalue())
+        output = tmp_path / "out.docx"
+
+        count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        result = Document(str(output)).paragraphs[0]
+        assert count == 2
+        assert result.text == "SSN [REDACTED] and mail [REDACTED]"
+        assert [run.text for run in result.runs] == ["SSN [REDACTED]", "", " and mail [REDACTED]", ""]
+        assert result.runs[1].bold
+
+    def test_redact_docx_fails_when_value_remains(self, redactor, spooled, tmp_path):
+        """Test a value the redactor cannot rewrite fails instead of returning a partial copy"""
+        from docx.opc.constants import RELATIONSHIP_TYPE
+
+        doc = Document()
+        doc.add_paragraph("Contact")
+        doc.part.relate_to("mailto:john@example.com", RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        upload = spooled("docx", buffer.getvalue())
+        output = tmp_path / "out.docx"
+
+        with pytest.raises(ValueError, match="could not be masked"):
+            redactor.redact_file(upload, str(output), FINDINGS)
+
+    def test_redact_pdf(self, redactor, spooled, tmp_path):
+        """Test PDF output is rasterized so values cannot be extracted"""
+        upload = spooled("pdf", make_pdf("SSN 123-45-6789"))
+        output = tmp_path / "out.pdf"
+
+        count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 1
+        with pdfplumber.open(str(output)) as pdf:
+            assert len(pdf.pages) == 1
+            assert "123-45-6789" not in (pdf.pages[0].extract_text() or "")
+
+    def test_redact_pdf_value_wrapped_across_lines(self, redactor, spooled, tmp_path):
+        """Test a value broken over two lines is found and boxed on both"""
+        upload = spooled("pdf", make_pdf("SSN 123-45-", "6789 on file"))
+        output = tmp_path / "out.pdf"
+
+        with patch.object(Redactor, "_line_boxes", wraps=Redactor._line_boxes) as line_boxes:
+            count = redactor.redact_file(upload, str(output), FINDINGS)
+
+        assert count == 1
+        assert len(Redactor._line_boxes(line_boxes.call_args.args[0])) == 2
+
+    def test_unsupported_extension(self, redactor, spooled, tmp_path):
+        upload = spooled("xyz", b"data")
+        with pytest.raises(ValueError, match="No redactor found"):
+            redactor.redact_file(upload, str(tmp_path / "out"), FINDINGS)
@@ -26,6 +26,11 @@ MOCK_FIRESTORE_DATA = {
     "createdAt": firestore.SERVER_TIMESTAMP,
 }
 
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
 @pytest.fixture
 def mock_firebase_service():
     with patch("src.server.routes.save_detection.FirebaseService") as mock:
@@ -68,6 +73,19 @@ class TestSaveDetectionEndpoint:
         assert "Missing required data" in response.json()["error"]
         mock_firebase_service.save_detection.assert_not_called()
 
+    @pytest.mark.parametrize("fields", [
+        ["not a finding"],
+        {"type": "email"},
+        [{"type": "email", "value": "a@b.co", "extra": 1}],
+        [{"type": "email", "value": "a@b.co", "locations": [{"page": 1, "offset": 3}]}],
+    ])
+    def test_save_detection_invalid_fields(self, mock_firebase_service, fields):
+        """Test malformed findings are rejected rather than dropped or failing with a 500"""
+        response = client.post("/save-detection", json={"file_name": "test.txt", "sensitive_fields": fields})
+
+        assert response.status_code == 400
+        mock_firebase_service.save_detection.assert_not_called()
+
     def test_save_detection_service_error(self, mock_firebase_service):
         """Test save detection when service fails"""
        
@@ -80,8 +98,24 @@ class TestSaveDetectionEndpoint:
         assert response.status_code == 500
         assert "Failed to save detection" in response.json()["error"]
 
+def partitioned_collections(db, months):
+    """Route collection names to their own mocks, with a partition registry holding ``months``."""
+    collections = {"detections": Mock(), "detection_meta": Mock()}
+    collections["detection_meta"].document.return_value.get.return_value = Mock(
+        exists=True, to_dict=Mock(return_value={"months": months})
+    )
+    db.collection.side_effect = lambda name: collections.setdefault(name, Mock())
+    return collections
+
+
 class TestFirebaseService:
-    @pytest.fixture
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self):
+        FirebaseService._instance = None
+        yield
+        FirebaseService._instance = None
+
+    @pytest.fixture(autouse=True)
     def mock_firebase_admin(self):
         with patch("firebase_admin.initialize_app") as mock_init:
             yield mock_init
@@ -93,7 +127,7 @@ class TestFirebaseService:
             mock_client.return_value = mock_db
             yield mock_db
 
-    @pytest.fixture
+    @pytest.fixture(autouse=True)
     def mock_credentials(self):
         with patch("firebase_admin.credentials.Certificate") as mock_cred:
             yield mock_cred
@@ -117,8 +151,10 @@ class TestFirebaseService:
       
         mock_doc = Mock()
         mock_doc.id = "mock_doc_id"
+        mock_partition = Mock()
+        mock_partition.document.return_value = mock_doc
         mock_collection = Mock()
-        mock_collection.document.return_value = mock_doc
+        mock_collection.document.return_value.collection.return_value = mock_partition
         mock_firestore_client.collection.return_value = mock_collection
 
         service = FirebaseService()
@@ -128,8 +164,38 @@ class TestFirebaseService:
 
      
         assert result == "mock_doc_id"
-        mock_firestore_client.collection.assert_called_with("detections")
-        mock_doc.set.assert_called_once()
+        mock_firestore_client.collection.assert_any_call("detections")
+        mock_collection.document.return_value.collection.assert_any_call("items")
+        mock_firestore_client.batch().create.assert_called_once_with(mock_doc, MOCK_FIRESTORE_DATA)
+        mock_firestore_client.batch().commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_save_detection_bumps_version(self, mock_firestore_client):
+        """Test the collection version is advanced in the same batch as the detection"""
+        service = FirebaseService()
+        await service.save_detection(dict(MOCK_FIRESTORE_DATA))
+
+        mock_firestore_client.collection.assert_any_call("detection_meta")
+        version_writes = [
+            call for call in mock_firestore_client.batch().set.call_args_list
+            if call.kwargs.get("merge") and "version" in call.args[1]
+        ]
+        assert len(version_writes) == 1
+        mock_firestore_client.batch().commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_save_detection_survives_value_index_failure(self, mock_firestore_client):
+        """Test a committed detection reports its ID when the value index write fails"""
+        mock_doc = Mock()
+        mock_doc.id = "mock_doc_id"
+        mock_firestore_client.collection.return_value.document.return_value.collection.return_value.document.return_value = mock_doc
+        service = FirebaseService()
+
+        with patch.object(service, "_update_value_index", side_effect=Exception("Index error")):
+            result = await service.save_detection(dict(MOCK_FIRESTORE_DATA))
+
+        assert result == "mock_doc_id"
+        mock_firestore_client.batch().commit.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_save_detection_error(self, mock_firestore_client):
@@ -150,9 +216,14 @@ class TestFirebaseService:
         """Test successful detections retrieval"""
       
         mock_doc = Mock()
-        mock_doc.to_dict.return_value = MOCK_FIRESTORE_DATA
-        mock_doc.id = "mock_doc_id"
-        mock_firestore_client.collection().get.return_value = [mock_doc]
+        mock_doc.to_dict.return_value = dict(MOCK_FIRESTORE_DATA)
+        mock_doc.id = "2024-03_mock_doc_id"
+        legacy_doc = Mock()
+        legacy_doc.to_dict.return_value = dict(MOCK_FIRESTORE_DATA)
+        legacy_doc.id = "legacy_doc_id"
+        collections = partitioned_collections(mock_firestore_client, {"2024-03": {"hot": True}})
+        collections["detections"].stream.return_value = [legacy_doc]
+        collections["detections"].document("2024-03").collection("items").stream.return_value = [mock_doc]
 
         service = FirebaseService()
         
@@ -160,9 +231,8 @@ class TestFirebaseService:
         result = await service.get_detections()
 
        
-        assert len(result) == 1
-        assert result[0]["id"] == "mock_doc_id"
-        mock_firestore_client.collection.assert_called_with("detections")
+        assert [detection["id"] for detection in result] == ["2024-03_mock_doc_id", "legacy_doc_id"]
+        collections["detections"].document.assert_any_call("2024-03")
 
     @pytest.mark.asyncio
     async def test_get_detections_error(self, mock_firestore_client):
@@ -178,21 +248,44 @@ class TestFirebaseService:
        
         assert result is None
 
+    @pytest.fixture
+    def run_transactions(self):
+        """Run transactional functions once against the mocked transaction."""
+        with patch("src.services.firebase_service.firestore.transactional", side_effect=lambda fn: fn):
+            yield
+
     @pytest.mark.asyncio
-    async def test_delete_detection_success(self, mock_firestore_client):
+    async def test_delete_detection_success(self, mock_firestore_client, run_transactions):
         """Test successful detection deletion"""
+        mock_snapshot = Mock(exists=True)
+        mock_snapshot.to_dict.return_value = MOCK_FIRESTORE_DATA
+        mock_firestore_client.collection().document().get.return_value = mock_snapshot
         service = FirebaseService()
         await service.delete_detection("mock_doc_id")
         
-        mock_firestore_client.collection.assert_called_with("detections")
-        mock_firestore_client.collection().document.assert_called_with("mock_doc_id")
-        mock_firestore_client.collection().document().delete.assert_called_once()
+        transaction = mock_firestore_client.transaction()
+        doc_ref = mock_firestore_client.collection().document()
+        mock_firestore_client.collection.assert_any_call("detections")
+        mock_firestore_client.collection().document.assert_any_call("mock_doc_id")
+        doc_ref.get.assert_called_once_with(transaction=transaction)
+        transaction.delete.assert_called_once_with(doc_ref)
+        assert transaction.set.called
+        mock_firestore_client.batch().delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_missing_detection_leaves_rollups(self, mock_firestore_client, run_transactions):
+        """Test a detection already deleted by a concurrent request is not decremented again"""
+        mock_firestore_client.collection().document().get.return_value = Mock(exists=False)
+        service = FirebaseService()
+        await service.delete_detection("mock_doc_id")
+
+        mock_firestore_client.transaction().set.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_delete_detection_error(self, mock_firestore_client):
+    async def test_delete_detection_error(self, mock_firestore_client, run_transactions):
         """Test detection deletion error"""
       
-        mock_firestore_client.collection().document().delete.side_effect = Exception("Delete error")
+        mock_firestore_client.collection().document().get.side_effect = Exception("Delete error")
         
         service = FirebaseService()
         
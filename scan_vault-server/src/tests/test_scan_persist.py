@@ -0,0 +1,93 @@
+import io
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch, AsyncMock
+
+from src.server.routes.scan import router
+from src.server.services.detection_writer import DetectionSaveError, save_reserved_detection
+
+
+client = TestClient(router)
+
+
+MOCK_RESULTS = {
+    "file_name": "test.txt",
+    "sensitive_fields": [
+        {"type": "email", "value": "test@example.com", "confidence": "high", "category": "PII"}
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def mock_scan_service():
+    with patch("src.server.routes.scan.scan_service") as mock:
+        mock.scan_file = AsyncMock(return_value=MOCK_RESULTS)
+        yield mock
+
+@pytest.fixture
+def mock_firebase_service():
+    with patch("src.server.services.detection_writer.FirebaseService") as mock:
+        mock_instance = Mock()
+        mock_instance.new_detection_id.return_value = "mock_doc_id"
+        mock_instance.save_detection = AsyncMock(return_value="mock_doc_id")
+        mock.return_value = mock_instance
+        mock.build_detection.side_effect = lambda name, fields: {"fileName": name, "sensitiveInfo": fields}
+        yield mock_instance
+
+
+class TestScanPersist:
+    def test_scan_with_persist(self, mock_scan_service, mock_firebase_service):
+        """Test scan saves the findings and returns the detection ID"""
+        response = client.post(
+            "/scan?persist=true",
+            files={"file": ("test.txt", io.BytesIO(b"test content"))},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["detection_id"] == "mock_doc_id"
+        assert response.json()["results"] == MOCK_RESULTS
+        mock_firebase_service.save_detection.assert_awaited_once_with(
+            {"fileName": "test.txt", "sensitiveInfo": MOCK_RESULTS["sensitive_fields"]},
+            "mock_doc_id",
+        )
+
+    def test_scan_without_persist(self, mock_scan_service, mock_firebase_service):
+        """Test scan does not touch storage by default"""
+        response = client.post(
+            "/scan",
+            files={"file": ("test.txt", io.BytesIO(b"test content"))},
+        )
+
+        assert response.status_code == 200
+        assert "detection_id" not in response.json()
+        mock_firebase_service.save_detection.assert_not_called()
+
+
+class TestSaveReservedDetection:
+    @pytest.mark.asyncio
+    async def test_retries_failed_saves(self, mock_firebase_service):
+        """Test a failed save is retried under the same ID"""
+        mock_firebase_service.save_detection.side_effect = [None, "mock_doc_id"]
+
+        detection_id = await save_reserved_detection({"fileName": "test.txt"}, "mock_doc_id", backoff=0)
+
+        assert detection_id == "mock_doc_id"
+        assert mock_firebase_service.save_detection.await_count == 2
+        assert all(call.args[1] == "mock_doc_id" for call in mock_firebase_service.save_detection.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_raises_after_last_attempt(self, mock_firebase_service, caplog):
+        """Test a save that keeps failing raises and logs the reserved ID"""
+        mock_firebase_service.save_detection.return_value = None
+
+        with pytest.raises(DetectionSaveError):
+            await save_reserved_detection({"fileName": "test.txt"}, "mock_doc_id", attempts=2, backoff=0)
+
+        assert mock_firebase_service.save_detection.await_count == 2
+        errors = [record for record in caplog.records if record.levelname == "ERROR"]
+        assert "mock_doc_id" in errors[-1].getMessage()
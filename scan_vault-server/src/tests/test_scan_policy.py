@@ -0,0 +1,148 @@
+import asyncio
+import io
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch, AsyncMock
+
+from src.server.models.finding import Finding
+from src.server.models.scan_policy import ScanPolicy
+from src.server.routes.scan import router
+from src.server.services.file_handler import SpooledUpload
+from src.server.services.scan_service import ScanService
+from src.server.utils.file_processor import FileProcessor
+from src.server.utils.finding_locator import FindingLocator
+
+
+client = TestClient(router)
+
+SSN = Finding("ssn", "123-45-6789", confidence="high", category="PII")
+EMAIL = Finding("email", "a@example.com", confidence="low", category="PII")
+
+# Five chunks of text; only the second contains an SSN
+CHUNKS = ["aaaa " * 20, "SSN: 123-45-6789 " + "bbbb " * 16, "cccc " * 20, "dddd " * 20, "eeee " * 20]
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def service():
+    instance = object.__new__(ScanService)
+    instance.llm_handler = Mock()
+    instance.file_processor = FileProcessor()
+    instance.finding_locator = FindingLocator()
+    return instance
+
+@pytest.fixture
+def upload(tmp_path):
+    data = "".join(CHUNKS).encode()
+    path = tmp_path / "input.txt"
+    path.write_bytes(data)
+    return SpooledUpload(str(path), "input.txt", "text", len(data), "txt")
+
+@pytest.fixture(autouse=True)
+def small_chunks():
+    with patch("src.server.services.scan_service.POLICY_CHUNK_CHARS", 100):
+        yield
+
+
+def analyze(chunk: str):
+    return [Finding("ssn", "123-45-6789", confidence="high", category="PII")] if "123-45-6789" in chunk else []
+
+
+class TestScanPolicy:
+    def test_matches_category_and_type(self):
+        policy = ScanPolicy(categories=["pii"], types=["SSN"])
+        assert policy.matches(SSN)
+        assert not policy.matches(EMAIL)
+
+    def test_matches_min_confidence(self):
+        policy = ScanPolicy(categories=["PII"], min_confidence="medium")
+        assert policy.matches(SSN)
+        assert not policy.matches(EMAIL)
+
+
+class TestPolicyScan:
+    @pytest.mark.asyncio
+    async def test_stops_reading_once_satisfied(self, service, upload):
+        """Test no further chunks are sent once the policy matches"""
+        service.llm_handler.analyze_text_async = AsyncMock(side_effect=analyze)
+
+        with patch("src.server.services.scan_service.POLICY_MAX_IN_FLIGHT", 1):
+            result = await service.scan_upload(upload, ScanPolicy(types=["ssn"]))
+
+        assert service.llm_handler.analyze_text_async.await_count == 2
+        assert result["policy"]["matched"] is True
+        assert result["policy"]["stopped_early"] is True
+        assert result["sensitive_fields"][0].locations[0].page == 1
+
+    @pytest.mark.asyncio
+    async def test_cancels_outstanding_calls(self, service, upload):
+        """Test model calls still in flight are cancelled when the policy matches"""
+        cancelled = []
+
+        async def slow_analyze(chunk):
+            if "123-45-6789" in chunk:
+                return analyze(chunk)
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(chunk)
+                raise
+            return []
+
+        service.llm_handler.analyze_text_async = slow_analyze
+
+        result = await asyncio.wait_for(service.scan_upload(upload, ScanPolicy(types=["ssn"])), 5)
+        await asyncio.sleep(0)
+
+        assert result["policy"]["matched"] is True
+        assert result["policy"]["chunks_analyzed"] == 1
+        assert len(cancelled) >= 1
+
+    @pytest.mark.asyncio
+    async def test_reads_everything_without_match(self, service, upload):
+        """Test the whole file is analyzed when the policy never matches"""
+        service.llm_handler.analyze_text_async = AsyncMock(side_effect=analyze)
+
+        result = await service.scan_upload(upload, ScanPolicy(categories=["PCI"]))
+
+        assert service.llm_handler.analyze_text_async.await_count == len(CHUNKS)
+        assert result["policy"]["matched"] is False
+        assert result["policy"]["stopped_early"] is False
+        assert len(result["sensitive_fields"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_model_error_fails_scan(self, service, upload):
+        service.llm_handler.analyze_text_async = AsyncMock(side_effect=ValueError("Failed to analyze text"))
+
+        with pytest.raises(ValueError):
+            await service.scan_upload(upload, ScanPolicy(types=["ssn"]))
+
+
+class TestPolicyEndpoint:
+    @pytest.fixture
+    def mock_scan_service(self):
+        with patch("src.server.routes.scan.scan_service") as mock:
+            mock.scan_file = AsyncMock(return_value={"file_name": "test.txt", "sensitive_fields": []})
+            yield mock
+
+    def test_scan_with_policy(self, mock_scan_service):
+        """Test stop conditions are passed to the scan service"""
+        response = client.post(
+            "/scan?stop_on_category=PHI&stop_on_type=ssn&stop_after=2&min_confidence=high",
+            files={"file": ("test.txt", io.BytesIO(b"test content"))},
+        )
+
+        assert response.status_code == 200
+        policy = mock_scan_service.scan_file.call_args.args[1]
+        assert policy == ScanPolicy(categories=["PHI"], types=["ssn"], stop_after=2, min_confidence="high")
+
+    def test_scan_without_policy(self, mock_scan_service):
+        response = client.post("/scan", files={"file": ("test.txt", io.BytesIO(b"test content"))})
+
+        assert response.status_code == 200
+        assert mock_scan_service.scan_file.call_args.args[1] is None
+        assert "policy" not in response.json()["results"]
@@ -0,0 +1,192 @@
+import asyncio
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch, AsyncMock
+
+from src.server.services.fair_scheduler import FairScheduler
+from src.server.providers.openai_provider import OpenAIProvider
+from src.services.firebase_service import FirebaseService
+from src.utils import auth
+from src.utils.tenants import QuotaExceededError, Tenant, TenantStore, current_tenant, key_digest, utc_day
+
+
+@pytest.fixture
+def store():
+    instance = TenantStore(sync_interval=0)
+    instance.add(Tenant("default"), key_digest("default-key"), static=True)
+    instance.add(Tenant("batch", requests_per_minute=2, daily_token_quota=100), key_digest("batch-key"))
+    return instance
+
+
+class TestTenantStore:
+    def test_lookup_by_key(self, store):
+        assert store.get("batch-key").id == "batch"
+        assert store.get("wrong-key") is None
+        assert store.get(None) is None
+
+    def test_rate_limit(self, store):
+        tenant = store.get("batch-key")
+        store.check_request(tenant)
+        store.check_request(tenant)
+
+        with pytest.raises(QuotaExceededError) as error:
+            store.check_request(tenant)
+        assert error.value.retry_after >= 1
+        assert tenant.requests_used == 2
+
+    def test_rate_limit_split_between_workers(self):
+        """Test each worker allows its share, so all of them together allow the configured rate"""
+        store = TenantStore(sync_interval=0, workers=2)
+        store.add(Tenant("batch", requests_per_minute=4), key_digest("batch-key"))
+        tenant = store.get("batch-key")
+        store.check_request(tenant)
+        store.check_request(tenant)
+
+        with pytest.raises(QuotaExceededError):
+            store.check_request(tenant)
+
+    def test_token_quota(self, store):
+        tenant = store.get("batch-key")
+        tenant.charge(100)
+
+        with pytest.raises(QuotaExceededError, match="Daily token quota"):
+            store.check_request(tenant)
+
+    @pytest.mark.asyncio
+    async def test_sync(self, store):
+        """Test deltas are flushed, totals from all workers applied and configuration reloaded"""
+        store.get("batch-key").charge(10)
+        firebase = Mock()
+        firebase.record_tenant_usage = AsyncMock(return_value={"batch": {"requests": 5, "tokens": 60}})
+        firebase.get_tenants = AsyncMock(return_value=[
+            {"id": "batch", "keyDigest": key_digest("rotated-key"), "weight": 0.5, "dailyTokenQuota": 100},
+            {"id": "interactive", "keyDigest": key_digest("ui-key"), "weight": 4},
+        ])
+
+        await store.sync(firebase)
+
+        firebase.record_tenant_usage.assert_awaited_once_with(utc_day(), {"batch": {"requests": 0, "tokens": 10}})
+        batch = store.get("rotated-key")
+        assert batch.tokens_used == 60
+        assert batch.pending_tokens == 0
+        assert batch.weight == 0.5
+        assert store.get("batch-key") is None
+        assert store.get("ui-key").weight == 4
+        assert store.get("default-key") is not None
+
+    @pytest.mark.asyncio
+    async def test_sync_failure_keeps_deltas(self, store):
+        store.get("batch-key").charge(10)
+        firebase = Mock()
+        firebase.record_tenant_usage = AsyncMock(side_effect=RuntimeError("unavailable"))
+
+        with pytest.raises(RuntimeError):
+            await store.sync(firebase)
+
+        assert store.get("batch-key").pending_tokens == 10
+
+    @pytest.mark.asyncio
+    async def test_firestore_keys_accepted_after_start(self):
+        """Test tenants are loaded at startup instead of after the first sync interval"""
+        store = TenantStore(sync_interval=3600)
+        firebase = Mock()
+        firebase.record_tenant_usage = AsyncMock(return_value={})
+        firebase.get_tenants = AsyncMock(return_value=[{"id": "batch", "keyDigest": key_digest("stored-key")}])
+
+        await store.start_sync(lambda: firebase)
+        try:
+            assert store.get("stored-key").id == "batch"
+        finally:
+            await store.stop_sync(lambda: firebase)
+
+    def test_record_tenant_usage(self):
+        service = object.__new__(FirebaseService)
+        service.db = Mock()
+        usage_doc = Mock()
+        usage_doc.to_dict.return_value = {"tenantId": "batch", "requests": 5, "tokens": 60}
+        service.db.collection().where().stream.return_value = [usage_doc]
+
+        totals = asyncio.run(service.record_tenant_usage("2024-01-01", {"batch": {"requests": 1, "tokens": 10}}))
+
+        service.db.batch().set.assert_called_once()
+        service.db.batch().commit.assert_called_once()
+        assert totals == {"batch": {"requests": 5, "tokens": 60}}
+
+
+class TestAuth:
+    @pytest.fixture
+    def client(self, store):
+        app = FastAPI()
+
+        @app.get("/whoami")
+        async def whoami(tenant=Depends(auth.get_api_key)):
+            return {"tenant": tenant.id, "current": current_tenant.get().id}
+
+        with patch.object(auth, "tenant_store", store):
+            yield TestClient(app)
+
+    def test_tenant_resolved_from_key(self, client):
+        response = client.get("/whoami", headers={"access_token": "batch-key"})
+        assert response.json() == {"tenant": "batch", "current": "batch"}
+
+    def test_invalid_key(self, client):
+        assert client.get("/whoami", headers={"access_token": "nope"}).status_code == 403
+
+    def test_rate_limited(self, client):
+        for _ in range(2):
+            client.get("/whoami", headers={"access_token": "batch-key"})
+        response = client.get("/whoami", headers={"access_token": "batch-key"})
+
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    def test_model_tokens_charged_to_current_tenant(self):
+        tenant = Tenant("batch")
+        handler = object.__new__(OpenAIProvider)
+        token = current_tenant.set(tenant)
+        try:
+            handler._charge_tenant(Mock(usage=Mock(total_tokens=42)))
+        finally:
+            current_tenant.reset(token)
+        assert tenant.tokens_used == 42
+
+
+class TestFairScheduler:
+    @pytest.mark.asyncio
+    async def test_tenants_share_slots_by_weight(self):
+        """Test a tenant with a backlog does not starve one that arrives later"""
+        scheduler = FairScheduler(concurrency=1)
+        await scheduler.acquire("running")
+        order = []
+
+        async def request(tenant_id, weight):
+            await scheduler.acquire(tenant_id, weight)
+            order.append(tenant_id)
+
+        tasks = [asyncio.create_task(request("batch", 1)) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(request("interactive", 2)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert scheduler.queued() == {"batch": 4, "interactive": 2}
+
+        for _ in range(6):
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert order[:3] == ["batch", "interactive", "interactive"]
+        assert order.count("batch") == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = FairScheduler(concurrency=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        assert scheduler.in_flight == 0
+        assert scheduler.queued() == {}
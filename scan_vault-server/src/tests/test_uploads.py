@@ -0,0 +1,266 @@
+import base64
+import hashlib
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.server.models.finding import Finding
+from src.server.routes.uploads import router
+from src.server.services.upload_sessions import (
+    ChecksumMismatchError,
+    UploadConflictError,
+    UploadInterruptedError,
+    UploadNotFoundError,
+    UploadQuotaError,
+    UploadStore,
+)
+from src.server.services.file_handler import UnsupportedFileTypeError
+from src.server.utils.file_processor import FileProcessor
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+CHUNK = {"Content-Type": "application/offset+octet-stream"}
+
+
+def metadata(filename):
+    return f"filename {base64.b64encode(filename.encode()).decode()}"
+
+
+async def chunks(*parts, interrupt=False):
+    for part in parts:
+        yield part
+    if interrupt:
+        raise UploadInterruptedError()
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def store(tmp_path):
+    store = UploadStore(directory=str(tmp_path), analyze_bytes=16)
+    with patch("src.server.routes.uploads.upload_store", store):
+        yield store
+
+@pytest.fixture
+def mock_scan_service():
+    with patch("src.server.routes.uploads.scan_service") as mock:
+        mock.file_processor = FileProcessor()
+        mock.llm_handler.analyze_text_async = AsyncMock(
+            side_effect=lambda text: [Finding("email", "a@example.com")] if "a@example.com" in text else []
+        )
+        mock.scan_upload = AsyncMock(return_value={"file_name": "notes.txt", "sensitive_fields": []})
+        mock.finish_analyzed_upload = AsyncMock(
+            side_effect=lambda upload, findings, chunks, policy: {"file_name": upload.filename, "sensitive_fields": findings}
+        )
+        yield mock
+
+
+def create(length, filename="notes.txt"):
+    response = client.post("/uploads", headers={"Upload-Length": str(length), "Upload-Metadata": metadata(filename)})
+    assert response.status_code == 201
+    return response.headers["Location"]
+
+
+class TestUploadStore:
+    @pytest.mark.asyncio
+    async def test_append_checks_offset(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create("notes.txt", "txt", "text", 10)
+
+        assert await store.append(session, 0, chunks(b"hello")) == 5
+        with pytest.raises(UploadConflictError):
+            await store.append(session, 0, chunks(b"again"))
+        assert store.offset(session) == 5
+
+    @pytest.mark.asyncio
+    async def test_checksum_mismatch_discards_chunk(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create("notes.txt", "txt", "text", 10)
+        wrong = "sha1 " + base64.b64encode(hashlib.sha1(b"other").digest()).decode()
+
+        with pytest.raises(ChecksumMismatchError):
+            await store.append(session, 0, chunks(b"hello"), checksum=wrong)
+        assert store.offset(session) == 0
+
+    @pytest.mark.asyncio
+    async def test_interrupted_chunk_kept_unless_checksummed(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create("notes.txt", "txt", "text", 20)
+        checksum = "sha256 " + base64.b64encode(hashlib.sha256(b"hello world").digest()).decode()
+
+        with pytest.raises(UploadInterruptedError):
+            await store.append(session, 0, chunks(b"hello", interrupt=True))
+        assert store.offset(session) == 5
+
+        with pytest.raises(UploadInterruptedError):
+            await store.append(session, 5, chunks(b" wor", interrupt=True), checksum=checksum)
+        assert store.offset(session) == 5
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filename,extension,file_type,body", [
+        ("report.pdf", "pdf", "pdf", b"%PDF-1.4\n" + b"x" * 600),
+        ("letter.docx", "docx", "docx", b"PK\x03\x04" + b"x" * 600),
+    ])
+    async def test_sniffs_once_header_has_arrived(self, tmp_path, filename, extension, file_type, body):
+        """Test a first chunk shorter than any signature is held until the header is complete"""
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create(filename, extension, file_type, len(body))
+        sniff = FileProcessor().sniff_file_type
+
+        assert await store.append(session, 0, chunks(body[:2]), sniff=sniff) == 2
+        assert await store.append(session, 2, chunks(body[2:100], body[100:]), sniff=sniff) == len(body)
+
+    @pytest.mark.asyncio
+    async def test_sniff_rejects_header_completed_later(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create("report.pdf", "pdf", "pdf", 4)
+        sniff = FileProcessor().sniff_file_type
+
+        assert await store.append(session, 0, chunks(b"%P"), sniff=sniff) == 2
+        with pytest.raises(UnsupportedFileTypeError):
+            await store.append(session, 2, chunks(b"XX"), sniff=sniff)
+        assert store.offset(session) == 2
+
+    def test_quotas_per_tenant(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path), max_sessions=2, max_bytes=100)
+        store.create("a.txt", "txt", "text", 40, tenant_id="acme")
+        with pytest.raises(UploadQuotaError):
+            store.create("b.txt", "txt", "text", 70, tenant_id="acme")
+        store.create("b.txt", "txt", "text", 60, tenant_id="acme")
+        with pytest.raises(UploadQuotaError):
+            store.create("c.txt", "txt", "text", 0, tenant_id="acme")
+
+        # Other tenants have their own quota, and finished uploads free theirs
+        other = store.create("a.txt", "txt", "text", 100, tenant_id="globex")
+        store.delete(other)
+        store.create("b.txt", "txt", "text", 100, tenant_id="globex")
+
+    def test_other_tenant_and_expired_not_found(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path))
+        session = store.create("notes.txt", "txt", "text", 10, tenant_id="acme")
+
+        with pytest.raises(UploadNotFoundError):
+            store.get(session.id, "other")
+        with pytest.raises(UploadNotFoundError):
+            store.get("../etc/passwd", "acme")
+
+        store.ttl = -1
+        assert store.sweep() == 1
+        with pytest.raises(UploadNotFoundError):
+            store.get(session.id, "acme")
+
+    @pytest.mark.asyncio
+    async def test_analyzes_complete_lines_while_arriving(self, tmp_path):
+        store = UploadStore(directory=str(tmp_path), analyze_bytes=32)
+        body = b"first line a@example.com here\nsecond line, still arriv"
+        session = store.create("notes.txt", "txt", "text", len(body) + 4, streamable=True)
+        await store.append(session, 0, chunks(body))
+        analyze = AsyncMock(return_value=[Finding("email", "a@example.com")])
+
+        session = await store.analyze_received(session, analyze)
+        assert session.analyzed == body.index(b"\n") + 1
+        analyze.assert_awaited_once_with("first line a@example.com here\n")
+
+        await store.append(session, len(body), chunks(b"ing\n"))
+        session = await store.analyze_received(session, AsyncMock(return_value=[]), final=True)
+        assert session.analyzed == len(body) + 4
+        assert [finding.value for finding in store.get(session.id).early_findings()] == ["a@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_non_utf8_upload_is_unsupported(self, tmp_path):
+        """Test invalid UTF-8 fails as an unsupported file, keeping progress made before it"""
+        store = UploadStore(directory=str(tmp_path), analyze_bytes=8)
+        body = b"first line\ncaf\xe9 au lait\n"
+        session = store.create("notes.txt", "txt", "text", len(body), streamable=True)
+        await store.append(session, 0, chunks(body))
+
+        with pytest.raises(UnsupportedFileTypeError, match="offset 14"):
+            await store.analyze_received(session, AsyncMock(return_value=[]))
+        assert store.get(session.id).analyzed == len(b"first line\n")
+
+
+class TestUploadRoutes:
+    def test_resumable_upload_and_scan(self, store, mock_scan_service):
+        location = create(12, "notes.pdf")
+        assert client.head(location).headers["Upload-Offset"] == "0"
+
+        first = client.patch(location, content=b"%PDF-1.4", headers={**CHUNK, "Upload-Offset": "0"})
+        assert first.status_code == 204
+        assert first.headers["Upload-Offset"] == "8"
+
+        stale = client.patch(location, content=b"\n%%E", headers={**CHUNK, "Upload-Offset": "0"})
+        assert stale.status_code == 409
+
+        early = client.post(f"{location}/scan")
+        assert early.status_code == 409
+
+        client.patch(location, content=b"\n%%E", headers={**CHUNK, "Upload-Offset": "8"})
+        response = client.post(f"{location}/scan")
+        assert response.status_code == 200
+        upload = mock_scan_service.scan_upload.await_args.args[0]
+        assert (upload.filename, upload.file_type, upload.size) == ("notes.pdf", "pdf", 12)
+        assert client.head(location).status_code == 404
+
+    def test_streamable_upload_uses_early_findings(self, store, mock_scan_service):
+        body = b"contact a@example.com today\n" + b"nothing else\n"
+        location = create(len(body))
+
+        client.patch(location, content=body[:30], headers={**CHUNK, "Upload-Offset": "0"})
+        client.patch(location, content=body[30:], headers={**CHUNK, "Upload-Offset": "30"})
+        response = client.post(f"{location}/scan")
+
+        assert response.status_code == 200
+        assert response.json()["results"]["sensitive_fields"][0]["value"] == "a@example.com"
+        mock_scan_service.scan_upload.assert_not_awaited()
+        assert mock_scan_service.finish_analyzed_upload.await_args.args[2] == 2
+
+    def test_non_utf8_streamable_upload_returns_415(self, store, mock_scan_service):
+        body = b"contact a@example.com today\n" + b"caf\xe9 au lait\n"
+        location = create(len(body))
+
+        client.patch(location, content=body[:30], headers={**CHUNK, "Upload-Offset": "0"})
+        client.patch(location, content=body[30:], headers={**CHUNK, "Upload-Offset": "30"})
+        response = client.post(f"{location}/scan")
+
+        assert response.status_code == 415
+        assert "not UTF-8" in response.json()["detail"]
+
+    def test_checksum_mismatch_returns_460(self, store, mock_scan_service):
+        location = create(5)
+        checksum = "md5 " + base64.b64encode(hashlib.md5(b"other").digest()).decode()
+
+        response = client.patch(
+            location, content=b"hello", headers={**CHUNK, "Upload-Offset": "0", "Upload-Checksum": checksum}
+        )
+        assert response.status_code == 460
+        assert client.head(location).headers["Upload-Offset"] == "0"
+
+    def test_rejects_wrong_content(self, store, mock_scan_service):
+        location = create(8, "report.pdf")
+        response = client.patch(location, content=b"not a pdf", headers={**CHUNK, "Upload-Offset": "0"})
+        assert response.status_code == 415
+
+    def test_rejects_oversized_and_unsupported(self, store, mock_scan_service):
+        too_large = client.post("/uploads", headers={"Upload-Length": str(10 ** 12), "Upload-Metadata": metadata("a.txt")})
+        assert too_large.status_code == 413
+
+        unsupported = client.post("/uploads", headers={"Upload-Length": "5", "Upload-Metadata": metadata("a.exe")})
+        assert unsupported.status_code == 400
+
+    def test_quota_returns_429(self, store, mock_scan_service):
+        store.max_sessions = 1
+        create(5)
+        response = client.post("/uploads", headers={"Upload-Length": "5", "Upload-Metadata": metadata("b.txt")})
+        assert response.status_code == 429
+
+    def test_delete(self, store, mock_scan_service):
+        location = create(5)
+        assert client.delete(location).status_code == 204
+        assert client.head(location).status_code == 404
@@ -0,0 +1,122 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch, AsyncMock
+
+from src.server.routes.find_by_value import router
+from src.services.firebase_service import FirebaseService
+from src.utils.value_hash import normalize_value, value_digest
+
+
+client = TestClient(router)
+
+MOCK_KEY = b"test-index-key"
+
+MOCK_DETECTION = {
+    "fileName": "cards.csv",
+    "sensitiveInfo": [
+        {"type": "credit_card", "value": "4111 1111 1111 1111", "category": "PCI"},
+        {"type": "credit_card", "value": "4111-1111-1111-1111", "category": "PCI"},
+        {"type": "email", "value": "Test@Example.com", "category": "PII"},
+        {"type": "note", "value": "", "category": "PII"},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_verify_key():
+    with patch("src.utils.auth.verify_key", return_value=True):
+        yield
+
+@pytest.fixture
+def service():
+    instance = object.__new__(FirebaseService)
+    instance.db = Mock()
+    return instance
+
+
+class TestValueHash:
+    def test_normalize_numeric_values(self):
+        """Test separators are ignored for card numbers, SSNs and phone numbers"""
+        assert normalize_value("4111 1111 1111 1111") == "4111111111111111"
+        assert normalize_value("123-45-6789") == normalize_value("123 45 6789")
+        assert normalize_value("(555) 123-4567") == "5551234567"
+
+    def test_normalize_text_values(self):
+        """Test text values are case-folded with whitespace collapsed"""
+        assert normalize_value("  John   DOE ") == "john doe"
+        assert normalize_value("john.doe@example.com") != normalize_value("johndoe@example.com")
+
+    def test_digest_is_keyed(self):
+        """Test the digest depends on the key and hides the raw value"""
+        digest = value_digest("123-45-6789", MOCK_KEY)
+        assert digest == value_digest("123 45 6789", MOCK_KEY)
+        assert digest != value_digest("123-45-6789", b"other-key")
+        assert "6789" not in digest
+
+
+class TestValueIndex:
+    def test_update_value_index(self, service):
+        """Test each distinct normalized value gets one index write"""
+        with patch("src.services.firebase_service.get_index_key", return_value=MOCK_KEY):
+            service._update_value_index("doc-1", MOCK_DETECTION, add=True)
+
+        assert service.db.batch().set.call_count == 2
+        service.db.collection().document.assert_any_call(value_digest("4111111111111111", MOCK_KEY))
+        service.db.batch().commit.assert_called_once()
+
+    def test_update_value_index_without_key(self, service):
+        """Test indexing is skipped when no key is configured"""
+        with patch("src.services.firebase_service.get_index_key", return_value=None):
+            service._update_value_index("doc-1", MOCK_DETECTION, add=True)
+
+        service.db.batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_find_detections_by_value(self, service):
+        """Test lookup reads one index entry and the matching detections"""
+        service.db.collection().document().get.return_value = Mock(
+            exists=True, to_dict=Mock(return_value={"detectionIds": ["doc-1"]})
+        )
+        match = Mock(exists=True, id="doc-1")
+        match.to_dict.return_value = {"fileName": "cards.csv"}
+        service.db.get_all.return_value = [match]
+
+        with patch("src.services.firebase_service.get_index_key", return_value=MOCK_KEY):
+            result = await service.find_detections_by_value("4111111111111111")
+
+        assert result == [{"fileName": "cards.csv", "id": "doc-1"}]
+        service.db.collection().get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_find_detections_without_key(self, service):
+        """Test lookup fails clearly when the index is not configured"""
+        with patch("src.services.firebase_service.get_index_key", return_value=None):
+            with pytest.raises(ValueError, match="Value index is not configured"):
+                await service.find_detections_by_value("4111111111111111")
+
+
+class TestFindByValueEndpoint:
+    @pytest.fixture
+    def mock_firebase_service(self):
+        with patch("src.server.routes.find_by_value.FirebaseService") as mock:
+            mock_instance = Mock()
+            mock_instance.find_detections_by_value = AsyncMock()
+            mock.return_value = mock_instance
+            yield mock_instance
+
+    def test_find_by_value_success(self, mock_firebase_service):
+        """Test lookup endpoint"""
+        mock_firebase_service.find_detections_by_value.return_value = [{"id": "doc-1", "fileName": "cards.csv"}]
+
+        response = client.post("/detections/by-value", json={"value": "4111111111111111"})
+
+        assert response.status_code == 200
+        assert response.json() == {"detections": [{"id": "doc-1", "fileName": "cards.csv"}]}
+
+    def test_find_by_value_not_configured(self, mock_firebase_service):
+        """Test lookup endpoint when the index key is missing"""
+        mock_firebase_service.find_detections_by_value.side_effect = ValueError("Value index is not configured")
+
+        response = client.post("/detections/by-value", json={"value": "4111111111111111"})
+
+        assert response.status_code == 503
@@ -1,25 +1,55 @@
+import hmac
 import os
+from typing import Optional
 from fastapi import Security, HTTPException, status
 from fastapi.security import APIKeyHeader
 import s3fs
 import logging  
 
+from src.utils.tenants import QuotaExceededError, Tenant, TenantStore, current_tenant
+
 logger = logging.getLogger(__name__)
 
 s3fs.S3FileSystem.cachable = False
 
-API_KEY = os.environ['SCAN_VAULT_API_KEY']
 API_KEY_NAME = "access_token"
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
+# Profiling and other operator endpoints; disabled unless SCAN_VAULT_ADMIN_KEY is set
+ADMIN_KEY_NAME = "admin_token"
+admin_key_header = APIKeyHeader(name=ADMIN_KEY_NAME, auto_error=False)
+
+# SCAN_VAULT_API_KEY is the "default" tenant; more are loaded from Firestore in the background
+tenant_store = TenantStore.from_env()
+
 
-async def get_api_key(api_key: str = Security(api_key_header)):
+async def get_api_key(api_key: str = Security(api_key_header)) -> Optional[Tenant]:
   if not verify_key(api_key):
     logger.error("Invalid API Key: Unauthorized access attempt")
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                         detail="Invalid API Key")
 
+  tenant = tenant_store.get(api_key)
+  if tenant is not None:
+    try:
+      tenant_store.check_request(tenant)
+    except QuotaExceededError as e:
+      logger.warning("Tenant %s throttled: %s", tenant.name, e)
+      raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                          detail=str(e),
+                          headers={"Retry-After": str(e.retry_after)})
+  current_tenant.set(tenant)
+  return tenant
+
 def verify_key(api_key: str):
-  return api_key == API_KEY
+  return tenant_store.get(api_key) is not None
 
+async def get_admin_key(admin_key: str = Security(admin_key_header)) -> None:
+  if not verify_admin_key(admin_key):
+    logger.error("Invalid admin key: Unauthorized admin access attempt")
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Invalid admin key")
 
+def verify_admin_key(admin_key: Optional[str]) -> bool:
+  expected = os.getenv("SCAN_VAULT_ADMIN_KEY")
+  return bool(expected and admin_key) and hmac.compare_digest(admin_key.encode(), expected.encode())
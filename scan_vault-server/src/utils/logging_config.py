@@ -1,9 +1,172 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+import atexit
 import logging
-from colorlog import ColoredFormatter
+import os
+import queue
+import random
+import sys
 
-def setup_logging():
-    # Create a colored formatter
-    formatter = ColoredFormatter(
+import orjson
+
+from src.server.models.finding import Finding
+from src.utils.tenants import current_tenant
+
+# json for log shipping, console for colored local output
+LOG_FORMAT = os.getenv("SCAN_VAULT_LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("SCAN_VAULT_LOG_LEVEL", "info").upper()
+
+# Share of INFO and DEBUG records kept for chatty per-request loggers.
+# Override or extend with SCAN_VAULT_LOG_SAMPLING="logger=rate,logger=rate".
+DEFAULT_SAMPLE_RATES = {
+    "src.server.services.model_handler": 0.01,
+    "src.server.routes.health": 0.01,
+}
+
+# Keys that mark a mapping as holding findings or their values
+SENSITIVE_KEYS = {"value", "sensitive_fields", "sensitiveInfo", "findings"}
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "tenant"}
+# Arguments that cannot change between the logging call and formatting on the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+def parse_sample_rates(spec: Optional[str]) -> Dict[str, float]:
+    """Default sample rates updated with ``logger=rate`` pairs from the environment."""
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for pair in (spec or "").split(","):
+        name, _, rate = pair.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def scrub(value: Any) -> Any:
+    """Replace findings, or containers of them, with a placeholder."""
+    if isinstance(value, Finding):
+        return f"<finding {value.type}>"
+    if isinstance(value, dict) and SENSITIVE_KEYS.intersection(value):
+        return "<redacted>"
+    if isinstance(value, (list, tuple, set)) and any(isinstance(item, (Finding, dict)) for item in value):
+        return f"<redacted {len(value)} items>"
+    return value
+
+
+class FindingRedactionFilter(logging.Filter):
+    """Keeps finding values out of log output, whatever a caller passes in."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not isinstance(record.msg, str):
+            record.msg = scrub(record.msg)
+        if isinstance(record.args, tuple):
+            record.args = tuple(scrub(arg) for arg in record.args)
+        elif isinstance(record.args, dict):
+            record.args = scrub(record.args)
+            if not isinstance(record.args, dict):
+                record.msg, record.args = f"{record.msg} {record.args}", None
+        for key in set(vars(record)) - _RECORD_ATTRIBUTES:
+            setattr(record, key, scrub(getattr(record, key)))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a share of INFO and DEBUG records per logger.
+
+    A logger without its own rate uses its nearest configured parent's.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        if name not in self._resolved:
+            rate, candidate = 1.0, name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class ContextFilter(logging.Filter):
+    """Tags records with the tenant being served, read on the calling task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        tenant = current_tenant.get()
+        record.tenant = tenant.id if tenant is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        if getattr(record, "tenant", None):
+            entry["tenant"] = record.tenant
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them first.
+
+    Messages with only immutable arguments are interpolated on the listener
+    thread; anything else is rendered now, before the caller can change it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time, so redirected output is followed."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def _console_formatter() -> logging.Formatter:
+    from colorlog import ColoredFormatter
+
+    return ColoredFormatter(
         "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
         log_colors={
@@ -15,10 +178,50 @@ def setup_logging():
         },
     )
 
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        handlers=[console_handler]
-    )
+_handler: Optional[DeferredQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _start_listener() -> None:
+    global _listener
+    output = _StdoutHandler()
+    output.setFormatter(_console_formatter() if LOG_FORMAT == "console" else JsonFormatter())
+    _handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+
+
+def setup_logging() -> None:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Callers only pay for filtering and an enqueue; formatting and writing
+    happen on the listener thread. Safe to call more than once, and the
+    listener is restarted in forked workers.
+    """
+    global _handler
+    if _handler is not None:
+        return
+
+    _handler = DeferredQueueHandler(queue.SimpleQueue())
+    _handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("SCAN_VAULT_LOG_SAMPLING"))))
+    _handler.addFilter(FindingRedactionFilter())
+    _handler.addFilter(ContextFilter())
+    _start_listener()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+
+    atexit.register(stop_logging)
+    # Threads do not survive fork; each gunicorn worker needs its own listener
+    os.register_at_fork(after_in_child=_start_listener)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,265 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExceededError(Exception):
+    """Raised when a tenant is over its request rate or token quota."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def key_digest(api_key: str) -> str:
+    """SHA-256 of an API key; only digests are stored or compared."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class Tenant:
+    """An API key holder with its limits and today's usage."""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        name: str = None,
+        weight: float = 1.0,
+        requests_per_minute: int = 0,
+        daily_token_quota: int = 0,
+    ):
+        self.id = tenant_id
+        self.name = name or tenant_id
+        self.key_digest: Optional[str] = None
+        self.weight = max(weight, 0.01)
+        self.requests_per_minute = requests_per_minute  # 0 means unlimited
+        self.daily_token_quota = daily_token_quota  # 0 means unlimited
+        # Usage persisted by any worker, plus what this worker has not flushed yet
+        self.requests_used = 0
+        self.tokens_used = 0
+        self.pending_requests = 0
+        self.pending_tokens = 0
+        self._allowance = float(requests_per_minute)
+        self._checked_at = time.monotonic()
+
+    def take_request(self, workers: int = 1) -> Optional[float]:
+        """
+        Take one request from the token bucket.
+
+        Args:
+            workers (int): Server workers the rate limit is split between
+
+        Returns:
+            Optional[float]: None if allowed, otherwise seconds until a request is available
+        """
+        if not self.requests_per_minute:
+            return None
+        now = time.monotonic()
+        limit = self.requests_per_minute / workers
+        rate = limit / 60
+        self._allowance = min(max(limit, 1.0), self._allowance + (now - self._checked_at) * rate)
+        self._checked_at = now
+        if self._allowance < 1:
+            return (1 - self._allowance) / rate
+        self._allowance -= 1
+        return None
+
+    def charge(self, tokens: int) -> None:
+        """Count model tokens against the daily quota."""
+        self.tokens_used += tokens
+        self.pending_tokens += tokens
+
+    def configure(self, other: "Tenant") -> None:
+        """Take limits from a reloaded configuration, keeping usage and rate state."""
+        self.name = other.name
+        self.weight = other.weight
+        if other.requests_per_minute != self.requests_per_minute:
+            self._allowance = float(other.requests_per_minute)
+        self.requests_per_minute = other.requests_per_minute
+        self.daily_token_quota = other.daily_token_quota
+
+
+# Tenant of the request being served, so model calls can be charged to it
+current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+
+class TenantStore:
+    """
+    In-memory tenant registry and usage counters.
+
+    Lookups and quota checks never touch storage. A background task flushes
+    usage deltas to Firestore, reloads the day's totals (so quotas converge
+    across workers) and picks up tenant configuration changes.
+
+    Request rates are checked in memory too, so each of the ``workers``
+    server processes allows its share of a tenant's requests per minute
+    and together they allow the configured rate. Requests are spread over
+    workers by the kernel, so a tenant may be refused slightly before its
+    full rate when they are uneven.
+    """
+
+    def __init__(self, sync_interval: float = 30.0, workers: int = 1):
+        self.sync_interval = sync_interval
+        self.workers = max(workers, 1)
+        self._by_digest: Dict[str, Tenant] = {}
+        self._by_id: Dict[str, Tenant] = {}
+        self._static_ids = set()
+        self._day = utc_day()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "TenantStore":
+        """Create a store holding the tenant for SCAN_VAULT_API_KEY."""
+        store = cls(
+            sync_interval=float(os.getenv("SCAN_VAULT_TENANT_SYNC_SECONDS", "30")),
+            # Matches the worker count gunicorn.conf.py starts
+            workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        )
+        api_key = os.environ["SCAN_VAULT_API_KEY"]
+        default = Tenant(
+            "default",
+            requests_per_minute=int(os.getenv("SCAN_VAULT_DEFAULT_REQUESTS_PER_MINUTE", "0")),
+            daily_token_quota=int(os.getenv("SCAN_VAULT_DEFAULT_DAILY_TOKENS", "0")),
+        )
+        store.add(default, key_digest(api_key), static=True)
+        return store
+
+    def add(self, tenant: Tenant, digest: str, static: bool = False) -> None:
+        """Add a tenant under the digest of its key, updating it in place if already known."""
+        existing = self._by_id.get(tenant.id)
+        if existing is not None:
+            existing.configure(tenant)
+            tenant = existing
+            # The key may have been rotated
+            self._by_digest.pop(tenant.key_digest, None)
+        tenant.key_digest = digest
+        self._by_digest[digest] = tenant
+        self._by_id[tenant.id] = tenant
+        if static:
+            self._static_ids.add(tenant.id)
+
+    def remove(self, tenant_id: str) -> None:
+        tenant = self._by_id.pop(tenant_id, None)
+        if tenant is not None:
+            self._by_digest.pop(tenant.key_digest, None)
+
+    def get(self, api_key: Optional[str]) -> Optional[Tenant]:
+        if not api_key:
+            return None
+        return self._by_digest.get(key_digest(api_key))
+
+    def tenants(self) -> List[Tenant]:
+        return list(self._by_id.values())
+
+    def check_request(self, tenant: Tenant) -> None:
+        """
+        Count a request against a tenant's rate limit and quota.
+
+        Raises:
+            QuotaExceededError: If the tenant must wait before calling again
+        """
+        self._roll_day()
+        if tenant.daily_token_quota and tenant.tokens_used >= tenant.daily_token_quota:
+            raise QuotaExceededError("Daily token quota exhausted", self._seconds_to_midnight())
+        wait = tenant.take_request(self.workers)
+        if wait is not None:
+            raise QuotaExceededError("Request rate limit exceeded", max(1, int(wait + 0.999)))
+        tenant.requests_used += 1
+        tenant.pending_requests += 1
+
+    async def sync(self, firebase_service) -> None:
+        """Flush usage deltas, then reload tenant configuration and today's totals."""
+        self._roll_day()
+        day = self._day
+        deltas = {}
+        for tenant in self._by_id.values():
+            if tenant.pending_requests or tenant.pending_tokens:
+                deltas[tenant.id] = {"requests": tenant.pending_requests, "tokens": tenant.pending_tokens}
+                tenant.pending_requests = tenant.pending_tokens = 0
+        try:
+            totals = await firebase_service.record_tenant_usage(day, deltas)
+        except Exception:
+            # Keep the deltas for the next attempt
+            for tenant_id, counts in deltas.items():
+                self._by_id[tenant_id].pending_requests += counts["requests"]
+                self._by_id[tenant_id].pending_tokens += counts["tokens"]
+            raise
+
+        self.load(await firebase_service.get_tenants())
+        if day == self._day:
+            for tenant_id, counts in totals.items():
+                tenant = self._by_id.get(tenant_id)
+                if tenant is not None:
+                    tenant.requests_used = counts.get("requests", 0) + tenant.pending_requests
+                    tenant.tokens_used = counts.get("tokens", 0) + tenant.pending_tokens
+
+    def load(self, configs: List[Dict[str, Any]]) -> None:
+        """Replace stored tenants with the given configurations; env tenants are kept."""
+        seen = set(self._static_ids)
+        for config in configs:
+            if config.get("disabled") or not config.get("keyDigest"):
+                continue
+            tenant = Tenant(
+                config["id"],
+                name=config.get("name"),
+                weight=float(config.get("weight", 1.0)),
+                requests_per_minute=int(config.get("requestsPerMinute", 0)),
+                daily_token_quota=int(config.get("dailyTokenQuota", 0)),
+            )
+            self.add(tenant, config["keyDigest"])
+            seen.add(tenant.id)
+        for tenant_id in list(self._by_id):
+            if tenant_id not in seen:
+                self.remove(tenant_id)
+
+    async def start_sync(self, firebase_factory) -> None:
+        """Load tenants from Firestore, then sync every ``sync_interval`` seconds until stop_sync is called."""
+        if self._sync_task is not None or self.sync_interval <= 0:
+            return
+        # Without this a new worker rejects Firestore-stored keys until the first interval has passed
+        try:
+            await self.sync(firebase_factory())
+        except Exception as e:
+            logger.warning("Initial tenant sync failed: %s", e)
+
+        async def run():
+            while True:
+                await asyncio.sleep(self.sync_interval)
+                try:
+                    await self.sync(firebase_factory())
+                except Exception as e:
+                    logger.warning("Tenant sync failed: %s", e)
+
+        self._sync_task = asyncio.create_task(run())
+
+    async def stop_sync(self, firebase_factory) -> None:
+        """Stop the sync task and flush what is left."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+            try:
+                await self.sync(firebase_factory())
+            except Exception as e:
+                logger.warning("Final tenant sync failed: %s", e)
+
+    def _roll_day(self) -> None:
+        today = utc_day()
+        if today != self._day:
+            self._day = today
+            for tenant in self._by_id.values():
+                tenant.requests_used = tenant.tokens_used = 0
+
+    @staticmethod
+    def _seconds_to_midnight() -> int:
+        now = datetime.now(timezone.utc)
+        return max(1, 86400 - (now.hour * 3600 + now.minute * 60 + now.second))
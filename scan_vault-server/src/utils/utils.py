@@ -15,5 +15,5 @@ def read_markdown_file(file_path: str):
         with open(file_path, 'r', encoding='utf-8') as file:
             return file.read()
     except FileNotFoundError:
-        logger.error(f"The file {file_path} was not found.")
+        logger.error("The file %s was not found.", file_path)
         return None
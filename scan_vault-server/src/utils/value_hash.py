@@ -0,0 +1,33 @@
+import hashlib
+import hmac
+import os
+import re
+from typing import Any, Optional
+
+_NUMERIC_VALUE = re.compile(r"^[\d\s\-./()+]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_value(value: Any) -> str:
+    """
+    Normalize a finding value so formatting differences map to the same key.
+
+    Values made only of digits and separators (card numbers, SSNs, phone
+    numbers) are reduced to their digits; anything else is case-folded with
+    whitespace collapsed.
+    """
+    text = str(value).strip()
+    if _NUMERIC_VALUE.match(text) and any(char.isdigit() for char in text):
+        return "".join(char for char in text if char.isdigit())
+    return _WHITESPACE.sub(" ", text).casefold()
+
+
+def get_index_key() -> Optional[bytes]:
+    """Return the HMAC key for the value index, or None if it is not configured."""
+    key = os.getenv("SCAN_VAULT_INDEX_KEY")
+    return key.encode("utf-8") if key else None
+
+
+def value_digest(value: Any, key: bytes) -> str:
+    """Keyed hash of a normalized finding value; raw values are never stored."""
+    return hmac.new(key, normalize_value(value).encode("utf-8"), hashlib.sha256).hexdigest()